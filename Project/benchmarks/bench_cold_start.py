@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark.
+
+Starts fresh interpreters (like new gunicorn workers) and times each boot stage:
+importing the third-party dependencies, importing app.py (which builds the
+module-level app through create_app()), building a second app with
+create_app(), and serving the first request. For comparison it also times
+the bcrypt hash + verify that every boot used to do when app.py seeded the
+default staff account on import.
+
+Fails (exit status 1) when the median `import app` time is over the budget,
+so a heavy module-level import (NumPy, Pillow, ...) on the app import path
+shows up as a regression instead of a slightly bigger number.
+
+Usage:
+    cd Project
+    python benchmarks/bench_cold_start.py [--runs 10] [--budget-ms 140]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Median `import app` time allowed, in ms
+IMPORT_APP_BUDGET_MS = float(os.getenv('IMPORT_APP_BUDGET_MS', '140'))
+
+# Runs inside each fresh interpreter; prints one JSON line of stage timings in ms
+CHILD = '''
+import json, sys, time
+sys.path.insert(0, {src!r})
+t0 = time.perf_counter()
+import flask, flask_session, flask_cors, bcrypt
+t1 = time.perf_counter()
+import app as app_module
+t2 = time.perf_counter()
+app_module.create_app()
+t3 = time.perf_counter()
+with app_module.app.test_client() as client:
+    client.get('/api/health')
+t4 = time.perf_counter()
+app_module.verify_password('admin123', app_module.hash_password('admin123'))
+t5 = time.perf_counter()
+print(json.dumps({{
+    'dependencies': (t1 - t0) * 1000,
+    'import_app': (t2 - t1) * 1000,
+    'create_app': (t3 - t2) * 1000,
+    'first_request': (t4 - t3) * 1000,
+    'bcrypt_seed': (t5 - t4) * 1000,
+}}))
+'''
+
+STAGES = [
+    ('dependencies', 'import flask/bcrypt/...'),
+    ('import_app', 'import app (incl. create_app)'),
+    ('create_app', 'create_app() again'),
+    ('first_request', 'first request'),
+    ('bcrypt_seed', 'bcrypt hash+verify (no longer at boot)'),
+]
+
+
+def boot_once():
+    """Boot one fresh interpreter; return (stage timings, process wall time) in ms."""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(src=SRC_DIR)],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    wall = (time.perf_counter() - start) * 1000
+    return json.loads(output.strip().splitlines()[-1]), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_APP_BUDGET_MS,
+                        help='median import app time allowed (default %(default)s)')
+    args = parser.parse_args()
+
+    results, walls = [], []
+    for _ in range(args.runs):
+        timings, wall = boot_once()
+        results.append(timings)
+        walls.append(wall)
+
+    print(f"{'stage':<42}{'median ms':>12}{'max ms':>10}")
+    for key, label in STAGES:
+        values = [r[key] for r in results]
+        print(f"{label:<42}{statistics.median(values):>12.1f}{max(values):>10.1f}")
+    print(f"{'process wall time (interpreter + all)':<42}{statistics.median(walls):>12.1f}{max(walls):>10.1f}")
+
+    import_app = statistics.median(r['import_app'] for r in results)
+    if import_app > args.budget_ms:
+        sys.exit(f"FAIL: import app took {import_app:.1f} ms (median), budget {args.budget_ms:.0f} ms")
+    print(f"OK: import app {import_app:.1f} ms (median) within the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Description matching benchmark.
+
+Fills a scratch SQLite database with generated unclaimed items and times
+the in-memory TF-IDF index behind POST /api/items/match: building it from
+the items table, matching a student's description, applying one item write
+(note_item), and the first match after that write (which recomputes the
+IDF weights and item norms), at growing table sizes.
+
+Usage:
+    cd Project
+    python benchmarks/bench_match.py [--sizes 10000 50000 100000] [--runs 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import migrations
+from db_pool import SQLitePool
+from matching import build_match_index
+
+COLOURS = ('black', 'blue', 'red', 'green', 'grey', 'white', 'pink', 'silver', 'brown', 'navy')
+THINGS = ('wallet', 'bottle', 'umbrella', 'jacket', 'phone', 'charger', 'keys', 'notebook', 'calculator',
+          'scarf', 'hat', 'case', 'bag', 'airpods', 'laptop', 'watch', 'glasses', 'mitten', 'lanyard', 'ring')
+DETAILS = ('leather', 'plastic', 'small', 'large', 'cracked', 'sticker', 'zipper', 'strap', 'engraved', 'old')
+CATEGORIES = ('cards', 'bottles', 'electronics', 'clothing', 'keys', 'bags', 'other')
+LOCATIONS = ('SLC Great Hall', 'PAC Gym', 'CIF', 'DC Library', 'MC Lounge', 'E7 Atrium', 'QNC')
+
+QUERY = ('I lost my black leather wallet with my WatCard and a brown sticker on it, '
+         'probably somewhere in the SLC Great Hall on Monday')
+
+
+def fill(pool, count, start=0):
+    rng = random.Random(start)
+    rows = []
+    for i in range(start, start + count):
+        thing = rng.choice(THINGS)
+        # Brand-like rare words give the vocabulary a long tail
+        words = [rng.choice(COLOURS), rng.choice(DETAILS), thing, f'brand{int(rng.paretovariate(1.2))}']
+        rows.append((
+            f'{words[0]} {thing}'.title(), ' '.join(words), rng.choice(CATEGORIES), rng.choice(LOCATIONS),
+            'SLC', f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00', 'SLC'
+        ))
+    conn = pool.connection()
+    conn.cursor().executemany('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def time_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLitePool(os.path.join(tmp, 'bench_match.db'), profile='default')
+        conn = pool.connection()
+        migrations.upgrade(conn)
+        conn.close()
+
+        print(f"{'items':>9} {'build ms':>9} {'match ms':>9} {'note ms':>9} {'match after write ms':>21}")
+        filled = 0
+        for size in sorted(args.sizes):
+            fill(pool, size - filled, start=filled)
+            filled = size
+            conn = pool.connection()
+            start = time.perf_counter()
+            index = build_match_index(conn.cursor())
+            build_ms = (time.perf_counter() - start) * 1000
+            conn.close()
+
+            index.match(QUERY)
+            match_ms = time_ms(lambda: index.match(QUERY, limit=10), args.runs)
+            item_ids = iter(range(1, size + 1))
+            note_ms = time_ms(lambda: index.note_item(next(item_ids), 'unclaimed', 'Black Wallet',
+                                                      'black leather wallet', 'cards', 'SLC Great Hall'), args.runs)
+
+            def write_then_match():
+                index.note_item(size, 'unclaimed', 'Grey Umbrella', 'grey umbrella', 'other', 'PAC Gym')
+                index.match(QUERY, limit=10)
+            after_write_ms = time_ms(write_then_match, args.runs)
+            print(f'{size:>9} {build_ms:>9.1f} {match_ms:>9.2f} {note_ms:>9.3f} {after_write_ms:>21.2f}')
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Item search benchmark.
+
+Fills a scratch SQLite database with generated items and times the search
+done by GET /api/items?search=... (COUNT query + first page) at growing
+table sizes, once with the old five-column LIKE '%term%' scan and once
+through the FTS5 index from migration 3. LIKE time grows with the table;
+FTS time should stay roughly flat. It also times a fuzzy lookup of a
+misspelled word ("walet") in the in-process trigram index used by
+fuzzy=true, and how long rebuilding that index takes.
+
+Usage:
+    cd Project
+    python benchmarks/bench_search.py [--sizes 10000 50000 200000] [--runs 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import migrations
+from db_pool import SQLitePool
+from search import ITEM_MATCH_JOIN, build_fuzzy_index, match_expression
+
+WORDS = ('black', 'blue', 'red', 'leather', 'plastic', 'small', 'large', 'wallet', 'bottle', 'umbrella',
+         'jacket', 'phone', 'charger', 'keys', 'notebook', 'calculator', 'scarf', 'hat', 'case', 'bag')
+CATEGORIES = ('cards', 'bottles', 'electronics', 'clothing', 'keys', 'bags', 'other')
+LOCATIONS = ('SLC', 'PAC', 'CIF', 'DC Library', 'MC Lounge', 'E7 Atrium', 'QNC')
+
+# Rare term: about 1 item in 2000 mentions it
+NEEDLE = 'stethoscope'
+
+LIKE_SEARCH = '''(
+    description LIKE ? OR category LIKE ? OR location_found LIKE ? OR
+    pickup_at LIKE ? OR found_by_desk LIKE ?
+)'''
+
+
+def fill(pool, count, start=0):
+    rng = random.Random(start)
+    rows = []
+    for i in range(start, start + count):
+        words = rng.sample(WORDS, 4)
+        if i % 2000 == 0:
+            words.append(NEEDLE)
+        rows.append((
+            ' '.join(words[:2]).title(), ' '.join(words), rng.choice(CATEGORIES), rng.choice(LOCATIONS),
+            rng.choice(('SLC', 'PAC', 'CIF')), f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00',
+            rng.choice(('SLC', 'PAC', 'CIF'))
+        ))
+    conn = pool.connection()
+    conn.cursor().executemany('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def run_search(cursor, from_clause, where, params):
+    cursor.execute(f"SELECT COUNT(*) AS total FROM {from_clause} WHERE status != 'deleted' AND {where}", params)
+    cursor.fetchone()
+    cursor.execute(f'''
+        SELECT item_id, name FROM {from_clause}
+        WHERE status != 'deleted' AND {where}
+        ORDER BY date_found DESC, created_at DESC LIMIT 20 OFFSET 0
+    ''', params)
+    return cursor.fetchall()
+
+
+def time_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLitePool(os.path.join(tmp, 'bench_search.db'), profile='default')
+        conn = pool.connection()
+        migrations.upgrade(conn)
+        conn.close()
+
+        print(f"{'items':>9}  {'term':<12} {'LIKE ms':>9} {'FTS ms':>9} {'fuzzy ms':>9} {'build ms':>9}")
+        filled = 0
+        for size in sorted(args.sizes):
+            fill(pool, size - filled, start=filled)
+            filled = size
+            conn = pool.connection()
+            cursor = conn.cursor()
+            start = time.perf_counter()
+            index = build_fuzzy_index(cursor)
+            build_ms = (time.perf_counter() - start) * 1000
+            for term, typo in ((NEEDLE, 'stethoscpe'), ('wallet', 'walet')):
+                like_ms = time_ms(lambda: run_search(cursor, 'items', LIKE_SEARCH, [f'%{term}%'] * 5), args.runs)
+                match = match_expression(cursor.dialect, term)
+                fts_from = f"items {ITEM_MATCH_JOIN['sqlite']}"
+                fts_ms = time_ms(lambda: run_search(cursor, fts_from, '1 = 1', [match]), args.runs)
+                fuzzy_ms = time_ms(lambda: index.search(typo, limit=500), args.runs)
+                print(f'{size:>9}  {term:<12} {like_ms:>9.2f} {fts_ms:>9.2f} {fuzzy_ms:>9.2f} {build_ms:>9.1f}')
+            conn.close()
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+SQLite contention benchmark.
+
+Measures item-listing read throughput while staff threads keep approving
+claims, once with the default rollback-journal profile and once with the
+'wal' profile (separate read-only/writer pools, busy timeout, mmap reads).
+
+Usage:
+    cd Project
+    python benchmarks/bench_sqlite_contention.py [--seconds 5] [--readers 8] [--writers 2]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import db_config
+from db_pool import SQLitePool
+
+LISTING_QUERY = '''
+    SELECT
+        item_id, name, category, location_found, date_found, status,
+        (SELECT status FROM claims WHERE item_id = items.item_id ORDER BY updated_at DESC LIMIT 1) AS latest_claim_status,
+        (SELECT COUNT(*) FROM claims WHERE item_id = items.item_id AND status = 'pending') AS pending_claims
+    FROM items
+    WHERE status != 'deleted'
+    ORDER BY date_found DESC, created_at DESC
+    LIMIT 20 OFFSET ?
+'''
+
+
+def build_database(path, item_count):
+    """Create a database with items and pending claims to approve."""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE items (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT, category TEXT NOT NULL, location_found TEXT NOT NULL,
+            date_found TIMESTAMP NOT NULL, status TEXT NOT NULL DEFAULT 'unclaimed',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            claimed_at TIMESTAMP
+        );
+        CREATE TABLE claims (
+            claim_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL, claimant_user_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending', staff_notes TEXT,
+            processed_by_staff_id INTEGER,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX idx_items_status_date ON items(status, date_found DESC);
+        CREATE INDEX idx_claims_item_id ON claims(item_id);
+    ''')
+    conn.executemany(
+        "INSERT INTO items (name, category, location_found, date_found) VALUES (?, 'electronics', 'SLC', ?)",
+        [(f'Item {i}', f'2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00') for i in range(item_count)]
+    )
+    conn.executemany(
+        'INSERT INTO claims (item_id, claimant_user_id) VALUES (?, ?)',
+        [(1 + i % item_count, 1 + i % 50) for i in range(item_count * 2)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def approve_claim(conn, claim_id):
+    """The write pattern of PATCH /api/claims/<id> (approve + auto-reject)."""
+    cursor = conn.cursor()
+    cursor.execute('SELECT item_id FROM claims WHERE claim_id = ?', (claim_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return
+    cursor.execute(
+        "UPDATE claims SET status = 'approved', staff_notes = 'ok', processed_by_staff_id = 1, "
+        "updated_at = CURRENT_TIMESTAMP WHERE claim_id = ?", (claim_id,)
+    )
+    cursor.execute(
+        "UPDATE claims SET status = 'rejected', updated_at = CURRENT_TIMESTAMP "
+        "WHERE item_id = ? AND claim_id != ? AND status = 'pending'", (row['item_id'], claim_id)
+    )
+    cursor.execute(
+        "UPDATE items SET updated_at = CURRENT_TIMESTAMP WHERE item_id = ?", (row['item_id'],)
+    )
+    conn.commit()
+
+
+def run_profile(profile, seconds, readers, writers, item_count):
+    """Run readers and writers concurrently against a fresh database."""
+    workdir = tempfile.mkdtemp(prefix='lostfound_bench_')
+    path = os.path.join(workdir, 'bench.db')
+    build_database(path, item_count)
+
+    if profile == 'wal':
+        read_pool = SQLitePool(path, readonly=True, profile='wal')
+        write_pool = SQLitePool(path, max_size=db_config.SQLITE_WRITER_POOL_SIZE, profile='wal', role='write')
+    else:
+        read_pool = write_pool = SQLitePool(path, max_size=readers + writers, profile='default')
+
+    stop = threading.Event()
+    counters = {'reads': 0, 'writes': 0, 'locked': 0, 'read_latency': []}
+    lock = threading.Lock()
+
+    def reader(offset_seed):
+        offset = offset_seed
+        while not stop.is_set():
+            conn = read_pool.connection()
+            try:
+                start = time.perf_counter()
+                conn.execute(LISTING_QUERY, ((offset * 20) % item_count,)).fetchall()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    counters['reads'] += 1
+                    counters['read_latency'].append(elapsed)
+            except sqlite3.OperationalError:
+                with lock:
+                    counters['locked'] += 1
+            finally:
+                conn.close()
+            offset += 1
+
+    def writer(seed):
+        claim_id = seed
+        while not stop.is_set():
+            conn = write_pool.connection()
+            try:
+                approve_claim(conn, 1 + claim_id % (item_count * 2))
+                with lock:
+                    counters['writes'] += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    counters['locked'] += 1
+            finally:
+                conn.close()
+            claim_id += writers
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_pool.close()
+    write_pool.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = sorted(counters['read_latency']) or [0.0]
+    p95 = latencies[int(len(latencies) * 0.95) - 1 if len(latencies) > 1 else 0]
+    return {
+        'profile': profile,
+        'reads_per_sec': counters['reads'] / seconds,
+        'writes_per_sec': counters['writes'] / seconds,
+        'locked_errors': counters['locked'],
+        'read_p95_ms': p95 * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--items', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'p95 read ms':>14}{'locked':>10}")
+    for profile in ('default', 'wal'):
+        result = run_profile(profile, args.seconds, args.readers, args.writers, args.items)
+        print(f"{result['profile']:<10}{result['reads_per_sec']:>12.1f}{result['writes_per_sec']:>12.1f}"
+              f"{result['read_p95_ms']:>14.2f}{result['locked_errors']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -83,7 +83,7 @@ function ItemCard({ item, showClaimButton = false, onClaimSuccess, onViewDetails
       {item.image_url && (
         <div className="item-image-container">
           <img 
-            src={item.image_url} 
+            src={item.thumbnails ? item.thumbnails['320'] : item.image_url} 
             alt={item.description || 'Lost item'} 
             className="item-image"
             onError={(e) => {
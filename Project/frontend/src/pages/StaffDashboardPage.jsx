@@ -261,10 +261,11 @@ function StaffDashboardPage() {
         ? new Date(formData.date_found).toISOString().replace('T', ' ').substring(0, 19)
         : new Date().toISOString().replace('T', ' ').substring(0, 19)
 
-      // Handle image URL - use uploaded file preview if available
+      // Handle image URL - upload the selected file, the server stores it and makes thumbnails
       let imageUrl = formData.image_url || null
-      if (imageOption === 'upload' && imagePreview) {
-        imageUrl = imagePreview  // Base64 encoded image
+      if (imageOption === 'upload' && imageFile) {
+        const uploaded = await itemsAPI.uploadImage(imageFile)
+        imageUrl = uploaded.image_url
       }
 
       const itemData = {
@@ -1115,7 +1116,7 @@ function StaffDashboardPage() {
               <div key={item.item_id} className="grid-item-card">
                 <div className="card-image">
                   {item.image_url ? (
-                    <img src={item.image_url} alt={displayName} />
+                    <img src={item.thumbnails ? item.thumbnails['320'] : item.image_url} alt={displayName} />
                   ) : (
                     <div className="no-image">
                       <span className="no-image-icon">📦</span>
@@ -1226,7 +1227,7 @@ function StaffDashboardPage() {
                       <td>
                         {item.image_url ? (
                           <img 
-                            src={item.image_url} 
+                            src={item.thumbnails ? item.thumbnails['160'] : item.image_url} 
                             alt={displayName} 
                             className="table-item-image"
                           />
@@ -79,6 +79,30 @@ export const itemsAPI = {
     return response.data
   },
 
+  /**
+   * Get several items by ID in one request (at most 100)
+   * @param {number[]} itemIds - Item identifiers
+   * @returns {Promise} Items in the order asked for, and the ids not found
+   */
+  getItemsBatch: async (itemIds) => {
+    const response = await api.get(`/api/items/batch?ids=${itemIds.join(',')}`)
+    return response.data
+  },
+
+  /**
+   * Upload an item photo (staff only)
+   * @param {File} file - JPEG, PNG, WebP or GIF image (max 5MB)
+   * @returns {Promise} image_url to save on the item, and its thumbnail URLs by size
+   */
+  uploadImage: async (file) => {
+    const formData = new FormData()
+    formData.append('image', file)
+    const response = await api.post('/api/images', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    })
+    return response.data
+  },
+
   /**
    * Create a new item (staff only)
    * @param {Object} itemData - Item data
@@ -177,6 +201,16 @@ export const claimsAPI = {
     return response.data
   },
 
+  /**
+   * Get details of several claims in one request (at most 100)
+   * @param {number[]} claimIds - Claim IDs
+   * @returns {Promise} Claims in the order asked for, and the ids not found
+   */
+  getClaimsBatch: async (claimIds) => {
+    const response = await api.get(`/api/claims/batch?ids=${claimIds.join(',')}`)
+    return response.data
+  },
+
   /**
    * Update claim status (staff only)
    * @param {number} claimId - Claim ID
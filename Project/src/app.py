@@ -13,11 +13,14 @@ Author: Team 15 (Ruhani, Sheehan, Aidan, Neng, Theni)
 Sprint: 2
 """
 
-from flask import Flask, request, jsonify, session, make_response
+from flask import (
+    Flask, Blueprint, request, jsonify, session, make_response, send_file, g, has_request_context, current_app
+)
 from flask_session import Session
 from flask_cors import CORS
-import sqlite3
 import os
+import time
+import base64
 from datetime import datetime, timedelta
 import bcrypt
 import secrets
@@ -26,9 +29,42 @@ import csv
 from io import StringIO
 import json
 import email_utils
-from db_config import get_db_connection, init_db as init_database, convert_query, DB_TYPE, DB_PATH
-
-app = Flask(__name__)
+from db_config import (
+    table_exists, DB_TYPE, DB_PATH, REPLICA_STICKY_SECONDS,
+    DatabaseError, IntegrityError, OperationalError
+)
+from db_pool import (
+    get_pool, pool_stats, PooledConnection, PoolTimeoutError,
+    replica_configured, replica_available, mark_replica_down
+)
+from migrations import check_schema
+from queries import named_query, query_stats
+from search import (
+    ITEM_MATCH_JOIN, RANK_ORDER, search_terms, match_expression, fuzzy_match_join, note_item as note_item_fuzzy
+)
+from claim_summary import SUMMARY_JOIN as CLAIM_SUMMARY_JOIN
+from count_cache import ROW_GENERATIONS, cached_count
+from lookups import CATEGORY_FILTER, DESK_FILTER, LOCATION_FILTER, normalize_key
+from facets import facet_query, parse_facets, facet_counts
+from item_fields import parse_fields, select_list, item_values, item_row
+from suggest import SUGGEST_MAX_LIMIT, suggestion_index, note_item as note_item_suggestions
+from matching import MATCH_MAX_LIMIT, MATCH_MAX_TEXT, match_index, note_item as note_item_matches
+from saved_searches import (
+    SAVED_SEARCH_LIMIT, SAVED_SEARCH_MAX_TEXT, SAVED_SEARCH_COLUMNS, saved_search_dict, percolator, note_search
+)
+from response_cache import (
+    ITEM_LISTING_GENERATIONS, request_key, response_cache_stats, cache_for as response_cache_for
+)
+from images import (
+    IMAGE_MAX_BYTES, THUMBNAIL_SIZES, MIMETYPES, IMMUTABLE_MAX_AGE, ImageError, original_path, parse_original_name, is_digest,
+    thumbnail_urls, save_upload, get_thumbnail_pool
+)
+from conditional import read_version, make_etag, not_modified, not_modified_response, with_validators
+import instrumentation
+from write_queue import get_write_queue
+
+# Routes are registered on this blueprint and mounted by create_app()
+api = Blueprint('api', __name__)
 
 # Enable CORS for frontend
 # Production: Allow Vercel frontend origin
@@ -38,217 +74,212 @@ allowed_origins = ['http://localhost:3000', 'http://127.0.0.1:3000', 'http://loc
 if FRONTEND_URL:
     allowed_origins.append(FRONTEND_URL)
 
-CORS(app, 
-     origins=allowed_origins,
-     supports_credentials=True,
-     allow_headers=['Content-Type', 'Authorization'],
-     methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
 
-# Configuration
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(32))
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['SESSION_PERMANENT'] = False
-app.config['SESSION_USE_SIGNER'] = True
-app.config['SESSION_KEY_PREFIX'] = 'lostfound:'
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+def create_app(config=None):
+    """
+    Application factory.
 
-# Initialize Flask-Session
-Session(app)
+    Building the app has no database side effects beyond one SELECT on
+    schema_version: no DDL, no account seeding and no bcrypt work, so a
+    gunicorn worker boots quickly. Schema changes and the default staff
+    account are one-time commands (`python migrations.py upgrade`,
+    `python seed.py`).
 
-# Database setup
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'lostfound.db')
+    Args:
+        config: Optional dict of settings overriding the defaults below
+                (e.g. {'TESTING': True, 'CHECK_SCHEMA': False})
 
-def init_db():
+    Returns:
+        Configured Flask application
     """
-    Initialize the database with required tables for authentication and items.
-    Creates Users, Items, and Sessions tables.
+    app = Flask(__name__)
+
+    # Configuration
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(32))
+    app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['SESSION_PERMANENT'] = False
+    app.config['SESSION_USE_SIGNER'] = True
+    app.config['SESSION_KEY_PREFIX'] = 'lostfound:'
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+    # Warn at startup when the database is behind the migrations
+    app.config['CHECK_SCHEMA'] = os.getenv('CHECK_SCHEMA', 'true').lower() == 'true'
+    # X-DB-Queries / X-DB-Time-Ms / X-DB-Rows response headers (always on in debug mode)
+    app.config['SQL_DEBUG_HEADERS'] = os.getenv('SQL_DEBUG_HEADERS', 'false').lower() == 'true'
+    if config:
+        app.config.update(config)
+
+    CORS(app,
+         origins=allowed_origins,
+         supports_credentials=True,
+         allow_headers=['Content-Type', 'Authorization'],
+         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+
+    # Initialize Flask-Session
+    Session(app)
+
+    app.register_blueprint(api)
+
+    if app.config['CHECK_SCHEMA']:
+        check_schema()
+    return app
+
+
+def _request_connection(pool):
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Users table - stores all user accounts (students and staff only)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            name TEXT NOT NULL,
-            password_hash TEXT NOT NULL,  -- Required for all users
-            role TEXT NOT NULL CHECK(role IN ('student', 'staff')),
-            watcard_number TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP
-        )
-    ''')
-    
-    # Items table - stores lost-and-found items
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS items (
-            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            description TEXT,
-            category TEXT NOT NULL,
-            location_found TEXT NOT NULL,
-            pickup_at TEXT NOT NULL CHECK(pickup_at IN ('SLC', 'PAC', 'CIF')),
-            date_found TIMESTAMP NOT NULL,
-            status TEXT NOT NULL DEFAULT 'unclaimed' CHECK(status IN ('unclaimed', 'claimed', 'deleted')),
-            image_url TEXT,
-            found_by_desk TEXT NOT NULL,
-            created_by_user_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            claimed_at TIMESTAMP,
-            FOREIGN KEY (created_by_user_id) REFERENCES users(user_id)
-        )
-    ''')
-    
-    def ensure_column(table_name, column_name, column_definition, post_update_sql=None):
-        """
-        Ensure a column exists on a table. Adds it if missing.
-        column_definition should include both the column name and type, e.g. "updated_at TIMESTAMP".
-        """
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = {row[1] for row in cursor.fetchall()}
-        if column_name not in columns:
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_definition}")
-            if post_update_sql:
-                cursor.execute(post_update_sql)
-    
-    # Add updated_at and claimed_at columns if they don't exist (for existing databases)
-    ensure_column(
-        'items',
-        'updated_at',
-        'updated_at TIMESTAMP',
-        "UPDATE items SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"
-    )
-    ensure_column('items', 'claimed_at', 'claimed_at TIMESTAMP')
-    
-    # Add name column if it doesn't exist (Sprint 4 enhancement)
-    ensure_column(
-        'items',
-        'name',
-        'name TEXT',
-        "UPDATE items SET name = COALESCE(description, category) WHERE name IS NULL OR name = ''"
-    )
-    
-    # Sessions table - tracks active sessions
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            role TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
-    ''')
-    
-    # Claims table - tracks item claims by students
-    # Sprint 3: Item Claiming System
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS claims (
-            claim_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_id INTEGER NOT NULL,
-            claimant_user_id INTEGER NOT NULL,
-            claimant_name TEXT NOT NULL,
-            claimant_email TEXT NOT NULL,
-            claimant_phone TEXT,
-            verification_text TEXT NOT NULL,
-            status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'approved', 'rejected', 'picked_up')),
-            staff_notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            processed_by_staff_id INTEGER,
-            FOREIGN KEY (item_id) REFERENCES items(item_id),
-            FOREIGN KEY (claimant_user_id) REFERENCES users(user_id),
-            FOREIGN KEY (processed_by_staff_id) REFERENCES users(user_id)
-        )
-    ''')
-    
-    # Activity Log table - audit trail for staff
-    # Sprint 4: Activity Log (Issue #44)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS activity_log (
-            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            user_name TEXT,
-            user_email TEXT,
-            user_role TEXT,
-            action_type TEXT NOT NULL CHECK(action_type IN (
-                'item_added', 'item_updated', 'item_deleted',
-                'claim_created', 'claim_approved', 'claim_rejected', 'claim_picked_up',
-                'user_registered', 'user_login', 'profile_updated', 'password_changed',
-                'data_export'
-            )),
-            entity_type TEXT CHECK(entity_type IN ('item', 'claim', 'user', 'profile')),
-            entity_id INTEGER,
-            details TEXT,
-            ip_address TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
-    ''')
-    
-    # Create indexes for improved query performance
-    # Sprint 3: Item Searching & Filtering (Backend)
-    
-    # Items table indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_status ON items(status)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_category ON items(category)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_location_found ON items(location_found)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_date_found ON items(date_found DESC)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_created_at ON items(created_at DESC)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_pickup_at ON items(pickup_at)')
-    
-    # Composite indexes for common query patterns
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_status_date ON items(status, date_found DESC)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_category_status ON items(category, status)')
-    
-    # Claims table indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_claims_item_id ON claims(item_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_claims_claimant_user_id ON claims(claimant_user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_claims_created_at ON claims(created_at DESC)')
-    
-    # Users table indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)')
-    
-    # Activity Log table indexes (Sprint 4: Issue #44)
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_user_id ON activity_log(user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_action_type ON activity_log(action_type)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_created_at ON activity_log(created_at DESC)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_entity ON activity_log(entity_type, entity_id)')
-    
-    # Notifications table - stores in-app notifications for users
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS notifications (
-            notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            type TEXT NOT NULL DEFAULT 'info',
-            title TEXT NOT NULL,
-            message TEXT NOT NULL,
-            metadata TEXT,
-            is_read INTEGER NOT NULL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            read_at TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
-    ''')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_id, is_read)')
-    
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully")
-    print("✅ Database indexes created for optimal query performance")
-    print("✅ Activity log table created for audit trail")
+    Return a handle to the request's connection from `pool`, checking one out
+    on first use. Checkouts are kept on flask.g and returned by teardown.
+    """
+    if not has_request_context():
+        return pool.connection()
+
+    checkouts = g.setdefault('db_checkouts', {})
+    conn = checkouts.get(pool)
+    if conn is None:
+        conn = checkouts[pool] = pool.acquire()
+    # close() on the handle only rolls back; the connection stays with the request
+    return PooledConnection(conn, lambda raw: _rollback_request_connection(pool, raw), pool.dialect,
+                            on_commit=lambda: _on_request_commit(pool), pool=pool)
+
+
+def _on_request_commit(pool):
+    """The request committed on `pool`: remember the write and release writes waiting for it."""
+    if pool.role != 'replica':
+        g.db_wrote = True
+    _submit_pending_writes(pool)
+
+
+def _rollback_request_connection(pool, raw):
+    """Roll back the request's connection; writes waiting for its commit are dropped."""
+    raw.rollback()
+    pending = g.get('pending_writes')
+    if pending:
+        pending.pop(pool, None)
+
+
+def _submit_pending_writes(pool):
+    """Hand writes that were waiting for this connection's commit to the write-behind queue."""
+    pending = g.get('pending_writes')
+    rows = pending.pop(pool, None) if pending else None
+    for query, params in rows or ():
+        get_write_queue().submit(pool, query, params)
+
+
+def queue_write(query, params, after_commit=False):
+    """
+    Run a secondary write (audit log, last login, notification) off the request path.
+    The write-behind queue's writer thread batches it with other queued writes.
+
+    Args:
+        query: Query to run against the primary database
+        params: Parameters for the query
+        after_commit: Hold the write until the request's transaction commits
+                      (dropped if it rolls back instead)
+    """
+    pool = get_pool(DB_PATH)
+    if after_commit and has_request_context():
+        g.setdefault('pending_writes', {}).setdefault(pool, []).append((query, params))
+    else:
+        get_write_queue().submit(pool, query, params)
 
-# Initialize database on startup
-init_db()
 
 def get_db_connection():
-    """Get a database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Get a database connection.
+    Inside a request every call shares one pooled connection (kept on flask.g),
+    so helpers like log_activity() don't open a second one. The connection is
+    returned to the pool when the request ends. Outside a request the caller
+    gets its own pooled connection, returned on close().
+    """
+    return _request_connection(get_pool(DB_PATH))
+
+
+def get_read_connection():
+    """
+    Get a connection for read-only endpoints.
+    On PostgreSQL with REPLICA_DATABASE_URL set this is a replica connection,
+    except right after the session's own write (see _reads_pinned_to_primary)
+    or while the replica is failing. Under the 'wal' SQLite profile it comes
+    from the read-only pool, so readers never queue behind the writer pool;
+    otherwise it is the same connection get_db_connection() returns.
+    """
+    if replica_available() and _reads_pinned_to_primary():
+        return get_db_connection()
+    pool = get_pool(DB_PATH, readonly=True)
+    if pool.role != 'replica':
+        return _request_connection(pool)
+    try:
+        return _request_connection(pool)
+    except PoolTimeoutError:
+        raise
+    except Exception as exc:
+        mark_replica_down(exc)
+        return get_db_connection()
+
+
+def _reads_pinned_to_primary():
+    """
+    Read-your-writes: reads stay on the primary if this request already
+    committed a write, or if the session wrote within REPLICA_STICKY_SECONDS
+    (the replica may not have replayed it yet).
+    """
+    if not has_request_context():
+        return False
+    if g.get('db_wrote'):
+        return True
+    return session.get('read_primary_until', 0) > time.time()
+
+
+@api.before_app_request
+def start_sql_recording():
+    """Count the queries, database time and rows of this request."""
+    g.sql_recording = instrumentation.begin_request(request.path)
+
+
+@api.after_app_request
+def add_sql_headers(response):
+    """Report the request's SQL work in response headers (debug mode only)."""
+    if current_app.debug or current_app.config.get('SQL_DEBUG_HEADERS'):
+        stats = instrumentation.current_request_stats()
+        if stats is not None:
+            response.headers['X-DB-Queries'] = str(stats.queries)
+            response.headers['X-DB-Time-Ms'] = f'{stats.seconds * 1000:.3f}'
+            response.headers['X-DB-Rows'] = str(stats.rows)
+    return response
+
+
+@api.after_app_request
+def pin_reads_after_write(response):
+    """After a write, keep this session's reads on the primary for REPLICA_STICKY_SECONDS."""
+    if g.get('db_wrote') and replica_configured():
+        session['read_primary_until'] = time.time() + REPLICA_STICKY_SECONDS
+    return response
+
+
+@api.teardown_app_request
+def release_db_connection(exc):
+    """Return the request's pooled connections (if any) at the end of the request."""
+    checkouts = g.pop('db_checkouts', None)
+    if checkouts:
+        for pool, conn in checkouts.items():
+            pool.release(conn)
+    g.pop('pending_writes', None)
+    token = g.pop('sql_recording', None)
+    if token is not None:
+        instrumentation.end_request(token)
+
+
+# Secondary writes, executed by the write-behind queue in batches
+INSERT_ACTIVITY_LOG = named_query('activity_log.insert', '''
+    INSERT INTO activity_log (
+        user_id, user_name, user_email, user_role,
+        action_type, entity_type, entity_id, details, ip_address
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+''')
+UPDATE_LAST_LOGIN = named_query('users.last_login', 'UPDATE users SET last_login = ? WHERE user_id = ?')
+INSERT_NOTIFICATION = named_query('notifications.insert', '''
+    INSERT INTO notifications (user_id, type, title, message, metadata)
+    VALUES (?, ?, ?, ?, ?)
+''')
 
 
 def log_activity(action_type, entity_type=None, entity_id=None, details=None, user_id=None, user_info=None):
@@ -265,9 +296,6 @@ def log_activity(action_type, entity_type=None, entity_id=None, details=None, us
         user_info: Dictionary with user information (name, email, role)
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         # Get user info from session if not provided
         if user_id is None and session.get('user_id'):
             user_id = session.get('user_id')
@@ -280,12 +308,8 @@ def log_activity(action_type, entity_type=None, entity_id=None, details=None, us
         # Get IP address
         ip_address = request.remote_addr if request else None
         
-        cursor.execute('''
-            INSERT INTO activity_log (
-                user_id, user_name, user_email, user_role,
-                action_type, entity_type, entity_id, details, ip_address
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        # Written by the write-behind queue; the request does not wait for it
+        queue_write(INSERT_ACTIVITY_LOG, (
             user_id,
             user_info.get('name') if user_info else None,
             user_info.get('email') if user_info else None,
@@ -296,9 +320,6 @@ def log_activity(action_type, entity_type=None, entity_id=None, details=None, us
             details,
             ip_address
         ))
-        
-        conn.commit()
-        conn.close()
     except Exception as e:
         print(f"Warning: Failed to log activity: {e}")
         # Don't let logging failures break the application
@@ -327,26 +348,60 @@ def serialize_notification_row(row):
 
 def insert_notification(cursor, user_id, title, message, notification_type='info', metadata=None):
     """
-    Insert a notification using an existing DB cursor so it can participate in the current transaction.
+    Insert a notification for the current transaction.
+    Inside a request it is queued and written by the write-behind queue once the
+    request's transaction commits (never if it rolls back). Outside a request it
+    is inserted directly with `cursor`.
     """
     if not user_id:
         return
     metadata_json = json.dumps(metadata) if metadata is not None else None
+    params = (user_id, notification_type, title, message, metadata_json)
+
+    if has_request_context():
+        queue_write(INSERT_NOTIFICATION, params, after_commit=True)
+        return
 
     try:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='notifications'")
-        if cursor.fetchone() is None:
+        if not table_exists(cursor, 'notifications'):
             # Notifications table does not exist in this environment (e.g., tests) – skip gracefully
             return
 
-        cursor.execute('''
-            INSERT INTO notifications (user_id, type, title, message, metadata)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, notification_type, title, message, metadata_json))
-    except sqlite3.Error as exc:
+        cursor.execute(INSERT_NOTIFICATION, params)
+    except DatabaseError as exc:
         print(f"Warning: skipped notification insert because table is unavailable ({exc})")
 
 
+def notify_saved_searches(conn, item_id, item, created_by):
+    """
+    Notify the owners of saved searches a new item matches (saved_searches.py).
+    One notification per user, listing every saved search of theirs it matches.
+    
+    Args:
+        conn: Connection of the transaction creating the item
+        item_id: New item's id
+        item: The item's values (name, description, category, locations, status)
+        created_by: User logging the item, never notified about it
+    """
+    if item.get('status', 'unclaimed') != 'unclaimed':
+        return
+    matched = {}
+    for search in percolator(conn).percolate(item):
+        if search.user_id != created_by:
+            matched.setdefault(search.user_id, []).append(search)
+    
+    label = item.get('name') or item.get('description') or item.get('category')
+    for user_id, searches in matched.items():
+        insert_notification(
+            conn.cursor(),
+            user_id,
+            'Saved Search Match',
+            f'A new item matching your saved search "{searches[0].name}" was logged: {label}.',
+            'info',
+            {'item_id': item_id, 'saved_search_ids': sorted(search.search_id for search in searches)}
+        )
+
+
 def hash_password(password):
     """Hash a password using bcrypt."""
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -355,52 +410,6 @@ def verify_password(password, password_hash):
     """Verify a password against its hash."""
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
-# Create default staff account for testing (password: admin123)
-# This runs on every startup to ensure the account exists
-def create_default_staff_account():
-    """Create default staff account if it doesn't exist, or reset password if it does."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE email = ? AND role = ?', ('admin@uwaterloo.ca', 'staff'))
-        existing_user = cursor.fetchone()
-        
-        # Always create fresh hash
-        admin_hash = hash_password('admin123')
-        
-        # Verify the hash works before storing
-        test_verify = verify_password('admin123', admin_hash)
-        if not test_verify:
-            print("ERROR: Generated password hash does not verify! This is a critical error.")
-        
-        if not existing_user:
-            # Create new admin account
-            cursor.execute('''
-                INSERT INTO users (email, name, password_hash, role)
-                VALUES (?, ?, ?, ?)
-            ''', ('admin@uwaterloo.ca', 'Admin User', admin_hash, 'staff'))
-            conn.commit()
-            print("✅ Default staff account created: admin@uwaterloo.ca / admin123")
-            print(f"   Hash verification test: {test_verify}")
-        else:
-            # Update password hash to ensure it's correct
-            cursor.execute('''
-                UPDATE users 
-                SET password_hash = ?
-                WHERE email = ? AND role = ?
-            ''', (admin_hash, 'admin@uwaterloo.ca', 'staff'))
-            conn.commit()
-            print("✅ Default staff account password reset: admin@uwaterloo.ca / admin123")
-            print(f"   Hash verification test: {test_verify}")
-        conn.close()
-    except Exception as e:
-        print(f"❌ ERROR: Could not create default staff account: {e}")
-        import traceback
-        traceback.print_exc()
-
-# Create default staff account on startup
-create_default_staff_account()
-
 def validate_uwaterloo_email(email):
     """
     Validate that email is a @uwaterloo.ca email address.
@@ -445,7 +454,7 @@ def require_role(*allowed_roles):
 # Authentication Endpoints
 # ============================================================================
 
-@app.route('/auth/login', methods=['POST'])
+@api.route('/auth/login', methods=['POST'])
 def login():
     """
     Login endpoint for students and staff.
@@ -509,13 +518,8 @@ def login():
         traceback.print_exc()
         return jsonify({'error': 'Invalid email or password'}), 401
     
-    # Update last login
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('UPDATE users SET last_login = ? WHERE user_id = ?', 
-                  (datetime.now().isoformat(), user['user_id']))
-    conn.commit()
-    conn.close()
+    # Update last login (write-behind; the response does not wait for it)
+    queue_write(UPDATE_LAST_LOGIN, (datetime.now().isoformat(), user['user_id']))
     
     # Set session
     session['user_id'] = user['user_id']
@@ -534,7 +538,7 @@ def login():
         }
     }), 200
 
-@app.route('/auth/register', methods=['POST'])
+@api.route('/auth/register', methods=['POST'])
 def register():
     """
     Registration endpoint for students and staff.
@@ -576,8 +580,12 @@ def register():
     if len(password) < 6:
         return jsonify({'error': 'Password must be at least 6 characters'}), 400
     
+    # Hashed before the write lock is taken: bcrypt is slow on purpose
+    password_hash = hash_password(password)
+    
     conn = get_db_connection()
     cursor = conn.cursor()
+    conn.begin_write()
     
     # Check if email already exists
     cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
@@ -586,13 +594,11 @@ def register():
         return jsonify({'error': 'Email already registered'}), 409
     
     # Create account (default to student, staff requires explicit role)
-    password_hash = hash_password(password)
-    cursor.execute('''
+    user_id = cursor.insert_returning_id('''
         INSERT INTO users (email, name, password_hash, role)
         VALUES (?, ?, ?, ?)
-    ''', (email, name, password_hash, role))
+    ''', (email, name, password_hash, role), 'user_id')
     
-    user_id = cursor.lastrowid
     conn.commit()
     conn.close()
     
@@ -606,7 +612,7 @@ def register():
         }
     }), 201
 
-@app.route('/auth/logout', methods=['POST'])
+@api.route('/auth/logout', methods=['POST'])
 @require_auth
 def logout():
     """
@@ -622,7 +628,7 @@ def logout():
     
     return jsonify({'message': 'Logout successful'}), 200
 
-@app.route('/auth/verify-session', methods=['GET'])
+@api.route('/auth/verify-session', methods=['GET'])
 def verify_session():
     """
     Verify if the current session is valid and return user information.
@@ -644,7 +650,7 @@ def verify_session():
         }
     }), 200
 
-@app.route('/auth/me', methods=['GET'])
+@api.route('/auth/me', methods=['GET'])
 @require_auth
 def get_current_user():
     """
@@ -662,7 +668,7 @@ def get_current_user():
     }), 200
 
 
-@app.route('/auth/forgot-password', methods=['POST'])
+@api.route('/auth/forgot-password', methods=['POST'])
 def forgot_password():
     """
     Send password recovery email to user.
@@ -801,7 +807,7 @@ This is an automated message. Please do not reply to this email.
             'message': 'If an account exists with this email, password recovery instructions have been sent.'
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'An error occurred. Please try again later.'}), 500
     except Exception as err:
@@ -811,7 +817,7 @@ This is an automated message. Please do not reply to this email.
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/auth/profile', methods=['PATCH'])
+@api.route('/auth/profile', methods=['PATCH'])
 @require_auth
 def update_profile():
     """
@@ -855,6 +861,7 @@ def update_profile():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        conn.begin_write()
         
         # If email is being changed, check if it's already in use
         if email:
@@ -905,7 +912,7 @@ def update_profile():
             }
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to update profile'}), 500
     except Exception as err:
@@ -915,7 +922,7 @@ def update_profile():
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/auth/change-password', methods=['POST'])
+@api.route('/auth/change-password', methods=['POST'])
 @require_auth
 def change_password():
     """
@@ -978,15 +985,22 @@ def change_password():
             conn.close()
             return jsonify({'error': 'User not found'}), 404
         
-        # Verify current password
+        # Verify current password and hash the new one before the write lock
+        # is taken: bcrypt is slow on purpose
         if not bcrypt.checkpw(current_password.encode('utf-8'), user['password']):
             conn.close()
             return jsonify({'error': 'Current password is incorrect'}), 401
-        
-        # Hash new password
         new_password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
         
-        # Update password
+        # Update password, unless it changed since it was checked
+        # (write lock: SQLite the database's, PostgreSQL the user's row)
+        conn.begin_write()
+        lock = ' FOR UPDATE' if cursor.dialect.name == 'postgresql' else ''
+        cursor.execute(f'SELECT password FROM users WHERE user_id = ?{lock}', (user_id,))
+        current = cursor.fetchone()
+        if not current or current['password'] != user['password']:
+            conn.close()
+            return jsonify({'error': 'Password was changed by another request, please try again'}), 409
         cursor.execute('UPDATE users SET password = ? WHERE user_id = ?', (new_password_hash, user_id))
         conn.commit()
         conn.close()
@@ -1068,7 +1082,7 @@ This is an automated message. Please do not reply to this email.
             'message': 'Password changed successfully'
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to change password'}), 500
     except Exception as err:
@@ -1082,8 +1096,8 @@ This is an automated message. Please do not reply to this email.
 # Test/Health Endpoints
 # ============================================================================
 
-@app.route('/health', methods=['GET'])
-@app.route('/api/health', methods=['GET'])
+@api.route('/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint for Render and monitoring."""
     return jsonify({
@@ -1092,11 +1106,126 @@ def health_check():
         'database': DB_TYPE
     }), 200
 
+
+@api.route('/api/diagnostics/pools', methods=['GET'])
+@require_role('staff')
+def get_pool_stats():
+    """
+    Connection pool and write-behind queue statistics (staff only).
+    
+    Returns:
+    - 200: {"pools": [{"in_use", "waiting", "created", ...}], "write_queue": {"depth", ...}}
+    - 403: Not staff
+    """
+    return jsonify({
+        'pools': pool_stats(),
+        'write_queue': get_write_queue().stats()
+    }), 200
+
+
+@api.route('/api/diagnostics/queries', methods=['GET'])
+@require_role('staff')
+def get_query_stats():
+    """
+    Execution count and latency of every named query (staff only).
+    Sorted by total time so the queries that dominate come first.
+    
+    Returns:
+    - 200: {"queries": [{"name", "count", "errors", "total_ms", "avg_ms", "max_ms", "variants"}]}
+    - 403: Not staff
+    """
+    return jsonify({'queries': query_stats()}), 200
+
+
+@api.route('/api/diagnostics/response-cache', methods=['GET'])
+@require_role('staff')
+def get_response_cache_stats():
+    """
+    Hit, miss and eviction counts of the cached item listings, per pool (staff only).
+    
+    Returns:
+    - 200: {"caches": [{"backend", "role", "entries", "max_size", "ttl_seconds", "hits",
+      "misses", "hit_rate", "evictions", "expired", "invalidated"}]}
+    - 403: Not staff
+    """
+    return jsonify({'caches': response_cache_stats()}), 200
+
+
+@api.route('/api/diagnostics/slow-queries', methods=['GET'])
+@require_role('staff')
+def get_slow_queries():
+    """
+    Recent statements slower than SLOW_QUERY_MS, with captured query plans (staff only).
+    Plans are EXPLAIN QUERY PLAN on SQLite and EXPLAIN ANALYZE on PostgreSQL.
+    
+    Returns:
+    - 200: {"threshold_ms": 100, "slow_queries": [{"name", "sql", "duration_ms", "path", "plan", ...}]}
+    - 403: Not staff
+    """
+    return jsonify({
+        'threshold_ms': instrumentation.SLOW_QUERY_MS,
+        'slow_queries': instrumentation.slow_queries()
+    }), 200
+
 # ============================================================================
 # Items Endpoints
 # ============================================================================
 
-@app.route('/api/items', methods=['GET'])
+# Listing order per sort: every key column, item_id last so the order is total
+ITEM_ORDER = {
+    'recent': 'date_found DESC, created_at DESC, items.item_id DESC',
+    'oldest': 'date_found ASC, created_at ASC, items.item_id ASC',
+}
+# Rows after a cursor in that order (row values compare column by column)
+ITEM_AFTER_CURSOR = {
+    'recent': '(date_found, created_at, items.item_id) < (?, ?, ?)',
+    'oldest': '(date_found, created_at, items.item_id) > (?, ?, ?)',
+}
+
+
+def _cursor_value(value):
+    """Timestamp as stored text; PostgreSQL returns datetimes."""
+    return value.isoformat(sep=' ') if hasattr(value, 'isoformat') else value
+
+
+def encode_item_cursor(sort_order, row):
+    """
+    Opaque token for the position just after `row` in the items listing.
+    
+    Args:
+        sort_order: 'recent' or 'oldest'
+        row: Item row with date_found, created_at and item_id
+    
+    Returns:
+        str: URL-safe token for the `cursor` parameter
+    """
+    key = [sort_order, _cursor_value(row['date_found']), _cursor_value(row['created_at']), row['item_id']]
+    raw = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_item_cursor(token):
+    """
+    Read a token made by encode_item_cursor().
+    
+    Returns:
+        tuple: (sort_order, [date_found, created_at, item_id])
+    
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_order, date_found, created_at, item_id = json.loads(raw)
+    except (TypeError, ValueError, UnicodeDecodeError) as err:
+        raise ValueError('Invalid cursor') from err
+    if (sort_order not in ITEM_ORDER or not isinstance(date_found, str)
+            or not isinstance(created_at, str) or not isinstance(item_id, int) or isinstance(item_id, bool)):
+        raise ValueError('Invalid cursor')
+    return sort_order, [date_found, created_at, item_id]
+
+
+@api.route('/api/items', methods=['GET'])
 @require_auth
 def get_items():
     """
@@ -1105,17 +1234,34 @@ def get_items():
     Only accessible to authenticated students and staff.
     
     Query Parameters:
-    - search: Text search across description, category, location_found (optional)
+    - search: Full-text search across name, description, category and locations;
+      every word must match as a prefix (optional)
+    - fuzzy: 'true' for typo-tolerant search across name, description and category;
+      every word must be similar to a word of the item (optional)
     - category: Filter by exact category (optional)
     - location: Filter by location_found (case-insensitive partial match) (optional)
+    - desk: Filter by found_by_desk (exact match, case-insensitive) (optional)
     - status: Filter by status (unclaimed, claimed) (optional)
-    - sort: Sort order - 'recent' (newest first) or 'oldest' (oldest first), default 'recent' (optional)
+    - sort: Sort order - 'recent' (newest first), 'oldest' (oldest first) or 'relevance'
+      (best search match first; same as 'recent' without search), default 'recent' (optional)
     - page: Page number for pagination (default: 1) (optional)
     - page_size: Number of items per page (default: 20, max: 100) (optional)
+    - cursor: Keyset pagination instead of page numbers; empty for the first page,
+      then the previous response's next_cursor. Not available with sort=relevance
+      while searching (optional)
+    - include_total: 'false' to skip counting matches; pagination then has no
+      total_count/total_pages, only has_more (default: 'true') (optional)
+    - facets: Comma-separated facets to count: category, location, pickup_at,
+      status (optional)
+    - fields: Comma-separated item fields to return (default: all); only their
+      columns are read (optional)
+    - compact: 'true' to return items as arrays of values, after a header row
+      of field names (optional)
     
     Returns:
-    - 200: Paginated list of items with metadata
-    - 400: Invalid parameters
+    - 200: Paginated list of items with metadata (with ETag and Last-Modified)
+    - 304: Not modified since the client's copy (If-None-Match / If-Modified-Since)
+    - 400: Invalid parameters or cursor
     - 401: Not authenticated
     - 500: Database error
     
@@ -1126,9 +1272,33 @@ def get_items():
             "page": 1,
             "page_size": 20,
             "total_count": 45,
-            "total_pages": 3
+            "total_pages": 3,
+            "approximate": false,
+            "has_more": true,
+            "next_cursor": "..."
         }
     }
+    
+    With cursor the pagination is {"page_size", "total_count", "approximate", "has_more",
+    "next_cursor"}; next_cursor is null on the last page. Items added or removed between
+    requests do not shift later pages, and every page costs the same as the first.
+    
+    Totals are cached until items change (count_cache.py); very large totals are
+    PostgreSQL estimates and come with "approximate": true.
+    
+    Responses are cached per role and normalized parameters until items or
+    claims change (response_cache.py).
+    
+    With compact=true "items" is [["item_id", "name", ...], [1, "Black Wallet", ...], ...].
+    
+    Items whose photo was uploaded (POST /api/images) have "thumbnails": {"160": url,
+    "320": url, "640": url} of WebP thumbnails to show instead of the original;
+    thumbnails is null for other image URLs.
+    
+    With facets the response also has "facets": {"category": [{"value": "cards",
+    "count": 12}, ...], ...}, most common first. Each facet counts the matches of
+    every other filter but not its own, so a selected category still lists the
+    other categories with their counts.
     """
     try:
         # Parse query parameters
@@ -1136,7 +1306,10 @@ def get_items():
         category_filter = request.args.get('category', '').strip()
         location_filter = request.args.get('location', '').strip()
         status_filter = request.args.get('status', '').strip()
+        desk_filter = request.args.get('desk', '').strip()
         sort_order = request.args.get('sort', 'recent').strip().lower()
+        fuzzy = request.args.get('fuzzy', 'false').strip().lower() == 'true'
+        include_total = request.args.get('include_total', 'true').strip().lower() != 'false'
         
         # Parse pagination parameters
         try:
@@ -1145,6 +1318,15 @@ def get_items():
         except ValueError:
             return jsonify({'error': 'Invalid page or page_size parameter. Must be integers.'}), 400
         
+        # Keyset pagination: any `cursor` parameter, empty for the first page
+        keyset = 'cursor' in request.args
+        cursor_key = None
+        if keyset and request.args['cursor'].strip():
+            try:
+                cursor_sort, cursor_key = decode_item_cursor(request.args['cursor'].strip())
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
         # Validate parameters
         if page < 1:
             return jsonify({'error': 'Page must be >= 1'}), 400
@@ -1152,40 +1334,110 @@ def get_items():
         if page_size < 1 or page_size > 100:
             return jsonify({'error': 'Page size must be between 1 and 100'}), 400
         
-        if sort_order not in ['recent', 'oldest']:
-            return jsonify({'error': "Sort must be 'recent' or 'oldest'"}), 400
+        if sort_order not in ['recent', 'oldest', 'relevance']:
+            return jsonify({'error': "Sort must be 'recent', 'oldest' or 'relevance'"}), 400
         
         if status_filter and status_filter not in ['unclaimed', 'claimed']:
             return jsonify({'error': "Status must be 'unclaimed' or 'claimed'"}), 400
         
-        conn = get_db_connection()
+        try:
+            facet_names = parse_facets(request.args.get('facets', ''))
+        except ValueError as err:
+            return jsonify({'error': str(err)}), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields', ''))
+        except ValueError as err:
+            return jsonify({'error': str(err)}), 400
+        compact = request.args.get('compact', 'false').strip().lower() == 'true'
+        
+        # Order the keys follow; relevance without a search is the default order
+        key_order = 'oldest' if sort_order == 'oldest' else 'recent'
+        if keyset and sort_order == 'relevance' and search_query:
+            return jsonify({'error': "Cursor pagination supports sort 'recent' or 'oldest'"}), 400
+        if cursor_key is not None and cursor_sort != key_order:
+            return jsonify({'error': 'Cursor does not match the sort order'}), 400
+        
+        conn = get_read_connection()
         cursor = conn.cursor()
         
+        # The client's copy is current while items and claims are unchanged (conditional.py)
+        cache_key = request_key('items', session.get('role'), request.args)
+        version = read_version(cursor, ITEM_LISTING_GENERATIONS)
+        generations = version.generations
+        etag = make_etag(version, cache_key)
+        if not_modified(etag, version.last_modified):
+            conn.close()
+            return not_modified_response(etag, version.last_modified)
+        
+        # Same request and role as an earlier one: reuse the serialized
+        # response (response_cache.py)
+        cache = None
+        if getattr(conn, 'pool', None) is not None and etag is not None:
+            cache = response_cache_for(conn.pool)
+            body = cache.get(cache_key, generations)
+            if body is not None:
+                conn.close()
+                response = current_app.response_class(body, status=200, mimetype='application/json')
+                return with_validators(response, etag, version.last_modified)
+        
         # Build WHERE clause
+        from_clause = 'items'
         where_clauses = ["status != 'deleted'"]
         params = []
         
-        # Text search (searches in description, category, location_found)
-        if search_query:
-            search_pattern = f'%{search_query}%'
-            where_clauses.append('''(
-                description LIKE ? OR 
-                category LIKE ? OR 
-                location_found LIKE ? OR
-                pickup_at LIKE ? OR
-                found_by_desk LIKE ?
-            )''')
-            params.extend([search_pattern] * 5)
-        
-        # Category filter (exact match, case-insensitive)
+        # Text search through the full-text or trigram index (search.py);
+        # the join exposes matches.search_rank for sort=relevance
+        searching = False
+        fuzzy_truncated = False
+        facet_from, facet_join_params, join_param_count = from_clause, [], 0
+        if search_query and fuzzy:
+            # The in-process index applies the filters before its result cap;
+            # facets ignore all but the desk filter, so they get their own join
+            fuzzy_join = fuzzy_match_join(conn, search_query, {
+                'status': status_filter, 'category': category_filter,
+                'location': location_filter, 'desk': desk_filter
+            })
+            if fuzzy_join is None:
+                where_clauses.append('1 = 0')  # no similar words
+            else:
+                from_clause = f'items {fuzzy_join[0]}'
+                params.extend(fuzzy_join[1])
+                fuzzy_truncated = fuzzy_join[2]
+                searching = True
+                facet_from, facet_join_params = from_clause, list(fuzzy_join[1])
+                join_param_count = len(fuzzy_join[1])
+                if facet_names:
+                    facet_join = fuzzy_match_join(conn, search_query, {'desk': desk_filter})
+                    facet_from, facet_join_params = f'items {facet_join[0]}', list(facet_join[1])
+        elif search_query:
+            match = match_expression(cursor.dialect, search_query)
+            if match is None:
+                where_clauses.append('1 = 0')  # nothing searchable, e.g. only punctuation
+            else:
+                from_clause = f'items {ITEM_MATCH_JOIN[cursor.dialect.name]}'
+                params.append(match)
+                searching = True
+                facet_from, facet_join_params, join_param_count = from_clause, [match], 1
+        
+        # Category, location and desk filters match the normalized keys of the
+        # lookup tables, then the integer id indexes on items (lookups.py)
+        if desk_filter:
+            where_clauses.append(DESK_FILTER)
+            params.append(normalize_key(desk_filter))
+        
+        # Facets are counted without the filters below (facets.py)
+        facet_where = ' AND '.join(where_clauses)
+        facet_params = facet_join_params + params[join_param_count:]
+        
         if category_filter:
-            where_clauses.append('LOWER(category) = LOWER(?)')
-            params.append(category_filter)
+            where_clauses.append(CATEGORY_FILTER)
+            params.append(normalize_key(category_filter))
         
         # Location filter (partial match, case-insensitive)
         if location_filter:
-            where_clauses.append('LOWER(location_found) LIKE LOWER(?)')
-            params.append(f'%{location_filter}%')
+            where_clauses.append(LOCATION_FILTER)
+            params.append(f'%{normalize_key(location_filter)}%')
         
         # Status filter
         if status_filter:
@@ -1194,124 +1446,368 @@ def get_items():
         
         where_clause = ' AND '.join(where_clauses)
         
-        # Count total matching items (for pagination metadata)
-        count_query = f'SELECT COUNT(*) as total FROM items WHERE {where_clause}'
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()['total']
+        # The pg_trgm join cannot be a prepared statement (see search.PG_FUZZY_JOIN)
+        prepare = not fuzzy
         
-        # Calculate pagination
-        total_pages = (total_count + page_size - 1) // page_size  # Ceiling division
+        # Count total matching items (for pagination metadata), cached until items change
+        if include_total:
+            total_count, approximate = cached_count(
+                conn, 'items.count', ROW_GENERATIONS['items'], f'{from_clause} WHERE {where_clause}',
+                params, prepare=prepare
+            )
+            # Fuzzy matches past search.FUZZY_MAX_RESULTS are not counted
+            approximate = approximate or fuzzy_truncated
+            total_pages = (total_count + page_size - 1) // page_size  # Ceiling division
         offset = (page - 1) * page_size
         
-        # Determine sort order
-        if sort_order == 'recent':
-            order_by = 'date_found DESC, created_at DESC'
-        else:  # oldest
-            order_by = 'date_found ASC, created_at ASC'
+        # Every requested facet comes from one grouped pass over the matches
+        facets = None
+        if facet_names:
+            cursor.execute(
+                named_query('items.facets', facet_query(facet_from, facet_where), prepare=prepare),
+                facet_params
+            )
+            facets = facet_counts(cursor.fetchall(), facet_names, {
+                'category': category_filter, 'location': location_filter, 'status': status_filter
+            })
         
-        # Build main query with pagination
+        # Determine sort order
+        if sort_order == 'relevance' and searching:
+            order_by = f'{RANK_ORDER}, {ITEM_ORDER[key_order]}'
+        else:
+            order_by = ITEM_ORDER[key_order]
+        
+        # Keyset mode seeks past the cursor through idx_items_listing instead of
+        # skipping rows with OFFSET. One extra row is read to learn has_more.
+        page_where = where_clause
+        if cursor_key is not None:
+            page_where = f'{where_clause} AND {ITEM_AFTER_CURSOR[key_order]}'
+            params.extend(cursor_key)
+        if keyset:
+            offset = 0
+        limit = page_size + 1
+        
+        # Build main query with pagination. Only the requested fields' columns
+        # are selected (item_fields.py); claim details come from the per-item
+        # summary (claim_summary.py), joined only when a claim field is requested
+        select_columns, needs_summary = select_list(fields)
         query = f'''
-            SELECT 
-                item_id,
-                name,
-                description,
-                category,
-                location_found,
-                pickup_at,
-                date_found,
-                status,
-                image_url,
-                found_by_desk,
-                created_at,
-                (SELECT status FROM claims WHERE item_id = items.item_id ORDER BY updated_at DESC LIMIT 1) AS latest_claim_status,
-                (SELECT claim_id FROM claims WHERE item_id = items.item_id ORDER BY updated_at DESC LIMIT 1) AS latest_claim_id,
-                (SELECT claimant_name FROM claims WHERE item_id = items.item_id ORDER BY updated_at DESC LIMIT 1) AS latest_claimant_name,
-                (SELECT COUNT(*) FROM claims WHERE item_id = items.item_id AND status = 'pending') AS pending_claims,
-                (SELECT COUNT(*) FROM claims WHERE item_id = items.item_id AND status = 'approved') AS approved_claims,
-                (SELECT COUNT(*) FROM claims WHERE item_id = items.item_id AND status = 'picked_up') AS picked_up_claims
-            FROM items
-            WHERE {where_clause}
+            SELECT {select_columns}
+            FROM {from_clause}
+            {CLAIM_SUMMARY_JOIN if needs_summary else ''}
+            WHERE {page_where}
             ORDER BY {order_by}
             LIMIT ? OFFSET ?
         '''
         
-        params.extend([page_size, offset])
-        cursor.execute(query, params)
+        params.extend([limit, offset])
+        cursor.execute(named_query('items.page', query, prepare=prepare), params)
         rows = cursor.fetchall()
         conn.close()
         
-        # Convert rows to list of dictionaries
-        items = []
-        for row in rows:
-            items.append({
-                'item_id': row['item_id'],
-                'name': row['name'] or row['description'] or row['category'],
-                'description': row['description'],
-                'category': row['category'],
-                'location_found': row['location_found'],
-                'pickup_at': row['pickup_at'],
-                'date_found': row['date_found'],
-                'status': row['status'],
-                'image_url': row['image_url'],
-                'found_by_desk': row['found_by_desk'],
-                'created_at': row['created_at'],
-                'latest_claim_status': row['latest_claim_status'],
-                'latest_claim_id': row['latest_claim_id'],
-                'latest_claimant_name': row['latest_claimant_name'],
-                'pending_claims': row['pending_claims'],
-                'approved_claims': row['approved_claims'],
-                'picked_up_claims': row['picked_up_claims'],
-                'is_picked_up': (row['picked_up_claims'] or 0) > 0
-            })
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        # Position after the last row; relevance order is not keyed by the cursor
+        next_cursor = None
+        if rows and has_more and not (sort_order == 'relevance' and searching):
+            next_cursor = encode_item_cursor(key_order, rows[-1])
+        
+        # Convert rows to dictionaries, or a header row and value arrays in compact mode
+        if compact:
+            items = [fields] + [item_row(row, fields) for row in rows]
+        else:
+            items = [item_values(row, fields) for row in rows]
+        
+        pagination = {'page_size': page_size}
+        if not keyset:
+            pagination['page'] = page
+        if include_total:
+            pagination['total_count'] = total_count
+            if not keyset:
+                pagination['total_pages'] = total_pages
+            pagination['approximate'] = approximate
+        pagination['has_more'] = has_more
+        pagination['next_cursor'] = next_cursor
+        
+        response = {
+            'items': items,
+            'pagination': pagination
+        }
+        if facets is not None:
+            response['facets'] = facets
+        
+        response = jsonify(response)
+        if cache is not None:
+            cache.put(cache_key, generations, response.get_data())
+        return with_validators(response, etag, version.last_modified), 200
+        
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'Failed to retrieve items'}), 500
+    except Exception as err:
+        print(f"Error: {err}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+def note_item_indexes(pool, item_id, row):
+    """
+    Apply an item write to this worker's in-memory suggestion, match and fuzzy search indexes.
+    
+    Args:
+        pool: Pool the write was committed on
+        item_id: Item id
+        row: The item's values after the write (at least its status)
+    """
+    note_item_suggestions(pool, item_id, row)
+    note_item_matches(pool, item_id, row)
+    note_item_fuzzy(pool, item_id, row)
+
+
+@api.route('/api/items/suggest', methods=['GET'])
+@require_auth
+def suggest_items():
+    """
+    Search-as-you-type completions for the search box.
+    Matches the start of any word of item names, categories and locations
+    from an in-memory prefix index (suggest.py); the database is only read
+    to build the index and, every SUGGEST_REFRESH_SECONDS, to check for
+    writes made by other workers.
+    
+    Query Parameters:
+    - q: Text typed so far
+    - limit: Number of completions (default: 8, max: 20) (optional)
+    
+    Returns:
+    - 200: {"query": "wal", "suggestions": [{"text": "Black Wallet", "type": "name", "count": 3}, ...]}
+      with type 'name', 'category' or 'location' and the number of items with that value
+    - 400: Invalid limit
+    - 401: Not authenticated
+    - 500: Database error
+    """
+    query = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', 8))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit parameter. Must be an integer.'}), 400
+    if limit < 1 or limit > SUGGEST_MAX_LIMIT:
+        return jsonify({'error': f'Limit must be between 1 and {SUGGEST_MAX_LIMIT}'}), 400
+    
+    try:
+        index = suggestion_index(get_pool(DB_PATH))
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        return jsonify({'error': 'Failed to load suggestions'}), 500
+    
+    return jsonify({'query': query, 'suggestions': index.suggest(query, limit)}), 200
+
+
+@api.route('/api/items/match', methods=['POST'])
+@require_auth
+def match_items():
+    """
+    "Is my lost item here?": unclaimed items ranked by how similar their name,
+    description, category and location are to a description of the lost item
+    (TF-IDF cosine similarity over an in-memory index, see matching.py).
+    
+    Request Body:
+    {
+        "description": "Black leather wallet with my WatCard, lost near the SLC",
+        "limit": 10 (optional, max: 50)
+    }
+    
+    Returns:
+    - 200: {"items": [{...item fields..., "score": 0.61}, ...], "count": 2}, best match first
+    - 400: Missing or too long description, invalid limit
+    - 401: Not authenticated
+    - 500: Database error
+    """
+    data = request.get_json(silent=True) or {}
+    description = data.get('description')
+    if not isinstance(description, str) or not description.strip():
+        return jsonify({'error': 'description is required'}), 400
+    if len(description) > MATCH_MAX_TEXT:
+        return jsonify({'error': f'description must be at most {MATCH_MAX_TEXT} characters'}), 400
+    limit = data.get('limit', 10)
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1 or limit > MATCH_MAX_LIMIT:
+        return jsonify({'error': f'limit must be an integer between 1 and {MATCH_MAX_LIMIT}'}), 400
+    
+    try:
+        matches = match_index(get_pool(DB_PATH)).match(description, limit)
+        if not matches:
+            return jsonify({'items': [], 'count': 0}), 200
+        
+        # The index may trail other workers' writes: re-read the items and keep
+        # only those still unclaimed
+        fields = parse_fields('')
+        select_columns, _summary = select_list(fields)
+        placeholders = ', '.join('?' for _ in matches)
+        conn = get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute(named_query('items.match', f'''
+            SELECT {select_columns}
+            FROM items
+            {CLAIM_SUMMARY_JOIN}
+            WHERE items.item_id IN ({placeholders}) AND items.status = 'unclaimed'
+        '''), [item_id for item_id, _score in matches])
+        rows = {row['item_id']: row for row in cursor.fetchall()}
+        conn.close()
+        
+        items = [
+            dict(item_values(rows[item_id], fields), score=score)
+            for item_id, score in matches if item_id in rows
+        ]
+        return jsonify({'items': items, 'count': len(items)}), 200
+        
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        return jsonify({'error': 'Failed to match items'}), 500
+    except Exception as err:
+        print(f"Error: {err}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+
+# Most ids /api/items/batch and /api/claims/batch accept in one request
+BATCH_MAX_IDS = 100
+
+ITEM_DETAIL_COLUMNS = (
+    'item_id', 'name', 'description', 'category', 'location_found', 'pickup_at', 'date_found',
+    'status', 'image_url', 'found_by_desk', 'created_at', 'updated_at', 'claimed_at'
+)
+
+
+def parse_id_list(value):
+    """
+    Ids of a comma-separated `ids` parameter, in order and without repeats.
+    
+    Returns:
+        tuple: (ids, error message or None)
+    """
+    ids = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            return None, f'Invalid id: {part}'
+        if int(part) not in ids:
+            ids.append(int(part))
+    if not ids:
+        return None, 'ids is required'
+    if len(ids) > BATCH_MAX_IDS:
+        return None, f'At most {BATCH_MAX_IDS} ids per request'
+    return ids, None
+
+
+def batch_params(ids):
+    """
+    IN (...) placeholders and parameters for `ids`, padded with the last id
+    to a power of two so a handful of statement texts (and prepared
+    statements on PostgreSQL) cover every batch size.
+    """
+    size = 1
+    while size < len(ids):
+        size *= 2
+    params = list(ids) + [ids[-1]] * (size - len(ids))
+    return ', '.join('?' for _ in params), params
+
+
+def serialize_item_row(row):
+    """Item detail dict of a row with ITEM_DETAIL_COLUMNS, plus the thumbnails of uploaded images."""
+    item = {column: row[column] for column in ITEM_DETAIL_COLUMNS}
+    item['thumbnails'] = thumbnail_urls(row['image_url'])
+    return item
+
+
+@api.route('/api/items/batch', methods=['GET'])
+@require_auth
+def get_items_batch():
+    """
+    Retrieve several items by ID in one query, for pages that show many
+    items at once (claims lists, detail modals).
+    Deleted items are visible to staff only, as in get_item_by_id.
+    
+    Query Parameters:
+    - ids: Comma-separated item ids (at most 100)
+    
+    Returns:
+    - 200: {"items": [...], "count": 2, "missing": [7]}, items in the order
+      asked for; missing lists ids that do not exist or are not visible
+    - 304: No item changed since the client's copy (If-None-Match / If-Modified-Since)
+    - 400: Missing or invalid ids, or too many
+    - 401: Not authenticated
+    - 500: Database error
+    """
+    ids, error = parse_id_list(request.args.get('ids'))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        conn = get_read_connection()
+        cursor = conn.cursor()
         
-        return jsonify({
-            'items': items,
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': total_pages
-            }
-        }), 200
+        user_role = session.get('role')
+        version = read_version(cursor, (ROW_GENERATIONS['items'],))
+        etag = make_etag(version, 'items.batch', tuple(ids), user_role)
+        if not_modified(etag, version.last_modified):
+            conn.close()
+            return not_modified_response(etag, version.last_modified)
+        
+        placeholders, params = batch_params(ids)
+        cursor.execute(named_query('items.batch', f'''
+            SELECT {', '.join(ITEM_DETAIL_COLUMNS)}
+            FROM items
+            WHERE item_id IN ({placeholders})
+        ''', prepare=True), params)
+        rows = {
+            row['item_id']: row for row in cursor.fetchall()
+            if row['status'] != 'deleted' or user_role == 'staff'
+        }
+        conn.close()
         
-    except sqlite3.Error as err:
+        items = [serialize_item_row(rows[item_id]) for item_id in ids if item_id in rows]
+        response = jsonify({
+            'items': items,
+            'count': len(items),
+            'missing': [item_id for item_id in ids if item_id not in rows]
+        })
+        return with_validators(response, etag, version.last_modified), 200
+    
+    except DatabaseError as err:
         print(f"Database Error: {err}")
-        import traceback
-        traceback.print_exc()
         return jsonify({'error': 'Failed to retrieve items'}), 500
     except Exception as err:
         print(f"Error: {err}")
-        import traceback
-        traceback.print_exc()
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/api/items/<int:item_id>', methods=['GET'])
+
+@api.route('/api/items/<int:item_id>', methods=['GET'])
 @require_auth
 def get_item_by_id(item_id):
     """
     Retrieve a single item by ID.
     Students cannot access deleted items, but staff can so they can verify
     destructive actions (e.g., delete confirmations).
+    
+    Supports conditional GET: 304 when If-None-Match matches the ETag (or
+    If-Modified-Since is not older than Last-Modified) and no item has changed.
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT 
-                item_id,
-                name,
-                description,
-                category,
-                location_found,
-                pickup_at,
-                date_found,
-                status,
-                image_url,
-                found_by_desk,
-                created_at,
-                updated_at,
-                claimed_at
+        # Unchanged while no item is written (conditional.py); deleted items
+        # differ by role
+        version = read_version(cursor, (ROW_GENERATIONS['items'],))
+        etag = make_etag(version, 'item', item_id, session.get('role'))
+        if not_modified(etag, version.last_modified):
+            conn.close()
+            return not_modified_response(etag, version.last_modified)
+
+        cursor.execute(f'''
+            SELECT {', '.join(ITEM_DETAIL_COLUMNS)}
             FROM items
             WHERE item_id = ?
         ''', (item_id,))
@@ -1326,25 +1822,9 @@ def get_item_by_id(item_id):
         if row['status'] == 'deleted' and user_role != 'staff':
             return jsonify({'error': 'Item not found'}), 404
 
-        item = {
-            'item_id': row['item_id'],
-            'name': row['name'],
-            'description': row['description'],
-            'category': row['category'],
-            'location_found': row['location_found'],
-            'pickup_at': row['pickup_at'],
-            'date_found': row['date_found'],
-            'status': row['status'],
-            'image_url': row['image_url'],
-            'found_by_desk': row['found_by_desk'],
-            'created_at': row['created_at'],
-            'updated_at': row['updated_at'],
-            'claimed_at': row['claimed_at']
-        }
-
-        return jsonify({'item': item}), 200
+        return with_validators(jsonify({'item': serialize_item_row(row)}), etag, version.last_modified), 200
 
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to retrieve item'}), 500
     except Exception as err:
@@ -1354,7 +1834,7 @@ def get_item_by_id(item_id):
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/api/items', methods=['POST'])
+@api.route('/api/items', methods=['POST'])
 @require_role('staff')
 def create_item():
     """
@@ -1426,7 +1906,7 @@ def create_item():
         
         # Insert new item
         current_timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
+        item_id = cursor.insert_returning_id('''
             INSERT INTO items (
                 name,
                 description,
@@ -1452,11 +1932,14 @@ def create_item():
             data.get('found_by_desk'),
             user_id,
             current_timestamp
-        ))
+        ), 'item_id')
+        
+        # Queued with this transaction: sent only once the item is committed
+        notify_saved_searches(conn, item_id, data, user_id)
         
-        item_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        note_item_indexes(conn.pool, item_id, {**data, 'status': data.get('status', 'unclaimed')})
         
         # Return created item
         return jsonify({
@@ -1477,14 +1960,18 @@ def create_item():
             }
         }), 201
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to create item'}), 500
     except Exception as err:
         print(f"Error: {err}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/api/items/<int:item_id>', methods=['PUT'])
+ITEM_NAME_BY_ID = named_query('items.name_by_id', 'SELECT item_id, name FROM items WHERE item_id = ?')
+ITEM_BY_ID = named_query('items.by_id', 'SELECT * FROM items WHERE item_id = ?')
+
+
+@api.route('/api/items/<int:item_id>', methods=['PUT'])
 @require_role('staff')
 def update_item(item_id):
     """
@@ -1527,9 +2014,10 @@ def update_item(item_id):
         
         conn = get_db_connection()
         cursor = conn.cursor()
+        conn.begin_write()
         
         # Check if item exists
-        cursor.execute('SELECT item_id, name FROM items WHERE item_id = ?', (item_id,))
+        cursor.execute(ITEM_NAME_BY_ID, (item_id,))
         item = cursor.fetchone()
         
         if not item:
@@ -1566,16 +2054,17 @@ def update_item(item_id):
         print(f"[UPDATE ITEM] SQL Query: {update_query}")
         print(f"[UPDATE ITEM] SQL Values: {update_values}")
         
-        cursor.execute(update_query, update_values)
+        cursor.execute(named_query('items.update', update_query), update_values)
         conn.commit()
         
         print(f"[UPDATE ITEM] ✅ Update committed successfully")
         
         # Get updated item
-        cursor.execute('SELECT * FROM items WHERE item_id = ?', (item_id,))
+        cursor.execute(ITEM_BY_ID, (item_id,))
         updated_item = dict(cursor.fetchone())
         
         conn.close()
+        note_item_indexes(conn.pool, item_id, updated_item)
         
         # Log activity
         log_activity(
@@ -1591,18 +2080,104 @@ def update_item(item_id):
             'item': updated_item
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to update item'}), 500
     except Exception as err:
         print(f"Error: {err}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
+# ============================================================================
+# Item Images Endpoints
+# ============================================================================
+
+def immutable_file(path, mimetype):
+    """Response serving a content-addressed image file, cacheable forever."""
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=False)
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+@api.route('/api/images', methods=['POST'])
+@require_role('staff')
+def upload_image():
+    """
+    Upload an item photo (staff only). The original is stored once per
+    content (SHA-256) and its WebP thumbnails are rendered in the background
+    (images.py). Use the returned image_url as the item's image_url.
+    
+    Request: multipart/form-data with an "image" file (JPEG, PNG, WebP or GIF, max 5 MB)
+    
+    Returns:
+    - 201: {"image_url": "/api/images/<sha256>.jpg", "thumbnails": {"160": ..., "320": ..., "640": ...},
+      "width": 4032, "height": 3024}
+    - 200: Same, when this image was already uploaded
+    - 400: Missing file, not an accepted image, or too large
+    - 401: Not authenticated
+    - 403: Not staff
+    """
+    upload = request.files.get('image')
+    if upload is None:
+        return jsonify({'error': 'image file is required'}), 400
+    try:
+        image = save_upload(upload.read(IMAGE_MAX_BYTES + 1))
+    except ImageError as err:
+        return jsonify({'error': str(err)}), 400
+    except OSError as err:
+        print(f"Image storage error: {err}")
+        return jsonify({'error': 'Failed to store image'}), 500
+    
+    get_thumbnail_pool().submit(image.digest, image.ext)
+    
+    return jsonify({
+        'image_url': image.url,
+        'thumbnails': thumbnail_urls(image.url),
+        'width': image.width,
+        'height': image.height
+    }), 201 if image.created else 200
+
+
+@api.route('/api/images/<name>', methods=['GET'])
+def get_image(name):
+    """
+    Serve an uploaded original by its content address (<sha256>.<ext>).
+    Public, like any image URL an <img> tag loads; the hash is the id.
+    
+    Returns:
+    - 200: The image, with Cache-Control: public, max-age=31536000, immutable
+    - 404: No such image
+    """
+    parsed = parse_original_name(name)
+    if parsed is None or not os.path.exists(original_path(*parsed)):
+        return jsonify({'error': 'Image not found'}), 404
+    return immutable_file(original_path(*parsed), MIMETYPES[parsed[1]])
+
+
+@api.route('/api/images/<digest>/<int:size>.webp', methods=['GET'])
+def get_image_thumbnail(digest, size):
+    """
+    Serve a WebP thumbnail of an uploaded image, rendering it first if the
+    background workers have not yet.
+    
+    Returns:
+    - 200: The thumbnail, with Cache-Control: public, max-age=31536000, immutable
+    - 404: Unknown image or size
+    """
+    if not is_digest(digest) or size not in THUMBNAIL_SIZES:
+        return jsonify({'error': 'Image not found'}), 404
+    path = get_thumbnail_pool().thumbnail(digest, size)
+    if path is None:
+        return jsonify({'error': 'Image not found'}), 404
+    return immutable_file(path, 'image/webp')
+
+
 # ============================================================================
 # Archived Items Endpoint - Sprint 3: Pickup Tracking
 # ============================================================================
 
-@app.route('/api/items/archived', methods=['GET'])
+@api.route('/api/items/archived', methods=['GET'])
 @require_auth
 def get_archived_items():
     """
@@ -1619,7 +2194,7 @@ def get_archived_items():
     # Check if user is staff
     try:
         user_id = session.get('user_id')
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         cursor.execute('SELECT role FROM users WHERE user_id = ?', (user_id,))
@@ -1697,7 +2272,7 @@ def get_archived_items():
             'total_count': len(archived_items)
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to retrieve archived items'}), 500
     except Exception as err:
@@ -1711,7 +2286,7 @@ def get_archived_items():
 # Analytics Endpoints - Sprint 4: Analytics Dashboard
 # ============================================================================
 
-@app.route('/api/analytics/dashboard', methods=['GET'])
+@api.route('/api/analytics/dashboard', methods=['GET'])
 @require_auth
 @require_role('staff')
 def get_analytics_dashboard():
@@ -1733,8 +2308,9 @@ def get_analytics_dashboard():
     - 500: Server error
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
+        dialect = cursor.dialect
         
         # === BASIC COUNTS ===
         # Total items (excluding deleted)
@@ -1789,15 +2365,16 @@ def get_analytics_dashboard():
         claimed_items = cursor.fetchone()['count']
         
         # === ITEMS ADDED PER WEEK (Last 8 weeks) ===
-        cursor.execute('''
+        week = dialect.week_bucket('created_at')
+        cursor.execute(f'''
             SELECT 
-                strftime('%Y-%W', created_at) as week,
+                {week} as week,
                 COUNT(*) as count,
                 MIN(created_at) as week_start
             FROM items
             WHERE status != 'deleted'
-            AND created_at >= datetime('now', '-8 weeks')
-            GROUP BY strftime('%Y-%W', created_at)
+            AND created_at >= {dialect.weeks_ago(8)}
+            GROUP BY {week}
             ORDER BY week_start ASC
         ''')
         items_per_week = []
@@ -1900,14 +2477,14 @@ def get_analytics_dashboard():
         recent_activity = sorted(recent_activity, key=lambda x: x['timestamp'], reverse=True)[:10]
         
         # === CLAIMS TIMELINE (Last 8 weeks) ===
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT 
-                strftime('%Y-%W', created_at) as week,
+                {week} as week,
                 COUNT(*) as count,
                 MIN(created_at) as week_start
             FROM claims
-            WHERE created_at >= datetime('now', '-8 weeks')
-            GROUP BY strftime('%Y-%W', created_at)
+            WHERE created_at >= {dialect.weeks_ago(8)}
+            GROUP BY {week}
             ORDER BY week_start ASC
         ''')
         claims_per_week = []
@@ -1952,7 +2529,7 @@ def get_analytics_dashboard():
         
         return jsonify(analytics_data), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to retrieve analytics data'}), 500
     except Exception as err:
@@ -1966,7 +2543,7 @@ def get_analytics_dashboard():
 # Notifications Endpoints
 # ============================================================================
 
-@app.route('/api/notifications', methods=['GET'])
+@api.route('/api/notifications', methods=['GET'])
 @require_auth
 def get_notifications():
     """
@@ -1974,6 +2551,7 @@ def get_notifications():
     Optional query params:
       - status: unread | read | all (default unread)
       - limit: number of notifications to return (default 10, max 100)
+    Responds 304 when the client's ETag (If-None-Match) is still current.
     """
     try:
         status_filter = request.args.get('status', 'unread').lower()
@@ -1983,9 +2561,16 @@ def get_notifications():
         limit = max(1, min(limit, 100))
         
         user_id = session.get('user_id')
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
+        # Unchanged while no notification is written (conditional.py)
+        version = read_version(cursor, (ROW_GENERATIONS['notifications'],))
+        etag = make_etag(version, request_key('notifications', session.get('role'), request.args), user_id)
+        if not_modified(etag, version.last_modified):
+            conn.close()
+            return not_modified_response(etag, version.last_modified)
+        
         query = 'SELECT * FROM notifications WHERE user_id = ?'
         params = [user_id]
         
@@ -2003,8 +2588,8 @@ def get_notifications():
         conn.close()
         
         notifications = [serialize_notification_row(row) for row in rows]
-        return jsonify({'notifications': notifications}), 200
-    except sqlite3.Error as err:
+        return with_validators(jsonify({'notifications': notifications}), etag, version.last_modified), 200
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to load notifications'}), 500
     except Exception as err:
@@ -2012,7 +2597,7 @@ def get_notifications():
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/api/notifications/<int:notification_id>/read', methods=['PATCH'])
+@api.route('/api/notifications/<int:notification_id>/read', methods=['PATCH'])
 @require_auth
 def mark_notification_read(notification_id):
     """Mark a specific notification as read."""
@@ -2034,7 +2619,7 @@ def mark_notification_read(notification_id):
             return jsonify({'error': 'Notification not found'}), 404
         
         return jsonify({'message': 'Notification marked as read'}), 200
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to update notification'}), 500
     except Exception as err:
@@ -2042,7 +2627,155 @@ def mark_notification_read(notification_id):
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/api/activity-log', methods=['GET'])
+# ============================================================================
+# Saved Searches Endpoints
+# ============================================================================
+
+@api.route('/api/saved-searches', methods=['GET'])
+@require_auth
+def get_saved_searches():
+    """
+    List the logged-in user's saved searches, newest first.
+    
+    Returns:
+    - 200: {"saved_searches": [...], "count": 2}
+    - 401: Not authenticated
+    - 500: Database error
+    """
+    try:
+        conn = get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {SAVED_SEARCH_COLUMNS} FROM saved_searches
+            WHERE user_id = ?
+            ORDER BY created_at DESC, saved_search_id DESC
+        ''', (session.get('user_id'),))
+        saved_searches = [saved_search_dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return jsonify({'saved_searches': saved_searches, 'count': len(saved_searches)}), 200
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        return jsonify({'error': 'Failed to load saved searches'}), 500
+    except Exception as err:
+        print(f"Error: {err}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+
+@api.route('/api/saved-searches', methods=['POST'])
+@require_auth
+def create_saved_search():
+    """
+    Save an item search. Its owner gets a notification whenever a new item
+    matching it is logged, with the same rules as /api/items: every word of
+    search as a prefix, exact category and desk, partial location.
+    
+    Request Body:
+    {
+        "name": "My wallet" (optional, defaults to the search text),
+        "search": "black wallet" (optional),
+        "category": "cards" (optional),
+        "location": "SLC" (optional),
+        "desk": "SLC" (optional)
+    }
+    At least one of search, category, location or desk is required.
+    
+    Returns:
+    - 201: Saved search created
+    - 400: Validation error, or the user already has 20 saved searches
+    - 401: Not authenticated
+    - 500: Database error
+    """
+    data = request.get_json(silent=True) or {}
+    values = {}
+    for field in ('name', 'search', 'category', 'location', 'desk'):
+        value = data.get(field)
+        if value is not None and not isinstance(value, str):
+            return jsonify({'error': f'{field} must be a string'}), 400
+        value = (value or '').strip()
+        if len(value) > SAVED_SEARCH_MAX_TEXT:
+            return jsonify({'error': f'{field} must be at most {SAVED_SEARCH_MAX_TEXT} characters'}), 400
+        values[field] = value or None
+    
+    if values['search'] and not search_terms(values['search']):
+        return jsonify({'error': 'search must contain at least one word'}), 400
+    criteria = [values[field] for field in ('search', 'category', 'location', 'desk') if values[field]]
+    if not criteria:
+        return jsonify({'error': 'At least one of search, category, location or desk is required'}), 400
+    name = values['name'] or ', '.join(criteria)
+    
+    try:
+        user_id = session.get('user_id')
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Write lock first, so the per-user limit holds under concurrent requests
+        # (SQLite: the database's; PostgreSQL: the user's row)
+        conn.begin_write()
+        if cursor.dialect.name == 'postgresql':
+            cursor.execute('SELECT user_id FROM users WHERE user_id = ? FOR UPDATE', (user_id,))
+        cursor.execute('SELECT COUNT(*) AS count FROM saved_searches WHERE user_id = ?', (user_id,))
+        if cursor.fetchone()['count'] >= SAVED_SEARCH_LIMIT:
+            conn.rollback()
+            conn.close()
+            return jsonify({'error': f'You can keep at most {SAVED_SEARCH_LIMIT} saved searches'}), 400
+        
+        saved_search_id = cursor.insert_returning_id('''
+            INSERT INTO saved_searches (user_id, name, search_text, category, location, desk)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (user_id, name, values['search'], values['category'], values['location'], values['desk']),
+            'saved_search_id')
+        cursor.execute(f'SELECT {SAVED_SEARCH_COLUMNS} FROM saved_searches WHERE saved_search_id = ?',
+                       (saved_search_id,))
+        row = cursor.fetchone()
+        
+        conn.commit()
+        conn.close()
+        note_search(conn.pool, saved_search_id, row)
+        
+        return jsonify({'message': 'Saved search created', 'saved_search': saved_search_dict(row)}), 201
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        return jsonify({'error': 'Failed to save search'}), 500
+    except Exception as err:
+        print(f"Error: {err}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+
+@api.route('/api/saved-searches/<int:saved_search_id>', methods=['DELETE'])
+@require_auth
+def delete_saved_search(saved_search_id):
+    """
+    Delete one of the logged-in user's saved searches.
+    
+    Returns:
+    - 200: Saved search deleted
+    - 401: Not authenticated
+    - 404: No such saved search of this user
+    - 500: Database error
+    """
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM saved_searches WHERE saved_search_id = ? AND user_id = ?',
+                       (saved_search_id, session.get('user_id')))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            conn.close()
+            return jsonify({'error': 'Saved search not found'}), 404
+        conn.commit()
+        conn.close()
+        note_search(conn.pool, saved_search_id, None)
+        
+        return jsonify({'message': 'Saved search deleted'}), 200
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        return jsonify({'error': 'Failed to delete saved search'}), 500
+    except Exception as err:
+        print(f"Error: {err}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+
+@api.route('/api/activity-log', methods=['GET'])
 @require_auth
 @require_role('staff')
 def get_activity_log():
@@ -2058,6 +2791,8 @@ def get_activity_log():
     - end_date: Filter by end date (optional, format: YYYY-MM-DD)
     - page: Page number (default: 1)
     - page_size: Items per page (default: 50, max: 200)
+    - include_total: 'false' to skip counting entries; the response then has
+      has_more but no total_count/total_pages (default: 'true')
     
     Returns:
     - 200: Activity log entries with pagination
@@ -2072,8 +2807,9 @@ def get_activity_log():
         end_date = request.args.get('end_date')
         page = max(1, request.args.get('page', 1, type=int))
         page_size = min(200, max(1, request.args.get('page_size', 50, type=int)))
+        include_total = request.args.get('include_total', 'true').strip().lower() != 'false'
         
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         # Build WHERE clause dynamically
@@ -2098,12 +2834,13 @@ def get_activity_log():
         
         where_clause = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ''
         
-        # Get total count
-        count_query = f'SELECT COUNT(*) as count FROM activity_log {where_clause}'
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()['count']
+        # Get total count (cached until the log changes, see count_cache.py)
+        if include_total:
+            total_count, approximate = cached_count(
+                conn, 'activity_log.count', ROW_GENERATIONS['activity_log'], f'activity_log {where_clause}', params
+            )
         
-        # Get paginated results
+        # Get paginated results, one extra row to learn has_more
         offset = (page - 1) * page_size
         query = f'''
             SELECT * FROM activity_log
@@ -2111,11 +2848,14 @@ def get_activity_log():
             ORDER BY created_at DESC
             LIMIT ? OFFSET ?
         '''
-        cursor.execute(query, params + [page_size, offset])
+        cursor.execute(named_query('activity_log.page', query), params + [page_size + 1, offset])
         logs = cursor.fetchall()
         
         conn.close()
         
+        has_more = len(logs) > page_size
+        logs = logs[:page_size]
+        
         # Format results
         log_entries = []
         for log in logs:
@@ -2133,17 +2873,20 @@ def get_activity_log():
                 'created_at': log['created_at']
             })
         
-        total_pages = (total_count + page_size - 1) // page_size
-        
-        return jsonify({
+        response = {
             'logs': log_entries,
-            'total_count': total_count,
             'page': page,
             'page_size': page_size,
-            'total_pages': total_pages
-        }), 200
+            'has_more': has_more
+        }
+        if include_total:
+            response['total_count'] = total_count
+            response['total_pages'] = (total_count + page_size - 1) // page_size
+            response['approximate'] = approximate
+        
+        return jsonify(response), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to retrieve activity log'}), 500
     except Exception as err:
@@ -2153,7 +2896,7 @@ def get_activity_log():
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/api/items/<int:item_id>', methods=['DELETE'])
+@api.route('/api/items/<int:item_id>', methods=['DELETE'])
 @require_auth
 @require_role('staff')
 def delete_item(item_id):
@@ -2171,6 +2914,7 @@ def delete_item(item_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        conn.begin_write()
         
         # Check if item exists
         cursor.execute('SELECT * FROM items WHERE item_id = ? AND status != ?', (item_id, 'deleted'))
@@ -2190,6 +2934,7 @@ def delete_item(item_id):
         
         conn.commit()
         conn.close()
+        note_item_indexes(conn.pool, item_id, {'status': 'deleted'})
         
         # Log the deletion
         log_activity(
@@ -2204,7 +2949,7 @@ def delete_item(item_id):
             'item_id': item_id
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to delete item'}), 500
     except Exception as err:
@@ -2218,7 +2963,7 @@ def delete_item(item_id):
 # Data Export Endpoints - Sprint 4: Issue #45
 # ============================================================================
 
-@app.route('/api/export/items/csv', methods=['GET'])
+@api.route('/api/export/items/csv', methods=['GET'])
 @require_auth
 @require_role('staff')
 def export_items_csv():
@@ -2229,7 +2974,7 @@ def export_items_csv():
     
     Query Parameters:
     - status: Filter by status (optional)
-    - category: Filter by category (optional)
+    - category: Filter by category (case-insensitive) (optional)
     
     Returns:
     - 200: CSV file download
@@ -2237,7 +2982,7 @@ def export_items_csv():
     - 500: Server error
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         # Build query with optional filters
@@ -2251,8 +2996,8 @@ def export_items_csv():
         
         category = request.args.get('category')
         if category:
-            where_clauses.append('category = ?')
-            params.append(category)
+            where_clauses.append(CATEGORY_FILTER)
+            params.append(normalize_key(category))
         
         where_clause = ' AND '.join(where_clauses)
         
@@ -2309,7 +3054,7 @@ def export_items_csv():
         
         return response
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to export items'}), 500
     except Exception as err:
@@ -2319,7 +3064,7 @@ def export_items_csv():
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/api/export/claims/csv', methods=['GET'])
+@api.route('/api/export/claims/csv', methods=['GET'])
 @require_auth
 @require_role('staff')
 def export_claims_csv():
@@ -2337,7 +3082,7 @@ def export_claims_csv():
     - 500: Server error
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         # Build query with optional filter
@@ -2415,7 +3160,7 @@ def export_claims_csv():
         
         return response
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to export claims'}), 500
     except Exception as err:
@@ -2425,7 +3170,7 @@ def export_claims_csv():
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
 
-@app.route('/api/export/activity-log/csv', methods=['GET'])
+@api.route('/api/export/activity-log/csv', methods=['GET'])
 @require_auth
 @require_role('staff')
 def export_activity_log_csv():
@@ -2445,7 +3190,7 @@ def export_activity_log_csv():
     - 500: Server error
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         # Build query with optional filters
@@ -2522,7 +3267,7 @@ def export_activity_log_csv():
         
         return response
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to export activity log'}), 500
     except Exception as err:
@@ -2536,7 +3281,40 @@ def export_activity_log_csv():
 # Claims Endpoints - Sprint 3: Item Claiming System
 # ============================================================================
 
-@app.route('/api/claims', methods=['POST'])
+# Statements run by claim creation (prepared on PostgreSQL)
+CLAIM_CONTEXT = named_query('claims.create.context', '''
+    SELECT
+        u.name,
+        u.email,
+        i.item_id,
+        i.status AS item_status,
+        i.description,
+        i.category,
+        (SELECT status FROM claims
+         WHERE item_id = i.item_id AND status IN ('approved', 'picked_up')
+         LIMIT 1) AS approved_status
+    FROM users u
+    LEFT JOIN items i ON i.item_id = ?
+    WHERE u.user_id = ?
+''', prepare=True)
+INSERT_CLAIM = named_query('claims.create.insert', '''
+    INSERT INTO claims (
+        item_id,
+        claimant_user_id,
+        claimant_name,
+        claimant_email,
+        claimant_phone,
+        verification_text,
+        status
+    ) VALUES (?, ?, ?, ?, ?, ?, 'pending')
+''')
+ACTIVE_CLAIM_BY_USER = named_query('claims.create.active_by_user', '''
+    SELECT claim_id, status FROM claims 
+    WHERE item_id = ? AND claimant_user_id = ? AND status IN ('pending', 'approved')
+''')
+
+
+@api.route('/api/claims', methods=['POST'])
 @require_auth
 def create_claim():
     """
@@ -2554,7 +3332,8 @@ def create_claim():
     - 201: Claim created successfully
     - 400: Missing required fields or validation error
     - 404: Item not found
-    - 409: Item already has an approved/picked up claim
+    - 409: Item already has an approved/picked up claim, or the user already
+           has a pending/approved claim for it
     - 500: Database error
     """
     data = request.get_json()
@@ -2579,81 +3358,60 @@ def create_claim():
         # Get current user info from session
         user_id = session.get('user_id')
         
-        # Get user details
-        cursor.execute('SELECT email, name FROM users WHERE user_id = ?', (user_id,))
-        user = cursor.fetchone()
-        if not user:
-            conn.close()
-            return jsonify({'error': 'User not found'}), 404
+        # One write transaction: checks and insert see the same state.
+        # SQLite takes the write lock up front; on PostgreSQL the partial
+        # unique index (migration 2) rejects a concurrent duplicate.
+        conn.begin_write()
         
-        # Check if item exists and is unclaimed
-        cursor.execute('SELECT item_id, status FROM items WHERE item_id = ?', (item_id,))
-        item = cursor.fetchone()
+        # User, item and any approved claim in a single round trip
+        cursor.execute(CLAIM_CONTEXT, (item_id, user_id))
+        context = cursor.fetchone()
+        if not context:
+            conn.rollback()
+            return jsonify({'error': 'User not found'}), 404
         
-        if not item:
-            conn.close()
+        if context['item_id'] is None:
+            conn.rollback()
             return jsonify({'error': 'Item not found'}), 404
         
-        if item['status'] == 'deleted':
-            conn.close()
+        if context['item_status'] == 'deleted':
+            conn.rollback()
             return jsonify({'error': 'Item no longer available'}), 404
         
         # Check if there's already an approved or picked_up claim for this item
-        cursor.execute('''
-            SELECT claim_id, status FROM claims 
-            WHERE item_id = ? AND status IN ('approved', 'picked_up')
-        ''', (item_id,))
-        existing_claim = cursor.fetchone()
-        
-        if existing_claim:
-            conn.close()
+        if context['approved_status']:
+            conn.rollback()
             return jsonify({
                 'error': 'This item already has an approved claim',
-                'claim_status': existing_claim['status']
+                'claim_status': context['approved_status']
             }), 409
         
-        # Check if this user has already submitted a claim for this item (prevent duplicates)
-        cursor.execute('''
-            SELECT claim_id, status FROM claims 
-            WHERE item_id = ? AND claimant_user_id = ? AND status IN ('pending', 'approved')
-        ''', (item_id, user_id))
-        user_existing_claim = cursor.fetchone()
-        
-        if user_existing_claim:
+        # A duplicate claim by this user is rejected by idx_claims_active_claimant
+        try:
+            claim_id = cursor.insert_returning_id(INSERT_CLAIM, (
+                context['item_id'],
+                user_id,
+                context['name'],
+                context['email'],
+                data.get('phone'),
+                verification_text
+            ), 'claim_id')
+            conn.commit()
+        except IntegrityError:
+            conn.rollback()
+            cursor.execute(ACTIVE_CLAIM_BY_USER, (context['item_id'], user_id))
+            user_existing_claim = cursor.fetchone()
             conn.close()
+            if not user_existing_claim:
+                raise
             return jsonify({
                 'error': f'You have already submitted a claim for this item (Status: {user_existing_claim["status"]})',
                 'claim_id': user_existing_claim['claim_id'],
                 'claim_status': user_existing_claim['status']
             }), 409
         
-        # Create new claim
-        cursor.execute('''
-            INSERT INTO claims (
-                item_id,
-                claimant_user_id,
-                claimant_name,
-                claimant_email,
-                claimant_phone,
-                verification_text,
-                status
-            ) VALUES (?, ?, ?, ?, ?, ?, 'pending')
-        ''', (
-            item_id,
-            user_id,
-            user['name'],
-            user['email'],
-            data.get('phone'),
-            verification_text
-        ))
-        
-        claim_id = cursor.lastrowid
-        conn.commit()
-        
-        # Get item description for email
-        cursor.execute('SELECT description, category FROM items WHERE item_id = ?', (item_id,))
-        item_data = cursor.fetchone()
-        item_description = item_data['description'] or f"{item_data['category']} item"
+        user = {'name': context['name'], 'email': context['email']}
+        item_description = context['description'] or f"{context['category']} item"
         
         conn.close()
         
@@ -2682,7 +3440,7 @@ def create_claim():
             }
         }), 201
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to create claim'}), 500
     except Exception as err:
@@ -2691,7 +3449,7 @@ def create_claim():
         traceback.print_exc()
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/api/claims', methods=['GET'])
+@api.route('/api/claims', methods=['GET'])
 @require_auth
 def get_claims():
     """
@@ -2704,17 +3462,25 @@ def get_claims():
     - user_id: Filter by claimant user ID (staff only)
     
     Returns:
-    - 200: List of claims
+    - 200: List of claims (with ETag and Last-Modified)
+    - 304: Not modified since the client's copy (If-None-Match / If-Modified-Since)
     - 401: Not authenticated
     - 500: Database error
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         user_id = session.get('user_id')
         user_role = session.get('role')
         
+        # Unchanged while no claim or item is written (conditional.py)
+        version = read_version(cursor, (ROW_GENERATIONS['claims'], ROW_GENERATIONS['items']))
+        etag = make_etag(version, request_key('claims', user_role, request.args), user_id)
+        if not_modified(etag, version.last_modified):
+            conn.close()
+            return not_modified_response(etag, version.last_modified)
+        
         # Build query based on role and filters
         query = '''
             SELECT 
@@ -2766,7 +3532,7 @@ def get_claims():
         
         query += ' ORDER BY c.created_at DESC'
         
-        cursor.execute(query, params)
+        cursor.execute(named_query('claims.list', query, prepare=True), params)
         rows = cursor.fetchall()
         conn.close()
         
@@ -2793,19 +3559,136 @@ def get_claims():
                 'item_image_url': row['item_image_url']
             })
         
-        return jsonify({
+        response = jsonify({
             'claims': claims,
             'count': len(claims)
-        }), 200
+        })
+        return with_validators(response, etag, version.last_modified), 200
+        
+    except DatabaseError as err:
+        print(f"Database Error: {err}")
+        return jsonify({'error': 'Failed to retrieve claims'}), 500
+    except Exception as err:
+        print(f"Error: {err}")
+        return jsonify({'error': 'An unexpected error occurred'}), 500
+
+# Claim with its item, as returned by get_claim and get_claims_batch
+CLAIM_DETAIL_SELECT = '''
+    SELECT 
+        c.claim_id,
+        c.item_id,
+        c.claimant_user_id,
+        c.claimant_name,
+        c.claimant_email,
+        c.claimant_phone,
+        c.verification_text,
+        c.status,
+        c.staff_notes,
+        c.created_at,
+        c.updated_at,
+        c.processed_by_staff_id,
+        i.name AS item_name,
+        i.description AS item_description,
+        i.category AS item_category,
+        i.location_found AS item_location_found,
+        i.pickup_at AS item_pickup_location,
+        i.date_found AS item_date_found,
+        i.image_url AS item_image_url,
+        i.status AS item_status
+    FROM claims c
+    LEFT JOIN items i ON c.item_id = i.item_id
+'''
+
+
+def serialize_claim_row(row):
+    """Claim detail dict (with its item) of a CLAIM_DETAIL_SELECT row."""
+    return {
+        'claim_id': row['claim_id'],
+        'item_id': row['item_id'],
+        'claimant_user_id': row['claimant_user_id'],
+        'claimant_name': row['claimant_name'],
+        'claimant_email': row['claimant_email'],
+        'claimant_phone': row['claimant_phone'],
+        'verification_text': row['verification_text'],
+        'status': row['status'],
+        'staff_notes': row['staff_notes'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+        'processed_by_staff_id': row['processed_by_staff_id'],
+        'item': {
+            'name': row['item_name'] or row['item_description'] or row['item_category'],
+            'description': row['item_description'],
+            'category': row['item_category'],
+            'location_found': row['item_location_found'],
+            'pickup_at': row['item_pickup_location'],
+            'date_found': row['item_date_found'],
+            'image_url': row['item_image_url'],
+            'status': row['item_status']
+        }
+    }
+
+
+@api.route('/api/claims/batch', methods=['GET'])
+@require_auth
+def get_claims_batch():
+    """
+    Retrieve several claims (with their items) by ID in one query.
+    Students only get their own claims, staff get any claim, as in get_claim.
+    
+    Query Parameters:
+    - ids: Comma-separated claim ids (at most 100)
+    
+    Returns:
+    - 200: {"claims": [...], "count": 2, "missing": [7]}, claims in the order
+      asked for; missing lists ids that do not exist or are not visible
+    - 304: No claim or item changed since the client's copy
+    - 400: Missing or invalid ids, or too many
+    - 401: Not authenticated
+    - 500: Database error
+    """
+    ids, error = parse_id_list(request.args.get('ids'))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        conn = get_read_connection()
+        cursor = conn.cursor()
+        
+        user_id = session.get('user_id')
+        user_role = session.get('role')
+        version = read_version(cursor, (ROW_GENERATIONS['claims'], ROW_GENERATIONS['items']))
+        etag = make_etag(version, 'claims.batch', tuple(ids), user_role, user_id)
+        if not_modified(etag, version.last_modified):
+            conn.close()
+            return not_modified_response(etag, version.last_modified)
+        
+        placeholders, params = batch_params(ids)
+        cursor.execute(named_query(
+            'claims.batch', f'{CLAIM_DETAIL_SELECT} WHERE c.claim_id IN ({placeholders})', prepare=True
+        ), params)
+        rows = {
+            row['claim_id']: row for row in cursor.fetchall()
+            if user_role != 'student' or row['claimant_user_id'] == user_id
+        }
+        conn.close()
         
-    except sqlite3.Error as err:
+        claims = [serialize_claim_row(rows[claim_id]) for claim_id in ids if claim_id in rows]
+        response = jsonify({
+            'claims': claims,
+            'count': len(claims),
+            'missing': [claim_id for claim_id in ids if claim_id not in rows]
+        })
+        return with_validators(response, etag, version.last_modified), 200
+    
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to retrieve claims'}), 500
     except Exception as err:
         print(f"Error: {err}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/api/claims/<int:claim_id>', methods=['GET'])
+
+@api.route('/api/claims/<int:claim_id>', methods=['GET'])
 @require_auth
 def get_claim(claim_id):
     """
@@ -2819,39 +3702,14 @@ def get_claim(claim_id):
     - 500: Database error
     """
     try:
-        conn = get_db_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         
         user_id = session.get('user_id')
         user_role = session.get('role')
         
         # Get claim details with item information
-        cursor.execute('''
-            SELECT 
-                c.claim_id,
-                c.item_id,
-                c.claimant_user_id,
-                c.claimant_name,
-                c.claimant_email,
-                c.claimant_phone,
-                c.verification_text,
-                c.status,
-                c.staff_notes,
-                c.created_at,
-                c.updated_at,
-                c.processed_by_staff_id,
-                i.name AS item_name,
-                i.description AS item_description,
-                i.category AS item_category,
-                i.location_found AS item_location_found,
-                i.pickup_at AS item_pickup_location,
-                i.date_found AS item_date_found,
-                i.image_url AS item_image_url,
-                i.status AS item_status
-            FROM claims c
-            LEFT JOIN items i ON c.item_id = i.item_id
-            WHERE c.claim_id = ?
-        ''', (claim_id,))
+        cursor.execute(f'{CLAIM_DETAIL_SELECT} WHERE c.claim_id = ?', (claim_id,))
         
         row = cursor.fetchone()
         conn.close()
@@ -2863,41 +3721,71 @@ def get_claim(claim_id):
         if user_role == 'student' and row['claimant_user_id'] != user_id:
             return jsonify({'error': 'Not authorized to view this claim'}), 403
         
-        claim = {
-            'claim_id': row['claim_id'],
-            'item_id': row['item_id'],
-            'claimant_user_id': row['claimant_user_id'],
-            'claimant_name': row['claimant_name'],
-            'claimant_email': row['claimant_email'],
-            'claimant_phone': row['claimant_phone'],
-            'verification_text': row['verification_text'],
-            'status': row['status'],
-            'staff_notes': row['staff_notes'],
-            'created_at': row['created_at'],
-            'updated_at': row['updated_at'],
-            'processed_by_staff_id': row['processed_by_staff_id'],
-            'item': {
-                'name': row['item_name'] or row['item_description'] or row['item_category'],
-                'description': row['item_description'],
-                'category': row['item_category'],
-                'location_found': row['item_location_found'],
-                'pickup_at': row['item_pickup_location'],
-                'date_found': row['item_date_found'],
-                'image_url': row['item_image_url'],
-                'status': row['item_status']
-            }
-        }
-        
-        return jsonify({'claim': claim}), 200
+        return jsonify({'claim': serialize_claim_row(row)}), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"Database Error: {err}")
         return jsonify({'error': 'Failed to retrieve claim'}), 500
     except Exception as err:
         print(f"Error: {err}")
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/api/claims/<int:claim_id>', methods=['PATCH'])
+# Statements run by every claim status change (prepared on PostgreSQL)
+CLAIM_STATUS = named_query(
+    'claims.update.status',
+    'SELECT claim_id, item_id, status, claimant_user_id FROM claims WHERE claim_id = ?',
+    prepare=True
+)
+OTHER_APPROVED_CLAIM = named_query('claims.update.other_approved', '''
+    SELECT claim_id FROM claims 
+    WHERE item_id = ? AND status IN ('approved', 'picked_up') AND claim_id != ?
+''', prepare=True)
+CLAIM_EMAIL_DATA = named_query('claims.update.email_data', '''
+    SELECT 
+        c.claimant_name,
+        c.claimant_email,
+        c.claimant_user_id,
+        i.description,
+        i.category,
+        i.pickup_at
+    FROM claims c
+    INNER JOIN items i ON c.item_id = i.item_id
+    WHERE c.claim_id = ?
+''', prepare=True)
+SET_CLAIM_STATUS = named_query('claims.update.set_status', '''
+    UPDATE claims 
+    SET status = ?, 
+        staff_notes = ?, 
+        processed_by_staff_id = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE claim_id = ?
+''', prepare=True)
+MARK_ITEM_CLAIMED = named_query('claims.update.mark_item_claimed', '''
+    UPDATE items 
+    SET status = 'claimed',
+        updated_at = CURRENT_TIMESTAMP,
+        claimed_at = CURRENT_TIMESTAMP
+    WHERE item_id = ?
+''', prepare=True)
+CONFLICTING_CLAIMS = named_query('claims.update.conflicting', '''
+    SELECT claim_id, claimant_user_id, claimant_name, claimant_email
+    FROM claims
+    WHERE item_id = ? AND claim_id != ? AND status IN ('pending', 'approved')
+''', prepare=True)
+AUTO_REJECT_CLAIM = named_query('claims.update.auto_reject', '''
+    UPDATE claims
+    SET status = 'rejected',
+        staff_notes = CASE
+            WHEN staff_notes IS NULL OR TRIM(staff_notes) = '' THEN ?
+            ELSE staff_notes || '\n' || ?
+        END,
+        processed_by_staff_id = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE claim_id = ?
+''', prepare=True)
+
+
+@api.route('/api/claims/<int:claim_id>', methods=['PATCH'])
 @require_role('staff')
 def update_claim(claim_id):
     """
@@ -2955,11 +3843,12 @@ def update_claim(claim_id):
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        conn.begin_write()
         
         staff_id = session.get('user_id')
         
         # Get current claim status
-        cursor.execute('SELECT claim_id, item_id, status, claimant_user_id FROM claims WHERE claim_id = ?', (claim_id,))
+        cursor.execute(CLAIM_STATUS, (claim_id,))
         claim = cursor.fetchone()
         
         if not claim:
@@ -2980,10 +3869,7 @@ def update_claim(claim_id):
         
         # If approving, check if there's already an approved claim for this item
         if new_status == 'approved':
-            cursor.execute('''
-                SELECT claim_id FROM claims 
-                WHERE item_id = ? AND status IN ('approved', 'picked_up') AND claim_id != ?
-            ''', (item_id, claim_id))
+            cursor.execute(OTHER_APPROVED_CLAIM, (item_id, claim_id))
             existing_approved = cursor.fetchone()
             
             if existing_approved:
@@ -2994,18 +3880,7 @@ def update_claim(claim_id):
                 }), 409
         
         # Get claimant and item info for email notification
-        cursor.execute('''
-            SELECT 
-                c.claimant_name,
-                c.claimant_email,
-                c.claimant_user_id,
-                i.description,
-                i.category,
-                i.pickup_at
-            FROM claims c
-            INNER JOIN items i ON c.item_id = i.item_id
-            WHERE c.claim_id = ?
-        ''', (claim_id,))
+        cursor.execute(CLAIM_EMAIL_DATA, (claim_id,))
         email_data = cursor.fetchone()
         
         auto_rejected_claims = []
@@ -3016,26 +3891,13 @@ def update_claim(claim_id):
             pickup_location = email_data['pickup_at']
         
         # Update claim status
-        cursor.execute('''
-            UPDATE claims 
-            SET status = ?, 
-                staff_notes = ?, 
-                processed_by_staff_id = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE claim_id = ?
-        ''', (new_status, staff_notes, staff_id, claim_id))
+        cursor.execute(SET_CLAIM_STATUS, (new_status, staff_notes, staff_id, claim_id))
         
         # If status is picked_up, update item status to claimed with timestamp
         if new_status == 'picked_up':
             try:
-                cursor.execute('''
-                    UPDATE items 
-                    SET status = 'claimed',
-                        updated_at = CURRENT_TIMESTAMP,
-                        claimed_at = CURRENT_TIMESTAMP
-                    WHERE item_id = ?
-                ''', (item_id,))
-            except sqlite3.OperationalError as exc:
+                cursor.execute(MARK_ITEM_CLAIMED, (item_id,))
+            except OperationalError as exc:
                 if 'no such column' in str(exc):
                     cursor.execute('''
                         UPDATE items
@@ -3047,26 +3909,12 @@ def update_claim(claim_id):
         
         # Auto-reject other claims if one is approved
         if new_status == 'approved':
-            cursor.execute('''
-                SELECT claim_id, claimant_user_id, claimant_name, claimant_email
-                FROM claims
-                WHERE item_id = ? AND claim_id != ? AND status IN ('pending', 'approved')
-            ''', (item_id, claim_id))
+            cursor.execute(CONFLICTING_CLAIMS, (item_id, claim_id))
             conflicting_claims = cursor.fetchall()
             auto_note = 'Automatically rejected because another claimant was verified for this item.'
             
             for other in conflicting_claims:
-                cursor.execute('''
-                    UPDATE claims
-                    SET status = 'rejected',
-                        staff_notes = CASE
-                            WHEN staff_notes IS NULL OR TRIM(staff_notes) = '' THEN ?
-                            ELSE staff_notes || '\n' || ?
-                        END,
-                        processed_by_staff_id = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE claim_id = ?
-                ''', (auto_note, auto_note, staff_id, other['claim_id']))
+                cursor.execute(AUTO_REJECT_CLAIM, (auto_note, auto_note, staff_id, other['claim_id']))
                 
                 metadata = {
                     'claim_id': other['claim_id'],
@@ -3177,7 +4025,7 @@ def update_claim(claim_id):
             'item_updated': new_status == 'picked_up'
         }), 200
         
-    except sqlite3.Error as err:
+    except DatabaseError as err:
         print(f"❌ [UPDATE_CLAIM] Database Error: {err}")
         print(f"{'='*60}\n")
         return jsonify({'error': 'Failed to update claim'}), 500
@@ -3187,7 +4035,7 @@ def update_claim(claim_id):
         traceback.print_exc()
         return jsonify({'error': 'An unexpected error occurred'}), 500
 
-@app.route('/', methods=['GET'])
+@api.route('/', methods=['GET'])
 def index():
     """Root endpoint with API information."""
     return jsonify({
@@ -3210,6 +4058,9 @@ def index():
         }
     }), 200
 
+# Module-level app for gunicorn (app:app) and the tests
+app = create_app()
+
 if __name__ == '__main__':
     # In production, gunicorn handles this. This is for local development only.
     # Use PORT env var if set (for Render), otherwise default to 5001
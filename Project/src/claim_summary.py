@@ -0,0 +1,210 @@
+"""
+Item Claim Summary Module
+Per-item claim summary kept next to items so listings do not query claims
+once per row.
+
+item_claim_summary holds, for every item with at least one claim, the latest
+claim (by updated_at, then claim_id) and the number of pending, approved and
+picked-up claims. Triggers on claims refresh an item's row whenever one of
+its claims is inserted, deleted or changes item, status, claimant name or
+updated_at, in the same transaction as the change. On PostgreSQL the refresh
+takes a per-item advisory lock so concurrent claims on one item are counted
+one after the other.
+
+Usage:
+    python src/claim_summary.py check     # list items whose summary is wrong
+    python src/claim_summary.py rebuild   # recompute every row
+"""
+
+import argparse
+import sys
+
+from db_config import get_db_connection
+
+# pg_advisory_xact_lock(key, item_id) namespace for summary refreshes
+_PG_LOCK_KEY = 714_016
+
+SUMMARY_COLUMNS = (
+    'latest_claim_id', 'latest_claim_status', 'latest_claimant_name',
+    'pending_claims', 'approved_claims', 'picked_up_claims',
+)
+
+# Summary rows computed from claims; {where} narrows `latest` (e.g. to one item)
+SUMMARY_SELECT = '''
+    SELECT
+        latest.item_id AS item_id,
+        latest.claim_id AS latest_claim_id,
+        latest.status AS latest_claim_status,
+        latest.claimant_name AS latest_claimant_name,
+        (SELECT COUNT(*) FROM claims WHERE item_id = latest.item_id AND status = 'pending') AS pending_claims,
+        (SELECT COUNT(*) FROM claims WHERE item_id = latest.item_id AND status = 'approved') AS approved_claims,
+        (SELECT COUNT(*) FROM claims WHERE item_id = latest.item_id AND status = 'picked_up') AS picked_up_claims
+    FROM claims AS latest
+    WHERE {where} latest.claim_id = (
+        SELECT claim_id FROM claims
+        WHERE item_id = latest.item_id
+        ORDER BY updated_at DESC, claim_id DESC
+        LIMIT 1
+    )
+'''
+
+SUMMARY_INSERT = f'''
+    INSERT INTO item_claim_summary (item_id, {', '.join(SUMMARY_COLUMNS)})
+    {SUMMARY_SELECT}
+'''
+
+# Joined after the items FROM clause by listings; columns are NULL without claims
+SUMMARY_JOIN = 'LEFT JOIN item_claim_summary AS claim_summary ON claim_summary.item_id = items.item_id'
+
+# Claim columns a summary depends on
+_WATCHED_COLUMNS = 'item_id, status, claimant_name, updated_at'
+
+
+def _refresh_statements(item):
+    """Statements recomputing the summary of the item whose id is the SQL expression `item`."""
+    return [
+        f'DELETE FROM item_claim_summary WHERE item_id = {item}',
+        SUMMARY_INSERT.format(where=f'latest.item_id = {item} AND'),
+    ]
+
+
+def create_claim_summary(cursor):
+    """Create item_claim_summary with its triggers on claims and fill it."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_claim_summary (
+            item_id INTEGER PRIMARY KEY REFERENCES items(item_id) ON DELETE CASCADE,
+            latest_claim_id INTEGER NOT NULL,
+            latest_claim_status TEXT NOT NULL,
+            latest_claimant_name TEXT,
+            pending_claims INTEGER NOT NULL DEFAULT 0,
+            approved_claims INTEGER NOT NULL DEFAULT 0,
+            picked_up_claims INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    if cursor.dialect.name == 'postgresql':
+        refresh = ';\n                '.join(_refresh_statements('target'))
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION refresh_item_claim_summary(target INTEGER) RETURNS void AS $$
+            BEGIN
+                PERFORM pg_advisory_xact_lock({_PG_LOCK_KEY}, target);
+                {refresh};
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute('''
+            CREATE OR REPLACE FUNCTION claims_refresh_item_summary() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    PERFORM refresh_item_claim_summary(OLD.item_id);
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.item_id <> OLD.item_id) THEN
+                    PERFORM refresh_item_claim_summary(NEW.item_id);
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute('DROP TRIGGER IF EXISTS claims_item_summary ON claims')
+        cursor.execute(f'''
+            CREATE TRIGGER claims_item_summary
+            AFTER INSERT OR DELETE OR UPDATE OF {_WATCHED_COLUMNS} ON claims
+            FOR EACH ROW EXECUTE FUNCTION claims_refresh_item_summary()
+        ''')
+    else:
+        new_refresh = ';\n'.join(_refresh_statements('new.item_id'))
+        old_refresh = ';\n'.join(_refresh_statements('old.item_id'))
+        for event, name, body in (
+            ('INSERT', 'insert', new_refresh),
+            ('DELETE', 'delete', old_refresh),
+            (f'UPDATE OF {_WATCHED_COLUMNS}', 'update', f'{old_refresh};\n{new_refresh}'),
+        ):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS claims_item_summary_{name} AFTER {event} ON claims BEGIN
+                    {body};
+                END
+            ''')
+
+    rebuild(cursor)
+
+
+def rebuild(cursor):
+    """
+    Recompute every summary row from claims.
+
+    Args:
+        cursor: Cursor inside the caller's transaction
+
+    Returns:
+        int: Number of items with claims
+    """
+    if cursor.dialect.name == 'postgresql':
+        # Claim triggers wait for the rebuild instead of racing it; reads continue
+        cursor.execute('LOCK TABLE item_claim_summary IN EXCLUSIVE MODE')
+    cursor.execute('DELETE FROM item_claim_summary')
+    cursor.execute(SUMMARY_INSERT.format(where=''))
+    cursor.execute('SELECT COUNT(*) AS count FROM item_claim_summary')
+    return cursor.fetchone()['count']
+
+
+def check(cursor):
+    """
+    Compare item_claim_summary with a summary computed from claims.
+
+    Returns:
+        list of dicts {"item_id", "expected", "actual"} for each item whose
+        stored row is missing, stale or left over (None stands for no row);
+        empty when consistent
+    """
+    def by_item(rows):
+        return {row['item_id']: tuple(row[column] for column in SUMMARY_COLUMNS) for row in rows}
+
+    cursor.execute(SUMMARY_SELECT.format(where=''))
+    expected = by_item(cursor.fetchall())
+    cursor.execute(f"SELECT item_id, {', '.join(SUMMARY_COLUMNS)} FROM item_claim_summary")
+    actual = by_item(cursor.fetchall())
+
+    problems = []
+    for item_id in sorted(set(expected) | set(actual)):
+        if expected.get(item_id) != actual.get(item_id):
+            problems.append({
+                'item_id': item_id,
+                'expected': dict(zip(SUMMARY_COLUMNS, expected[item_id])) if item_id in expected else None,
+                'actual': dict(zip(SUMMARY_COLUMNS, actual[item_id])) if item_id in actual else None,
+            })
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='UW Lost-and-Found item claim summary')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    subcommands.add_parser('check', help='report items whose summary differs from their claims')
+    subcommands.add_parser('rebuild', help='recompute the summary of every item')
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        if args.command == 'rebuild':
+            count = rebuild(cursor)
+            conn.commit()
+            print(f"✅ Rebuilt claim summary for {count} items")
+            return 0
+
+        problems = check(cursor)
+        for problem in problems:
+            print(f"❌ Item {problem['item_id']}: expected {problem['expected']}, found {problem['actual']}")
+        if problems:
+            print(f"{len(problems)} items out of sync; run 'python src/claim_summary.py rebuild'")
+            return 1
+        print("✅ Claim summary is consistent")
+        return 0
+    finally:
+        conn.close()
+
+
+__all__ = ['SUMMARY_COLUMNS', 'SUMMARY_JOIN', 'create_claim_summary', 'rebuild', 'check']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Conditional GET Module
+ETag and Last-Modified validators for read endpoints that clients poll.
+
+A response's version is the write generations of the tables it is built
+from (see count_cache.ROW_GENERATIONS): triggers bump a table's counter and
+record the time in generations.changed_at on every insert, update or delete.
+Reading them is one small query, so a poll whose If-None-Match (or
+If-Modified-Since) still matches is answered 304 Not Modified before the
+endpoint runs its own queries or serializes anything.
+
+The ETag hashes the generations together with everything else the body
+depends on (endpoint, user, role, normalized parameters), so it is strong:
+equal tags mean byte-identical bodies. Last-Modified is the latest change
+time of those tables; If-None-Match takes precedence over it, as in RFC 7232.
+Change times have one-second resolution, so Last-Modified is only sent (and
+If-Modified-Since alone only answered 304) once its second is over: until
+then a later write in the same second would carry the same timestamp.
+
+Usage:
+    version = read_version(cursor, ITEM_LISTING_GENERATIONS)
+    etag = make_etag(version, 'items', role, params)
+    if not_modified(etag, version.last_modified):
+        return not_modified_response(etag, version.last_modified)
+    ...
+    return with_validators(jsonify(body), etag, version.last_modified), 200
+"""
+
+import hashlib
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from flask import request, current_app
+from werkzeug.http import is_resource_modified
+
+# generations: counter values in the order asked for; last_modified: aware UTC datetime or None
+Version = namedtuple('Version', ['generations', 'last_modified'])
+
+# Validators must be checked on every use, and responses are per user
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _settled(last_modified):
+    """True once no later write can share last_modified's (one-second) timestamp."""
+    return last_modified is not None and _now() >= last_modified + timedelta(seconds=1)
+
+
+def _as_datetime(value):
+    """changed_at as an aware UTC datetime (SQLite returns text)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S')
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def read_version(cursor, names):
+    """
+    Current generations and latest change time of several tables.
+
+    Args:
+        cursor: Cursor on the connection the response will be read from
+        names: Generation counter names (see count_cache.ROW_GENERATIONS)
+
+    Returns:
+        Version: Counter values in the order of `names` (None if missing) and
+        the latest changed_at among them
+    """
+    # A counter is the sum of its rows, one per slot on PostgreSQL (see count_cache.shard_generations)
+    conditions = ' OR '.join('name = ? OR name LIKE ?' for _ in names)
+    cursor.execute(
+        f'SELECT name, value, changed_at FROM generations WHERE {conditions}',
+        [param for name in names for param in (name, f'{name}:%')]
+    )
+    values, times = {}, []
+    for row in cursor.fetchall():
+        name = row['name'].split(':')[0]
+        values[name] = values.get(name, 0) + row['value']
+        if row['changed_at'] is not None:
+            times.append(_as_datetime(row['changed_at']))
+    generations = tuple(values.get(name) for name in names)
+    return Version(generations, max(times) if times else None)
+
+
+def make_etag(version, *parts):
+    """
+    Strong ETag value (unquoted) for a response that depends on `parts` at `version`.
+    None when a counter is missing (database not migrated): no validators then.
+    """
+    if None in version.generations:
+        return None
+    return hashlib.sha1(repr(parts + (version.generations,)).encode('utf-8')).hexdigest()[:32]
+
+
+def not_modified(etag, last_modified):
+    """True when the request's If-None-Match / If-Modified-Since still match."""
+    if etag is None:
+        return False
+    if not _settled(last_modified):
+        last_modified = None
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def with_validators(response, etag, last_modified):
+    """Set ETag, Last-Modified and Cache-Control on a response and return it."""
+    if etag is None:
+        return response
+    response.set_etag(etag)
+    if _settled(last_modified):
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def not_modified_response(etag, last_modified):
+    """Empty 304 response carrying the validators."""
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+__all__ = ['Version', 'read_version', 'make_etag', 'not_modified', 'with_validators', 'not_modified_response']
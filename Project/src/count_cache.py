@@ -0,0 +1,367 @@
+"""
+Count Cache Module
+Cached total counts for paginated listings (/api/items, /api/activity-log).
+
+A listing's COUNT(*) often costs more than the page itself. Counts are
+cached per connection pool, keyed by the count query's text and its
+(normalized) parameters, and tagged with a write generation: a counter in
+the `generations` table that triggers bump on every insert, update or
+delete of the counted table (migration 7; each table has its own counter,
+split over several rows on PostgreSQL by migration 12, see
+shard_generations). A cached count is used only while its table's
+generation is unchanged, so no write is ever missed.
+
+Counting stops after COUNT_EXACT_LIMIT rows. Beyond that PostgreSQL reports
+the planner's row estimate and the count is flagged approximate; SQLite has
+no estimate and finishes the exact count.
+
+The same generations keep the in-memory item indexes (suggest.py,
+matching.py, search.py) current through PoolIndexCache.
+
+Usage:
+    total, approximate = cached_count(conn, 'items.count', ROW_GENERATIONS['items'],
+                                      "items WHERE status != 'deleted'", [])
+"""
+
+import os
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from db_config import column_names
+from queries import named_query
+
+# Listings cached per pool
+COUNT_CACHE_SIZE = int(os.getenv('COUNT_CACHE_SIZE', '1024'))
+# Rows counted exactly before falling back to an estimate (PostgreSQL)
+COUNT_EXACT_LIMIT = int(os.getenv('COUNT_EXACT_LIMIT', '50000'))
+
+# Generation counter bumped by any write to each table
+ROW_GENERATIONS = {
+    'items': 'items.rows',
+    'activity_log': 'activity_log.rows',
+    'claims': 'claims.rows',
+    'notifications': 'notifications.rows',
+    'saved_searches': 'saved_searches.rows',
+}
+
+# Rows per counter on PostgreSQL (see shard_generations)
+GENERATION_SLOTS = 16
+
+
+def read_generation(cursor, name):
+    """
+    Current value of a generation counter (None if the counter does not exist):
+    the sum of its rows, one per slot on PostgreSQL (see shard_generations).
+    """
+    cursor.execute('SELECT SUM(value) AS value FROM generations WHERE name = ? OR name LIKE ?',
+                   (name, f'{name}:%'))
+    row = cursor.fetchone()
+    return row['value'] if row else None
+
+
+class CountCache:
+    """Bounded LRU map of count key -> (generation, total, approximate)."""
+
+    def __init__(self, size=COUNT_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, generation):
+        """(total, approximate) cached at `generation`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != generation:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key, generation, total, approximate):
+        with self._lock:
+            self._entries[key] = (generation, total, approximate)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_for(pool):
+    """The CountCache of a connection pool (created on first use)."""
+    with _caches_lock:
+        cache = _caches.get(pool)
+        if cache is None:
+            cache = _caches[pool] = CountCache()
+        return cache
+
+
+class _CachedIndex:
+    """A pool's index, the generation it reflects and when that was checked."""
+
+    def __init__(self):
+        self.index = None
+        self.generation = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+class PoolIndexCache:
+    """
+    One in-memory index per connection pool (so per worker process), built
+    on first use and rebuilt when a generation counter has moved.
+
+    The counter is read at most every `refresh_seconds`; in between no
+    query is run at all. While one thread checks or rebuilds, others keep
+    using the current index. Writes made by this process are applied to the
+    index by the caller (see peek), so they show at once.
+
+    Usage:
+        indexes = PoolIndexCache(build_match_index, MATCH_REFRESH_SECONDS)
+        indexes.get(pool).match('black wallet')
+    """
+
+    def __init__(self, build, refresh_seconds, generation=ROW_GENERATIONS['items']):
+        self.build = build                      # cursor -> index
+        self.refresh_seconds = refresh_seconds
+        self.generation = generation
+        self._entries = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _entry(self, pool):
+        with self._lock:
+            entry = self._entries.get(pool)
+            if entry is None:
+                entry = self._entries[pool] = _CachedIndex()
+            return entry
+
+    def _fresh(self, entry):
+        return entry.index is not None and time.monotonic() - entry.checked_at < self.refresh_seconds
+
+    def get(self, pool, conn=None):
+        """
+        The index of `pool`.
+
+        Args:
+            pool: Connection pool (None: an index is built from `conn` and not kept)
+            conn: Connection to check and build with; a connection of `pool`
+                is taken when None
+        """
+        if pool is None:
+            return self.build(conn.cursor())
+        entry = self._entry(pool)
+        if self._fresh(entry):
+            return entry.index
+        if not entry.lock.acquire(blocking=entry.index is None):
+            return entry.index
+        try:
+            if self._fresh(entry):
+                return entry.index
+            own = conn is None
+            if own:
+                conn = pool.connection()
+            try:
+                cursor = conn.cursor()
+                generation = read_generation(cursor, self.generation)
+                if entry.index is None or generation is None or generation != entry.generation:
+                    entry.index = self.build(cursor)
+                    entry.generation = generation
+            finally:
+                if own:
+                    conn.close()
+            entry.checked_at = time.monotonic()
+            return entry.index
+        finally:
+            entry.lock.release()
+
+    def peek(self, pool):
+        """The index of `pool` if it has been built, else None (nothing to update)."""
+        if pool is None:
+            return None
+        return self._entry(pool).index
+
+
+def _estimate(cursor, from_where, params):
+    """PostgreSQL planner's row estimate for `SELECT 1 FROM {from_where}`."""
+    cursor.execute(f'EXPLAIN (FORMAT JSON) SELECT 1 FROM {from_where}', params)
+    plan = cursor.fetchone()['QUERY PLAN']
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_rows(cursor, name, from_where, params, prepare=True):
+    """
+    Count the rows of `SELECT 1 FROM {from_where}`, exactly up to COUNT_EXACT_LIMIT.
+
+    Args:
+        cursor: Cursor to count with
+        name: Named query the count is reported under (e.g. 'items.count')
+        from_where: FROM clause with its WHERE clause
+        params: Parameters of from_where
+        prepare: Use prepared statements (see queries.named_query)
+
+    Returns:
+        tuple: (total, approximate)
+    """
+    capped = f'SELECT COUNT(*) AS total FROM (SELECT 1 AS found FROM {from_where} LIMIT ?) AS capped'
+    cursor.execute(named_query(name, capped, prepare=prepare), list(params) + [COUNT_EXACT_LIMIT + 1])
+    total = cursor.fetchone()['total']
+    if total <= COUNT_EXACT_LIMIT:
+        return total, False
+    if cursor.dialect.name == 'postgresql':
+        return max(_estimate(cursor, from_where, params), total), True
+    cursor.execute(named_query(name, f'SELECT COUNT(*) AS total FROM {from_where}', prepare=prepare), params)
+    return cursor.fetchone()['total'], False
+
+
+def cached_count(conn, name, generation_name, from_where, params, prepare=True):
+    """
+    count_rows() through the pool's CountCache.
+
+    Args:
+        conn: Pooled connection (counts are not cached without a pool)
+        name: Named query name, also part of the cache key
+        generation_name: Generation counter of the counted table (see ROW_GENERATIONS)
+        from_where: FROM clause with its WHERE clause
+        params: Normalized parameters of from_where
+
+    Returns:
+        tuple: (total, approximate)
+    """
+    cursor = conn.cursor()
+    pool = getattr(conn, 'pool', None)
+    generation = read_generation(cursor, generation_name)
+    if pool is None or generation is None:
+        return count_rows(cursor, name, from_where, params, prepare)
+
+    cache = cache_for(pool)
+    key = (name, from_where, tuple(params))
+    hit = cache.get(key, generation)
+    if hit is not None:
+        return hit
+    total, approximate = count_rows(cursor, name, from_where, params, prepare)
+    cache.put(key, generation, total, approximate)
+    return total, approximate
+
+
+def create_row_generations(cursor, generations):
+    """
+    Generation counters bumped by triggers on every write to the counted tables.
+    Each bump also records when it happened in generations.changed_at (the
+    Last-Modified time of responses built from the table, see conditional.py).
+
+    Args:
+        cursor: Cursor of the migration
+        generations: {table: counter name} of the tables the calling migration
+            covers, written out in that migration (not ROW_GENERATIONS, which
+            grows with later migrations)
+    """
+    if 'changed_at' not in column_names(cursor, 'generations'):
+        cursor.execute('ALTER TABLE generations ADD COLUMN changed_at TIMESTAMP')
+        cursor.execute('UPDATE generations SET changed_at = CURRENT_TIMESTAMP')
+    for table, name in generations.items():
+        cursor.execute('SELECT COUNT(*) AS count FROM generations WHERE name = ?', (name,))
+        if not cursor.fetchone()['count']:
+            # Random start, as for items.text (see search.create_fuzzy_support)
+            cursor.execute(
+                'INSERT INTO generations (name, value, changed_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+                (name, random.randrange(2 ** 30))
+            )
+
+    if cursor.dialect.name == 'postgresql':
+        create_generation_bump(cursor, 'bump_generation', 'TG_ARGV[0]')
+        for table, name in generations.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_row_generation ON {table}')
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_row_generation
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_generation('{name}')
+            ''')
+        return
+
+    # Recreated so triggers from before changed_at existed set it too
+    for table, name in generations.items():
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            trigger = f'{table}_row_generation_{event.lower()}'
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'''
+                CREATE TRIGGER {trigger} AFTER {event} ON {table} BEGIN
+                    UPDATE generations SET value = value + 1, changed_at = CURRENT_TIMESTAMP WHERE name = '{name}';
+                END
+            ''')
+
+
+
+def create_generation_bump(cursor, function, name, slots=GENERATION_SLOTS, changed_at=True):
+    """
+    PostgreSQL trigger function bumping a generation counter, the only
+    definition of that body: every migration (re)creating a bump function
+    goes through here, so none of them undoes the slots.
+
+    A statement bumps the slot row of its backend ('items.rows:3' when
+    pg_backend_pid() % slots is 3), or the counter's own row while the
+    counter has no slot rows (before migration 12, or for a new counter).
+
+    Args:
+        cursor: Cursor of the migration
+        function: Name of the trigger function
+        name: SQL expression of the counter name (e.g. 'TG_ARGV[0]')
+        slots: Rows per counter, written out in the calling migration
+        changed_at: Also set generations.changed_at (migration 10 on)
+    """
+    if cursor.dialect.name != 'postgresql':
+        return
+    assignments = 'value = value + 1' + (', changed_at = CURRENT_TIMESTAMP' if changed_at else '')
+    cursor.execute(f'''
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            UPDATE generations SET {assignments} WHERE name = {name} || ':' || (pg_backend_pid() % {slots});
+            IF NOT FOUND THEN
+                UPDATE generations SET {assignments} WHERE name = {name};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    ''')
+
+
+def shard_generations(cursor, names, slots):
+    """
+    Split generation counters over `slots` extra rows each on PostgreSQL.
+
+    A trigger bumping one counter row holds that row's lock until its
+    transaction commits, so each writer to a table waited for the previous
+    one. With slot rows a statement bumps the row of its backend (see
+    create_generation_bump), so concurrent writers rarely meet.
+    read_generation() sums the rows: the value still moves with every commit,
+    and only then. SQLite has a single writer and is left as it is.
+
+    Args:
+        cursor: Cursor of the migration
+        names: Counters to split, written out in the calling migration
+        slots: Rows per counter, written out in the calling migration
+    """
+    if cursor.dialect.name != 'postgresql':
+        return
+    for name in names:
+        for slot in range(slots):
+            cursor.execute('''
+                INSERT INTO generations (name, value, changed_at)
+                SELECT ?, 0, changed_at FROM generations WHERE name = ?
+                ON CONFLICT (name) DO NOTHING
+            ''', (f'{name}:{slot}', name))
+
+
+__all__ = [
+    'ROW_GENERATIONS', 'GENERATION_SLOTS', 'read_generation', 'CountCache', 'cache_for', 'PoolIndexCache',
+    'count_rows', 'cached_count', 'create_row_generations', 'create_generation_bump', 'shard_generations'
+]
@@ -1,18 +1,35 @@
 """
 Database Configuration Module
-Provides database connection abstraction for SQLite (development) and PostgreSQL (production).
+Provides the data access layer for SQLite (development) and PostgreSQL (production).
+
+Every route goes through this module: connections come from db_pool, cursors
+translate SQLite-style `?` placeholders for PostgreSQL, dialect-specific SQL
+(auto-increment keys, week bucketing, RETURNING) is produced here, and driver
+exceptions are re-raised as backend-neutral DatabaseError subclasses.
 
 Usage:
-    from db_config import get_db_connection, init_db, DB_TYPE
+    from db_config import get_db_connection, DB_TYPE, DatabaseError, Query
 """
 
 import os
 import sqlite3
-from urllib.parse import urlparse
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+import instrumentation
 
 # Detect database type from DATABASE_URL environment variable
 DATABASE_URL = os.getenv('DATABASE_URL', '')
 
+# Optional PostgreSQL read replica for read-only endpoints
+REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL', '')
+# After a session writes, its reads stay on the primary this long (read-your-writes)
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+# After the replica fails, reads use the primary this long before retrying it
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', '30'))
+
 def get_db_type():
     """Determine database type from DATABASE_URL."""
     if DATABASE_URL and DATABASE_URL.startswith('postgres'):
@@ -24,36 +41,443 @@ DB_TYPE = get_db_type()
 # SQLite database path (for development)
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'lostfound.db')
 
+# SQLite tuning profile
+# 'default': rollback journal, one shared pool (development, tests)
+# 'wal':     WAL journal, synchronous=NORMAL, busy timeout, larger page cache and
+#            memory-mapped reads, separate read-only and writer pools (multi-worker gunicorn)
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default').lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '16384'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_WRITER_POOL_SIZE = int(os.getenv('SQLITE_WRITER_POOL_SIZE', '4'))
+# Per-connection compiled statement cache (sqlite3 default is 128)
+SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', '256'))
 
-def get_db_connection():
+
+def sqlite_pragmas(profile=None, readonly=False):
     """
-    Get a database connection based on environment.
-    Returns SQLite connection in development, PostgreSQL in production.
+    Return the PRAGMA statements to run on a new SQLite connection.
+
+    Args:
+        profile: 'default' or 'wal' (defaults to SQLITE_PROFILE)
+        readonly: True for connections from the read-only pool
     """
-    if DB_TYPE == 'postgresql':
+    profile = profile or SQLITE_PROFILE
+    if profile != 'wal':
+        return []
+    pragmas = [
+        f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}',
+        f'PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}',  # negative = KiB
+        f'PRAGMA mmap_size = {SQLITE_MMAP_SIZE}',
+        'PRAGMA temp_store = MEMORY',
+    ]
+    if readonly:
+        pragmas.append('PRAGMA query_only = ON')
+    else:
+        # journal_mode is persistent in the file; writers (re)assert it
+        pragmas.append('PRAGMA journal_mode = WAL')
+        pragmas.append('PRAGMA synchronous = NORMAL')
+    return pragmas
+
+
+def postgres_connect_kwargs(database_url=None):
+    """
+    psycopg2.connect() arguments for a postgres:// URL (Render provides this).
+    libpq parses the URL itself, so query options such as sslmode or a
+    unix-socket host (?host=/var/run/postgresql) are honoured.
+    """
+    from psycopg2.extras import RealDictCursor
+
+    return {
+        'dsn': database_url or DATABASE_URL,
+        'cursor_factory': RealDictCursor
+    }
+
+
+# ============================================================================
+# Backend-neutral errors
+# ============================================================================
+
+class DatabaseError(Exception):
+    """Base class for database errors from either backend."""
+
+
+class IntegrityError(DatabaseError):
+    """Constraint violation (unique, foreign key, check, not null)."""
+
+
+class OperationalError(DatabaseError):
+    """Operational failure (locked database, missing table/column, lost connection)."""
+
+
+@lru_cache(maxsize=None)
+def _driver_error_map():
+    """(driver exception classes, neutral class) pairs."""
+    mapping = [
+        ((sqlite3.IntegrityError,), IntegrityError),
+        ((sqlite3.OperationalError,), OperationalError),
+    ]
+    try:
         import psycopg2
-        from psycopg2.extras import RealDictCursor
-        
-        # Parse DATABASE_URL (Render provides this)
-        url = urlparse(DATABASE_URL)
-        conn = psycopg2.connect(
-            host=url.hostname,
-            port=url.port,
-            database=url.path[1:],  # Remove leading slash
-            user=url.username,
-            password=url.password,
-            cursor_factory=RealDictCursor
+        from psycopg2 import errors as pg_errors
+    except ImportError:
+        return mapping
+    return [
+        ((sqlite3.IntegrityError, psycopg2.IntegrityError), IntegrityError),
+        # PostgreSQL reports missing tables/columns as ProgrammingError; SQLite as OperationalError
+        ((sqlite3.OperationalError, psycopg2.OperationalError,
+          pg_errors.UndefinedTable, pg_errors.UndefinedColumn), OperationalError),
+    ]
+
+
+def translate_error(exc):
+    """Map a sqlite3/psycopg2 exception onto the backend-neutral hierarchy."""
+    for driver_classes, neutral_class in _driver_error_map():
+        if isinstance(exc, driver_classes):
+            return neutral_class(str(exc))
+    return DatabaseError(str(exc))
+
+
+# ============================================================================
+# Dialects
+# ============================================================================
+
+class Dialect:
+    """SQL differences between SQLite and PostgreSQL."""
+
+    def __init__(self, name, placeholder, primary_key, like, returning):
+        self.name = name
+        self.placeholder = placeholder
+        self.primary_key = primary_key
+        self.like = like
+        self.supports_returning = returning
+
+    def __repr__(self):
+        return f'Dialect({self.name!r})'
+
+    @property
+    def driver_errors(self):
+        """Exception classes raised by this backend's driver."""
+        if self.name == 'postgresql':
+            import psycopg2
+            return (psycopg2.Error,)
+        return (sqlite3.Error,)
+
+    def convert(self, query):
+        """Translate a SQLite-style query for this dialect (cached per distinct string)."""
+        if self.placeholder == '?':
+            return query
+        return _to_pyformat(query)
+
+    def week_bucket(self, column):
+        """Expression grouping a timestamp column into year-week buckets."""
+        if self.name == 'postgresql':
+            return f"to_char({column}, 'IYYY-IW')"
+        return f"strftime('%Y-%W', {column})"
+
+    def weeks_ago(self, weeks):
+        """Expression for the timestamp `weeks` weeks before now."""
+        if self.name == 'postgresql':
+            return f"(CURRENT_TIMESTAMP - INTERVAL '{int(weeks)} weeks')"
+        return f"datetime('now', '-{int(weeks)} weeks')"
+
+
+@lru_cache(maxsize=1024)
+def _to_pyformat(query):
+    return query.replace('?', '%s')
+
+
+SQLITE = Dialect('sqlite', '?', 'INTEGER PRIMARY KEY AUTOINCREMENT', 'LIKE', returning=False)
+POSTGRESQL = Dialect('postgresql', '%s', 'SERIAL PRIMARY KEY', 'ILIKE', returning=True)
+
+
+def get_dialect(db_type=None):
+    """Return the Dialect for a backend name (defaults to the configured backend)."""
+    return POSTGRESQL if (db_type or DB_TYPE) == 'postgresql' else SQLITE
+
+
+class Query:
+    """
+    SQL statement written once in SQLite style and translated for every
+    dialect when it is defined, so executing it never re-translates.
+
+    Usage:
+        FIND_USER = Query('SELECT * FROM users WHERE email = ?')
+        cursor.execute(FIND_USER, (email,))
+    """
+
+    __slots__ = ('source', '_texts')
+
+    def __init__(self, source):
+        self.source = source
+        self._texts = {
+            'sqlite': SQLITE.convert(source),
+            'postgresql': _to_pyformat(source),
+        }
+
+    def text(self, dialect):
+        return self._texts[dialect.name]
+
+    def __repr__(self):
+        return f'Query({self.source.strip()[:60]!r})'
+
+
+class QueryStats:
+    """Execution count and latency of one named query (all its variants)."""
+
+    __slots__ = ('name', 'count', 'errors', 'total_seconds', 'max_seconds', '_lock')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, failed=False):
+        with self._lock:
+            self.count += 1
+            if failed:
+                self.errors += 1
+            self.total_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+
+    def reset(self):
+        with self._lock:
+            self.count = self.errors = 0
+            self.total_seconds = self.max_seconds = 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'count': self.count,
+                'errors': self.errors,
+                'total_ms': round(self.total_seconds * 1000, 3),
+                'avg_ms': round(self.total_seconds * 1000 / self.count, 3) if self.count else 0.0,
+                'max_ms': round(self.max_seconds * 1000, 3)
+            }
+
+
+class NamedQuery(Query):
+    """
+    Query registered under a name (see queries.py). Every execution is timed
+    into `stats`. With prepared=True, PostgreSQL runs it as a server-side
+    prepared statement (PREPARE once per connection, then EXECUTE), so the
+    statement is parsed and planned once per connection. SQLite needs no
+    special handling: the text never changes, so sqlite3's per-connection
+    statement cache keeps it compiled.
+    """
+
+    __slots__ = ('name', 'prepared', 'statement_name', 'param_count', 'stats', '_numbered')
+
+    def __init__(self, name, source, stats, prepared=False, statement_name=None):
+        super().__init__(source)
+        self.name = name
+        self.stats = stats
+        self.prepared = prepared
+        self.statement_name = statement_name
+        self.param_count = source.count('?')
+        self._numbered = _to_numbered(source) if prepared else None
+
+    def __repr__(self):
+        return f'NamedQuery({self.name!r})'
+
+
+def _to_numbered(query):
+    """Rewrite ? placeholders as $1, $2, ... for PREPARE."""
+    parts = query.split('?')
+    return parts[0] + ''.join(f'${i}{part}' for i, part in enumerate(parts[1:], start=1))
+
+
+# Prepared statement names already created on each PostgreSQL connection
+_prepared_statements = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+
+# ============================================================================
+# Connection and cursor wrappers
+# ============================================================================
+
+class Cursor:
+    """
+    Dialect-aware cursor.
+    Accepts Query objects or SQLite-style strings, and raises DatabaseError
+    subclasses instead of driver exceptions.
+    """
+
+    def __init__(self, cursor, dialect):
+        self._cursor = cursor
+        self.dialect = dialect
+
+    def _sql(self, query):
+        if isinstance(query, Query):
+            return query.text(self.dialect)
+        return self.dialect.convert(query)
+
+    def execute(self, query, params=None):
+        start = time.perf_counter()
+        executed = None
+        try:
+            if isinstance(query, NamedQuery) and query.prepared and self.dialect.name == 'postgresql':
+                executed = self._run_prepared(query, params)
+            else:
+                sql = self._sql(query)
+                self._run(sql, params)
+                executed = sql
+        finally:
+            elapsed = time.perf_counter() - start
+            failed = executed is None
+            if isinstance(query, NamedQuery):
+                query.stats.record(elapsed, failed)
+            instrumentation.record_statement(
+                self, query.source if isinstance(query, Query) else query, params, elapsed,
+                name=getattr(query, 'name', None), explain_sql=executed, failed=failed
+            )
+        return self
+
+    def _run(self, sql, params):
+        try:
+            if params is None:
+                self._cursor.execute(sql)
+            else:
+                self._cursor.execute(sql, params)
+        except self.dialect.driver_errors as exc:
+            raise translate_error(exc) from exc
+
+    def _run_prepared(self, query, params):
+        """EXECUTE a server-side prepared statement, preparing it on first use. Returns the EXECUTE text."""
+        conn = self._cursor.connection
+        with _prepared_lock:
+            prepared = _prepared_statements.setdefault(conn, set())
+        if query.statement_name not in prepared:
+            self._run(f'PREPARE {query.statement_name} AS {query._numbered}', None)
+            prepared.add(query.statement_name)
+        if query.param_count:
+            placeholders = ', '.join(['%s'] * query.param_count)
+            sql = f'EXECUTE {query.statement_name} ({placeholders})'
+        else:
+            sql = f'EXECUTE {query.statement_name}'
+        self._run(sql, params if query.param_count else None)
+        return sql
+
+    def executemany(self, query, seq_of_params):
+        start = time.perf_counter()
+        failed = True
+        try:
+            self._cursor.executemany(self._sql(query), seq_of_params)
+            failed = False
+        except self.dialect.driver_errors as exc:
+            raise translate_error(exc) from exc
+        finally:
+            elapsed = time.perf_counter() - start
+            if isinstance(query, NamedQuery):
+                query.stats.record(elapsed, failed)
+            stats = instrumentation.current_request_stats()
+            if stats is not None:
+                stats.queries += 1
+                stats.seconds += elapsed
+        return self
+
+    def insert_returning_id(self, query, params, id_column):
+        """
+        Run an INSERT and return the new row's primary key.
+        PostgreSQL appends RETURNING; SQLite reads lastrowid.
+        """
+        if self.dialect.supports_returning:
+            sql = query.source if isinstance(query, Query) else query
+            self.execute(f'{sql.rstrip().rstrip(";")} RETURNING {id_column}', params)
+            row = self.fetchone()
+            return row[id_column]
+        self.execute(query, params)
+        return self._cursor.lastrowid
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            instrumentation.record_rows(1)
+        return row
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        instrumentation.record_rows(len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        rows = self._cursor.fetchmany() if size is None else self._cursor.fetchmany(size)
+        instrumentation.record_rows(len(rows))
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        for row in self._cursor:
+            instrumentation.record_rows(1)
+            yield row
+
+    @property
+    def connection(self):
+        """The driver connection this cursor belongs to."""
+        return self._cursor.connection
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+
+def wrap_cursor(cursor, dialect):
+    """Wrap a driver cursor in the dialect-aware Cursor."""
+    return Cursor(cursor, dialect)
+
+
+def table_exists(cursor, table_name):
+    """Return True if `table_name` exists in the current database."""
+    if cursor.dialect.name == 'postgresql':
+        cursor.execute(
+            "SELECT 1 AS present FROM information_schema.tables WHERE table_schema = current_schema() AND table_name = ?",
+            (table_name,)
+        )
+    else:
+        cursor.execute("SELECT 1 AS present FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def column_names(cursor, table_name):
+    """Return the set of column names of `table_name`."""
+    if cursor.dialect.name == 'postgresql':
+        cursor.execute(
+            "SELECT column_name AS name FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = ?",
+            (table_name,)
         )
-        return conn
     else:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+        cursor.execute(f'PRAGMA table_info({table_name})')
+    return {row['name'] for row in cursor.fetchall()}
+
+
+def get_db_connection():
+    """
+    Get a database connection based on environment.
+    Returns SQLite connection in development, PostgreSQL in production.
+    Connections are borrowed from a pool; close() returns them to it.
+    """
+    from db_pool import get_pool
+    return get_pool(DB_PATH).connection()
 
 
 def get_placeholder():
     """Return the correct placeholder for SQL queries."""
-    return '%s' if DB_TYPE == 'postgresql' else '?'
+    return get_dialect().placeholder
 
 
 def convert_query(query):
@@ -61,234 +485,11 @@ def convert_query(query):
     Convert SQLite-style query to PostgreSQL-style if needed.
     Replaces ? with %s for PostgreSQL.
     """
-    if DB_TYPE == 'postgresql':
-        return query.replace('?', '%s')
-    return query
-
-
-def init_db():
-    """
-    Initialize the database with required tables.
-    Handles both SQLite and PostgreSQL syntax differences.
-    """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if DB_TYPE == 'postgresql':
-        # PostgreSQL schema
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id SERIAL PRIMARY KEY,
-                email TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('student', 'staff')),
-                watcard_number TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                item_id SERIAL PRIMARY KEY,
-                name TEXT,
-                description TEXT,
-                category TEXT NOT NULL,
-                location_found TEXT NOT NULL,
-                pickup_at TEXT NOT NULL CHECK(pickup_at IN ('SLC', 'PAC', 'CIF')),
-                date_found TIMESTAMP NOT NULL,
-                status TEXT NOT NULL DEFAULT 'unclaimed' CHECK(status IN ('unclaimed', 'claimed', 'deleted')),
-                image_url TEXT,
-                found_by_desk TEXT NOT NULL,
-                created_by_user_id INTEGER REFERENCES users(user_id),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                claimed_at TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES users(user_id),
-                role TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS claims (
-                claim_id SERIAL PRIMARY KEY,
-                item_id INTEGER NOT NULL REFERENCES items(item_id),
-                claimant_user_id INTEGER NOT NULL REFERENCES users(user_id),
-                claimant_name TEXT NOT NULL,
-                claimant_email TEXT NOT NULL,
-                claimant_phone TEXT,
-                verification_text TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'approved', 'rejected', 'picked_up')),
-                staff_notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                processed_by_staff_id INTEGER REFERENCES users(user_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS activity_log (
-                log_id SERIAL PRIMARY KEY,
-                user_id INTEGER,
-                user_name TEXT,
-                user_email TEXT,
-                user_role TEXT,
-                action_type TEXT NOT NULL CHECK(action_type IN (
-                    'item_added', 'item_updated', 'item_deleted',
-                    'claim_created', 'claim_approved', 'claim_rejected', 'claim_picked_up',
-                    'user_registered', 'user_login', 'profile_updated', 'password_changed',
-                    'data_export'
-                )),
-                entity_type TEXT CHECK(entity_type IN ('item', 'claim', 'user', 'profile')),
-                entity_id INTEGER,
-                details TEXT,
-                ip_address TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                notification_id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES users(user_id),
-                type TEXT NOT NULL DEFAULT 'info',
-                title TEXT NOT NULL,
-                message TEXT NOT NULL,
-                metadata TEXT,
-                is_read INTEGER NOT NULL DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                read_at TIMESTAMP
-            )
-        ''')
-        
-        # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_status ON items(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_category ON items(category)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-        
-    else:
-        # SQLite schema (existing code)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('student', 'staff')),
-                watcard_number TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                description TEXT,
-                category TEXT NOT NULL,
-                location_found TEXT NOT NULL,
-                pickup_at TEXT NOT NULL CHECK(pickup_at IN ('SLC', 'PAC', 'CIF')),
-                date_found TIMESTAMP NOT NULL,
-                status TEXT NOT NULL DEFAULT 'unclaimed' CHECK(status IN ('unclaimed', 'claimed', 'deleted')),
-                image_url TEXT,
-                found_by_desk TEXT NOT NULL,
-                created_by_user_id INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                claimed_at TIMESTAMP,
-                FOREIGN KEY (created_by_user_id) REFERENCES users(user_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                role TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS claims (
-                claim_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id INTEGER NOT NULL,
-                claimant_user_id INTEGER NOT NULL,
-                claimant_name TEXT NOT NULL,
-                claimant_email TEXT NOT NULL,
-                claimant_phone TEXT,
-                verification_text TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'approved', 'rejected', 'picked_up')),
-                staff_notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                processed_by_staff_id INTEGER,
-                FOREIGN KEY (item_id) REFERENCES items(item_id),
-                FOREIGN KEY (claimant_user_id) REFERENCES users(user_id),
-                FOREIGN KEY (processed_by_staff_id) REFERENCES users(user_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS activity_log (
-                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                user_name TEXT,
-                user_email TEXT,
-                user_role TEXT,
-                action_type TEXT NOT NULL CHECK(action_type IN (
-                    'item_added', 'item_updated', 'item_deleted',
-                    'claim_created', 'claim_approved', 'claim_rejected', 'claim_picked_up',
-                    'user_registered', 'user_login', 'profile_updated', 'password_changed',
-                    'data_export'
-                )),
-                entity_type TEXT CHECK(entity_type IN ('item', 'claim', 'user', 'profile')),
-                entity_id INTEGER,
-                details TEXT,
-                ip_address TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                type TEXT NOT NULL DEFAULT 'info',
-                title TEXT NOT NULL,
-                message TEXT NOT NULL,
-                metadata TEXT,
-                is_read INTEGER NOT NULL DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                read_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id)
-            )
-        ''')
-        
-        # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_status ON items(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_category ON items(category)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
-    
-    conn.commit()
-    conn.close()
-    print(f"Database initialized successfully (using {DB_TYPE})")
+    return get_dialect().convert(query)
 
 
 # Export for use in app.py
-__all__ = ['get_db_connection', 'init_db', 'convert_query', 'get_placeholder', 'DB_TYPE', 'DB_PATH']
+__all__ = ['get_db_connection', 'postgres_connect_kwargs', 'convert_query', 'get_placeholder',
+           'sqlite_pragmas', 'get_dialect', 'wrap_cursor', 'table_exists', 'column_names',
+           'Query', 'NamedQuery', 'QueryStats', 'Cursor', 'Dialect', 'DatabaseError', 'IntegrityError', 'OperationalError',
+           'SQLITE', 'POSTGRESQL', 'DB_TYPE', 'DB_PATH', 'SQLITE_PROFILE', 'REPLICA_DATABASE_URL']
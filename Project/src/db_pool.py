@@ -0,0 +1,444 @@
+"""
+Database Connection Pool Module
+Reuses database connections instead of opening a new one for every call.
+
+SQLite connections are kept in a bounded pool per database file; under the
+'wal' SQLITE_PROFILE each file gets a read-only pool and a smaller writer
+pool. PostgreSQL connections come from a bounded psycopg2
+ThreadedConnectionPool, plus a replica pool when REPLICA_DATABASE_URL is
+set. Both pools block (up to a timeout) when every connection is checked
+out and report statistics (in use, idle, waiting, created).
+
+Usage:
+    from db_pool import get_pool, get_sqlite_pool, pool_stats
+
+    conn = get_pool().connection()   # handle; close() returns it to the pool
+    reader = get_sqlite_pool(path, readonly=True).connection()
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import db_config
+
+# Pool sizing (overridable per deployment)
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the pool timeout."""
+
+
+class PooledConnection:
+    """
+    Connection handle handed out to callers.
+    Behaves like the underlying DB-API connection, except that close() hands
+    the connection back to its owner instead of closing the socket/file.
+    Uncommitted work is rolled back on close(), exactly like a real close.
+    Cursors are db_config.Cursor objects, so SQLite-style queries work on
+    either backend and errors are backend-neutral. `on_commit` is called
+    after every successful commit. `pool` is the pool the connection came
+    from (None for unpooled connections).
+    """
+
+    def __init__(self, conn, release, dialect=db_config.SQLITE, on_commit=None, pool=None):
+        self._conn = conn
+        self._release = release
+        self._on_commit = on_commit
+        self.dialect = dialect
+        self.pool = pool
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def raw(self):
+        """The underlying driver connection."""
+        return self._conn
+
+    def cursor(self):
+        return db_config.wrap_cursor(self._conn.cursor(), self.dialect)
+
+    def execute(self, query, params=None):
+        return self.cursor().execute(query, params)
+
+    def begin_write(self):
+        """
+        Start a write transaction now, for a handler that reads before it writes.
+        On SQLite this is BEGIN IMMEDIATE: the write lock is taken before the
+        reads, so they see the state the write is based on and the write cannot
+        fail with "database is locked" when the transaction upgrades. sqlite3
+        only begins a transaction implicitly at the first INSERT/UPDATE/DELETE,
+        so without this the reads run outside it. No-op when a transaction is
+        already open, and on PostgreSQL (its transaction starts at the first
+        statement; conflicts are resolved by row locks and constraints).
+        """
+        if self.dialect.name == 'sqlite' and not self._conn.in_transaction:
+            self.cursor().execute('BEGIN IMMEDIATE')
+
+    def commit(self):
+        try:
+            self._conn.commit()
+        except self.dialect.driver_errors as exc:
+            raise db_config.translate_error(exc) from exc
+        if self._on_commit is not None:
+            self._on_commit()
+
+    def rollback(self):
+        try:
+            self._conn.rollback()
+        except self.dialect.driver_errors as exc:
+            raise db_config.translate_error(exc) from exc
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._release(conn)
+
+
+class ConnectionPool:
+    """
+    Bounded connection pool base class.
+    Handles the size limit, waiting and statistics; subclasses decide how
+    connections are opened, reset and stored while idle.
+    """
+
+    backend = None
+    dialect = None
+    role = 'primary'
+
+    def __init__(self, max_size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._closed = False
+
+    def acquire(self):
+        """Check out a raw connection, waiting up to `timeout` seconds for a free slot."""
+        with self._cond:
+            if self._in_use >= self.max_size:
+                deadline = time.monotonic() + self.timeout
+                self._waiting += 1
+                try:
+                    while self._in_use >= self.max_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f'No database connection available after {self.timeout}s '
+                                f'({self.max_size} in use)'
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+            self._checkouts += 1
+
+        try:
+            return self._checkout()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        """Return a raw connection to the pool. Open transactions are rolled back."""
+        try:
+            if not discard:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            self._checkin(conn, discard or self._closed)
+        finally:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+
+    def connection(self):
+        """Check out a connection wrapped in a PooledConnection handle."""
+        return PooledConnection(self.acquire(), self.release, self.dialect, pool=self)
+
+    def stats(self):
+        """Return a snapshot of pool usage."""
+        with self._cond:
+            return {
+                'backend': self.backend,
+                'role': self.role,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': self._idle_count(),
+                'waiting': self._waiting,
+                'created': self._created,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts
+            }
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when released."""
+        self._closed = True
+        self._close_idle()
+
+    # Subclass hooks
+    def _checkout(self):
+        raise NotImplementedError
+
+    def _checkin(self, conn, discard):
+        raise NotImplementedError
+
+    def _idle_count(self):
+        raise NotImplementedError
+
+    def _close_idle(self):
+        raise NotImplementedError
+
+
+class SQLitePool(ConnectionPool):
+    """
+    Pool of sqlite3 connections to a single database file.
+    Idle connections are reused most-recently-used first so the warmest page
+    cache serves the next request. If the database file is replaced (deleted
+    and recreated, restored from backup) the stale connections are dropped.
+
+    New connections get the PRAGMAs of the tuning profile (see
+    db_config.sqlite_pragmas). Under the 'wal' profile writer connections
+    use isolation_level='IMMEDIATE', so the transaction sqlite3 opens
+    implicitly at the first INSERT/UPDATE/DELETE takes the write lock at
+    once. SELECTs before that statement run outside the transaction:
+    handlers that read and then write call PooledConnection.begin_write()
+    first, which issues BEGIN IMMEDIATE before the reads.
+    """
+
+    backend = 'sqlite'
+    dialect = db_config.SQLITE
+
+    def __init__(self, db_path, max_size=POOL_SIZE, timeout=POOL_TIMEOUT, readonly=False, profile=None,
+                 role=None):
+        super().__init__(max_size=max_size, timeout=timeout)
+        self.db_path = db_path
+        self.readonly = readonly
+        self.role = role or ('read' if readonly else 'primary')
+        self.profile = profile or db_config.SQLITE_PROFILE
+        self._pragmas = db_config.sqlite_pragmas(self.profile, readonly=readonly)
+        self._idle = []
+        self._idle_lock = threading.Lock()
+        self._file_id = None
+        self._generation = 0
+        self._conn_generation = {}
+
+    def _current_file_id(self):
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _open(self):
+        timeout = db_config.SQLITE_BUSY_TIMEOUT_MS / 1000 if self.profile == 'wal' else 5.0
+        conn = sqlite3.connect(self.db_path, timeout=timeout, check_same_thread=False,
+                               cached_statements=db_config.SQLITE_STATEMENT_CACHE)
+        conn.row_factory = sqlite3.Row
+        for pragma in self._pragmas:
+            conn.execute(pragma)
+        if self.profile == 'wal' and not self.readonly:
+            conn.isolation_level = 'IMMEDIATE'
+        return conn
+
+    def _checkout(self):
+        file_id = self._current_file_id()
+        with self._idle_lock:
+            if file_id != self._file_id:
+                # Database file changed underneath us; never hand out old handles
+                self._generation += 1
+                self._file_id = file_id
+                stale, self._idle = self._idle, []
+            else:
+                stale = []
+            conn = self._idle.pop() if self._idle else None
+            generation = self._generation
+        for old in stale:
+            self._conn_generation.pop(id(old), None)
+            old.close()
+
+        if conn is None:
+            conn = self._open()
+            with self._idle_lock:
+                self._created += 1
+                if self._file_id is None:
+                    # File was created by this connect()
+                    self._file_id = self._current_file_id()
+                self._conn_generation[id(conn)] = generation
+        return conn
+
+    def _checkin(self, conn, discard):
+        with self._idle_lock:
+            stale = self._conn_generation.get(id(conn)) != self._generation
+            if not (discard or stale):
+                self._idle.append(conn)
+                return
+            self._conn_generation.pop(id(conn), None)
+        conn.close()
+
+    def _idle_count(self):
+        return len(self._idle)
+
+    def _close_idle(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                self._conn_generation.pop(id(conn), None)
+        for conn in idle:
+            conn.close()
+
+
+class PostgresPool(ConnectionPool):
+    """Bounded pool backed by psycopg2.pool.ThreadedConnectionPool."""
+
+    backend = 'postgresql'
+    dialect = db_config.POSTGRESQL
+
+    def __init__(self, connect_kwargs, max_size=POOL_SIZE, timeout=POOL_TIMEOUT, min_size=1, role='primary'):
+        super().__init__(max_size=max_size, timeout=timeout)
+        from psycopg2.pool import ThreadedConnectionPool
+
+        self.role = role
+
+        owner = self
+
+        class _CountingPool(ThreadedConnectionPool):
+            def _connect(self, key=None):
+                conn = super()._connect(key)
+                with owner._cond:
+                    owner._created += 1
+                return conn
+
+        # The outer semaphore guarantees getconn() is never called with the pool exhausted
+        self._pool = _CountingPool(min(min_size, self.max_size), self.max_size, **connect_kwargs)
+
+    def _checkout(self):
+        return self._pool.getconn()
+
+    def _checkin(self, conn, discard):
+        self._pool.putconn(conn, close=discard or conn.closed)
+
+    def _idle_count(self):
+        return len(self._pool._pool)
+
+    def _close_idle(self):
+        self._pool.closeall()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(db_path=None, readonly=False):
+    """
+    Return the shared pool for a SQLite database file (created on first use).
+    The read-only pool only exists under the 'wal' profile; otherwise readers
+    share the single pool so a request keeps using one connection.
+    """
+    path = os.path.abspath(db_path or db_config.DB_PATH)
+    wal = db_config.SQLITE_PROFILE == 'wal'
+    readonly = readonly and wal
+    key = ('sqlite', path, 'read' if readonly else 'write')
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if readonly:
+                pool = SQLitePool(path, readonly=True)
+            elif wal:
+                pool = SQLitePool(path, max_size=db_config.SQLITE_WRITER_POOL_SIZE, role='write')
+            else:
+                pool = SQLitePool(path)
+            _pools[key] = pool
+        return pool
+
+
+def get_postgres_pool(database_url=None, role='primary'):
+    """Return the shared pool for a PostgreSQL DSN (created on first use)."""
+    key = ('postgresql', database_url or db_config.DATABASE_URL)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = PostgresPool(db_config.postgres_connect_kwargs(key[1]), role=role)
+        return pool
+
+
+_replica_down_until = 0.0
+
+
+def replica_configured():
+    """True when reads can be routed to a PostgreSQL read replica."""
+    return db_config.DB_TYPE == 'postgresql' and bool(db_config.REPLICA_DATABASE_URL)
+
+
+def replica_available():
+    """True when a replica is configured and not in its failure back-off."""
+    return replica_configured() and time.monotonic() >= _replica_down_until
+
+
+def mark_replica_down(exc=None):
+    """Send reads to the primary for REPLICA_RETRY_SECONDS after a replica failure."""
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + db_config.REPLICA_RETRY_SECONDS
+    print(f"⚠️  Read replica unavailable ({exc}); reading from primary for "
+          f"{db_config.REPLICA_RETRY_SECONDS:.0f}s")
+
+
+def get_pool(db_path=None, readonly=False):
+    """
+    Return the pool for the configured backend (PostgreSQL when DATABASE_URL is set).
+    readonly=True selects the read pool: the replica (REPLICA_DATABASE_URL) on
+    PostgreSQL, the read-only pool under the SQLite 'wal' profile.
+    """
+    if db_config.DB_TYPE == 'postgresql':
+        if readonly and replica_available():
+            try:
+                return get_postgres_pool(db_config.REPLICA_DATABASE_URL, role='replica')
+            except Exception as exc:
+                mark_replica_down(exc)
+        return get_postgres_pool()
+    return get_sqlite_pool(db_path, readonly=readonly)
+
+
+def pool_stats():
+    """Return statistics for every pool created in this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def close_all_pools():
+    """Close every pool (used on shutdown and between test databases)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+__all__ = [
+    'ConnectionPool', 'SQLitePool', 'PostgresPool', 'PooledConnection', 'PoolTimeoutError',
+    'get_pool', 'get_sqlite_pool', 'get_postgres_pool', 'replica_configured', 'replica_available', 'mark_replica_down',
+    'pool_stats', 'close_all_pools'
+]
@@ -0,0 +1,106 @@
+"""
+Item Facets Module
+Per-value counts of category, location, pickup desk and status for
+/api/items?facets=...
+
+All facets come from one grouped query: matching items (search and the
+filters that are not facets) are counted per combination of the four
+values, which stays small because each field has few distinct values.
+Each facet is then summed from those rows with every other facet's filter
+applied but not its own, so the category counts show what picking another
+category would return rather than only the selected one.
+
+Usage:
+    rows = cursor.fetchall() after executing facet_query(from_clause, base_where)
+    facet_counts(rows, ['category', 'status'], {'category': 'cards', 'location': None, 'status': None})
+"""
+
+from lookups import normalize_key
+
+# Facet name -> grouped column holding its display value
+FACETS = {
+    'category': 'category',
+    'location': 'location',
+    'pickup_at': 'pickup_at',
+    'status': 'status',
+}
+
+
+def facet_query(from_clause, where_clause):
+    """Grouped count of matching items per category, location, pickup desk and status."""
+    return f'''
+        SELECT
+            categories.name AS category,
+            categories.key AS category_key,
+            locations.name AS location,
+            locations.key AS location_key,
+            items.pickup_at AS pickup_at,
+            items.status AS status,
+            COUNT(*) AS count
+        FROM {from_clause}
+        LEFT JOIN categories ON categories.category_id = items.category_id
+        LEFT JOIN locations ON locations.location_id = items.location_id
+        WHERE {where_clause}
+        GROUP BY categories.name, categories.key, locations.name, locations.key, items.pickup_at, items.status
+    '''
+
+
+def parse_facets(value):
+    """
+    Facet names from a comma-separated `facets` parameter.
+
+    Raises:
+        ValueError: If a name is not in FACETS
+    """
+    names = [name.strip().lower() for name in (value or '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise ValueError(f"Unknown facet '{unknown[0]}'. Must be one of: {', '.join(FACETS)}")
+    return list(dict.fromkeys(names))
+
+
+def _matchers(active):
+    """Row tests for the active facet filters, the same as the SQL filters in get_items."""
+    matchers = {}
+    if active.get('category'):
+        key = normalize_key(active['category'])
+        matchers['category'] = lambda row: row['category_key'] == key
+    if active.get('location'):
+        needle = normalize_key(active['location'])
+        matchers['location'] = lambda row: needle in (row['location_key'] or '')
+    if active.get('status'):
+        status = active['status']
+        matchers['status'] = lambda row: row['status'] == status
+    return matchers
+
+
+def facet_counts(rows, names, active):
+    """
+    Sum the grouped rows into facets.
+
+    Args:
+        rows: Rows of facet_query()
+        names: Facets to return
+        active: Current facet filters {'category', 'location', 'status'} (None when unset)
+
+    Returns:
+        dict: facet name -> [{"value", "count"}], most common first
+    """
+    matchers = _matchers(active)
+    facets = {}
+    for name in names:
+        others = [test for facet, test in matchers.items() if facet != name]
+        counts = {}
+        for row in rows:
+            value = row[FACETS[name]]
+            if value is None or not all(test(row) for test in others):
+                continue
+            counts[value] = counts.get(value, 0) + row['count']
+        facets[name] = [
+            {'value': value, 'count': count}
+            for value, count in sorted(counts.items(), key=lambda pair: (-pair[1], pair[0]))
+        ]
+    return facets
+
+
+__all__ = ['FACETS', 'facet_query', 'parse_facets', 'facet_counts']
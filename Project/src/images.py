@@ -0,0 +1,278 @@
+"""
+Item Images Module
+Uploaded item photos stored on local disk, content-addressed, with WebP thumbnails.
+
+An upload is stored under the SHA-256 of its bytes, so the same photo
+uploaded twice is kept once and its URL never changes meaning:
+
+    IMAGE_STORAGE_DIR/originals/ab/abcd...ef.jpg
+    IMAGE_STORAGE_DIR/thumbnails/ab/abcd...ef/320.webp
+
+Thumbnails (THUMBNAIL_SIZES, the longest side in pixels) are rendered by a
+small thread pool per process, not in the upload request. A thumbnail asked
+for before it is ready is rendered (or waited for) on demand. Since content
+never changes under a URL, originals and thumbnails are served with
+`Cache-Control: public, max-age=31536000, immutable`.
+
+Items keep pointing to their photo through image_url; thumbnail_urls()
+derives the thumbnail URLs of uploaded images from it (external URLs have
+none).
+
+Usage:
+    image = save_upload(request.files['image'].read())
+    get_thumbnail_pool().submit(image.digest, image.ext)
+    thumbnail_urls(image.url)   # {'160': '/api/images/abcd...ef/160.webp', ...}
+"""
+
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Pillow is imported by the functions decoding images, not at import time:
+# most processes importing this module only build thumbnail URLs.
+
+# Where originals and thumbnails are written
+IMAGE_STORAGE_DIR = os.getenv(
+    'IMAGE_STORAGE_DIR', os.path.join(os.path.dirname(__file__), '..', 'uploads')
+)
+# Largest upload accepted, in bytes
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', str(5 * 1024 * 1024)))
+# Largest image accepted, in pixels (guards against decompression bombs)
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', str(50_000_000)))
+# Thumbnail rendering threads per process
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '2'))
+# Seconds a thumbnail request waits for its rendering
+THUMBNAIL_WAIT_SECONDS = 10
+
+# Longest side of each thumbnail, in pixels
+THUMBNAIL_SIZES = (160, 320, 640)
+THUMBNAIL_QUALITY = 80
+
+# Accepted upload formats -> file extension of the stored original
+FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+MIMETYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp', 'gif': 'image/gif'}
+
+# Content never changes under an image URL
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+URL_PREFIX = '/api/images'
+_ORIGINAL_NAME = re.compile(r'^([0-9a-f]{64})\.(jpg|png|webp|gif)$')
+_IMAGE_URL = re.compile(r'^/api/images/([0-9a-f]{64})\.(jpg|png|webp|gif)$')
+_DIGEST = re.compile(r'^[0-9a-f]{64}$')
+
+# digest: SHA-256 of the upload; created: False when it was already stored
+StoredImage = namedtuple('StoredImage', ['digest', 'ext', 'width', 'height', 'created', 'url'])
+
+
+class ImageError(ValueError):
+    """Upload rejected: not an accepted image, or too large."""
+
+
+def original_path(digest, ext):
+    """Path of a stored original."""
+    return os.path.join(IMAGE_STORAGE_DIR, 'originals', digest[:2], f'{digest}.{ext}')
+
+
+def thumbnail_path(digest, size):
+    """Path of one thumbnail of an original."""
+    return os.path.join(IMAGE_STORAGE_DIR, 'thumbnails', digest[:2], digest, f'{size}.webp')
+
+
+def image_url(digest, ext):
+    """URL an original is served at (the image_url of items showing it)."""
+    return f'{URL_PREFIX}/{digest}.{ext}'
+
+
+def parse_original_name(name):
+    """(digest, ext) of an original's file name, or None."""
+    match = _ORIGINAL_NAME.match(name or '')
+    return match.groups() if match else None
+
+
+def is_digest(value):
+    """True when `value` is a SHA-256 hex digest (an image id)."""
+    return bool(_DIGEST.match(value or ''))
+
+
+def thumbnail_urls(url):
+    """
+    Thumbnail URLs of an uploaded image, by size.
+
+    Returns:
+        dict: {'160': url, ...}; None for external or missing image URLs
+    """
+    match = _IMAGE_URL.match(url or '')
+    if not match:
+        return None
+    digest = match.group(1)
+    return {str(size): f'{URL_PREFIX}/{digest}/{size}.webp' for size in THUMBNAIL_SIZES}
+
+
+def _write_atomically(path, write):
+    """Write a file through a temporary file in its directory, so readers never see part of it."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            write(handle)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _open(data):
+    from PIL import Image, UnidentifiedImageError
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise ImageError('File is not a valid image') from exc
+    if image.format not in FORMATS:
+        raise ImageError(f"Unsupported image format. Must be one of: {', '.join(sorted(FORMATS))}")
+    return image
+
+
+def save_upload(data):
+    """
+    Store uploaded image bytes under their SHA-256 (once, however often uploaded).
+
+    Raises:
+        ImageError: If the bytes are too large or not a JPEG, PNG, WebP or GIF image
+    """
+    if not data:
+        raise ImageError('Image file is empty')
+    if len(data) > IMAGE_MAX_BYTES:
+        raise ImageError(f'Image must be at most {IMAGE_MAX_BYTES // (1024 * 1024)} MB')
+    image = _open(data)
+    digest = hashlib.sha256(data).hexdigest()
+    ext = FORMATS[image.format]
+    path = original_path(digest, ext)
+    created = not os.path.exists(path)
+    if created:
+        _write_atomically(path, lambda handle: handle.write(data))
+    return StoredImage(digest, ext, image.width, image.height, created, image_url(digest, ext))
+
+
+def render_thumbnails(digest, ext):
+    """Render the missing thumbnails of a stored original."""
+    missing = [size for size in THUMBNAIL_SIZES if not os.path.exists(thumbnail_path(digest, size))]
+    if not missing:
+        return
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+    with Image.open(original_path(digest, ext)) as original:
+        # Phone photos are often stored sideways with an EXIF rotation
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    for size in missing:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+        _write_atomically(
+            thumbnail_path(digest, size),
+            lambda handle: thumbnail.save(handle, 'WEBP', quality=THUMBNAIL_QUALITY, method=4)
+        )
+
+
+class ThumbnailPool:
+    """Per-process thread pool rendering thumbnails, one job per original at a time."""
+
+    def __init__(self, workers=IMAGE_WORKERS):
+        self.workers = max(1, workers)
+        self._executor = None
+        self._pid = None
+        self._pending = {}     # digest -> Future
+        self._lock = threading.Lock()
+        self._rendered = 0
+        self._failed = 0
+
+    def submit(self, digest, ext):
+        """Queue the thumbnails of an original; returns the job's Future."""
+        with self._lock:
+            pid = os.getpid()
+            if self._pid != pid:
+                # Forked (e.g. gunicorn --preload): the parent's threads are not ours
+                self._executor = None
+                self._pending = {}
+                self._pid = pid
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='thumbnails')
+            future = self._pending.get(digest)
+            if future is None:
+                future = self._pending[digest] = self._executor.submit(self._render, digest, ext)
+            return future
+
+    def _render(self, digest, ext):
+        try:
+            render_thumbnails(digest, ext)
+            with self._lock:
+                self._rendered += 1
+        except Exception as exc:
+            with self._lock:
+                self._failed += 1
+            print(f"Warning: thumbnails of {digest} failed: {exc}")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(digest, None)
+
+    def thumbnail(self, digest, size, timeout=THUMBNAIL_WAIT_SECONDS):
+        """
+        Path of a thumbnail, rendering it first if needed.
+
+        Returns:
+            str: Path of the thumbnail; None when the original does not exist
+            or rendering failed or timed out
+        """
+        path = thumbnail_path(digest, size)
+        if os.path.exists(path):
+            return path
+        ext = next((ext for ext in MIMETYPES if os.path.exists(original_path(digest, ext))), None)
+        if ext is None:
+            return None
+        try:
+            self.submit(digest, ext).result(timeout)
+        except Exception:
+            return None
+        return path if os.path.exists(path) else None
+
+    def wait(self, timeout=None):
+        """Wait for every queued job (tests, shutdown)."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': len(self._pending),
+                'rendered': self._rendered,
+                'failed': self._failed,
+            }
+
+
+_thumbnail_pool = ThumbnailPool()
+
+
+def get_thumbnail_pool():
+    """Return the process-wide thumbnail pool."""
+    return _thumbnail_pool
+
+
+__all__ = [
+    'IMAGE_MAX_BYTES', 'THUMBNAIL_SIZES', 'MIMETYPES', 'IMMUTABLE_MAX_AGE', 'StoredImage', 'ImageError',
+    'original_path', 'thumbnail_path', 'image_url', 'parse_original_name', 'is_digest', 'thumbnail_urls',
+    'save_upload', 'render_thumbnails', 'ThumbnailPool', 'get_thumbnail_pool',
+]
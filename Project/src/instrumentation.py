@@ -0,0 +1,190 @@
+"""
+SQL Instrumentation Module
+Per-request query accounting and a slow-query log.
+
+Every statement executed through db_config.Cursor is reported here:
+- While a request is being recorded (begin_request/end_request, wired up in
+  app.py) the request's query count, total database time and rows fetched
+  are accumulated; in debug mode they are sent back as X-DB-* headers.
+- Statements slower than SLOW_QUERY_MS are kept in a bounded in-memory log
+  together with their query plan: EXPLAIN QUERY PLAN on SQLite, EXPLAIN
+  ANALYZE on PostgreSQL (plain EXPLAIN for writes, so they are not applied
+  twice). Parameters are not stored, since they can contain emails and
+  hashes, though PostgreSQL plans show literal values in filter lines;
+  the log is only served to staff.
+
+Usage:
+    token = begin_request('/api/items')
+    ...                                  # queries run
+    stats = end_request(token)           # {'queries': 6, 'db_ms': 4.2, 'rows': 21}
+"""
+
+import os
+import threading
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+
+# Statements at or above this duration go to the slow-query log
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '100'))
+# EXPLAIN ANALYZE re-runs the SELECT on PostgreSQL to get real timings
+SLOW_QUERY_ANALYZE = os.getenv('SLOW_QUERY_ANALYZE', 'true').lower() == 'true'
+
+_current = ContextVar('sql_request_stats', default=None)
+_slow_log = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_slow_lock = threading.Lock()
+
+
+class RequestStats:
+    """SQL work done while handling one request."""
+
+    __slots__ = ('path', 'queries', 'seconds', 'rows')
+
+    def __init__(self, path=None):
+        self.path = path
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.seconds * 1000, 3),
+            'rows': self.rows
+        }
+
+
+def begin_request(path=None):
+    """Start recording SQL for the current request; returns a token for end_request()."""
+    return _current.set(RequestStats(path))
+
+
+def end_request(token):
+    """Stop recording and return the request's totals as a dict."""
+    stats = _current.get()
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Token from another context (e.g. teardown after a streamed response)
+        _current.set(None)
+    return stats.as_dict() if stats else None
+
+
+def current_request_stats():
+    """RequestStats for the request being recorded, or None."""
+    return _current.get()
+
+
+def record_rows(count):
+    """Count rows fetched by the current request."""
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += count
+
+
+def record_statement(cursor, sql, params, seconds, name=None, explain_sql=None, failed=False):
+    """
+    Account for one executed statement.
+
+    Args:
+        cursor: db_config.Cursor that ran it (used to capture the plan)
+        sql: Statement text for the log (SQLite-style source)
+        params: Parameters it ran with (used for EXPLAIN only, never stored)
+        seconds: Execution time
+        name: Named query name, if any
+        explain_sql: Driver-ready text to EXPLAIN (defaults to `sql`)
+        failed: The statement raised; it is counted but never explained
+    """
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += seconds
+
+    if failed or seconds * 1000 < SLOW_QUERY_MS:
+        return
+    entry = {
+        'name': name,
+        'sql': ' '.join(sql.split()),
+        'duration_ms': round(seconds * 1000, 3),
+        'path': stats.path if stats is not None else None,
+        'backend': cursor.dialect.name,
+        'logged_at': datetime.now().isoformat(timespec='seconds'),
+        'plan': capture_plan(cursor, explain_sql or sql, params, read=_is_read(sql))
+    }
+    print(f"🐢 Slow query ({entry['duration_ms']} ms){' ' + name if name else ''}: {entry['sql'][:200]}")
+    with _slow_lock:
+        _slow_log.append(entry)
+
+
+def _is_read(sql):
+    words = sql.split(None, 1)
+    return bool(words) and words[0].upper() in ('SELECT', 'WITH')
+
+
+def capture_plan(cursor, sql, params, read=None):
+    """
+    Return the query plan of `sql` as a list of lines.
+
+    Args:
+        cursor: db_config.Cursor whose connection ran the statement
+        sql: Driver-ready statement text
+        params: Parameters for the statement
+        read: Whether the statement only reads (defaults to inspecting `sql`);
+              only reads get EXPLAIN ANALYZE, which executes the statement
+
+    Runs on a separate driver cursor so the caller's pending results are
+    untouched; on PostgreSQL inside a savepoint so a failing EXPLAIN does not
+    abort the caller's transaction.
+    """
+    dialect = cursor.dialect
+    if read is None:
+        read = _is_read(sql)
+    if dialect.name == 'postgresql':
+        explain = f"EXPLAIN {'ANALYZE ' if SLOW_QUERY_ANALYZE and read else ''}{sql}"
+    else:
+        explain = f'EXPLAIN QUERY PLAN {sql}'
+
+    raw = cursor.connection.cursor()  # driver cursor, bypasses instrumentation
+    savepoint = dialect.name == 'postgresql'
+    try:
+        if savepoint:
+            raw.execute('SAVEPOINT capture_plan')
+        if params is None:
+            raw.execute(explain)
+        else:
+            raw.execute(explain, params)
+        rows = raw.fetchall()
+        if savepoint:
+            raw.execute('RELEASE SAVEPOINT capture_plan')
+    except Exception as exc:
+        if savepoint:
+            try:
+                raw.execute('ROLLBACK TO SAVEPOINT capture_plan')
+            except Exception:
+                pass
+        return [f'(plan unavailable: {exc})']
+    finally:
+        raw.close()
+
+    if dialect.name == 'postgresql':
+        return [row['QUERY PLAN'] if isinstance(row, dict) else row[0] for row in rows]
+    # SQLite rows: (id, parent, notused, detail)
+    return [row[3] for row in rows]
+
+
+def slow_queries():
+    """Slow-query log entries, most recent first."""
+    with _slow_lock:
+        return list(reversed(_slow_log))
+
+
+def clear_slow_queries():
+    with _slow_lock:
+        _slow_log.clear()
+
+
+__all__ = [
+    'SLOW_QUERY_MS', 'RequestStats', 'begin_request', 'end_request', 'current_request_stats',
+    'record_rows', 'record_statement', 'capture_plan', 'slow_queries', 'clear_slow_queries'
+]
@@ -0,0 +1,101 @@
+"""
+Item Fields Module
+Field projection for /api/items?fields=...&compact=true
+
+Each response field of the listing names the columns it is built from, so
+a request for a few fields selects only those columns, and joins the claim
+summary only when a claim field is asked for. The keyset columns (item_id,
+date_found, created_at) are always selected because next_cursor is built
+from them, but they are only returned when requested.
+
+Usage:
+    fields = parse_fields('item_id,name,status')
+    select, claims = select_list(fields)
+    items = [item_values(row, fields) for row in rows]
+"""
+
+from images import thumbnail_urls
+
+# Response field -> (columns selected for it, needs the claim summary join)
+ITEM_FIELDS = {
+    'item_id': (('items.item_id',), False),
+    # Falls back to description, then category, for items saved without a name
+    'name': (('name', 'description', 'category'), False),
+    'description': (('description',), False),
+    'category': (('category',), False),
+    'location_found': (('location_found',), False),
+    'pickup_at': (('pickup_at',), False),
+    'date_found': (('date_found',), False),
+    'status': (('status',), False),
+    'image_url': (('image_url',), False),
+    # WebP thumbnail URLs by size for uploaded images (images.py), else null
+    'thumbnails': (('image_url',), False),
+    'found_by_desk': (('found_by_desk',), False),
+    'created_at': (('created_at',), False),
+    'latest_claim_status': (('claim_summary.latest_claim_status',), True),
+    'latest_claim_id': (('claim_summary.latest_claim_id',), True),
+    'latest_claimant_name': (('claim_summary.latest_claimant_name',), True),
+    'pending_claims': (('COALESCE(claim_summary.pending_claims, 0) AS pending_claims',), True),
+    'approved_claims': (('COALESCE(claim_summary.approved_claims, 0) AS approved_claims',), True),
+    'picked_up_claims': (('COALESCE(claim_summary.picked_up_claims, 0) AS picked_up_claims',), True),
+    'is_picked_up': (('COALESCE(claim_summary.picked_up_claims, 0) AS picked_up_claims',), True),
+}
+
+# Columns next_cursor is built from (see encode_item_cursor in app.py)
+KEY_COLUMNS = ('items.item_id', 'date_found', 'created_at')
+
+
+def parse_fields(value):
+    """
+    Requested fields from a comma-separated `fields` parameter, in ITEM_FIELDS order.
+
+    Returns:
+        list: Field names; every field when `value` is empty
+
+    Raises:
+        ValueError: If a name is not in ITEM_FIELDS
+    """
+    names = {name.strip().lower() for name in (value or '').split(',') if name.strip()}
+    unknown = sorted(names - set(ITEM_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown field '{unknown[0]}'. Must be among: {', '.join(ITEM_FIELDS)}")
+    return [name for name in ITEM_FIELDS if not names or name in names]
+
+
+def select_list(fields):
+    """
+    SELECT list for `fields` plus the keyset columns.
+
+    Returns:
+        tuple: (comma-separated columns, whether the claim summary must be joined)
+    """
+    columns = list(KEY_COLUMNS)
+    summary = False
+    for field in fields:
+        field_columns, needs_summary = ITEM_FIELDS[field]
+        summary = summary or needs_summary
+        columns.extend(column for column in field_columns if column not in columns)
+    return ', '.join(columns), summary
+
+
+def _value(row, field):
+    if field == 'name':
+        return row['name'] or row['description'] or row['category']
+    if field == 'thumbnails':
+        return thumbnail_urls(row['image_url'])
+    if field == 'is_picked_up':
+        return (row['picked_up_claims'] or 0) > 0
+    return row[field]
+
+
+def item_values(row, fields):
+    """Response dict of a listing row with only `fields`."""
+    return {field: _value(row, field) for field in fields}
+
+
+def item_row(row, fields):
+    """Values of `fields` for a listing row, in order (compact mode)."""
+    return [_value(row, field) for field in fields]
+
+
+__all__ = ['ITEM_FIELDS', 'parse_fields', 'select_list', 'item_values', 'item_row']
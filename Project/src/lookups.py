@@ -0,0 +1,140 @@
+"""
+Item Lookups Module
+Dictionary-encoded category, location and desk for items.
+
+Each low-cardinality text field of an item has a lookup table of its
+distinct values (categories, locations, desks), keyed by the normalized
+value (trimmed, lower-cased), and items carry the integer id next to the
+display text. Ids are assigned at write time by triggers on items
+(migration 8), so create_item, update_item, seed data and imports all
+stay in step without extra code.
+
+Filters match the small lookup table first and then use the integer index
+on items, so case-insensitive equality and even substring matches on
+location cost one index lookup instead of LOWER() over every item.
+
+Trade-off: the text columns stay, because every item response and the
+search indexes read them, so each row carries three integers more. On
+PostgreSQL a BEFORE trigger sets the ids in the written row itself. SQLite
+triggers cannot change NEW, so there an AFTER trigger updates the row
+again. Each insert is then two writes, and the row generation triggers
+fire for both, so items.rows moves by 2. That is harmless, because
+generations are only compared for equality. An update runs the second
+write only when a normalized key actually changed (migration 13).
+
+Usage:
+    where_clauses.append(CATEGORY_FILTER); params.append(normalize_key('Cards'))
+    where_clauses.append(LOCATION_FILTER); params.append(f"%{normalize_key('library')}%")
+"""
+
+from db_config import column_names
+
+# items column -> (lookup table, id column on items and in the lookup table)
+LOOKUPS = {
+    'category': ('categories', 'category_id'),
+    'location_found': ('locations', 'location_id'),
+    'found_by_desk': ('desks', 'desk_id'),
+}
+
+# Exact, case-insensitive match on the normalized key
+CATEGORY_FILTER = 'category_id = (SELECT category_id FROM categories WHERE key = ?)'
+DESK_FILTER = 'desk_id = (SELECT desk_id FROM desks WHERE key = ?)'
+# Substring match, evaluated on the distinct locations only
+LOCATION_FILTER = 'location_id IN (SELECT location_id FROM locations WHERE key LIKE ?)'
+
+
+def normalize_key(value):
+    """Lookup key for a display value, the same as the triggers' LOWER(TRIM(...))."""
+    return (value or '').strip().lower()
+
+
+def _key(expression):
+    return f'LOWER(TRIM({expression}))'
+
+
+def create_lookups(cursor):
+    """Create the lookup tables, id columns, indexes and triggers, and fill them."""
+    pk = cursor.dialect.primary_key
+    for column, (table, id_column) in LOOKUPS.items():
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {id_column} {pk},
+                key TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL
+            )
+        ''')
+        if id_column not in column_names(cursor, 'items'):
+            cursor.execute(f'ALTER TABLE items ADD COLUMN {id_column} INTEGER REFERENCES {table}({id_column})')
+        cursor.execute(f'''
+            INSERT INTO {table} (key, name)
+            SELECT {_key(column)}, MIN(TRIM({column})) FROM items
+            WHERE {_key(column)} NOT IN (SELECT key FROM {table})
+            GROUP BY {_key(column)}
+        ''')
+        cursor.execute(f'''
+            UPDATE items SET {id_column} = (SELECT {id_column} FROM {table} WHERE key = {_key(f'items.{column}')})
+        ''')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_items_{id_column} ON items({id_column})')
+
+    # Text indexes the filters never used (LOWER() around the column)
+    for index in ('idx_items_category', 'idx_items_location_found', 'idx_items_category_status'):
+        cursor.execute(f'DROP INDEX IF EXISTS {index}')
+
+    create_lookup_triggers(cursor)
+
+
+def create_lookup_triggers(cursor):
+    """(Re)create the triggers on items that assign the lookup ids."""
+    columns = ', '.join(LOOKUPS)
+    if cursor.dialect.name == 'postgresql':
+        statements = []
+        for column, (table, id_column) in LOOKUPS.items():
+            statements.append(
+                f'INSERT INTO {table} (key, name) VALUES ({_key(f"NEW.{column}")}, TRIM(NEW.{column})) '
+                f'ON CONFLICT (key) DO NOTHING'
+            )
+            statements.append(
+                f'SELECT {id_column} INTO NEW.{id_column} FROM {table} WHERE key = {_key(f"NEW.{column}")}'
+            )
+        body = ';\n                '.join(statements)
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION items_assign_lookups() RETURNS trigger AS $$
+            BEGIN
+                {body};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute('DROP TRIGGER IF EXISTS items_lookups ON items')
+        cursor.execute(f'''
+            CREATE TRIGGER items_lookups
+            BEFORE INSERT OR UPDATE OF {columns} ON items
+            FOR EACH ROW EXECUTE FUNCTION items_assign_lookups()
+        ''')
+        return
+
+    # SQLite triggers cannot change NEW, so the row is updated after the write
+    inserts = ';\n'.join(
+        f'INSERT OR IGNORE INTO {table} (key, name) VALUES ({_key(f"new.{column}")}, TRIM(new.{column}))'
+        for column, (table, _id_column) in LOOKUPS.items()
+    )
+    assignments = ', '.join(
+        f'{id_column} = (SELECT {id_column} FROM {table} WHERE key = {_key(f"new.{column}")})'
+        for column, (table, id_column) in LOOKUPS.items()
+    )
+    # Updates that leave every key as it was (e.g. a re-saved form) skip the second write
+    changed = ' OR '.join(f'{_key(f"old.{column}")} IS NOT {_key(f"new.{column}")}' for column in LOOKUPS)
+    for event, name, when in (('INSERT', 'insert', ''), (f'UPDATE OF {columns}', 'update', f'WHEN {changed}')):
+        cursor.execute(f'DROP TRIGGER IF EXISTS items_lookups_{name}')
+        cursor.execute(f'''
+            CREATE TRIGGER items_lookups_{name} AFTER {event} ON items {when} BEGIN
+                {inserts};
+                UPDATE items SET {assignments} WHERE item_id = new.item_id;
+            END
+        ''')
+
+
+__all__ = [
+    'LOOKUPS', 'CATEGORY_FILTER', 'DESK_FILTER', 'LOCATION_FILTER', 'normalize_key', 'create_lookups',
+    'create_lookup_triggers'
+]
@@ -0,0 +1,293 @@
+"""
+Item Matching Module
+Description similarity for /api/items/match ("is my lost item here?").
+
+Every unclaimed item is a document made of its name, description, category
+and location. Documents are weighted with TF-IDF (sublinear term frequency,
+smoothed inverse document frequency) and ranked by cosine similarity to the
+student's description of what they lost. Words no item uses, and a few
+filler words ("my", "with", "lost"), carry no weight.
+
+The weights live in NumPy arrays, a sparse item x term matrix stored by
+term: a main segment sorted by term, plus a tail of the entries added since
+it was last compacted. Scoring reads only the columns of the description's
+words and sums them per item with np.bincount, so it costs as much as the
+number of items sharing those words, not the size of the vocabulary.
+
+One index is kept per connection pool (so per worker process). The item
+routes apply their own writes to it (note_item), so they show at once.
+Writes by other workers or direct SQL move the `items.rows` generation; it
+is checked at most every MATCH_REFRESH_SECONDS, and the index is rebuilt
+when it has moved. The routes' own writes move it too (taking a lock on the
+counter in every item write would serialize them), so a check after them
+costs one extra rebuild.
+
+Usage:
+    index = match_index(pool)
+    index.match('black leather wallet with my watcard', limit=10)   # [(12, 0.61), (9, 0.18)]
+"""
+
+import math
+import os
+import threading
+from collections import Counter
+
+from count_cache import PoolIndexCache
+from trigram import words
+
+# Seconds between checks for writes made outside this process
+MATCH_REFRESH_SECONDS = float(os.getenv('MATCH_REFRESH_SECONDS', '30'))
+# Most matches a request can ask for
+MATCH_MAX_LIMIT = 50
+# Longest description accepted, in characters
+MATCH_MAX_TEXT = 5000
+
+# items columns an item's document is made of
+MATCH_COLUMNS = ('name', 'description', 'category', 'location_found')
+
+# Words too common in descriptions of lost things to tell items apart
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'at', 'be', 'by', 'for', 'from', 'had', 'has', 'have', 'i', 'in', 'is',
+    'it', 'its', 'lost', 'me', 'my', 'of', 'on', 'or', 'that', 'the', 'there', 'think', 'this', 'to',
+    'was', 'which', 'with',
+))
+
+# The tail is merged into the main segment once it holds this many entries,
+# or this share of the main segment's, whichever is larger
+# NumPy is imported by the first TfidfIndex, not when app.py imports this module
+np = None
+
+COMPACT_MIN_ENTRIES = 4096
+COMPACT_RATIO = 0.1
+
+
+def term_counts(*texts):
+    """Counter of the indexed words of `texts`."""
+    return Counter(word for text in texts for word in words(text) if word not in STOP_WORDS)
+
+
+class TfidfIndex:
+    """Unclaimed items' TF-IDF vectors as a sparse NumPy matrix stored by term."""
+
+    def __init__(self):
+        global np
+        if np is None:
+            import numpy
+            np = numpy
+        self._columns = {}       # term -> column
+        self._df = np.zeros(1024, dtype=np.int64)   # column -> live items using the term
+        self._rows = {}          # item_id -> row
+        self._item_ids = np.zeros(1024, dtype=np.int64)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._row_columns = []   # row -> columns of the row's terms
+        # Main segment: entries sorted by column, column c at [indptr[c], indptr[c + 1])
+        self._main_rows = np.zeros(0, dtype=np.int32)
+        self._main_cols = np.zeros(0, dtype=np.int32)
+        self._main_tf = np.zeros(0, dtype=np.float32)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        # Tail: entries added since the last compaction
+        self._tail_rows, self._tail_cols, self._tail_tf = [], [], []
+        self._dead = 0
+        self._weights = None     # (idf, row norms) until the next write
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def _grow(array, size):
+        if size <= len(array):
+            return array
+        grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _column(self, term):
+        column = self._columns.get(term)
+        if column is None:
+            column = self._columns[term] = len(self._columns)
+            self._df = self._grow(self._df, column + 1)
+        return column
+
+    def _add(self, item_id, counts):
+        row = len(self._row_columns)
+        self._item_ids = self._grow(self._item_ids, row + 1)
+        self._alive = self._grow(self._alive, row + 1)
+        self._item_ids[row] = item_id
+        self._alive[row] = True
+        self._rows[item_id] = row
+        columns = []
+        for term, count in counts.items():
+            column = self._column(term)
+            columns.append(column)
+            self._df[column] += 1
+            self._tail_rows.append(row)
+            self._tail_cols.append(column)
+            self._tail_tf.append(1.0 + math.log(count))
+        self._row_columns.append(columns)
+
+    def _remove(self, item_id):
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._df[self._row_columns[row]] -= 1
+        self._row_columns[row] = []
+        self._dead += 1
+
+    def note_item(self, item_id, status, *texts):
+        """
+        Index an item's current texts, replacing what was indexed before.
+
+        Args:
+            item_id: Item id
+            status: Item status; only unclaimed items are indexed
+            *texts: The item's MATCH_COLUMNS values
+        """
+        counts = term_counts(*texts) if status == 'unclaimed' else None
+        with self._lock:
+            self._remove(item_id)
+            if counts:
+                self._add(item_id, counts)
+            self._weights = None
+
+    def load(self, items):
+        """
+        Index many items at once (used to build a new index).
+
+        Args:
+            items: Iterable of (item_id, status, texts) as for note_item()
+        """
+        with self._lock:
+            for item_id, status, texts in items:
+                counts = term_counts(*texts) if status == 'unclaimed' else None
+                if counts:
+                    self._add(item_id, counts)
+            self._compact()
+
+    def _compact(self):
+        """Merge the tail into the main segment, dropping dead rows and renumbering the rest."""
+        row_count = len(self._row_columns)
+        live = np.flatnonzero(self._alive[:row_count])
+        renumber = np.full(row_count, -1, dtype=np.int64)
+        renumber[live] = np.arange(len(live))
+
+        rows = renumber[np.concatenate([self._main_rows, np.asarray(self._tail_rows, dtype=np.int32)])]
+        cols = np.concatenate([self._main_cols, np.asarray(self._tail_cols, dtype=np.int32)])
+        tf = np.concatenate([self._main_tf, np.asarray(self._tail_tf, dtype=np.float32)])
+        keep = rows >= 0
+        order = np.argsort(cols[keep], kind='stable')
+        self._main_rows = rows[keep][order].astype(np.int32)
+        self._main_cols = cols[keep][order]
+        self._main_tf = tf[keep][order]
+        self._indptr = np.zeros(len(self._columns) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._main_cols, minlength=len(self._columns)), out=self._indptr[1:])
+        self._tail_rows, self._tail_cols, self._tail_tf = [], [], []
+
+        self._item_ids = self._item_ids[live]
+        self._alive = np.ones(len(live), dtype=bool)
+        self._row_columns = [self._row_columns[row] for row in live]
+        self._rows = {int(item_id): row for row, item_id in enumerate(self._item_ids)}
+        self._dead = 0
+        self._weights = None
+
+    def _prepare(self):
+        """(idf per column, vector norm per row), recomputed after writes."""
+        tail_size = len(self._tail_cols)
+        if tail_size > max(COMPACT_MIN_ENTRIES, COMPACT_RATIO * len(self._main_cols)) \
+                or self._dead > max(COMPACT_MIN_ENTRIES, COMPACT_RATIO * len(self._rows)):
+            self._compact()
+        if self._weights is None:
+            df = self._df[:len(self._columns)]
+            idf = np.log((1.0 + len(self._rows)) / (1.0 + df)) + 1.0
+            rows = np.concatenate([self._main_rows, np.asarray(self._tail_rows, dtype=np.int32)])
+            cols = np.concatenate([self._main_cols, np.asarray(self._tail_cols, dtype=np.int32)])
+            tf = np.concatenate([self._main_tf, np.asarray(self._tail_tf, dtype=np.float32)])
+            weights = tf * idf[cols]
+            norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(self._row_columns)))
+            self._weights = (idf, norms)
+        return self._weights
+
+    def match(self, text, limit=10):
+        """
+        Unclaimed items most similar to `text`.
+
+        Returns:
+            list: (item_id, cosine similarity) pairs, best first, similarity > 0
+        """
+        counts = term_counts(text)
+        with self._lock:
+            query = {self._columns[term]: count for term, count in counts.items() if term in self._columns}
+            if not query or not self._rows:
+                return []
+            idf, norms = self._prepare()
+            columns = np.fromiter(query, dtype=np.int64, count=len(query))
+            query_weights = (1.0 + np.log(np.fromiter(query.values(), dtype=np.float64, count=len(query)))) \
+                * idf[columns]
+
+            # Per entry: document weight x query weight, summed per row
+            hit_rows, hit_weights = [], []
+            for column, weight in zip(columns, query_weights * idf[columns]):
+                if column + 1 < len(self._indptr):
+                    start, end = self._indptr[column], self._indptr[column + 1]
+                    hit_rows.append(self._main_rows[start:end])
+                    hit_weights.append(self._main_tf[start:end] * weight)
+            if self._tail_cols:
+                lookup = np.zeros(len(self._columns))
+                lookup[columns] = query_weights * idf[columns]
+                tail_cols = np.asarray(self._tail_cols, dtype=np.int64)
+                hits = np.flatnonzero(lookup[tail_cols])
+                hit_rows.append(np.asarray(self._tail_rows, dtype=np.int64)[hits])
+                hit_weights.append(np.asarray(self._tail_tf)[hits] * lookup[tail_cols[hits]])
+
+            row_count = len(self._row_columns)
+            scores = np.bincount(np.concatenate(hit_rows), weights=np.concatenate(hit_weights),
+                                 minlength=row_count)
+            scores[~self._alive[:row_count]] = 0.0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            similarity = scores[candidates] / (norms[candidates] * np.linalg.norm(query_weights))
+            item_ids = self._item_ids[candidates]
+            # Best first; newer items (higher ids) first among equals
+            order = np.lexsort((-item_ids, -similarity))
+            return [(int(item_ids[i]), round(float(similarity[i]), 4)) for i in order]
+
+
+def build_match_index(cursor):
+    """Build a TfidfIndex over every unclaimed item."""
+    index = TfidfIndex()
+    cursor.execute(f"SELECT item_id, status, {', '.join(MATCH_COLUMNS)} FROM items WHERE status = 'unclaimed'")
+    index.load(
+        (row['item_id'], row['status'], [row[column] for column in MATCH_COLUMNS])
+        for row in cursor.fetchall()
+    )
+    return index
+
+
+# One index per pool (see count_cache.PoolIndexCache)
+match_indexes = PoolIndexCache(build_match_index, MATCH_REFRESH_SECONDS)
+
+
+def match_index(pool):
+    """The TfidfIndex of `pool`, built on first use and checked every MATCH_REFRESH_SECONDS."""
+    return match_indexes.get(pool)
+
+
+def note_item(pool, item_id, row):
+    """
+    Apply an item write made by this process to the pool's index (if built).
+
+    Args:
+        pool: Pool the write was committed on
+        item_id: Item id
+        row: Mapping with the item's status and MATCH_COLUMNS
+    """
+    index = match_indexes.peek(pool)
+    if index is not None:
+        index.note_item(item_id, row.get('status'), *(row.get(column) for column in MATCH_COLUMNS))
+
+
+__all__ = [
+    'MATCH_MAX_LIMIT', 'MATCH_MAX_TEXT', 'TfidfIndex', 'build_match_index', 'match_indexes', 'match_index', 'note_item'
+]
@@ -0,0 +1,469 @@
+"""
+Schema Migrations Module
+Versioned, ordered schema migrations tracked in a `schema_version` table.
+
+Migrations run once per deploy from the command line, not on app import:
+
+    cd Project/src
+    python migrations.py upgrade      # apply pending migrations
+    python migrations.py status       # show current and latest version
+
+App startup only calls check_schema(), a single SELECT on schema_version.
+
+Adding a migration: append a function decorated with @migration(<next version>, '<name>').
+It receives a db_config.Cursor and runs inside the upgrade transaction.
+"""
+
+import argparse
+import sys
+
+from db_config import get_db_connection, column_names, OperationalError
+from search import create_search_index, create_fuzzy_support
+from claim_summary import create_claim_summary
+from count_cache import create_row_generations, create_generation_bump, shard_generations
+from lookups import create_lookups, create_lookup_triggers
+from saved_searches import create_saved_searches
+
+
+class Migration:
+    """One schema change: a version number, a name and an upgrade function."""
+
+    def __init__(self, version, name, upgrade):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+
+    def __repr__(self):
+        return f'Migration({self.version}, {self.name!r})'
+
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Register an upgrade function as migration `version`. Versions must be added in order."""
+    def decorator(fn):
+        if MIGRATIONS and version != MIGRATIONS[-1].version + 1:
+            raise ValueError(f'Migration {version} must follow {MIGRATIONS[-1].version}')
+        MIGRATIONS.append(Migration(version, name, fn))
+        return fn
+    return decorator
+
+
+# ============================================================================
+# Baseline schema (version 1)
+# ============================================================================
+
+SCHEMA = [
+    # Users table - stores all user accounts (students and staff only)
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        user_id {pk},
+        email TEXT UNIQUE NOT NULL,
+        name TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('student', 'staff')),
+        watcard_number TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login TIMESTAMP
+    )
+    ''',
+    # Items table - stores lost-and-found items
+    '''
+    CREATE TABLE IF NOT EXISTS items (
+        item_id {pk},
+        name TEXT,
+        description TEXT,
+        category TEXT NOT NULL,
+        location_found TEXT NOT NULL,
+        pickup_at TEXT NOT NULL CHECK(pickup_at IN ('SLC', 'PAC', 'CIF')),
+        date_found TIMESTAMP NOT NULL,
+        status TEXT NOT NULL DEFAULT 'unclaimed' CHECK(status IN ('unclaimed', 'claimed', 'deleted')),
+        image_url TEXT,
+        found_by_desk TEXT NOT NULL,
+        created_by_user_id INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        claimed_at TIMESTAMP,
+        FOREIGN KEY (created_by_user_id) REFERENCES users(user_id)
+    )
+    ''',
+    # Sessions table - tracks active sessions
+    '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        expires_at TIMESTAMP NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+    ''',
+    # Claims table - tracks item claims by students (Sprint 3: Item Claiming System)
+    '''
+    CREATE TABLE IF NOT EXISTS claims (
+        claim_id {pk},
+        item_id INTEGER NOT NULL,
+        claimant_user_id INTEGER NOT NULL,
+        claimant_name TEXT NOT NULL,
+        claimant_email TEXT NOT NULL,
+        claimant_phone TEXT,
+        verification_text TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'approved', 'rejected', 'picked_up')),
+        staff_notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed_by_staff_id INTEGER,
+        FOREIGN KEY (item_id) REFERENCES items(item_id),
+        FOREIGN KEY (claimant_user_id) REFERENCES users(user_id),
+        FOREIGN KEY (processed_by_staff_id) REFERENCES users(user_id)
+    )
+    ''',
+    # Activity Log table - audit trail for staff (Sprint 4: Issue #44)
+    '''
+    CREATE TABLE IF NOT EXISTS activity_log (
+        log_id {pk},
+        user_id INTEGER,
+        user_name TEXT,
+        user_email TEXT,
+        user_role TEXT,
+        action_type TEXT NOT NULL CHECK(action_type IN (
+            'item_added', 'item_updated', 'item_deleted',
+            'claim_created', 'claim_approved', 'claim_rejected', 'claim_picked_up',
+            'user_registered', 'user_login', 'profile_updated', 'password_changed',
+            'data_export'
+        )),
+        entity_type TEXT CHECK(entity_type IN ('item', 'claim', 'user', 'profile')),
+        entity_id INTEGER,
+        details TEXT,
+        ip_address TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+    ''',
+    # Notifications table - stores in-app notifications for users
+    '''
+    CREATE TABLE IF NOT EXISTS notifications (
+        notification_id {pk},
+        user_id INTEGER NOT NULL,
+        type TEXT NOT NULL DEFAULT 'info',
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        metadata TEXT,
+        is_read INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        read_at TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+    ''',
+]
+
+# Columns added after the first release: (table, column, definition, backfill)
+ADDED_COLUMNS = [
+    ('items', 'updated_at', 'updated_at TIMESTAMP',
+     "UPDATE items SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"),
+    ('items', 'claimed_at', 'claimed_at TIMESTAMP', None),
+    # Sprint 4 enhancement
+    ('items', 'name', 'name TEXT',
+     "UPDATE items SET name = COALESCE(description, category) WHERE name IS NULL OR name = ''"),
+]
+
+# Indexes for improved query performance (Sprint 3: Item Searching & Filtering)
+INDEXES = [
+    # Items table indexes
+    'CREATE INDEX IF NOT EXISTS idx_items_status ON items(status)',
+    'CREATE INDEX IF NOT EXISTS idx_items_category ON items(category)',
+    'CREATE INDEX IF NOT EXISTS idx_items_location_found ON items(location_found)',
+    'CREATE INDEX IF NOT EXISTS idx_items_date_found ON items(date_found DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_items_created_at ON items(created_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_items_pickup_at ON items(pickup_at)',
+    # Composite indexes for common query patterns
+    'CREATE INDEX IF NOT EXISTS idx_items_status_date ON items(status, date_found DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_items_category_status ON items(category, status)',
+    # Claims table indexes
+    'CREATE INDEX IF NOT EXISTS idx_claims_item_id ON claims(item_id)',
+    'CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status)',
+    'CREATE INDEX IF NOT EXISTS idx_claims_claimant_user_id ON claims(claimant_user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_claims_created_at ON claims(created_at DESC)',
+    # Users table indexes
+    'CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)',
+    'CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)',
+    # Activity Log table indexes (Sprint 4: Issue #44)
+    'CREATE INDEX IF NOT EXISTS idx_activity_user_id ON activity_log(user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_activity_action_type ON activity_log(action_type)',
+    'CREATE INDEX IF NOT EXISTS idx_activity_created_at ON activity_log(created_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_activity_entity ON activity_log(entity_type, entity_id)',
+    # Notifications
+    'CREATE INDEX IF NOT EXISTS idx_notifications_user_read ON notifications(user_id, is_read)',
+]
+
+
+@migration(1, 'baseline schema')
+def _baseline(cursor):
+    """
+    Tables and indexes as of Sprint 4. Uses IF NOT EXISTS and adds missing
+    columns so databases created before schema_version existed are adopted
+    in place.
+    """
+    for statement in SCHEMA:
+        cursor.execute(statement.format(pk=cursor.dialect.primary_key))
+
+    for table_name, column_name, definition, backfill in ADDED_COLUMNS:
+        if column_name not in column_names(cursor, table_name):
+            cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN {definition}')
+            if backfill:
+                cursor.execute(backfill)
+
+    for statement in INDEXES:
+        cursor.execute(statement)
+
+
+@migration(2, 'one active claim per user and item')
+def _unique_active_claim(cursor):
+    """
+    Partial unique index: a user can have at most one pending/approved claim
+    per item. Existing duplicates are closed first, keeping the approved claim
+    (or else the oldest) and rejecting the rest with a staff note.
+    """
+    note = 'Closed automatically: duplicate of an earlier claim for this item.'
+    cursor.execute('''
+        UPDATE claims
+        SET status = 'rejected',
+            staff_notes = CASE
+                WHEN staff_notes IS NULL OR TRIM(staff_notes) = '' THEN ?
+                ELSE staff_notes || '\n' || ?
+            END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE status IN ('pending', 'approved')
+          AND EXISTS (
+            SELECT 1 FROM claims AS other
+            WHERE other.item_id = claims.item_id
+              AND other.claimant_user_id = claims.claimant_user_id
+              AND other.claim_id != claims.claim_id
+              AND other.status IN ('pending', 'approved')
+              AND (
+                (other.status = 'approved' AND claims.status = 'pending')
+                OR (other.status = claims.status AND other.claim_id < claims.claim_id)
+              )
+          )
+    ''', (note, note))
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_claims_active_claimant
+        ON claims(item_id, claimant_user_id)
+        WHERE status IN ('pending', 'approved')
+    ''')
+
+
+@migration(3, 'full-text search on items')
+def _item_search(cursor):
+    """FTS5 table and sync triggers on SQLite, GIN tsvector index on PostgreSQL (see search.py)."""
+    create_search_index(cursor)
+
+
+@migration(4, 'trigram fuzzy search on items')
+def _item_fuzzy_search(cursor):
+    """Item text generation counter and pg_trgm index where available (see search.py)."""
+    create_fuzzy_support(cursor)
+
+
+@migration(5, 'keyset pagination index on items')
+def _item_listing_index(cursor):
+    """
+    Composite index matching the listing order (date_found, created_at, item_id),
+    so a cursor page seeks straight to its first row. Rows without created_at
+    are backfilled from date_found because NULL keys cannot be compared.
+    """
+    cursor.execute('UPDATE items SET created_at = date_found WHERE created_at IS NULL')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_items_listing
+        ON items(date_found, created_at, item_id)
+    ''')
+
+
+@migration(6, 'item claim summary')
+def _item_claim_summary(cursor):
+    """Per-item latest claim and claim counts, maintained by triggers (see claim_summary.py)."""
+    create_claim_summary(cursor)
+
+
+@migration(7, 'row generations for cached counts')
+def _row_generations(cursor):
+    """Generation counters bumped by every write to items and activity_log (see count_cache.py)."""
+    create_row_generations(cursor, {'items': 'items.rows', 'activity_log': 'activity_log.rows'})
+
+
+@migration(8, 'category, location and desk lookups')
+def _item_lookups(cursor):
+    """Lookup tables and integer ids on items for the listing filters (see lookups.py)."""
+    create_lookups(cursor)
+
+
+@migration(9, 'row generation for claims')
+def _claim_row_generation(cursor):
+    """claims.rows counter for the cached item listing responses (see response_cache.py)."""
+    create_row_generations(cursor, {'claims': 'claims.rows'})
+
+
+@migration(10, 'notification generation and change times')
+def _generation_change_times(cursor):
+    """notifications.rows counter and generations.changed_at for conditional GETs (see conditional.py)."""
+    # Triggers of the earlier counters recreated so they set changed_at too
+    create_row_generations(cursor, {
+        'items': 'items.rows', 'activity_log': 'activity_log.rows', 'claims': 'claims.rows',
+        'notifications': 'notifications.rows',
+    })
+
+
+@migration(11, 'saved searches')
+def _saved_searches(cursor):
+    """Saved item searches and their saved_searches.rows counter (see saved_searches.py)."""
+    create_saved_searches(cursor)
+    create_row_generations(cursor, {'saved_searches': 'saved_searches.rows'})
+
+
+@migration(12, 'generation counter slots')
+def _generation_slots(cursor):
+    """Counters split over 16 rows on PostgreSQL, so writers do not queue on one row (see count_cache.py)."""
+    shard_generations(cursor, [
+        'items.rows', 'activity_log.rows', 'claims.rows', 'notifications.rows', 'saved_searches.rows', 'items.text',
+    ], 16)
+    # Recreated for databases whose functions predate the slots
+    create_generation_bump(cursor, 'bump_generation', 'TG_ARGV[0]', 16)
+    create_generation_bump(cursor, 'bump_items_text_generation', "'items.text'", 16, changed_at=False)
+
+
+@migration(13, 'lookup triggers skip unchanged keys')
+def _lookup_triggers(cursor):
+    """SQLite re-assigns lookup ids only when a key changed (see lookups.py)."""
+    create_lookup_triggers(cursor)
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+# Arbitrary constant identifying this app's migration lock in pg_advisory_xact_lock
+_PG_LOCK_KEY = 714_015
+
+
+def latest_version():
+    """Version the code expects the database to be at."""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def _ensure_version_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _read_version(cursor):
+    cursor.execute('SELECT MAX(version) AS version FROM schema_version')
+    row = cursor.fetchone()
+    return (row['version'] if row else None) or 0
+
+
+def current_version(conn):
+    """Return the version recorded in the database (0 if never migrated)."""
+    cursor = conn.cursor()
+    try:
+        return _read_version(cursor)
+    except OperationalError:
+        conn.rollback()
+        return 0
+
+
+def check_schema(conn=None):
+    """
+    Cheap startup check: one SELECT on schema_version.
+    Returns (current_version, latest_version) and prints a warning when the
+    database is behind the code.
+    """
+    own_connection = conn is None
+    if own_connection:
+        conn = get_db_connection()
+    try:
+        current = current_version(conn)
+    finally:
+        if own_connection:
+            conn.close()
+    latest = latest_version()
+    if current < latest:
+        print(f"⚠️  Database schema is at version {current}, code expects {latest}. "
+              f"Run: python migrations.py upgrade")
+    return current, latest
+
+
+def upgrade(conn=None, target=None):
+    """
+    Apply every pending migration (up to `target`) in one transaction.
+    Concurrent runners are serialized: SQLite takes the write lock up front
+    (BEGIN IMMEDIATE), PostgreSQL takes a transaction-level advisory lock.
+
+    Returns:
+        list of Migration objects that were applied
+    """
+    own_connection = conn is None
+    if own_connection:
+        conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if cursor.dialect.name == 'postgresql':
+            cursor.execute('SELECT pg_advisory_xact_lock(?)', (_PG_LOCK_KEY,))
+        else:
+            cursor.execute('BEGIN IMMEDIATE')
+        _ensure_version_table(cursor)
+        current = _read_version(cursor)
+
+        applied = []
+        for step in MIGRATIONS:
+            if step.version <= current or (target is not None and step.version > target):
+                continue
+            step.upgrade(cursor)
+            cursor.execute('INSERT INTO schema_version (version, name) VALUES (?, ?)',
+                           (step.version, step.name))
+            applied.append(step)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_connection:
+            conn.close()
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='UW Lost-and-Found schema migrations')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    upgrade_parser = subcommands.add_parser('upgrade', help='apply pending migrations')
+    upgrade_parser.add_argument('--to', type=int, default=None, help='stop at this version')
+    subcommands.add_parser('status', help='show current and latest schema version')
+    args = parser.parse_args(argv)
+
+    if args.command == 'upgrade':
+        applied = upgrade(target=args.to)
+        for step in applied:
+            print(f"✅ Applied migration {step.version}: {step.name}")
+        if not applied:
+            print("Database schema is up to date")
+        return 0
+
+    conn = get_db_connection()
+    try:
+        current = current_version(conn)
+    finally:
+        conn.close()
+    print(f"Schema version: {current} (latest: {latest_version()})")
+    for step in MIGRATIONS:
+        marker = 'x' if step.version <= current else ' '
+        print(f"  [{marker}] {step.version:>3}  {step.name}")
+    return 0 if current >= latest_version() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
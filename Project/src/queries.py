@@ -0,0 +1,93 @@
+"""
+Named Query Registry
+Gives SQL statements a stable name so they can be tracked and prepared.
+
+Every NamedQuery records its execution count and latency under its name;
+query_stats() lists them with the most expensive first. Queries defined with
+prepare=True run as server-side prepared statements on PostgreSQL. On SQLite
+the fixed statement text is what makes sqlite3's statement cache effective.
+
+Queries whose text is assembled from optional filters (WHERE clauses,
+ORDER BY) are registered once per distinct text; all variants share the
+name's statistics and each gets its own prepared statement.
+
+Usage:
+    from queries import named_query, query_stats
+
+    FIND_CLAIM = named_query('claims.find', 'SELECT * FROM claims WHERE claim_id = ?', prepare=True)
+    cursor.execute(FIND_CLAIM, (claim_id,))
+
+    # Dynamic SQL: same call, cached per distinct text
+    cursor.execute(named_query('items.page', sql, prepare=True), params)
+"""
+
+import hashlib
+import re
+import threading
+
+from db_config import NamedQuery, QueryStats
+
+_stats = {}      # name -> QueryStats
+_queries = {}    # (name, sql, prepare) -> NamedQuery
+_lock = threading.Lock()
+
+
+def _statement_name(name, sql):
+    """PostgreSQL identifier for one variant: q_<name>_<hash of text>, at most 63 chars."""
+    digest = hashlib.sha1(sql.encode('utf-8')).hexdigest()[:10]
+    return f"q_{re.sub(r'[^a-z0-9_]', '_', name.lower())[:40]}_{digest}"
+
+
+def named_query(name, sql, prepare=False):
+    """
+    Return the NamedQuery for `name` and `sql`, registering it on first use.
+
+    Args:
+        name: Dotted name the statistics are reported under (e.g. 'items.page')
+        sql: SQLite-style SQL text
+        prepare: Use a server-side prepared statement on PostgreSQL
+
+    Returns:
+        NamedQuery to pass to cursor.execute()
+    """
+    key = (name, sql, prepare)
+    query = _queries.get(key)
+    if query is not None:
+        return query
+    with _lock:
+        query = _queries.get(key)
+        if query is None:
+            stats = _stats.get(name)
+            if stats is None:
+                stats = _stats[name] = QueryStats(name)
+            query = _queries[key] = NamedQuery(
+                name, sql, stats, prepared=prepare,
+                statement_name=_statement_name(name, sql) if prepare else None
+            )
+    return query
+
+
+def query_stats():
+    """Return per-name statistics, highest total time first."""
+    with _lock:
+        stats = list(_stats.values())
+    variants = {}
+    for name, _sql, _prepare in list(_queries):
+        variants[name] = variants.get(name, 0) + 1
+    rows = []
+    for entry in stats:
+        row = entry.snapshot()
+        row['variants'] = variants.get(entry.name, 0)
+        rows.append(row)
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def reset_query_stats():
+    """Zero every counter (registrations are kept)."""
+    with _lock:
+        stats = list(_stats.values())
+    for entry in stats:
+        entry.reset()
+
+
+__all__ = ['named_query', 'query_stats', 'reset_query_stats']
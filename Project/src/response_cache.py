@@ -0,0 +1,151 @@
+"""
+Response Cache Module
+Serialized /api/items responses shared by every user with the same request.
+
+Most students land on the same first page of the listing, so the finished
+JSON body is cached per connection pool, keyed by the user's role and the
+normalized query parameters. Each entry is tagged with the write generations
+of the tables the listing reads (items and claims, bumped by triggers on
+every insert, update or delete; see count_cache.ROW_GENERATIONS). A hit
+costs one small read of the generations table; any write to items or claims,
+whether from create_item, update_item, delete_item, the claim routes or
+direct SQL, makes older entries miss. RESPONSE_CACHE_TTL bounds how long an
+entry is kept regardless, and the least recently used entries are evicted
+beyond RESPONSE_CACHE_SIZE.
+
+Usage:
+    generations = read_version(cursor, ITEM_LISTING_GENERATIONS).generations  # conditional.py
+    key = request_key('items', session.get('role'), request.args)
+    body = cache.get(key, generations)
+    ...
+    cache.put(key, generations, response.get_data())
+"""
+
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from count_cache import ROW_GENERATIONS
+
+# Responses kept per pool (0 disables the cache)
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+# Seconds an entry is kept even while nothing is written
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '60'))
+
+# Tables /api/items reads: items (with their lookups) and the claim summary
+ITEM_LISTING_GENERATIONS = (ROW_GENERATIONS['items'], ROW_GENERATIONS['claims'])
+
+# Parameters whose letter case never changes the response
+CASELESS_PARAMS = {
+    'search', 'category', 'location', 'desk', 'sort', 'fuzzy', 'include_total', 'facets', 'fields', 'compact'
+}
+
+
+def request_key(endpoint, role, args):
+    """
+    Cache key for a request: endpoint, role and sorted, normalized parameters.
+
+    Args:
+        endpoint: Name of the cached listing (e.g. 'items')
+        role: Role of the logged-in user
+        args: request.args
+    """
+    params = []
+    for name, value in args.items(multi=True):
+        value = value.strip()
+        if name in CASELESS_PARAMS:
+            value = value.lower()
+        params.append((name, value))
+    return (endpoint, role, tuple(sorted(params)))
+
+
+class ResponseCache:
+    """Bounded LRU map of request key -> (generations, stored at, body) with a TTL."""
+
+    def __init__(self, size=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._invalidated = 0
+
+    def get(self, key, generations):
+        """Body cached at `generations` and younger than the TTL, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[0] != generations:
+                del self._entries[key]
+                self._invalidated += 1
+                self._misses += 1
+                return None
+            if time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def put(self, key, generations, body):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (generations, time.monotonic(), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self):
+        """Return a snapshot of cache usage."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_size': self.size,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expired': self._expired,
+                'invalidated': self._invalidated
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_for(pool):
+    """The ResponseCache of a connection pool (created on first use)."""
+    with _caches_lock:
+        cache = _caches.get(pool)
+        if cache is None:
+            cache = _caches[pool] = ResponseCache()
+        return cache
+
+
+def response_cache_stats():
+    """Return statistics for the response cache of every pool that has one."""
+    with _caches_lock:
+        caches = list(_caches.items())
+    return [dict(backend=pool.backend, role=pool.role, **cache.stats()) for pool, cache in caches]
+
+
+__all__ = [
+    'ITEM_LISTING_GENERATIONS', 'ResponseCache', 'request_key', 'cache_for', 'response_cache_stats'
+]
@@ -0,0 +1,270 @@
+"""
+Saved Searches Module
+Saved item searches whose owners are notified when a matching item is logged.
+
+A saved search is the text and filters of an /api/items search (search,
+category, location, desk) kept in saved_searches. When an item is created
+it is not run against every saved search: a percolator inverts them. Each
+search is indexed under its words or, when it has none, under its category,
+desk or the first letters of its location. The new item looks up the
+prefixes of its own words and its category, desk and location, and only
+the searches reached that way are checked, so matching costs as much as the
+new item's text, whatever the number of saved searches.
+
+Matching follows the listing's rules: every word of the search must be a
+prefix of a word of the item (name, description, category, locations);
+category and desk compare case-insensitively; location is a case-insensitive
+substring. Words are not stemmed.
+
+One percolator is kept per connection pool. Each use reads the
+`saved_searches.rows` generation (one small SELECT) and rebuilds the
+percolator when it moved. Saved-search writes made by this process are
+applied in place at once (note_search); they move the generation too, so
+the next use after them rebuilds once.
+
+Usage:
+    for search in percolator(conn).percolate(item):
+        insert_notification(cursor, search.user_id, 'Saved Search Match', ...)
+"""
+
+import threading
+import weakref
+from collections import Counter, defaultdict, namedtuple
+
+from count_cache import ROW_GENERATIONS, read_generation
+from db_config import OperationalError
+from lookups import normalize_key
+from search import SEARCH_COLUMNS, search_terms
+
+# Saved searches one user may keep
+SAVED_SEARCH_LIMIT = 20
+# Longest name or search text accepted, in characters
+SAVED_SEARCH_MAX_TEXT = 200
+
+# terms: distinct words of the search text; filters are normalized keys or None
+SavedSearch = namedtuple('SavedSearch', ['search_id', 'user_id', 'name', 'terms', 'category', 'location', 'desk'])
+
+SAVED_SEARCH_COLUMNS = 'saved_search_id, user_id, name, search_text, category, location, desk, created_at'
+
+
+def saved_search(row):
+    """SavedSearch of a saved_searches row."""
+    return SavedSearch(
+        row['saved_search_id'], row['user_id'], row['name'],
+        tuple(sorted(set(search_terms(row['search_text'])))),
+        normalize_key(row['category']) or None,
+        normalize_key(row['location']) or None,
+        normalize_key(row['desk']) or None,
+    )
+
+
+def saved_search_dict(row):
+    """API representation of a saved_searches row."""
+    return {
+        'saved_search_id': row['saved_search_id'],
+        'name': row['name'],
+        'search': row['search_text'],
+        'category': row['category'],
+        'location': row['location'],
+        'desk': row['desk'],
+        'created_at': row['created_at'],
+    }
+
+
+def _anchors(search):
+    """Keys a saved search is indexed under; the item must reach all of them."""
+    if search.terms:
+        return [('term', term) for term in search.terms]
+    if search.category:
+        return [('category', search.category)]
+    if search.desk:
+        return [('desk', search.desk)]
+    return [('location', search.location[:3])]
+
+
+def item_keys(item):
+    """
+    Keys an item reaches: every prefix of every word, its category and desk,
+    and the substrings of up to three letters of its location.
+    """
+    keys = set()
+    for column in SEARCH_COLUMNS:
+        for word in search_terms(item.get(column)):
+            keys.update(('term', word[:end]) for end in range(1, len(word) + 1))
+    keys.add(('category', normalize_key(item.get('category'))))
+    keys.add(('desk', normalize_key(item.get('found_by_desk'))))
+    location = normalize_key(item.get('location_found'))
+    for size in (1, 2, 3):
+        keys.update(('location', location[start:start + size]) for start in range(len(location) - size + 1))
+    return keys
+
+
+def _filters_match(search, item):
+    if search.category and normalize_key(item.get('category')) != search.category:
+        return False
+    if search.desk and normalize_key(item.get('found_by_desk')) != search.desk:
+        return False
+    if search.location and search.location not in normalize_key(item.get('location_found')):
+        return False
+    return True
+
+
+class Percolator:
+    """Saved searches inverted by their words and filters."""
+
+    def __init__(self):
+        self._searches = {}                 # search_id -> SavedSearch
+        self._postings = defaultdict(set)   # anchor key -> search ids
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._searches)
+
+    def add(self, search):
+        """Index a saved search (replacing one with the same id)."""
+        with self._lock:
+            self._remove(search.search_id)
+            self._searches[search.search_id] = search
+            for key in _anchors(search):
+                self._postings[key].add(search.search_id)
+
+    def remove(self, search_id):
+        """Forget a deleted saved search."""
+        with self._lock:
+            self._remove(search_id)
+
+    def _remove(self, search_id):
+        search = self._searches.pop(search_id, None)
+        if search is None:
+            return
+        for key in _anchors(search):
+            self._postings[key].discard(search_id)
+            if not self._postings[key]:
+                del self._postings[key]
+
+    def percolate(self, item):
+        """
+        Saved searches a new item matches.
+
+        Args:
+            item: Mapping with the item's SEARCH_COLUMNS values
+
+        Returns:
+            list: Matching SavedSearch tuples, oldest (lowest id) first
+        """
+        hits = Counter()
+        with self._lock:
+            for key in item_keys(item):
+                for search_id in self._postings.get(key, ()):
+                    hits[search_id] += 1
+            candidates = [
+                self._searches[search_id] for search_id, count in sorted(hits.items())
+                if count == len(_anchors(self._searches[search_id]))
+            ]
+        return [search for search in candidates if _filters_match(search, item)]
+
+
+def build_percolator(cursor):
+    """Build a Percolator over every saved search."""
+    index = Percolator()
+    cursor.execute(f'SELECT {SAVED_SEARCH_COLUMNS} FROM saved_searches')
+    for row in cursor.fetchall():
+        index.add(saved_search(row))
+    return index
+
+
+class _CachedPercolator:
+    """A pool's Percolator and the saved_searches.rows generation it reflects."""
+
+    def __init__(self):
+        self.index = None
+        self.generation = None
+        self.lock = threading.Lock()
+
+
+_percolators = weakref.WeakKeyDictionary()
+_percolators_lock = threading.Lock()
+
+
+def _cached(pool):
+    with _percolators_lock:
+        cached = _percolators.get(pool)
+        if cached is None:
+            cached = _percolators[pool] = _CachedPercolator()
+        return cached
+
+
+def percolator(conn):
+    """
+    The Percolator for the database behind `conn`, rebuilt when the
+    saved_searches.rows generation has moved. Empty on databases from
+    before migration 11.
+    """
+    cursor = conn.cursor()
+    try:
+        generation = read_generation(cursor, ROW_GENERATIONS['saved_searches'])
+    except OperationalError:
+        # SQLite database created before migration 7 (no generations table)
+        if cursor.dialect.name != 'sqlite':
+            raise
+        generation = None
+    if generation is None:
+        return Percolator()
+    pool = conn.pool
+    if pool is None:
+        return build_percolator(cursor)
+
+    cached = _cached(pool)
+    if cached.index is not None and cached.generation == generation:
+        return cached.index
+    with cached.lock:
+        if cached.index is None or cached.generation != generation:
+            cached.index = build_percolator(cursor)
+            cached.generation = generation
+        return cached.index
+
+
+def note_search(pool, search_id, row):
+    """
+    Apply a saved-search write made by this process to the pool's percolator (if built).
+
+    Args:
+        pool: Pool the write was committed on
+        search_id: Saved search id
+        row: The saved_searches row after the write, None when it was deleted
+    """
+    if pool is None:
+        return
+    cached = _cached(pool)
+    with cached.lock:
+        if cached.index is None:
+            return
+        if row is None:
+            cached.index.remove(search_id)
+        else:
+            cached.index.add(saved_search(row))
+
+
+def create_saved_searches(cursor):
+    """Create the saved_searches table and its owner index."""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS saved_searches (
+            saved_search_id {cursor.dialect.primary_key},
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            search_text TEXT,
+            category TEXT,
+            location TEXT,
+            desk TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches(user_id)')
+
+
+__all__ = [
+    'SAVED_SEARCH_LIMIT', 'SAVED_SEARCH_MAX_TEXT', 'SavedSearch', 'SAVED_SEARCH_COLUMNS',
+    'saved_search', 'saved_search_dict', 'Percolator', 'build_percolator', 'percolator', 'note_search',
+    'create_saved_searches',
+]
@@ -0,0 +1,396 @@
+"""
+Item Search Module
+Full-text search over items for /api/items?search=...
+
+SQLite: an FTS5 table (items_fts) over the item's text columns, kept in
+sync with `items` by triggers. PostgreSQL: a GIN index on a weighted
+tsvector expression over the same columns. Both are created by migration 3.
+
+Search text is split into words; every word must match, as a prefix
+("wal" finds "wallet"), case-insensitively and with English stemming.
+Matches are ranked with BM25 (SQLite) or ts_rank (PostgreSQL), weighting
+name above description above category above locations.
+
+Fuzzy search (fuzzy=true) matches words approximately by trigram
+similarity, so "walet" finds "wallet". PostgreSQL uses pg_trgm and a GIN
+trigram index when the extension could be installed (migration 4);
+otherwise, and always on SQLite, an in-process FuzzyIndex over the items
+that are not deleted is kept per connection pool. The item routes apply
+their own writes to it (note_item); writes by other workers or direct SQL
+move the `items.rows` generation, checked at most every
+FUZZY_REFRESH_SECONDS, and the index is rebuilt when it has moved. The
+listing filters (status, category, location, desk) are applied in the
+index before FUZZY_MAX_RESULTS cuts the matches, so the cap only drops
+matches that would have been listed.
+
+Usage:
+    match = match_expression(cursor.dialect, 'black wallet')
+    if match:
+        sql = f'SELECT ... FROM items {ITEM_MATCH_JOIN[cursor.dialect.name]} WHERE ... ORDER BY {RANK_ORDER}'
+        cursor.execute(sql, [match, ...])
+
+    join, params = fuzzy_match_join(conn, 'blak walet')   # same shape, None if nothing matches
+"""
+
+import os
+import random
+import re
+import threading
+import weakref
+
+from count_cache import PoolIndexCache, create_generation_bump
+from db_config import DatabaseError
+from lookups import normalize_key
+from trigram import TrigramIndex
+
+# Most fuzzy matches passed on to SQL (best first)
+FUZZY_MAX_RESULTS = int(os.getenv('FUZZY_MAX_RESULTS', '500'))
+# Seconds between checks for item writes made outside this process
+FUZZY_REFRESH_SECONDS = float(os.getenv('FUZZY_REFRESH_SECONDS', '30'))
+
+# Columns covered by the index, highest ranking weight first
+SEARCH_COLUMNS = ('name', 'description', 'category', 'location_found', 'pickup_at', 'found_by_desk')
+
+# SQLite FTS5: porter stemming over unicode61, prefix indexes for short prefixes
+FTS_TOKENIZE = 'porter unicode61 remove_diacritics 2'
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 2.0, 1.0, 1.0)
+
+# PostgreSQL: indexed expression; queries must use the identical text
+PG_SEARCH_CONFIG = 'english'
+PG_ITEM_DOCUMENT = (
+    "(setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(category, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(location_found, '') || ' ' || "
+    "coalesce(pickup_at, '') || ' ' || coalesce(found_by_desk, '')), 'D'))"
+)
+
+# Joined after `FROM items`; exposes matches.search_rank (higher is better).
+# Takes one parameter: the output of match_expression().
+ITEM_MATCH_JOIN = {
+    'sqlite': f'''
+        JOIN (
+            SELECT rowid AS match_id, -bm25(items_fts, {', '.join(str(w) for w in FTS_WEIGHTS)}) AS search_rank
+            FROM items_fts
+            WHERE items_fts MATCH ?
+        ) AS matches ON matches.match_id = items.item_id''',
+    'postgresql': f'''
+        JOIN (
+            SELECT item_id AS match_id, ts_rank({PG_ITEM_DOCUMENT}, query) AS search_rank
+            FROM items, to_tsquery('{PG_SEARCH_CONFIG}', ?) AS query
+            WHERE {PG_ITEM_DOCUMENT} @@ query
+        ) AS matches ON matches.match_id = items.item_id''',
+}
+
+RANK_ORDER = 'matches.search_rank DESC'
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(text):
+    """Lower-cased words of a search string (punctuation is dropped)."""
+    return _WORD.findall((text or '').lower())
+
+
+def match_expression(dialect, text):
+    """
+    Build the full-text query for `text`.
+
+    Args:
+        dialect: db_config.Dialect of the connection
+        text: Raw search string from the user
+
+    Returns:
+        FTS5 MATCH string or to_tsquery() input, or None if `text` has no words
+    """
+    terms = search_terms(text)
+    if not terms:
+        return None
+    if dialect.name == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    # Quoted so FTS5 operators (AND, OR, NEAR, column filters) are taken literally
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+# ============================================================================
+# Fuzzy search
+# ============================================================================
+
+# Columns covered by fuzzy search, and the pg_trgm-indexed expression over them
+FUZZY_COLUMNS = ('name', 'description', 'category')
+PG_FUZZY_DOCUMENT = "(coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || coalesce(category, ''))"
+
+# Generation counter bumped by triggers whenever item text changes
+ITEMS_TEXT_GENERATION = 'items.text'
+
+# items columns the in-process fuzzy index reads
+FUZZY_INDEX_COLUMNS = (*FUZZY_COLUMNS, 'status', 'location_found', 'found_by_desk')
+
+# `<%%` is pg_trgm's word-similarity operator, escaped for pyformat: this join
+# always runs with parameters and must not be used in a prepared NamedQuery
+PG_FUZZY_JOIN = f'''
+        JOIN (
+            SELECT item_id AS match_id, word_similarity(input.query, {PG_FUZZY_DOCUMENT}) AS search_rank
+            FROM items, (SELECT CAST(? AS TEXT) AS query) AS input
+            WHERE input.query <%% {PG_FUZZY_DOCUMENT}
+        ) AS matches ON matches.match_id = items.item_id'''
+
+_has_pg_trgm = weakref.WeakKeyDictionary()
+
+
+def uses_pg_trgm(conn):
+    """True when fuzzy search can run in PostgreSQL (pg_trgm installed); cached per pool."""
+    if conn.dialect.name != 'postgresql':
+        return False
+    pool = conn.pool
+    if pool is not None and pool in _has_pg_trgm:
+        return _has_pg_trgm[pool]
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) AS installed FROM pg_extension WHERE extname = 'pg_trgm'")
+    installed = cursor.fetchone()['installed'] > 0
+    if pool is not None:
+        _has_pg_trgm[pool] = installed
+    return installed
+
+
+def _like(pattern):
+    """Regular expression matching what SQL `LIKE pattern` does on a lower-cased key."""
+    return re.compile(''.join(
+        '.*' if char == '%' else '.' if char == '_' else re.escape(char) for char in pattern
+    ), re.DOTALL)
+
+
+class FuzzyIndex:
+    """
+    TrigramIndex over the items that are not deleted, with the values the
+    listing filters on, so filters apply before the result cap.
+    """
+
+    def __init__(self):
+        self._trigrams = TrigramIndex()
+        self._filter_values = {}   # item_id -> {'status', 'category', 'location', 'desk'}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._filter_values)
+
+    def note_item(self, item_id, row):
+        """
+        Add, replace or (when deleted) remove an item.
+
+        Args:
+            item_id: Item id
+            row: Mapping with the item's status and FUZZY_INDEX_COLUMNS
+        """
+        with self._lock:
+            if row.get('status') == 'deleted':
+                self._trigrams.remove(item_id)
+                self._filter_values.pop(item_id, None)
+                return
+            self._trigrams.add(item_id, *(row.get(column) for column in FUZZY_COLUMNS))
+            self._filter_values[item_id] = {
+                'status': row.get('status'),
+                'category': normalize_key(row.get('category')),
+                'location': normalize_key(row.get('location_found')),
+                'desk': normalize_key(row.get('found_by_desk')),
+            }
+
+    def search(self, text, filters=None, limit=None):
+        """
+        Items matching every word of `text` approximately and the listing filters.
+
+        Args:
+            text: Search string
+            filters: {'status', 'category', 'location', 'desk'} raw filter
+                values as /api/items takes them; empty ones are ignored
+            limit: Maximum number of results (None for all)
+
+        Returns:
+            list of (item_id, score) best first
+        """
+        wanted = {name: value for name, value in (filters or {}).items() if value}
+        if 'category' in wanted:
+            wanted['category'] = normalize_key(wanted['category'])
+        if 'desk' in wanted:
+            wanted['desk'] = normalize_key(wanted['desk'])
+        location = _like(f"%{normalize_key(wanted.pop('location'))}%") if 'location' in wanted else None
+
+        def accept(item_id):
+            values = self._filter_values[item_id]
+            if any(values[name] != value for name, value in wanted.items()):
+                return False
+            return location is None or location.fullmatch(values['location']) is not None
+
+        with self._lock:
+            return self._trigrams.search(text, limit=limit, accept=accept)
+
+
+def build_fuzzy_index(cursor):
+    """Build a FuzzyIndex over the items that are not deleted."""
+    index = FuzzyIndex()
+    cursor.execute(f"SELECT item_id, {', '.join(FUZZY_INDEX_COLUMNS)} FROM items WHERE status != 'deleted'")
+    for row in cursor.fetchall():
+        index.note_item(row['item_id'], dict(row))
+    return index
+
+
+# One index per pool (see count_cache.PoolIndexCache)
+fuzzy_indexes = PoolIndexCache(build_fuzzy_index, FUZZY_REFRESH_SECONDS)
+
+
+def fuzzy_index(conn):
+    """The in-process FuzzyIndex for the database behind `conn`, checked every FUZZY_REFRESH_SECONDS."""
+    return fuzzy_indexes.get(conn.pool, conn)
+
+
+def note_item(pool, item_id, row):
+    """
+    Apply an item write made by this process to the pool's fuzzy index (if built).
+
+    Args:
+        pool: Pool the write was committed on
+        item_id: Item id
+        row: Mapping with the item's status and FUZZY_INDEX_COLUMNS
+    """
+    index = fuzzy_indexes.peek(pool)
+    if index is not None:
+        index.note_item(item_id, row)
+
+
+def _bucket(count):
+    """Round up to a power of two (minimum 8) so few distinct statements are prepared."""
+    size = 8
+    while size < count:
+        size *= 2
+    return size
+
+
+def fuzzy_match_join(conn, text, filters=None):
+    """
+    Join for typo-tolerant search, shaped like ITEM_MATCH_JOIN.
+
+    Args:
+        conn: Connection handle the query will run on
+        text: Raw search string from the user
+        filters: Listing filters the in-process index applies before the
+            FUZZY_MAX_RESULTS cap (see FuzzyIndex.search); the query must
+            still apply them (pg_trgm ignores them here)
+
+    Returns:
+        (join_sql, params, truncated), or None when no item is similar;
+        truncated is True when matches beyond FUZZY_MAX_RESULTS were dropped
+    """
+    if not search_terms(text):
+        return None
+    if uses_pg_trgm(conn):
+        return PG_FUZZY_JOIN, [' '.join(search_terms(text))], False
+
+    index = fuzzy_index(conn)
+    if not index.search(text, limit=1):
+        return None
+    matches = index.search(text, filters, limit=FUZZY_MAX_RESULTS + 1)
+    truncated = len(matches) > FUZZY_MAX_RESULTS
+    matches = matches[:FUZZY_MAX_RESULTS]
+    # Padding rows use item_id 0, which never exists
+    padded = matches + [(0, 0.0)] * (_bucket(len(matches)) - len(matches))
+    values = ', '.join(['(?, ?)'] * len(padded))
+    join = f'''
+        JOIN (
+            SELECT column1 AS match_id, column2 AS search_rank FROM (VALUES {values}) AS fuzzy
+        ) AS matches ON matches.match_id = items.item_id'''
+    params = [value for pair in padded for value in pair]
+    return join, params, truncated
+
+
+# ============================================================================
+# Schema (used by migrations 3 and 4)
+# ============================================================================
+
+def create_search_index(cursor):
+    """Create the full-text index over items and fill it from existing rows."""
+    if cursor.dialect.name == 'postgresql':
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_items_search ON items USING GIN ({PG_ITEM_DOCUMENT})')
+        return
+
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+            {columns},
+            content='items', content_rowid='item_id',
+            tokenize='{FTS_TOKENIZE}', prefix='2 3'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, {columns}) VALUES (new.item_id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, {columns}) VALUES ('delete', old.item_id, {old_values});
+        END
+    ''')
+    # Only text changes touch the index (status updates do not)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF {columns} ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, {columns}) VALUES ('delete', old.item_id, {old_values});
+            INSERT INTO items_fts (rowid, {columns}) VALUES (new.item_id, {new_values});
+        END
+    ''')
+    cursor.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+
+
+def create_fuzzy_support(cursor):
+    """
+    Generation counter for item text (bumped by triggers) and, on PostgreSQL,
+    pg_trgm with a GIN trigram index. If the extension cannot be installed
+    (not available, or no permission) fuzzy search uses the in-process index.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS generations (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('SELECT COUNT(*) AS count FROM generations WHERE name = ?', (ITEMS_TEXT_GENERATION,))
+    if not cursor.fetchone()['count']:
+        # Random start: a recreated database never matches an index built from the old one
+        cursor.execute('INSERT INTO generations (name, value) VALUES (?, ?)',
+                       (ITEMS_TEXT_GENERATION, random.randrange(2 ** 30)))
+
+    columns = ', '.join(FUZZY_COLUMNS)
+    if cursor.dialect.name == 'postgresql':
+        # generations.changed_at only exists from migration 10
+        create_generation_bump(cursor, 'bump_items_text_generation', f"'{ITEMS_TEXT_GENERATION}'", changed_at=False)
+        cursor.execute('DROP TRIGGER IF EXISTS items_text_generation ON items')
+        cursor.execute(f'''
+            CREATE TRIGGER items_text_generation
+            AFTER INSERT OR DELETE OR UPDATE OF {columns} ON items
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_items_text_generation()
+        ''')
+        cursor.execute('SAVEPOINT pg_trgm')
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_items_trgm ON items USING GIN ({PG_FUZZY_DOCUMENT} gin_trgm_ops)')
+            cursor.execute('RELEASE SAVEPOINT pg_trgm')
+        except DatabaseError as err:
+            cursor.execute('ROLLBACK TO SAVEPOINT pg_trgm')
+            print(f"⚠️  pg_trgm unavailable ({str(err).strip().splitlines()[0]}); fuzzy search will use the in-process index")
+        return
+
+    bump = f"UPDATE generations SET value = value + 1 WHERE name = '{ITEMS_TEXT_GENERATION}'"
+    for event, name in (('INSERT', 'insert'), ('DELETE', 'delete'), (f'UPDATE OF {columns}', 'update')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS items_text_generation_{name} AFTER {event} ON items BEGIN
+                {bump};
+            END
+        ''')
+
+
+__all__ = [
+    'SEARCH_COLUMNS', 'ITEM_MATCH_JOIN', 'RANK_ORDER', 'search_terms', 'match_expression',
+    'FUZZY_COLUMNS', 'ITEMS_TEXT_GENERATION', 'uses_pg_trgm', 'FuzzyIndex', 'build_fuzzy_index',
+    'fuzzy_indexes', 'fuzzy_index', 'note_item', 'fuzzy_match_join', 'create_search_index', 'create_fuzzy_support'
+]
@@ -0,0 +1,85 @@
+"""
+Default Account Seeding
+Creates the default staff account (admin@uwaterloo.ca / admin123) used for
+development and demos.
+
+This used to run on every import of app.py (bcrypt hash + verify + UPDATE in
+every worker). It is now a one-time command, run after the migrations:
+
+    python migrations.py upgrade
+    python seed.py                    # create the account if it is missing
+    python seed.py --reset-password   # also reset the password to admin123
+
+Author: Team 15 (Ruhani, Sheehan, Aidan, Neng, Theni)
+"""
+
+import argparse
+import sys
+
+from app import get_db_connection, hash_password, verify_password
+
+DEFAULT_STAFF_EMAIL = 'admin@uwaterloo.ca'
+DEFAULT_STAFF_NAME = 'Admin User'
+DEFAULT_STAFF_PASSWORD = 'admin123'
+
+
+def create_default_staff_account(reset_password=False):
+    """
+    Create the default staff account if it doesn't exist.
+
+    Args:
+        reset_password: If True, an existing account's password is reset to the default
+
+    Returns:
+        'created', 'reset' or 'exists'
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT user_id FROM users WHERE email = ? AND role = ?', (DEFAULT_STAFF_EMAIL, 'staff'))
+        existing_user = cursor.fetchone()
+        if existing_user and not reset_password:
+            return 'exists'
+
+        admin_hash = hash_password(DEFAULT_STAFF_PASSWORD)
+        # Verify the hash works before storing
+        if not verify_password(DEFAULT_STAFF_PASSWORD, admin_hash):
+            raise RuntimeError('Generated password hash does not verify')
+
+        if not existing_user:
+            cursor.execute('''
+                INSERT INTO users (email, name, password_hash, role)
+                VALUES (?, ?, ?, ?)
+            ''', (DEFAULT_STAFF_EMAIL, DEFAULT_STAFF_NAME, admin_hash, 'staff'))
+            result = 'created'
+        else:
+            cursor.execute('''
+                UPDATE users
+                SET password_hash = ?
+                WHERE email = ? AND role = ?
+            ''', (admin_hash, DEFAULT_STAFF_EMAIL, 'staff'))
+            result = 'reset'
+        conn.commit()
+        return result
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed the default staff account')
+    parser.add_argument('--reset-password', action='store_true',
+                        help=f'reset an existing account\'s password to {DEFAULT_STAFF_PASSWORD}')
+    args = parser.parse_args(argv)
+
+    result = create_default_staff_account(reset_password=args.reset_password)
+    if result == 'created':
+        print(f"✅ Default staff account created: {DEFAULT_STAFF_EMAIL} / {DEFAULT_STAFF_PASSWORD}")
+    elif result == 'reset':
+        print(f"✅ Default staff account password reset: {DEFAULT_STAFF_EMAIL} / {DEFAULT_STAFF_PASSWORD}")
+    else:
+        print(f"Default staff account already exists: {DEFAULT_STAFF_EMAIL}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
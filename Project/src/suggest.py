@@ -0,0 +1,234 @@
+"""
+Item Suggestion Module
+Search-as-you-type completions for /api/items/suggest?q=...
+
+An in-process prefix trie over item names, categories and locations of
+every item that is not deleted. A value is indexed under each of its words,
+so "wal" completes "Black Wallet" as well as "Wallet". Each trie node keeps
+its subtree's best completions (most items first), so a lookup walks
+len(q) nodes and reads a ready list: no database access, no sorting.
+
+One index is kept per connection pool (so per worker process). The item
+routes apply their own writes to it incrementally (note_item), so they
+show at once. Writes by other workers or direct SQL move the `items.rows`
+generation; it is checked at most every SUGGEST_REFRESH_SECONDS, and the
+index is rebuilt when it has moved. The routes' own writes move it too, so
+a check after them costs one extra rebuild.
+
+Usage:
+    index = suggestion_index(pool)
+    index.suggest('wal', limit=8)   # [{'text': 'Black Wallet', 'type': 'name', 'count': 2}, ...]
+"""
+
+import os
+import threading
+
+from count_cache import PoolIndexCache
+from trigram import words
+
+# Seconds between checks for writes made outside this process
+SUGGEST_REFRESH_SECONDS = float(os.getenv('SUGGEST_REFRESH_SECONDS', '30'))
+# Completions kept per trie node, the most a request can ask for
+SUGGEST_MAX_LIMIT = 20
+
+# Suggestion type -> items column
+SUGGEST_COLUMNS = {
+    'name': 'name',
+    'category': 'category',
+    'location': 'location_found',
+}
+
+
+def normalize(text):
+    """Lower-cased words of `text` joined by single spaces."""
+    return ' '.join(words(text))
+
+
+def _keys(suggestion):
+    """Trie keys of a suggestion: its normalized text from each word on."""
+    key_words = suggestion[1].split(' ')
+    return [' '.join(key_words[start:]) for start in range(len(key_words))]
+
+
+class _Node:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = {}   # suggestion -> count, for keys ending here
+        self.top = []       # best (count, suggestion) of the subtree
+
+
+class PrefixIndex:
+    """Prefix trie of item values with per-node top completions."""
+
+    def __init__(self, node_limit=SUGGEST_MAX_LIMIT):
+        self.node_limit = node_limit
+        self._root = _Node()
+        self._counts = {}    # (type, key) -> number of items
+        self._display = {}   # (type, key) -> text as first written
+        self._items = {}     # item_id -> suggestions it contributes
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _item_suggestions(self, values):
+        suggestions = []
+        for kind, text in values.items():
+            key = normalize(text)
+            if key:
+                suggestions.append(((kind, key), text.strip()))
+        return suggestions
+
+    def _path(self, key):
+        """Nodes from the root to `key`'s node, created as needed."""
+        path = [self._root]
+        for char in key:
+            path.append(path[-1].children.setdefault(char, _Node()))
+        return path
+
+    def _adjust(self, suggestion, delta):
+        """Change a suggestion's count and refresh the nodes along each of its keys."""
+        count = self._counts.get(suggestion, 0) + delta
+        if count > 0:
+            self._counts[suggestion] = count
+        else:
+            self._counts.pop(suggestion, None)
+            self._display.pop(suggestion, None)
+        for key in _keys(suggestion):
+            path = self._path(key)
+            if count > 0:
+                path[-1].entries[suggestion] = count
+            else:
+                path[-1].entries.pop(suggestion, None)
+            for node in reversed(path):
+                self._refresh_top(node)
+
+    def _refresh_top(self, node):
+        best = dict(node.entries)
+        for child in node.children.values():
+            for count, suggestion in child.top:
+                best[suggestion] = count
+        ranked = sorted(((count, suggestion) for suggestion, count in best.items()),
+                        key=lambda pair: (-pair[0], pair[1]))
+        node.top = ranked[:self.node_limit]
+
+    def note_item(self, item_id, status, **values):
+        """
+        Index an item's current values, replacing what it contributed before.
+
+        Args:
+            item_id: Item id
+            status: Item status; deleted items contribute nothing
+            **values: name, category and location texts (see SUGGEST_COLUMNS)
+        """
+        with self._lock:
+            new = self._item_suggestions(values) if status != 'deleted' else []
+            old = self._items.pop(item_id, [])
+            old_keys = {suggestion for suggestion, _text in old}
+            new_keys = {suggestion for suggestion, _text in new}
+            for suggestion in old_keys - new_keys:
+                self._adjust(suggestion, -1)
+            for suggestion, text in new:
+                self._display.setdefault(suggestion, text)
+                if suggestion not in old_keys:
+                    self._adjust(suggestion, 1)
+            if new:
+                self._items[item_id] = new
+
+    def load(self, items):
+        """
+        Index many items at once, computing every node's completions in one
+        bottom-up pass instead of once per item (used to build a new index).
+
+        Args:
+            items: Iterable of (item_id, status, values) as for note_item()
+        """
+        with self._lock:
+            for item_id, status, values in items:
+                suggestions = self._item_suggestions(values) if status != 'deleted' else []
+                if not suggestions:
+                    continue
+                self._items[item_id] = suggestions
+                for suggestion, text in suggestions:
+                    self._display.setdefault(suggestion, text)
+                    self._counts[suggestion] = self._counts.get(suggestion, 0) + 1
+            for suggestion, count in self._counts.items():
+                for key in _keys(suggestion):
+                    self._path(key)[-1].entries[suggestion] = count
+            # Pre-order lists parents before children; reversed, children come first
+            order = []
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                order.append(node)
+                stack.extend(node.children.values())
+            for node in reversed(order):
+                self._refresh_top(node)
+
+    def forget_item(self, item_id):
+        """Remove an item's contributions (deleted item)."""
+        self.note_item(item_id, 'deleted')
+
+    def suggest(self, prefix, limit=8):
+        """
+        Completions of `prefix`, most items first.
+
+        Returns:
+            list of {"text", "type", "count"}
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        if prefix[-1:].isspace():
+            key += ' '   # "black " completes the next word only
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [
+            {'text': self._display.get(suggestion, suggestion[1]), 'type': suggestion[0], 'count': count}
+            for count, suggestion in node.top[:limit]
+        ]
+
+
+def build_suggestion_index(cursor):
+    """Build a PrefixIndex over every item that is not deleted."""
+    index = PrefixIndex()
+    cursor.execute(f"SELECT item_id, status, {', '.join(SUGGEST_COLUMNS.values())} FROM items WHERE status != 'deleted'")
+    index.load(
+        (row['item_id'], row['status'], {kind: row[column] or '' for kind, column in SUGGEST_COLUMNS.items()})
+        for row in cursor.fetchall()
+    )
+    return index
+
+
+# One index per pool (see count_cache.PoolIndexCache)
+suggestion_indexes = PoolIndexCache(build_suggestion_index, SUGGEST_REFRESH_SECONDS)
+
+
+def suggestion_index(pool):
+    """The PrefixIndex of `pool`, built on first use and checked every SUGGEST_REFRESH_SECONDS."""
+    return suggestion_indexes.get(pool)
+
+
+def note_item(pool, item_id, row):
+    """
+    Apply an item write made by this process to the pool's index (if built).
+
+    Args:
+        pool: Pool the write was committed on
+        item_id: Item id
+        row: Mapping with the item's status, name, category and location_found
+    """
+    index = suggestion_indexes.peek(pool)
+    if index is not None:
+        index.note_item(item_id, row.get('status'),
+                        **{kind: row.get(column) or '' for kind, column in SUGGEST_COLUMNS.items()})
+
+
+__all__ = [
+    'SUGGEST_MAX_LIMIT', 'PrefixIndex', 'build_suggestion_index', 'suggestion_indexes', 'suggestion_index', 'note_item'
+]
@@ -0,0 +1,150 @@
+"""
+Trigram Index Module
+In-process inverted trigram index for typo-tolerant lookups ("walet",
+"calcualtor", "airpod").
+
+Words are split into trigrams the way PostgreSQL's pg_trgm does (two spaces
+before the word, one after), and similarity is the share of trigrams two
+words have in common (same as pg_trgm's similarity()). The index maps each
+trigram to the distinct words containing it, and each word to the documents
+containing it, so a lookup only touches the words that share a trigram with
+the query, never every document. Candidates per query word and results are
+capped, which keeps a lookup bounded however large the corpus grows.
+
+Documents can be replaced (add again) or removed, so the index can follow
+writes instead of being rebuilt.
+
+Usage:
+    index = TrigramIndex()
+    index.add(1, 'Black Wallet', 'Leather wallet with a WatCard')
+    index.search('blak walet')      # [(1, 0.5)]
+    index.remove(1)
+"""
+
+import re
+from collections import defaultdict
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+# pg_trgm's default similarity threshold
+DEFAULT_THRESHOLD = 0.3
+# Closest vocabulary words considered per query word
+MAX_CANDIDATES = 50
+
+
+def words(text):
+    """Lower-cased words of `text`."""
+    return _WORD.findall((text or '').lower())
+
+
+def trigrams(word):
+    """Set of trigrams of one lower-cased word, padded like pg_trgm."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted trigram index over the words of a set of documents."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_candidates=MAX_CANDIDATES):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self._postings = defaultdict(set)    # trigram -> words
+        self._word_trigrams = {}             # word -> its trigram count
+        self._documents = defaultdict(set)   # word -> document ids
+        self._document_words = {}            # document id -> its words
+
+    @property
+    def document_count(self):
+        return len(self._document_words)
+
+    def add(self, doc_id, *texts):
+        """Index the words of `texts` under `doc_id`, replacing what it had."""
+        self.remove(doc_id)
+        doc_words = {word for text in texts for word in words(text)}
+        self._document_words[doc_id] = doc_words
+        for word in doc_words:
+            self._documents[word].add(doc_id)
+            if word not in self._word_trigrams:
+                grams = trigrams(word)
+                self._word_trigrams[word] = len(grams)
+                for gram in grams:
+                    self._postings[gram].add(word)
+
+    def remove(self, doc_id):
+        """Drop a document; words no other document uses leave the vocabulary."""
+        for word in self._document_words.pop(doc_id, ()):
+            documents = self._documents[word]
+            documents.discard(doc_id)
+            if documents:
+                continue
+            del self._documents[word]
+            del self._word_trigrams[word]
+            for gram in trigrams(word):
+                self._postings[gram].discard(word)
+                if not self._postings[gram]:
+                    del self._postings[gram]
+
+    @property
+    def vocabulary_size(self):
+        return len(self._word_trigrams)
+
+    def similar_words(self, word):
+        """
+        Vocabulary words similar to `word`.
+
+        Returns:
+            list of (word, similarity) with similarity >= threshold, best first,
+            at most max_candidates long
+        """
+        grams = trigrams(word)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] += 1
+        scored = []
+        for candidate, common in shared.items():
+            similarity = common / (len(grams) + self._word_trigrams[candidate] - common)
+            if similarity >= self.threshold:
+                scored.append((candidate, similarity))
+        scored.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scored[:self.max_candidates]
+
+    def search(self, text, limit=None, accept=None):
+        """
+        Documents matching every word of `text` approximately.
+
+        Args:
+            text: Search string
+            limit: Maximum number of results (None for all)
+            accept: Predicate on document ids; documents it rejects are left
+                out before `limit` applies
+
+        Returns:
+            list of (doc_id, score) best first; score is the mean similarity
+            of each query word's closest word in the document
+        """
+        scores = None
+        query_words = list(dict.fromkeys(words(text)))
+        for word in query_words:
+            best = {}
+            for candidate, similarity in self.similar_words(word):
+                for doc_id in self._documents[candidate]:
+                    if similarity > best.get(doc_id, 0.0):
+                        best[doc_id] = similarity
+            if scores is None:
+                scores = best
+            else:
+                scores = {doc_id: total + best[doc_id] for doc_id, total in scores.items() if doc_id in best}
+            if not scores:
+                return []
+        if accept is not None:
+            scores = {doc_id: total for doc_id, total in scores.items() if accept(doc_id)}
+        if not scores:
+            return []
+        ranked = sorted(((doc_id, total / len(query_words)) for doc_id, total in scores.items()),
+                        key=lambda pair: (-pair[1], pair[0]))
+        return ranked if limit is None else ranked[:limit]
+
+
+__all__ = ['TrigramIndex', 'trigrams', 'words', 'DEFAULT_THRESHOLD']
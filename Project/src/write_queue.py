@@ -0,0 +1,221 @@
+"""
+Write-Behind Queue Module
+Moves secondary writes (audit log entries, last-login timestamps,
+notifications) out of the request.
+
+Requests submit (pool, query, params) and return immediately; one writer
+thread per process drains the queue and writes each batch with executemany
+in a single transaction, so the SQLite write lock is taken once per batch
+instead of once per row. The queue is bounded: when it is full the write is
+done synchronously by the caller instead of being dropped. Pending writes
+are flushed at interpreter exit.
+
+Usage:
+    from write_queue import get_write_queue
+
+    get_write_queue().submit(pool, LOG_ACTIVITY, (user_id, ...))
+    get_write_queue().flush()      # wait until everything queued is written
+    get_write_queue().stats()      # depth, batch sizes, overflows, failures
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+# Queue sizing (overridable per deployment)
+WRITE_QUEUE_SIZE = int(os.getenv('WRITE_QUEUE_SIZE', '10000'))
+WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', '500'))
+# 'false' writes synchronously in the request (no writer thread)
+WRITE_BEHIND = os.getenv('WRITE_BEHIND', 'true').lower() == 'true'
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Bounded queue of fire-and-forget writes drained by a single writer thread."""
+
+    def __init__(self, capacity=WRITE_QUEUE_SIZE, batch_size=WRITE_BATCH_SIZE, enabled=WRITE_BEHIND):
+        self.capacity = max(1, capacity)
+        self.batch_size = max(1, batch_size)
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=self.capacity)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._written = 0
+        self._failed = 0
+        self._overflows = 0
+        self._batches = 0
+        self._last_batch_size = 0
+        self._max_batch_size = 0
+
+    def submit(self, pool, query, params):
+        """
+        Queue one write.
+
+        Args:
+            pool: Connection pool of the database to write to
+            query: Query (or SQL string) to run
+            params: Parameters for one row
+        """
+        item = (pool, query, params)
+        if not self.enabled:
+            self._write_batch([item])
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Never drop audit data: fall back to writing in the caller's thread
+            with self._stats_lock:
+                self._overflows += 1
+            self._write_batch([item])
+            return
+        with self._stats_lock:
+            self._enqueued += 1
+
+    def flush(self, timeout=None):
+        """Wait until every queued write has been attempted. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self, timeout=5):
+        """Write everything still queued, then stop the writer thread."""
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def stats(self):
+        """Return a snapshot of queue usage."""
+        with self._stats_lock:
+            return {
+                'enabled': self.enabled,
+                'depth': self._queue.qsize(),
+                'capacity': self.capacity,
+                'enqueued': self._enqueued,
+                'written': self._written,
+                'failed': self._failed,
+                'overflows': self._overflows,
+                'batches': self._batches,
+                'last_batch_size': self._last_batch_size,
+                'max_batch_size': self._max_batch_size,
+                'avg_batch_size': round((self._written + self._failed) / self._batches, 2) if self._batches else 0.0
+            }
+
+    def _ensure_writer(self):
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid != pid:
+                # Forked (e.g. gunicorn --preload): the parent's thread and locks are not ours
+                self._queue = queue.Queue(maxsize=self.capacity)
+                self._thread = None
+                self._pid = pid
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        """Write a batch: one transaction per database, one executemany per statement."""
+        by_pool = {}
+        for pool, query, params in batch:
+            by_pool.setdefault(pool, {}).setdefault(query, []).append(params)
+
+        for pool, statements in by_pool.items():
+            count = sum(len(rows) for rows in statements.values())
+            try:
+                conn = pool.connection()
+            except Exception as exc:
+                print(f"Warning: write-behind batch of {count} dropped, no connection: {exc}")
+                self._record_batch(0, count)
+                continue
+            try:
+                try:
+                    cursor = conn.cursor()
+                    for query, rows in statements.items():
+                        cursor.executemany(query, rows)
+                    conn.commit()
+                    self._record_batch(count, 0)
+                except Exception as exc:
+                    conn.rollback()
+                    print(f"Warning: write-behind batch failed ({exc}); retrying rows one by one")
+                    self._write_rows(conn, statements)
+            finally:
+                conn.close()
+
+    def _write_rows(self, conn, statements):
+        """Fallback after a failed batch: keep the good rows, count the bad ones."""
+        written = failed = 0
+        cursor = conn.cursor()
+        for query, rows in statements.items():
+            for params in rows:
+                try:
+                    cursor.execute(query, params)
+                    conn.commit()
+                    written += 1
+                except Exception as exc:
+                    conn.rollback()
+                    failed += 1
+                    print(f"Warning: Failed to write queued row: {exc}")
+        self._record_batch(written, failed)
+
+    def _record_batch(self, written, failed):
+        with self._stats_lock:
+            self._batches += 1
+            self._written += written
+            self._failed += failed
+            self._last_batch_size = written + failed
+            self._max_batch_size = max(self._max_batch_size, written + failed)
+
+
+_write_queue = WriteBehindQueue()
+atexit.register(_write_queue.stop)
+
+
+def get_write_queue():
+    """Return the process-wide write-behind queue."""
+    return _write_queue
+
+
+__all__ = ['WriteBehindQueue', 'get_write_queue', 'WRITE_BEHIND']
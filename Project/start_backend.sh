@@ -28,6 +28,13 @@ if [ ! -f "../.deps_installed" ]; then
     touch ../.deps_installed
 fi
 
+# Apply pending schema migrations
+echo "🗄️  Applying database migrations..."
+python3 migrations.py upgrade
+
+# Create the default staff account if it is missing (no-op afterwards)
+python3 seed.py
+
 # Start the Flask app
 echo "🚀 Starting Flask backend server..."
 echo ""
@@ -0,0 +1,144 @@
+"""
+Shared test configuration.
+
+Secondary writes (audit log, last login, notifications) are made in the
+request instead of by the write-behind queue, so a test can read what a
+request wrote as soon as it returns. test_write_queue.py builds its own
+queues with enabled=True to test the writer thread.
+
+The `pool` fixture runs a test once per backend on an empty database:
+- sqlite: a fresh file named after the test module (test_x.py -> test_x.db)
+- postgresql: the database in TEST_DATABASE_URL with the app's tables
+  dropped (skipped when unset)
+
+`migrated_pool` is that pool upgraded to the latest schema with USERS
+(password PASSWORD). A test module adds its own rows by overriding `pool`
+(requesting `pool` as well keeps the per-backend parameters):
+
+    @pytest.fixture
+    def pool(pool, migrated_pool):
+        conn = migrated_pool.connection()
+        ...
+        yield migrated_pool
+
+`client_for(pool, email)` returns a test client whose routes use `pool`,
+logged in as `email` (logged out when it is None); `login(client, email)`
+logs an existing client in and `add_users(conn, users)` adds more PASSWORD
+users.
+
+A migration adding a table adds it to APP_TABLES.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('WRITE_BEHIND', 'false')
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+import db_config
+import migrations
+from app import app, hash_password
+from db_pool import SQLitePool, PostgresPool
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL', '')
+
+# Users of migrated_pool: (email, role), named after the role ('Staff')
+USERS = [('staff@uwaterloo.ca', 'staff'), ('student@uwaterloo.ca', 'student')]
+PASSWORD = 'password123'
+
+# Every table the migrations create, dependents first
+APP_TABLES = ['notifications', 'activity_log', 'item_claim_summary', 'claims', 'sessions', 'items', 'users',
+              'schema_version', 'generations', 'categories', 'locations', 'desks',
+              'saved_searches']
+
+
+def _drop_app_tables(conn):
+    for table in APP_TABLES:
+        conn.execute(f'DROP TABLE IF EXISTS {table} CASCADE')
+    conn.commit()
+
+
+@pytest.fixture
+def drop_app_tables():
+    """Function dropping the app's tables on a PostgreSQL connection."""
+    return _drop_app_tables
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def pool(request):
+    """A pool for each backend on an empty database."""
+    if request.param == 'sqlite':
+        db_path = os.path.join(os.path.dirname(__file__), '..', f'{request.module.__name__.split(".")[-1]}.db')
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        pool = SQLitePool(db_path, profile='default')
+    else:
+        if not TEST_DATABASE_URL:
+            pytest.skip('TEST_DATABASE_URL not set')
+        pool = PostgresPool(db_config.postgres_connect_kwargs(TEST_DATABASE_URL))
+        conn = pool.connection()
+        _drop_app_tables(conn)
+        conn.close()
+
+    yield pool
+
+    pool.close()
+    if request.param == 'sqlite' and os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def add_users(conn, users):
+    """Insert (email, role) users with PASSWORD; the caller commits."""
+    password_hash = hash_password(PASSWORD)
+    for email, role in users:
+        conn.execute(
+            'INSERT INTO users (email, name, password_hash, role) VALUES (?, ?, ?, ?)',
+            (email, role.title(), password_hash, role)
+        )
+
+
+@pytest.fixture
+def migrated_pool(pool):
+    """`pool` upgraded to the latest schema, with USERS."""
+    conn = pool.connection()
+    migrations.upgrade(conn)
+    add_users(conn, USERS)
+    conn.commit()
+    conn.close()
+    return pool
+
+
+def login(client, email, password=PASSWORD):
+    """Log `client` in as `email`; the login must succeed."""
+    response = client.post('/auth/login', data=json.dumps({'email': email, 'password': password}),
+                           content_type='application/json')
+    assert response.status_code == 200
+    return response
+
+
+@pytest.fixture
+def client_for(monkeypatch):
+    """Function returning a test client whose routes use `pool`, logged in as `email` (None: not logged in)."""
+    app.config['TESTING'] = True
+
+    def client_for(pool, email='staff@uwaterloo.ca'):
+        monkeypatch.setattr(app_module, 'get_pool', lambda *args, **kwargs: pool)
+        client = app.test_client()
+        if email is not None:
+            login(client, email)
+        return client
+
+    return client_for
+
+
+@pytest.fixture
+def client(pool, client_for):
+    """Logged-in staff client whose routes use the backend under test."""
+    return client_for(pool)
@@ -0,0 +1,100 @@
+"""
+Test suite for the application factory and the default account seed command.
+
+Tests cover:
+- create_app() builds independent apps with config overrides
+- Building the app performs no writes and no password hashing
+- seed.py creates the default staff account once and can reset its password
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import create_app, verify_password
+import migrations
+import seed
+from db_pool import SQLitePool
+
+TEST_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'test_app_factory.db')
+
+
+@pytest.fixture
+def db_pool(monkeypatch):
+    """Migrated test database that the app's connection helpers use."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    pool = SQLitePool(TEST_DB_PATH, profile='default')
+    conn = pool.connection()
+    migrations.upgrade(conn)
+    conn.close()
+    monkeypatch.setattr(app_module, 'get_pool', lambda *args, **kwargs: pool)
+    yield pool
+    pool.close()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+def count_users(pool):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) AS count FROM users')
+    count = cursor.fetchone()['count']
+    conn.close()
+    return count
+
+
+def test_create_app_returns_independent_apps(db_pool):
+    """Each call builds a new app; config overrides apply to that app only."""
+    first = create_app({'TESTING': True, 'CHECK_SCHEMA': False})
+    second = create_app({'CHECK_SCHEMA': False})
+    assert first is not second
+    assert first.config['TESTING'] is True
+    assert not second.config.get('TESTING')
+    assert first.config['SESSION_TYPE'] == 'filesystem'
+
+    with first.test_client() as client:
+        response = client.get('/api/health')
+    assert response.status_code == 200
+
+
+def test_create_app_has_no_side_effects(db_pool, monkeypatch):
+    """Building the app neither seeds accounts nor hashes passwords."""
+    def fail(*args, **kwargs):
+        raise AssertionError('bcrypt called during app creation')
+
+    monkeypatch.setattr(app_module.bcrypt, 'hashpw', fail)
+    monkeypatch.setattr(app_module.bcrypt, 'checkpw', fail)
+    create_app()
+    assert count_users(db_pool) == 0
+
+
+def test_seed_creates_default_staff_account_once(db_pool):
+    """The seed command creates the account, then leaves it alone."""
+    assert seed.create_default_staff_account() == 'created'
+    assert seed.create_default_staff_account() == 'exists'
+    assert count_users(db_pool) == 1
+
+
+def test_seed_reset_password(db_pool):
+    """--reset-password restores the default password."""
+    seed.create_default_staff_account()
+    conn = db_pool.connection()
+    conn.execute("UPDATE users SET password_hash = 'stale' WHERE email = ?", (seed.DEFAULT_STAFF_EMAIL,))
+    conn.commit()
+    conn.close()
+
+    assert seed.main(['--reset-password']) == 0
+    conn = db_pool.connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT password_hash FROM users WHERE email = ?', (seed.DEFAULT_STAFF_EMAIL,))
+    password_hash = cursor.fetchone()['password_hash']
+    conn.close()
+    assert verify_password(seed.DEFAULT_STAFF_PASSWORD, password_hash)
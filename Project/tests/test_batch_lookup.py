@@ -0,0 +1,146 @@
+"""
+Test suite for /api/items/batch and /api/claims/batch.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Items and claims returned in the order asked for, with the single-item fields
+- Deleted items hidden from students, other users' claims hidden from students
+- Unknown ids listed as missing
+- One query per batch, with few statement variants across batch sizes
+- Validation of ids and the batch size cap
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+from app import batch_params, BATCH_MAX_IDS
+from queries import query_stats
+from write_queue import get_write_queue
+
+from conftest import add_users
+
+
+# Added to conftest.USERS (staff is user 1, student 2)
+OTHER_STUDENT = ('other@uwaterloo.ca', 'student')
+
+ITEMS = [
+    # name, status
+    ('Black Wallet', 'unclaimed'),
+    ('Water Bottle', 'unclaimed'),
+    ('Blue Umbrella', 'deleted'),
+]
+
+CLAIMS = [
+    # item_id, claimant_user_id
+    (1, 2),
+    (2, 3),
+    (1, 3),
+]
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with a second student, ITEMS and CLAIMS."""
+    conn = migrated_pool.connection()
+    add_users(conn, [OTHER_STUDENT])
+    for name, status in ITEMS:
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found,
+                               found_by_desk, status)
+            VALUES (?, ?, 'cards', 'SLC Great Hall', 'SLC', '2025-11-20 10:00:00', 'SLC', ?)
+        ''', (name, name, status))
+    for item_id, user_id in CLAIMS:
+        conn.execute('''
+            INSERT INTO claims (item_id, claimant_user_id, claimant_name, claimant_email, verification_text)
+            VALUES (?, ?, 'Student', 'student@uwaterloo.ca', 'Mine')
+        ''', (item_id, user_id))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+    get_write_queue().flush(timeout=10)
+
+
+@pytest.fixture
+def clients(pool, client_for):
+    """Logged-in staff and student clients whose routes use the backend under test."""
+    return client_for(pool, 'staff@uwaterloo.ca'), client_for(pool, 'student@uwaterloo.ca')
+
+
+def batch(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def query_calls(name):
+    return next((row['count'] for row in query_stats() if row['name'] == name), 0)
+
+
+def test_items_in_requested_order(clients):
+    staff, _student = clients
+    data = batch(staff, '/api/items/batch?ids=2,1,2')
+    assert [item['item_id'] for item in data['items']] == [2, 1]
+    assert data['count'] == 2
+    assert data['missing'] == []
+    assert data['items'][0] == staff.get('/api/items/2').get_json()['item']
+
+
+def test_deleted_items_visible_to_staff_only(clients):
+    staff, student = clients
+    assert [item['item_id'] for item in batch(staff, '/api/items/batch?ids=1,3')['items']] == [1, 3]
+    data = batch(student, '/api/items/batch?ids=1,3,99')
+    assert [item['item_id'] for item in data['items']] == [1]
+    assert data['missing'] == [3, 99]
+
+
+def test_claims_visibility(clients):
+    staff, student = clients
+    data = batch(staff, '/api/claims/batch?ids=3,1,2')
+    assert [claim['claim_id'] for claim in data['claims']] == [3, 1, 2]
+    assert data['claims'][1] == staff.get('/api/claims/1').get_json()['claim']
+
+    data = batch(student, '/api/claims/batch?ids=1,2,3')
+    assert [claim['claim_id'] for claim in data['claims']] == [1]
+    assert data['missing'] == [2, 3]
+
+
+def test_one_query_per_batch(clients):
+    staff, _student = clients
+    calls = query_calls('items.batch')
+    batch(staff, '/api/items/batch?ids=1,2,3')
+    assert query_calls('items.batch') == calls + 1
+
+
+def test_padding_limits_statement_variants():
+    sizes = range(1, BATCH_MAX_IDS + 1)
+    texts = {batch_params(list(range(size)))[0] for size in sizes}
+    assert len(texts) == 8
+    placeholders, params = batch_params([5, 6, 7])
+    assert placeholders == '?, ?, ?, ?'
+    assert params == [5, 6, 7, 7]
+
+
+def test_not_modified(clients):
+    staff, _student = clients
+    first = staff.get('/api/items/batch?ids=1,2')
+    second = staff.get('/api/items/batch?ids=1,2', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+
+
+def test_validation(clients):
+    staff, _student = clients
+    too_many = ','.join(str(item_id) for item_id in range(1, BATCH_MAX_IDS + 2))
+    for url in ('/api/items/batch', '/api/items/batch?ids=', '/api/items/batch?ids=1,abc',
+                '/api/items/batch?ids=-1', f'/api/items/batch?ids={too_many}', '/api/claims/batch?ids=x'):
+        assert staff.get(url).status_code == 400, url
@@ -0,0 +1,110 @@
+"""
+Concurrency stress test for claim creation.
+
+Hundreds of claims for one item are submitted at the same time from many
+sessions. Runs once per backend like test_data_access.py (PostgreSQL only
+when TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Exactly one active claim per user and item under concurrent submissions
+- Duplicates answered with 409 (never 500)
+- Item claim summary counts every concurrent claim
+- Migration 2 closes existing duplicates before adding the unique index
+
+Author: Team 15
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import app
+import migrations
+
+from conftest import add_users
+
+
+STUDENTS = 20
+ATTEMPTS_PER_STUDENT = 10
+
+
+def seed(pool):
+    """Students plus one unclaimed item; returns the item id."""
+    conn = pool.connection()
+    add_users(conn, [(f'student{i}@uwaterloo.ca', 'student') for i in range(STUDENTS)])
+    cursor = conn.cursor()
+    item_id = cursor.insert_returning_id('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', ('Black Wallet', 'Black wallet', 'wallets', 'SLC', 'SLC', '2025-11-20 10:00:00', 'SLC'), 'item_id')
+    conn.commit()
+    conn.close()
+    return item_id
+
+
+def scalar(pool, sql, params=()):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    value = cursor.fetchone()['value']
+    conn.close()
+    return value
+
+
+def test_concurrent_claims_create_one_per_user(migrated_pool, client_for, monkeypatch):
+    """200 simultaneous submissions from 20 users produce 20 claims and 180 conflicts."""
+    pool = migrated_pool
+    item_id = seed(pool)
+    monkeypatch.setattr(app_module.email_utils, 'send_claim_submitted_email', lambda **kwargs: True)
+
+    clients = [client_for(pool, f'student{i}@uwaterloo.ca') for i in range(STUDENTS)]
+
+    def submit(client):
+        response = client.post('/api/claims', json={
+            'item_id': item_id,
+            'verification_text': 'Black leather wallet with my WatCard inside'
+        })
+        return response.status_code
+
+    jobs = [client for client in clients for _ in range(ATTEMPTS_PER_STUDENT)]
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        statuses = list(executor.map(submit, jobs))
+
+    assert statuses.count(201) == STUDENTS
+    assert statuses.count(409) == STUDENTS * (ATTEMPTS_PER_STUDENT - 1)
+    assert scalar(pool, 'SELECT COUNT(*) AS value FROM claims WHERE item_id = ?', (item_id,)) == STUDENTS
+    assert scalar(pool, 'SELECT COUNT(DISTINCT claimant_user_id) AS value FROM claims WHERE item_id = ?',
+                  (item_id,)) == STUDENTS
+    # The claim summary trigger counted every concurrent insert
+    assert scalar(pool, 'SELECT pending_claims AS value FROM item_claim_summary WHERE item_id = ?',
+                  (item_id,)) == STUDENTS
+
+
+def test_migration_closes_existing_duplicates(pool):
+    """Duplicates created before the index existed are rejected, keeping the approved claim."""
+    conn = pool.connection()
+    migrations.upgrade(conn, target=1)
+    conn.close()
+    item_id = seed(pool)
+
+    conn = pool.connection()
+    cursor = conn.cursor()
+    for status in ('pending', 'approved', 'pending'):
+        cursor.execute('''
+            INSERT INTO claims (item_id, claimant_user_id, claimant_name, claimant_email, verification_text, status)
+            VALUES (?, 1, 'Student 0', 'student0@uwaterloo.ca', 'mine', ?)
+        ''', (item_id, status))
+    conn.commit()
+    applied = migrations.upgrade(conn, target=2)
+    assert [step.version for step in applied] == [2]
+
+    cursor.execute('SELECT claim_id, status, staff_notes FROM claims ORDER BY claim_id')
+    rows = cursor.fetchall()
+    conn.close()
+    assert [row['status'] for row in rows] == ['rejected', 'approved', 'rejected']
+    assert 'duplicate' in rows[0]['staff_notes']
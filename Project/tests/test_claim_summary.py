@@ -0,0 +1,166 @@
+"""
+Test suite for the denormalized item claim summary.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Summary follows claim inserts, status changes, deletes and moves
+- Latest claim chosen by updated_at, ties by claim_id
+- Items listing served from the summary (no claims subqueries)
+- Consistency checker reports drift and rebuild repairs it
+- Migration 6 fills the summary from existing claims
+
+Author: Team 15
+"""
+
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import claim_summary
+import migrations
+from queries import _queries
+
+from conftest import USERS, add_users
+
+
+def seed(pool, target=None):
+    """Migrate, then add a staff user, a student and two items."""
+    conn = pool.connection()
+    migrations.upgrade(conn, target=target)
+    add_users(conn, USERS)
+    cursor = conn.cursor()
+    for name in ('Wallet', 'Umbrella'):
+        cursor.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, ?, 'other', 'SLC', 'SLC', '2025-11-20 10:00:00', 'SLC')
+        ''', (name, f'{name} description'))
+    conn.commit()
+    conn.close()
+
+
+def add_claim(conn, item_id, name, status='pending', updated_at='2025-11-21 10:00:00'):
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id FROM users WHERE email = 'student@uwaterloo.ca'")
+    user_id = cursor.fetchone()['user_id']
+    claim_id = cursor.insert_returning_id('''
+        INSERT INTO claims (item_id, claimant_user_id, claimant_name, claimant_email,
+                            verification_text, status, updated_at)
+        VALUES (?, ?, ?, 'student@uwaterloo.ca', 'It has my WatCard inside', ?, ?)
+    ''', (item_id, user_id, name, status, updated_at), 'claim_id')
+    conn.commit()
+    return claim_id
+
+
+def summary(conn, item_id):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT {', '.join(claim_summary.SUMMARY_COLUMNS)} FROM item_claim_summary WHERE item_id = ?",
+        (item_id,)
+    )
+    row = cursor.fetchone()
+    return None if row is None else {column: row[column] for column in claim_summary.SUMMARY_COLUMNS}
+
+
+def test_summary_follows_claim_changes(pool):
+    """Every kind of claim write leaves the summary matching the claims."""
+    seed(pool)
+    conn = pool.connection()
+    first = add_claim(conn, 1, 'Ann', updated_at='2025-11-21 10:00:00')
+    second = add_claim(conn, 1, 'Ben', status='rejected', updated_at='2025-11-21 11:00:00')
+    assert summary(conn, 1) == {
+        'latest_claim_id': second, 'latest_claim_status': 'rejected', 'latest_claimant_name': 'Ben',
+        'pending_claims': 1, 'approved_claims': 0, 'picked_up_claims': 0,
+    }
+    assert summary(conn, 2) is None
+
+    conn.execute("UPDATE claims SET status = 'approved', updated_at = '2025-11-22 09:00:00' WHERE claim_id = ?",
+                 (first,))
+    conn.commit()
+    assert summary(conn, 1)['latest_claim_id'] == first
+    assert summary(conn, 1)['approved_claims'] == 1
+    assert summary(conn, 1)['pending_claims'] == 0
+
+    # Moving a claim to another item refreshes both items
+    conn.execute('UPDATE claims SET item_id = 2 WHERE claim_id = ?', (second,))
+    conn.commit()
+    assert summary(conn, 1)['latest_claim_id'] == first
+    assert summary(conn, 2)['latest_claimant_name'] == 'Ben'
+
+    conn.execute('DELETE FROM claims WHERE claim_id = ?', (second,))
+    conn.commit()
+    assert summary(conn, 2) is None
+    assert claim_summary.check(conn.cursor()) == []
+    conn.close()
+
+
+def test_latest_claim_ties_broken_by_id(pool):
+    """Claims updated in the same second resolve to the newest claim."""
+    seed(pool)
+    conn = pool.connection()
+    add_claim(conn, 1, 'Ann', status='rejected')
+    newest = add_claim(conn, 1, 'Ben')
+    assert summary(conn, 1)['latest_claim_id'] == newest
+    conn.close()
+
+
+def test_listing_uses_summary(pool, client_for):
+    """GET /api/items returns the summary without querying claims per row."""
+    seed(pool)
+    conn = pool.connection()
+    add_claim(conn, 1, 'Ann', status='picked_up')
+    conn.close()
+
+    response = client_for(pool).get('/api/items?sort=oldest')
+    assert response.status_code == 200
+    wallet, umbrella = response.get_json()['items']
+    assert wallet['latest_claimant_name'] == 'Ann'
+    assert wallet['picked_up_claims'] == 1
+    assert wallet['is_picked_up'] is True
+    assert umbrella['latest_claim_id'] is None
+    assert umbrella['pending_claims'] == 0
+
+    page_sql = [sql for name, sql, _prepare in list(_queries) if name == 'items.page']
+    assert page_sql and not any('FROM claims' in sql for sql in page_sql)
+
+
+def test_check_and_rebuild(pool):
+    """Drift is reported item by item and rebuild() repairs it."""
+    seed(pool)
+    conn = pool.connection()
+    add_claim(conn, 1, 'Ann')
+    add_claim(conn, 2, 'Ben')
+    conn.execute('UPDATE item_claim_summary SET pending_claims = 5 WHERE item_id = 1')
+    conn.execute('DELETE FROM item_claim_summary WHERE item_id = 2')
+    conn.commit()
+
+    cursor = conn.cursor()
+    problems = claim_summary.check(cursor)
+    assert [problem['item_id'] for problem in problems] == [1, 2]
+    assert problems[0]['actual']['pending_claims'] == 5
+    assert problems[0]['expected']['pending_claims'] == 1
+    assert problems[1]['actual'] is None
+
+    assert claim_summary.rebuild(cursor) == 2
+    conn.commit()
+    assert claim_summary.check(cursor) == []
+    conn.close()
+
+
+def test_migration_fills_existing_claims(pool):
+    """Claims made before migration 6 are summarized when it runs."""
+    seed(pool, target=5)
+    conn = pool.connection()
+    add_claim(conn, 1, 'Ann', status='rejected')
+    add_claim(conn, 1, 'Ben', status='approved', updated_at='2025-11-22 10:00:00')
+
+    applied = migrations.upgrade(conn, target=6)
+    assert [step.version for step in applied] == [6]
+    assert summary(conn, 1)['latest_claimant_name'] == 'Ben'
+    assert summary(conn, 1)['pending_claims'] == 0
+    assert summary(conn, 1)['approved_claims'] == 1
+    conn.close()
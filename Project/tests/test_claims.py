@@ -30,6 +30,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 # Import after path is set
 import app as app_module
 from app import app, hash_password
+import migrations
+from db_pool import SQLitePool
 
 @pytest.fixture
 def client():
@@ -131,6 +133,13 @@ def client():
     conn.commit()
     conn.close()
     
+    # Add what later migrations build on these tables (e.g. the item claim summary)
+    pool = SQLitePool(test_db, profile='default')
+    pool_conn = pool.connection()
+    migrations.upgrade(pool_conn)
+    pool_conn.close()
+    pool.close()
+    
     with app.test_client() as client:
         yield client
     
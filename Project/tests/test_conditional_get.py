@@ -0,0 +1,188 @@
+"""
+Test suite for ETag / Last-Modified conditional GETs.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- /api/items answers 304 to a current If-None-Match without running the listing
+- ETags differ per parameters and role, and change with item and claim writes
+- If-Modified-Since honoured, but a stale If-None-Match wins over it
+- No Last-Modified (and no 304 on If-Modified-Since alone) within the change's second
+- /api/items/<id>, /api/claims and /api/notifications validators
+- Migration 10 adds generations.changed_at and the notifications counter
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import conditional
+from datetime import datetime, timedelta, timezone
+
+from count_cache import ROW_GENERATIONS
+from db_config import column_names
+from queries import query_stats
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with two items."""
+    conn = migrated_pool.connection()
+    for name in ('Black Wallet', 'Water Bottle'):
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, ?, 'cards', 'SLC Great Hall', 'SLC', '2025-11-20 10:00:00', 'SLC')
+        ''', (name, name))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+@pytest.fixture
+def client(pool, client_for):
+    """Logged-in student client whose routes use the backend under test."""
+    return client_for(pool, 'student@uwaterloo.ca')
+
+
+def execute(pool, sql, params=()):
+    conn = pool.connection()
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def settle(monkeypatch):
+    """Move the clock past the second of every change so far."""
+    later = datetime.now(timezone.utc) + timedelta(seconds=2)
+    monkeypatch.setattr(conditional, '_now', lambda: later)
+
+
+def revalidate(client, url, response):
+    """Status of a conditional request with the validators of an earlier response."""
+    return client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code
+
+
+def page_calls():
+    return next((row['count'] for row in query_stats() if row['name'] == 'items.page'), 0)
+
+
+def test_items_not_modified(client, monkeypatch):
+    """A current ETag is answered 304 with no body and no listing query."""
+    settle(monkeypatch)
+    first = client.get('/api/items')
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith('"')
+    assert first.headers['Last-Modified']
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    calls = page_calls()
+    second = client.get('/api/items', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    assert second.get_data() == b''
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert page_calls() == calls
+
+
+def test_items_etag_follows_request_and_writes(client, pool, client_for):
+    first = client.get('/api/items')
+    assert client.get('/api/items?sort=oldest').headers['ETag'] != first.headers['ETag']
+
+    staff = client_for(pool, 'staff@uwaterloo.ca')
+    assert staff.get('/api/items').headers['ETag'] != first.headers['ETag']
+
+    execute(pool, "UPDATE items SET category = 'keys' WHERE name = 'Water Bottle'")
+    assert revalidate(client, '/api/items', first) == 200
+
+    current = client.get('/api/items')
+    execute(pool, '''
+        INSERT INTO claims (item_id, claimant_user_id, claimant_name, claimant_email, verification_text)
+        VALUES (1, 2, 'Student', 'student@uwaterloo.ca', 'Mine')
+    ''')
+    assert revalidate(client, '/api/items', current) == 200
+
+
+def test_if_modified_since(client, pool, monkeypatch):
+    """Last-Modified works alone; a stale ETag is not overridden by it."""
+    settle(monkeypatch)
+    first = client.get('/api/items')
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get('/api/items', headers=since).status_code == 304
+
+    execute(pool, "UPDATE items SET category = 'keys' WHERE name = 'Water Bottle'")
+    stale = dict(since, **{'If-None-Match': first.headers['ETag']})
+    assert client.get('/api/items', headers=stale).status_code == 200
+
+
+def test_last_modified_within_its_second(client, pool, monkeypatch):
+    """A write later in the same second would not move Last-Modified, so it is withheld."""
+    conn = pool.connection()
+    changed = conditional.read_version(conn.cursor(), (ROW_GENERATIONS['items'],)).last_modified
+    conn.close()
+    monkeypatch.setattr(conditional, '_now', lambda: changed + timedelta(milliseconds=500))
+
+    response = client.get('/api/items')
+    assert 'Last-Modified' not in response.headers
+    since = {'If-Modified-Since': changed.strftime('%a, %d %b %Y %H:%M:%S GMT')}
+    assert client.get('/api/items', headers=since).status_code == 200
+    assert revalidate(client, '/api/items', response) == 304
+
+    settle(monkeypatch)
+    assert client.get('/api/items', headers=since).status_code == 304
+
+
+def test_item_detail(client, pool):
+    first = client.get('/api/items/1')
+    assert first.status_code == 200
+    assert revalidate(client, '/api/items/1', first) == 304
+    assert client.get('/api/items/2').headers['ETag'] != first.headers['ETag']
+
+    execute(pool, "UPDATE items SET description = 'Leather' WHERE item_id = 1")
+    assert revalidate(client, '/api/items/1', first) == 200
+
+
+def test_claims(client, pool):
+    response = client.post('/api/claims', data=json.dumps({
+        'item_id': 1, 'verification_text': 'Black leather, my WatCard inside'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    claim_id = response.get_json()['claim']['claim_id']
+
+    first = client.get('/api/claims')
+    assert first.get_json()['count'] == 1
+    assert revalidate(client, '/api/claims', first) == 304
+
+    execute(pool, "UPDATE claims SET status = 'rejected' WHERE claim_id = ?", (claim_id,))
+    assert revalidate(client, '/api/claims', first) == 200
+
+
+def test_notifications(client, pool):
+    first = client.get('/api/notifications')
+    assert first.status_code == 200
+    assert revalidate(client, '/api/notifications', first) == 304
+
+    execute(pool, "INSERT INTO notifications (user_id, title, message) VALUES (2, 'Claim update', 'Approved')")
+    second = client.get('/api/notifications', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert len(second.get_json()['notifications']) == 1
+
+    notification_id = second.get_json()['notifications'][0]['notification_id']
+    assert client.patch(f'/api/notifications/{notification_id}/read').status_code == 200
+    assert revalidate(client, '/api/notifications', second) == 200
+
+
+def test_migration_adds_change_times(pool):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    assert 'changed_at' in column_names(cursor, 'generations')
+    cursor.execute('SELECT changed_at FROM generations WHERE name = ?', (ROW_GENERATIONS['notifications'],))
+    assert cursor.fetchone()['changed_at'] is not None
+    conn.close()
@@ -0,0 +1,195 @@
+"""
+Test suite for optional and cached listing totals.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- CountCache LRU eviction and generation checks
+- Generation counters split over slot rows on PostgreSQL
+- include_total=false on /api/items and /api/activity-log (has_more only)
+- Counts reused until the counted table changes
+- Filters differing only in letter case share a count
+- Totals above COUNT_EXACT_LIMIT flagged approximate on PostgreSQL
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import count_cache
+from count_cache import CountCache, ROW_GENERATIONS, read_generation
+
+
+ITEM_COUNT = 7
+
+
+def insert_item(conn, name, category='cards'):
+    conn.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES (?, 'Found item', ?, 'SLC', 'SLC', '2025-11-20 10:00:00', 'SLC')
+    ''', (name, category))
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with items and log entries."""
+    conn = migrated_pool.connection()
+    for number in range(ITEM_COUNT):
+        insert_item(conn, f'Item {number}', category='cards' if number < 3 else 'other')
+        conn.execute(
+            "INSERT INTO activity_log (user_id, action_type, entity_type, entity_id) VALUES (1, 'item_added', 'item', ?)",
+            (number + 1,)
+        )
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+@pytest.fixture
+def counts(monkeypatch):
+    """Names of the counts actually run against the database."""
+    names = []
+    count_rows = count_cache.count_rows
+
+    def counting(cursor, name, *args, **kwargs):
+        names.append(name)
+        return count_rows(cursor, name, *args, **kwargs)
+
+    monkeypatch.setattr(count_cache, 'count_rows', counting)
+    return names
+
+
+def pagination(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.get_json()['pagination']
+
+
+def test_count_cache_lru_and_generation():
+    """Entries expire when their generation moves and the oldest is evicted."""
+    cache = CountCache(size=2)
+    cache.put('a', 1, 10, False)
+    cache.put('b', 1, 20, False)
+    assert cache.get('a', 1) == (10, False)
+    assert cache.get('a', 2) is None
+    assert cache.get('a', 1) is None
+    cache.put('c', 1, 30, True)
+    cache.put('d', 1, 40, False)
+    assert cache.get('b', 1) is None
+    assert len(cache) == 2
+
+
+def test_include_total_false(client, counts):
+    """No count is run; has_more comes from fetching one extra row."""
+    first = pagination(client, '/api/items?include_total=false&page_size=4')
+    assert 'total_count' not in first and 'total_pages' not in first
+    assert first['has_more'] is True
+    last = pagination(client, '/api/items?include_total=false&page_size=4&page=2')
+    assert last['has_more'] is False
+
+    keyset = pagination(client, '/api/items?include_total=false&cursor=&page_size=10')
+    assert keyset['has_more'] is False and 'total_count' not in keyset
+
+    response = client.get('/api/activity-log?include_total=false&page_size=5')
+    data = response.get_json()
+    assert len(data['logs']) == 5
+    assert data['has_more'] is True
+    assert 'total_count' not in data
+    assert counts == []
+
+
+def test_counts_reused_until_items_change(client, pool, counts):
+    """Repeated pages reuse the count; any item write forces a recount."""
+    assert pagination(client, '/api/items?page_size=2')['total_count'] == ITEM_COUNT
+    assert pagination(client, '/api/items?page_size=2&page=2')['total_count'] == ITEM_COUNT
+    assert counts == ['items.count']
+
+    conn = pool.connection()
+    insert_item(conn, 'Late arrival')
+    conn.commit()
+    assert pagination(client, '/api/items?page_size=2')['total_count'] == ITEM_COUNT + 1
+
+    conn.execute("UPDATE items SET status = 'deleted' WHERE name = 'Item 0'")
+    conn.commit()
+    conn.close()
+    assert pagination(client, '/api/items?page_size=2')['total_count'] == ITEM_COUNT
+    assert counts == ['items.count'] * 3
+
+
+def test_activity_log_counts_cached(client, pool, counts):
+    """The log count is cached separately and follows new entries."""
+    data = client.get('/api/activity-log').get_json()
+    assert data['total_count'] == ITEM_COUNT and data['approximate'] is False
+    client.get('/api/activity-log')
+    assert counts == ['activity_log.count']
+
+    # Item writes do not invalidate log counts
+    conn = pool.connection()
+    insert_item(conn, 'Unlogged')
+    conn.commit()
+    client.get('/api/activity-log')
+    assert counts == ['activity_log.count']
+
+    conn.execute("INSERT INTO activity_log (user_id, action_type, entity_type, entity_id) VALUES (1, 'item_added', 'item', 99)")
+    conn.commit()
+    conn.close()
+    assert client.get('/api/activity-log').get_json()['total_count'] == ITEM_COUNT + 1
+
+
+def test_filters_normalized(client, counts):
+    """category=Cards and category=cards are one cached count."""
+    assert pagination(client, '/api/items?category=Cards')['total_count'] == 3
+    assert pagination(client, '/api/items?category=cards')['total_count'] == 3
+    assert counts == ['items.count']
+
+
+def test_generations_bumped_by_writes(pool):
+    """Each write statement moves its table's generation."""
+    conn = pool.connection()
+    cursor = conn.cursor()
+    before = {table: read_generation(cursor, name) for table, name in ROW_GENERATIONS.items()}
+    conn.execute("UPDATE items SET category = 'keys' WHERE name = 'Item 1'")
+    conn.commit()
+    assert read_generation(cursor, ROW_GENERATIONS['items']) != before['items']
+    assert read_generation(cursor, ROW_GENERATIONS['activity_log']) == before['activity_log']
+    conn.execute('DELETE FROM activity_log WHERE entity_id = 1')
+    conn.commit()
+    assert read_generation(cursor, ROW_GENERATIONS['activity_log']) != before['activity_log']
+    conn.close()
+
+
+def test_generation_slots(pool):
+    """PostgreSQL splits each counter over slot rows; a write bumps one of them."""
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) AS count FROM generations WHERE name LIKE 'items.rows:%'")
+    assert cursor.fetchone()['count'] == (16 if pool.backend == 'postgresql' else 0)
+    cursor.execute("SELECT value FROM generations WHERE name = 'items.rows'")
+    base = cursor.fetchone()['value']
+    before = read_generation(cursor, ROW_GENERATIONS['items'])
+    conn.execute("UPDATE items SET category = 'keys' WHERE name = 'Item 1'")
+    conn.commit()
+    assert read_generation(cursor, ROW_GENERATIONS['items']) > before
+    cursor.execute("SELECT value FROM generations WHERE name = 'items.rows'")
+    assert (cursor.fetchone()['value'] == base) == (pool.backend == 'postgresql')
+    conn.close()
+
+
+def test_large_totals_approximate(client, pool, monkeypatch):
+    """Past COUNT_EXACT_LIMIT PostgreSQL estimates; SQLite counts exactly."""
+    monkeypatch.setattr(count_cache, 'COUNT_EXACT_LIMIT', 3)
+    result = pagination(client, '/api/items')
+    if pool.backend == 'postgresql':
+        assert result['approximate'] is True
+        assert result['total_count'] >= 4
+    else:
+        assert result['approximate'] is False
+        assert result['total_count'] == ITEM_COUNT
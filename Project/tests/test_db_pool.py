@@ -0,0 +1,220 @@
+"""
+Test suite for the database connection pool.
+
+Tests cover:
+- Connection reuse across checkouts
+- Pool size limit, waiting and timeout
+- Statistics (in use, idle, waiting, created)
+- One shared connection per request
+- Recovery when the database file is replaced
+- WAL profile PRAGMAs for reader and writer pools
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+import sqlite3
+import threading
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import app
+import db_pool
+from db_pool import SQLitePool, PoolTimeoutError, get_sqlite_pool
+from db_config import OperationalError
+
+TEST_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'test_db_pool.db')
+
+
+@pytest.fixture
+def db_path():
+    """Create an empty test database file."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    conn = sqlite3.connect(TEST_DB_PATH)
+    conn.execute('CREATE TABLE things (thing_id INTEGER PRIMARY KEY, label TEXT)')
+    conn.commit()
+    conn.close()
+    yield TEST_DB_PATH
+    db_pool.close_all_pools()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+def test_connection_is_reused(db_path):
+    """Releasing a connection makes it available for the next checkout."""
+    pool = SQLitePool(db_path, max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is first
+    pool.release(second)
+    assert pool.stats()['created'] == 1
+
+
+def test_handle_close_returns_connection(db_path):
+    """Closing a PooledConnection handle returns it instead of closing it."""
+    pool = SQLitePool(db_path, max_size=1)
+    conn = pool.connection()
+    conn.execute("INSERT INTO things (label) VALUES ('a')")
+    conn.commit()
+    conn.close()
+    conn.close()  # idempotent
+    stats = pool.stats()
+    assert stats['in_use'] == 0
+    assert stats['idle'] == 1
+
+
+def test_uncommitted_work_rolled_back_on_release(db_path):
+    """Returning a connection discards its open transaction, like a real close."""
+    pool = SQLitePool(db_path, max_size=1)
+    conn = pool.connection()
+    conn.execute("INSERT INTO things (label) VALUES ('lost')")
+    conn.close()
+
+    check = sqlite3.connect(db_path)
+    count = check.execute('SELECT COUNT(*) FROM things').fetchone()[0]
+    check.close()
+    assert count == 0
+
+
+def test_pool_timeout_when_exhausted(db_path):
+    """A checkout waits for a free slot and gives up after the timeout."""
+    pool = SQLitePool(db_path, max_size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+    pool.release(held)
+
+
+def test_waiting_checkout_gets_released_connection(db_path):
+    """A waiting thread receives the connection as soon as it is released."""
+    pool = SQLitePool(db_path, max_size=1, timeout=5)
+    held = pool.acquire()
+    result = {}
+
+    def worker():
+        result['conn'] = pool.acquire()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while pool.stats()['waiting'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()['waiting'] == 1
+
+    pool.release(held)
+    thread.join(timeout=2)
+    assert result['conn'] is held
+    assert pool.stats()['waiting'] == 0
+    pool.release(result['conn'])
+
+
+def test_replaced_database_file_drops_stale_connections(db_path):
+    """Connections to a deleted database file are never handed out again."""
+    pool = SQLitePool(db_path, max_size=2)
+    conn = pool.connection()
+    conn.close()
+
+    os.remove(db_path)
+    fresh = sqlite3.connect(db_path)
+    fresh.execute('CREATE TABLE other (x INTEGER)')
+    fresh.commit()
+    fresh.close()
+
+    conn = pool.connection()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    conn.close()
+    assert tables == {'other'}
+    assert pool.stats()['created'] == 2
+
+
+def test_wal_profile_pragmas(db_path):
+    """The WAL profile switches the journal and makes reader connections query-only."""
+    writer = SQLitePool(db_path, profile='wal', role='write')
+    reader = SQLitePool(db_path, profile='wal', readonly=True)
+
+    conn = writer.connection()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+    assert conn.execute('PRAGMA busy_timeout').fetchone()[0] > 0
+    conn.close()
+
+    conn = reader.connection()
+    assert conn.execute('PRAGMA query_only').fetchone()[0] == 1
+    with pytest.raises(OperationalError):
+        conn.execute("INSERT INTO things (label) VALUES ('nope')")
+    conn.close()
+    assert reader.stats()['role'] == 'read'
+    writer.close()
+    reader.close()
+
+
+def test_begin_write_locks_before_reads(db_path):
+    """begin_write() takes the SQLite write lock before the first SELECT."""
+    writer = SQLitePool(db_path, profile='wal', role='write')
+    conn = writer.connection()
+    conn.execute('SELECT COUNT(*) FROM things')
+    assert not conn.in_transaction   # sqlite3 only begins at the first write
+
+    conn.begin_write()
+    conn.execute('SELECT COUNT(*) FROM things')
+    assert conn.in_transaction
+    other = sqlite3.connect(db_path, timeout=0)
+    with pytest.raises(sqlite3.OperationalError):
+        other.execute('BEGIN IMMEDIATE')
+    other.close()
+
+    conn.begin_write()   # already in a transaction: no-op
+    conn.execute("INSERT INTO things (label) VALUES ('kept')")
+    conn.commit()
+    conn.close()
+    writer.close()
+
+
+def test_request_shares_single_connection(db_path):
+    """All get_db_connection() calls in one request use the same pooled connection."""
+    original_db_path = app_module.DB_PATH
+    app_module.DB_PATH = db_path
+    try:
+        with app.test_request_context('/'):
+            first = app_module.get_db_connection()
+            first_raw = first.raw
+            first.close()
+            second = app_module.get_db_connection()
+            assert second.raw is first_raw
+            assert get_sqlite_pool(db_path).stats()['in_use'] == 1
+            second.close()
+        # Teardown returns the connection to the pool
+        assert get_sqlite_pool(db_path).stats()['in_use'] == 0
+    finally:
+        app_module.DB_PATH = original_db_path
+
+
+def test_pool_stats_for_staff_only(db_path):
+    """Pool statistics are staff diagnostics, not part of the public health check."""
+    with app.test_client() as client:
+        response = client.get('/api/health')
+        assert response.status_code == 200
+        assert 'pools' not in response.get_json()
+        assert client.get('/api/diagnostics/pools').status_code == 401
+
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['role'] = 'student'
+        assert client.get('/api/diagnostics/pools').status_code == 403
+
+        with client.session_transaction() as sess:
+            sess['role'] = 'staff'
+        response = client.get('/api/diagnostics/pools')
+    assert response.status_code == 200
+    pools = response.get_json()['pools']
+    assert all({'in_use', 'waiting', 'created'} <= set(p) for p in pools)
+    assert 'depth' in response.get_json()['write_queue']
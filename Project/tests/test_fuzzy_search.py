@@ -0,0 +1,246 @@
+"""
+Test suite for typo-tolerant (fuzzy) item search.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated). Without
+pg_trgm in the test database the PostgreSQL run uses the in-process index.
+
+Tests cover:
+- Trigrams and similarity computed like pg_trgm
+- fuzzy=true finding misspelled words ("walet", "airpod", "calcualtor")
+- Similarity-ranked results with sort=relevance
+- Generation counter bumped only by item text changes
+- Documents replaced and removed in a TrigramIndex
+- In-process index updated by API writes, rebuilt after writes made elsewhere
+- Deleted items hidden and left out of the index
+- Filters applied before the result cap; capped totals flagged approximate
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import search
+from count_cache import read_generation
+from trigram import TrigramIndex, trigrams
+
+
+ITEMS = [
+    # name, description, category
+    ('Black Wallet', 'Leather wallet with a WatCard', 'cards'),
+    ('AirPods', 'White earbuds in a charging case', 'electronics'),
+    ('Calculator', 'TI-84 graphing calculator', 'electronics'),
+    ('Wall Charger', 'USB-C wall plug', 'electronics'),
+]
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with a few items."""
+    conn = migrated_pool.connection()
+    cursor = conn.cursor()
+    for name, description, category in ITEMS:
+        cursor.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, ?, ?, 'SLC', 'SLC', '2025-11-20 10:00:00', 'SLC')
+        ''', (name, description, category))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def fuzzy(client, text, **params):
+    response = client.get('/api/items', query_string={'search': text, 'fuzzy': 'true', **params})
+    assert response.status_code == 200
+    return [item['name'] for item in response.get_json()['items']]
+
+
+def generation(pool):
+    conn = pool.connection()
+    value = read_generation(conn.cursor(), search.ITEMS_TEXT_GENERATION)
+    conn.close()
+    return value
+
+
+def test_trigrams_match_pg_trgm():
+    """Words are padded like pg_trgm: show_trgm('cat') = {"  c"," ca","at ","cat"}."""
+    assert trigrams('cat') == {'  c', ' ca', 'cat', 'at '}
+    index = TrigramIndex()
+    index.add(1, 'wallet')
+    assert index.similar_words('walet') == [('wallet', 0.625)]
+    assert index.similar_words('zebra') == []
+
+
+def test_index_requires_every_word():
+    """Each query word must be close to some word of the document."""
+    index = TrigramIndex()
+    index.add(1, 'Black Wallet')
+    index.add(2, 'Blue Wallet')
+    assert [doc for doc, _ in index.search('blak walet')] == [1]
+    assert [doc for doc, _ in index.search('walet')] == [1, 2]
+    assert index.search('') == []
+
+
+def test_index_replace_and_remove():
+    """Re-adding a document replaces its words; removed words leave the index."""
+    index = TrigramIndex()
+    index.add(1, 'Black Wallet')
+    index.add(2, 'Blue Wallet')
+    index.add(1, 'Red Scarf')
+    assert [doc for doc, _ in index.search('walet')] == [2]
+    assert [doc for doc, _ in index.search('scarv')] == [1]
+    index.remove(1)
+    index.remove(3)
+    assert index.search('scarv') == [] and index.document_count == 1
+    assert index.similar_words('scarf') == []
+    assert [doc for doc, _ in index.search('walet', accept=lambda doc: doc != 2)] == []
+
+
+def test_misspellings_found(client):
+    """Common typos find the intended item only with fuzzy=true."""
+    assert 'Black Wallet' in fuzzy(client, 'walet')
+    assert fuzzy(client, 'airpod') == ['AirPods']
+    assert fuzzy(client, 'calcualtor') == ['Calculator']
+    assert fuzzy(client, 'xylophone') == []
+
+    response = client.get('/api/items?search=walet')
+    assert response.get_json()['items'] == []
+
+
+def test_ranked_by_similarity(client):
+    """The closest spelling comes first with sort=relevance."""
+    names = fuzzy(client, 'wallet', sort='relevance')
+    assert names[0] == 'Black Wallet'
+    assert 'Wall Charger' in names
+
+
+def test_generation_bumped_by_text_changes_only(pool):
+    """Inserts and text edits move the counter; status changes do not."""
+    before = generation(pool)
+    conn = pool.connection()
+    conn.execute("UPDATE items SET status = 'claimed' WHERE name = 'AirPods'")
+    conn.commit()
+    assert generation(pool) == before
+
+    conn.execute("UPDATE items SET description = 'Graphing calculator' WHERE name = 'Calculator'")
+    conn.commit()
+    after_update = generation(pool)
+    assert after_update != before
+
+    conn.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES ('Scarf', 'Red wool scarf', 'clothing', 'PAC', 'PAC', '2025-11-21 10:00:00', 'PAC')
+    ''')
+    conn.commit()
+    conn.close()
+    assert generation(pool) != after_update
+
+
+def in_process(pool):
+    conn = pool.connection()
+    result = not search.uses_pg_trgm(conn)
+    conn.close()
+    return result
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Counts in-process index builds."""
+    calls = []
+    build = search.fuzzy_indexes.build
+
+    def counting_build(cursor):
+        calls.append(1)
+        return build(cursor)
+
+    monkeypatch.setattr(search.fuzzy_indexes, 'build', counting_build)
+    return calls
+
+
+def test_api_writes_applied_without_rebuild(client, pool, builds):
+    """Items created, edited and deleted through the API are found at once."""
+    fuzzy(client, 'walet')
+    response = client.post('/api/items', data=json.dumps({
+        'name': 'Red Scarf', 'description': 'Wool scarf', 'category': 'clothing',
+        'location_found': 'PAC', 'pickup_at': 'PAC', 'date_found': '2025-11-21 10:00:00', 'found_by_desk': 'PAC'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    item_id = response.get_json()['item']['item_id']
+    assert fuzzy(client, 'scarv') == ['Red Scarf']
+
+    response = client.put(f'/api/items/{item_id}', data=json.dumps({'name': 'Blue Mitten', 'description': 'Knitted'}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert fuzzy(client, 'scarv') == []
+    assert fuzzy(client, 'miten') == ['Blue Mitten']
+
+    assert client.delete(f'/api/items/{item_id}').status_code == 200
+    assert fuzzy(client, 'miten') == []
+    assert len(builds) == (1 if in_process(pool) else 0)
+
+
+def test_index_rebuilt_after_outside_writes(client, pool, builds, monkeypatch):
+    """Writes made elsewhere are picked up at the next generation check."""
+    fuzzy(client, 'walet')
+    fuzzy(client, 'airpod')
+    assert len(builds) == (1 if in_process(pool) else 0)
+
+    conn = pool.connection()
+    conn.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES ('Scarf', 'Red wool scarf', 'clothing', 'PAC', 'PAC', '2025-11-21 10:00:00', 'PAC')
+    ''')
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(search.fuzzy_indexes, 'refresh_seconds', 0)
+    assert fuzzy(client, 'scarv') == ['Scarf']
+    fuzzy(client, 'scarv')
+    assert len(builds) == (2 if in_process(pool) else 0)
+
+
+def test_deleted_items_hidden(client, pool, monkeypatch):
+    """Soft-deleted items are not returned by fuzzy search nor kept in the index."""
+    conn = pool.connection()
+    conn.execute("UPDATE items SET status = 'deleted' WHERE name = 'Black Wallet'")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(search.fuzzy_indexes, 'refresh_seconds', 0)
+    assert 'Black Wallet' not in fuzzy(client, 'walet')
+    if in_process(pool):
+        conn = pool.connection()
+        assert len(search.fuzzy_index(conn)) == len(ITEMS) - 1
+        conn.close()
+
+
+def test_filters_applied_before_cap(client, pool, monkeypatch):
+    """Filtered-out matches do not use up FUZZY_MAX_RESULTS; a cut total is approximate."""
+    conn = pool.connection()
+    for number in range(5):
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, 'Brown wallet', 'cards', 'DC', 'CIF', '2025-11-21 10:00:00', 'CIF')
+        ''', (f'Wallet {number}',))
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(search, 'FUZZY_MAX_RESULTS', 2)
+
+    response = client.get('/api/items', query_string={'search': 'walet', 'fuzzy': 'true', 'location': 'slc'})
+    data = response.get_json()
+    assert sorted(item['name'] for item in data['items']) == ['Black Wallet', 'Wall Charger']
+    assert data['pagination']['total_count'] == 2
+    assert data['pagination']['approximate'] is False
+
+    response = client.get('/api/items', query_string={'search': 'walet', 'fuzzy': 'true', 'desk': 'cif'})
+    pagination = response.get_json()['pagination']
+    if in_process(pool):
+        assert pagination['total_count'] == 2 and pagination['approximate'] is True
+    else:
+        assert pagination['total_count'] == 5
@@ -0,0 +1,139 @@
+"""
+Test suite for per-request SQL instrumentation and the slow-query log.
+
+Backend tests run once per backend like test_data_access.py (PostgreSQL only
+when TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Query count, database time and rows per request
+- X-DB-* response headers only when enabled
+- Slow statements logged with their query plan (parameters not stored)
+- Writes are explained without being applied twice
+- Staff-only slow-query diagnostics endpoint
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+from app import app
+import instrumentation
+
+from conftest import login
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool for each backend, with an empty slow-query log."""
+    instrumentation.clear_slow_queries()
+
+    yield migrated_pool
+
+
+def insert_item(cursor, name='Blue Bottle'):
+    return cursor.insert_returning_id('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (name, name, 'bottles', 'SLC', 'SLC', '2025-11-20 10:00:00', 'SLC'), 'item_id')
+
+
+def test_request_stats_count_queries_and_rows(pool):
+    """Statements and fetched rows are accumulated between begin and end."""
+    conn = pool.connection()
+    cursor = conn.cursor()
+    insert_item(cursor, 'One')
+    insert_item(cursor, 'Two')
+
+    token = instrumentation.begin_request('/test')
+    cursor.execute('SELECT item_id FROM items')
+    assert len(cursor.fetchall()) == 2
+    cursor.execute('SELECT COUNT(*) AS count FROM items')
+    cursor.fetchone()
+    stats = instrumentation.end_request(token)
+    conn.close()
+
+    assert stats['queries'] == 2
+    assert stats['rows'] == 3
+    assert stats['db_ms'] > 0
+    assert instrumentation.current_request_stats() is None
+
+
+def test_slow_query_logged_with_plan(pool, monkeypatch):
+    """Statements over the threshold are logged with their plan; parameters are not stored."""
+    monkeypatch.setattr(instrumentation, 'SLOW_QUERY_MS', 0)
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM items WHERE category = ?', ('secret-value',))
+    conn.close()
+
+    entry = instrumentation.slow_queries()[0]
+    assert entry['sql'] == 'SELECT * FROM items WHERE category = ?'
+    assert entry['backend'] == cursor.dialect.name
+    assert entry['plan'] and not entry['plan'][0].startswith('(plan unavailable')
+    if cursor.dialect.name == 'postgresql':
+        assert any('actual time' in line for line in entry['plan'])
+    assert 'params' not in entry
+    assert 'secret-value' not in entry['sql']
+
+
+def test_slow_write_is_not_applied_twice(pool, monkeypatch):
+    """Explaining a slow INSERT does not run it again."""
+    monkeypatch.setattr(instrumentation, 'SLOW_QUERY_MS', 0)
+    conn = pool.connection()
+    cursor = conn.cursor()
+    insert_item(cursor)
+    conn.commit()
+    cursor.execute('SELECT COUNT(*) AS count FROM items')
+    assert cursor.fetchone()['count'] == 1
+    conn.close()
+
+
+@pytest.fixture
+def client(pool, client_for):
+    """Logged-out test client whose routes use the backend under test."""
+    conn = pool.connection()
+    insert_item(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    yield client_for(pool, None)
+    app.config['SQL_DEBUG_HEADERS'] = False
+
+
+def test_debug_headers(client):
+    """X-DB-* headers appear only when enabled."""
+    login(client, 'student@uwaterloo.ca')
+    response = client.get('/api/items')
+    assert 'X-DB-Queries' not in response.headers
+
+    app.config['SQL_DEBUG_HEADERS'] = True
+    # Not the request above, which would be served from the response cache
+    response = client.get('/api/items?page_size=10')
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Queries']) >= 2  # count + page
+    assert int(response.headers['X-DB-Rows']) >= 2      # count row + one item
+    assert float(response.headers['X-DB-Time-Ms']) > 0
+
+
+def test_slow_query_endpoint_is_staff_only(client, monkeypatch):
+    """Staff can read the slow-query log, including the request path."""
+    login(client, 'student@uwaterloo.ca')
+    monkeypatch.setattr(instrumentation, 'SLOW_QUERY_MS', 0)
+    client.get('/api/items')
+    monkeypatch.setattr(instrumentation, 'SLOW_QUERY_MS', 10_000)
+    assert client.get('/api/diagnostics/slow-queries').status_code == 403
+    client.post('/auth/logout')
+
+    login(client, 'staff@uwaterloo.ca')
+    response = client.get('/api/diagnostics/slow-queries')
+    assert response.status_code == 200
+    entries = response.get_json()['slow_queries']
+    page = next(entry for entry in entries if entry['name'] == 'items.page')
+    assert page['path'] == '/api/items'
+    assert page['plan']
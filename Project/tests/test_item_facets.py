@@ -0,0 +1,120 @@
+"""
+Test suite for faceted counts on /api/items.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Counts per category, location, pickup desk and status, most common first
+- Each facet ignores its own filter but applies the others
+- Search and desk filters narrow every facet
+- Unknown facet names rejected
+- One grouped query for all facets; none without the facets parameter
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+from queries import query_stats
+
+
+ITEMS = [
+    # name, category, location_found, pickup_at, status, found_by_desk
+    ('Black Wallet', 'cards', 'DC Library', 'SLC', 'unclaimed', 'SLC'),
+    ('WatCard', 'Cards', 'DP Library', 'SLC', 'claimed', 'SLC'),
+    ('Blue Wallet', 'cards', 'SLC Great Hall', 'PAC', 'unclaimed', 'PAC'),
+    ('Water Bottle', 'bottles', 'PAC Gym', 'PAC', 'unclaimed', 'PAC'),
+    ('Umbrella', 'other', 'SLC Great Hall', 'SLC', 'unclaimed', 'SLC'),
+    ('Old Scarf', 'other', 'SLC Great Hall', 'SLC', 'deleted', 'SLC'),
+]
+
+
+def insert_item(conn, name, category, location, pickup_at, status, desk):
+    conn.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, status, found_by_desk)
+        VALUES (?, ?, ?, ?, ?, '2025-11-20 10:00:00', ?, ?)
+    ''', (name, name, category, location, pickup_at, status, desk))
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with ITEMS."""
+    conn = migrated_pool.connection()
+    for item in ITEMS:
+        insert_item(conn, *item)
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def facets(client, query):
+    response = client.get(f'/api/items?{query}')
+    assert response.status_code == 200
+    return response.get_json()['facets']
+
+
+def counts(facet):
+    return {entry['value']: entry['count'] for entry in facet}
+
+
+def facet_calls():
+    return next((row['count'] for row in query_stats() if row['name'] == 'items.facets'), 0)
+
+
+def test_facet_counts(client):
+    """Deleted items are not counted; values are ordered by count."""
+    result = facets(client, 'facets=category,location,pickup_at,status')
+    assert result['category'] == [
+        {'value': 'cards', 'count': 3}, {'value': 'bottles', 'count': 1}, {'value': 'other', 'count': 1}
+    ]
+    assert counts(result['location']) == {
+        'SLC Great Hall': 2, 'DC Library': 1, 'DP Library': 1, 'PAC Gym': 1
+    }
+    assert counts(result['pickup_at']) == {'SLC': 3, 'PAC': 2}
+    assert counts(result['status']) == {'unclaimed': 4, 'claimed': 1}
+
+
+def test_facets_ignore_their_own_filter(client):
+    """With a category selected the other categories still show; other facets narrow."""
+    data = client.get('/api/items?category=CARDS&facets=category,status,location').get_json()
+    assert len(data['items']) == 3
+    assert counts(data['facets']['category']) == {'cards': 3, 'bottles': 1, 'other': 1}
+    assert counts(data['facets']['status']) == {'unclaimed': 2, 'claimed': 1}
+    assert counts(data['facets']['location']) == {'DC Library': 1, 'DP Library': 1, 'SLC Great Hall': 1}
+
+    result = facets(client, 'category=cards&status=unclaimed&location=library&facets=category,status,location')
+    assert counts(result['category']) == {'cards': 1}
+    assert counts(result['status']) == {'unclaimed': 1, 'claimed': 1}
+    assert counts(result['location']) == {'DC Library': 1, 'SLC Great Hall': 1}
+
+
+def test_search_and_desk_narrow_all_facets(client):
+    result = facets(client, 'search=wallet&facets=category,pickup_at')
+    assert counts(result['category']) == {'cards': 2}
+    assert counts(result['pickup_at']) == {'SLC': 1, 'PAC': 1}
+
+    result = facets(client, 'desk=pac&facets=category')
+    assert counts(result['category']) == {'cards': 1, 'bottles': 1}
+
+
+def test_unknown_facet(client):
+    response = client.get('/api/items?facets=category,colour')
+    assert response.status_code == 400
+    assert 'colour' in response.get_json()['error']
+
+
+def test_one_grouped_query(client):
+    """All facets share one query; the plain listing runs none."""
+    before = facet_calls()
+    assert 'facets' not in client.get('/api/items').get_json()
+    assert facet_calls() == before
+    facets(client, 'facets=category,location,pickup_at,status')
+    assert facet_calls() == before + 1
@@ -0,0 +1,110 @@
+"""
+Test suite for field projection and compact mode on /api/items.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- All fields by default
+- fields= returns only the requested fields and narrows the SELECT
+- Claim summary joined only for claim fields
+- compact=true header row and value arrays, smaller than the default body
+- Keyset cursors without the key fields requested
+- Unknown field names rejected
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+from item_fields import ITEM_FIELDS, select_list
+
+
+ITEMS = [
+    # name, description, date_found
+    ('Black Wallet', 'Leather wallet with WatCard', '2025-11-20 10:00:00'),
+    (None, 'Blue water bottle', '2025-11-21 10:00:00'),
+    ('Umbrella', 'Green umbrella', '2025-11-22 10:00:00'),
+]
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with ITEMS."""
+    conn = migrated_pool.connection()
+    for name, description, date_found in ITEMS:
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, ?, 'other', 'SLC Great Hall', 'SLC', ?, 'SLC')
+        ''', (name, description, date_found))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def listing(client, query=''):
+    response = client.get(f'/api/items?{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_all_fields_by_default(client):
+    items = listing(client)['items']
+    assert set(items[0]) == set(ITEM_FIELDS)
+    assert items[0]['pending_claims'] == 0 and items[0]['is_picked_up'] is False
+
+
+def test_projection(client):
+    """Only the requested fields come back; name still falls back to description."""
+    items = listing(client, 'fields=name,Status')['items']
+    assert items == [
+        {'name': 'Umbrella', 'status': 'unclaimed'},
+        {'name': 'Blue water bottle', 'status': 'unclaimed'},
+        {'name': 'Black Wallet', 'status': 'unclaimed'},
+    ]
+    items = listing(client, 'fields=item_id,is_picked_up')['items']
+    assert set(items[0]) == {'item_id', 'is_picked_up'}
+
+
+def test_select_list_narrowed():
+    columns, summary = select_list(['name', 'status'])
+    assert 'image_url' not in columns and 'location_found' not in columns
+    assert summary is False
+    columns, summary = select_list(['is_picked_up', 'picked_up_claims'])
+    assert summary is True
+    assert columns.count('AS picked_up_claims') == 1
+
+
+def test_compact(client):
+    """A header row, then one array per item in the header's order."""
+    data = listing(client, 'fields=item_id,name&compact=true')
+    header, *rows = data['items']
+    assert header == ['item_id', 'name']
+    assert [row[1] for row in rows] == ['Umbrella', 'Blue water bottle', 'Black Wallet']
+    assert data['pagination']['total_count'] == 3
+
+    full = client.get('/api/items').get_data()
+    compact = client.get('/api/items?compact=true').get_data()
+    assert len(compact) < len(full)
+
+
+def test_cursor_without_key_fields(client):
+    """next_cursor works even when item_id and the dates are not requested."""
+    first = listing(client, 'fields=name&cursor=&page_size=2')
+    assert [item['name'] for item in first['items']] == ['Umbrella', 'Blue water bottle']
+    cursor = first['pagination']['next_cursor']
+    second = listing(client, f'fields=name&cursor={cursor}&page_size=2')
+    assert second['items'] == [{'name': 'Black Wallet'}]
+
+
+def test_unknown_field(client):
+    response = client.get('/api/items?fields=name,password_hash')
+    assert response.status_code == 400
+    assert 'password_hash' in response.get_json()['error']
@@ -0,0 +1,161 @@
+"""
+Test suite for item image uploads and thumbnails.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+Images are written to a temporary IMAGE_STORAGE_DIR.
+
+Tests cover:
+- Uploads stored once per content, under their SHA-256
+- WebP thumbnails rendered in the background, or on demand when missing
+- Originals and thumbnails served with immutable cache headers
+- Thumbnail URLs in /api/items and /api/items/<id>, null for external images
+- Validation (missing file, not an image, too large, not staff)
+
+Author: Team 15
+"""
+
+import pytest
+import hashlib
+import io
+import json
+import os
+import sys
+
+from PIL import Image
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import images
+from images import THUMBNAIL_SIZES, get_thumbnail_pool, thumbnail_path
+from write_queue import get_write_queue
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool, flushing queued writes after each test."""
+    yield migrated_pool
+
+    get_write_queue().flush(timeout=10)
+
+
+@pytest.fixture
+def staff(pool, client_for, monkeypatch, tmp_path):
+    """Logged-in staff client on the backend under test, storing images under tmp_path."""
+    monkeypatch.setattr(images, 'IMAGE_STORAGE_DIR', str(tmp_path))
+    yield client_for(pool)
+    get_thumbnail_pool().wait(timeout=10)
+
+
+def photo(width=1200, height=800, color=(200, 30, 30), format='JPEG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, format)
+    return buffer.getvalue()
+
+
+def upload(client, data, filename='photo.jpg'):
+    return client.post('/api/images', data={'image': (io.BytesIO(data), filename)},
+                       content_type='multipart/form-data')
+
+
+def stored_files(root):
+    return sorted(os.path.relpath(os.path.join(path, name), root)
+                  for path, _dirs, names in os.walk(root) for name in names)
+
+
+def test_upload_stored_once(staff, tmp_path):
+    data = photo()
+    digest = hashlib.sha256(data).hexdigest()
+
+    first = upload(staff, data)
+    assert first.status_code == 201
+    body = first.get_json()
+    assert body['image_url'] == f'/api/images/{digest}.jpg'
+    assert (body['width'], body['height']) == (1200, 800)
+    assert set(body['thumbnails']) == {str(size) for size in THUMBNAIL_SIZES}
+
+    second = upload(staff, data, filename='copy.jpg')
+    assert second.status_code == 200
+    assert second.get_json()['image_url'] == body['image_url']
+    originals = [name for name in stored_files(tmp_path) if name.startswith('originals')]
+    assert originals == [os.path.join('originals', digest[:2], f'{digest}.jpg')]
+
+
+def test_thumbnails_rendered_in_background(staff):
+    data = photo()
+    digest = hashlib.sha256(data).hexdigest()
+    upload(staff, data)
+    get_thumbnail_pool().wait(timeout=10)
+
+    for size in THUMBNAIL_SIZES:
+        with Image.open(thumbnail_path(digest, size)) as thumbnail:
+            assert thumbnail.format == 'WEBP'
+            assert thumbnail.size == (size, round(size * 2 / 3))
+
+
+def test_served_immutable(staff):
+    body = upload(staff, photo()).get_json()
+
+    original = staff.get(body['image_url'])
+    assert original.status_code == 200
+    assert original.mimetype == 'image/jpeg'
+    assert 'immutable' in original.headers['Cache-Control']
+    assert 'max-age=31536000' in original.headers['Cache-Control']
+
+    thumbnail = staff.get(body['thumbnails']['160'])
+    assert thumbnail.status_code == 200
+    assert thumbnail.mimetype == 'image/webp'
+    assert 'immutable' in thumbnail.headers['Cache-Control']
+
+
+def test_missing_thumbnail_rendered_on_demand(staff):
+    data = photo(format='PNG')
+    digest = hashlib.sha256(data).hexdigest()
+    body = upload(staff, data, filename='photo.png').get_json()
+    get_thumbnail_pool().wait(timeout=10)
+    os.remove(thumbnail_path(digest, 320))
+
+    assert staff.get(body['thumbnails']['320']).status_code == 200
+    assert os.path.exists(thumbnail_path(digest, 320))
+
+
+def test_unknown_images(staff):
+    digest = 'a' * 64
+    assert staff.get(f'/api/images/{digest}.jpg').status_code == 404
+    assert staff.get(f'/api/images/{digest}/160.webp').status_code == 404
+    assert staff.get('/api/images/../secret.jpg').status_code == 404
+    body = upload(staff, photo()).get_json()
+    assert staff.get(body['thumbnails']['160'].replace('/160.', '/100.')).status_code == 404
+
+
+def test_items_have_thumbnail_urls(staff):
+    body = upload(staff, photo()).get_json()
+    for image_url in (body['image_url'], 'https://example.com/wallet.jpg'):
+        response = staff.post('/api/items', data=json.dumps({
+            'name': 'Black Wallet', 'category': 'cards', 'location_found': 'SLC',
+            'pickup_at': 'SLC', 'date_found': '2025-11-20 10:00:00', 'found_by_desk': 'SLC',
+            'image_url': image_url
+        }), content_type='application/json')
+        assert response.status_code == 201
+
+    items = {item['image_url']: item for item in staff.get('/api/items').get_json()['items']}
+    assert items[body['image_url']]['thumbnails'] == body['thumbnails']
+    assert items['https://example.com/wallet.jpg']['thumbnails'] is None
+
+    item_id = items[body['image_url']]['item_id']
+    assert staff.get(f'/api/items/{item_id}').get_json()['item']['thumbnails'] == body['thumbnails']
+    compact = staff.get('/api/items?fields=item_id,thumbnails&compact=true').get_json()['items']
+    assert compact[0] == ['item_id', 'thumbnails']
+
+
+def test_validation(staff, pool, client_for, monkeypatch):
+    assert staff.post('/api/images', data={}, content_type='multipart/form-data').status_code == 400
+    assert upload(staff, b'not an image').status_code == 400
+
+    monkeypatch.setattr(images, 'IMAGE_MAX_BYTES', 1024)
+    assert upload(staff, photo()).status_code == 400
+
+    student = client_for(pool, 'student@uwaterloo.ca')
+    assert upload(student, photo()).status_code == 403
@@ -0,0 +1,162 @@
+"""
+Test suite for the category, location and desk lookup tables.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Ids assigned on insert and update, whatever the letter case or spacing
+- Updates leaving every key unchanged are written once
+- Items created and edited through the API get ids
+- Category, location (partial) and desk filters through the lookups
+- Migration 8 fills lookups for existing items
+- The SQLite category filter uses the integer index
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import migrations
+from count_cache import read_generation
+from lookups import CATEGORY_FILTER
+
+
+ITEMS = [
+    # name, category, location_found, found_by_desk
+    ('Black Wallet', 'cards', 'DC Library', 'SLC'),
+    ('WatCard', ' Cards ', 'DP Library', 'slc'),
+    ('Water Bottle', 'bottles', 'PAC Gym', 'PAC'),
+    ('Umbrella', 'other', 'SLC Great Hall', 'SLC'),
+]
+
+
+def insert_item(conn, name, category, location, desk):
+    conn.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES (?, ?, ?, ?, 'SLC', '2025-11-20 10:00:00', ?)
+    ''', (name, name, category, location, desk))
+
+
+def insert_items(pool):
+    conn = pool.connection()
+    for item in ITEMS:
+        insert_item(conn, *item)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def client(migrated_pool, client_for):
+    """Logged-in staff client on a migrated database with ITEMS."""
+    insert_items(migrated_pool)
+    return client_for(migrated_pool)
+
+
+def lookup_ids(pool, name):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT category_id, location_id, desk_id FROM items WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    conn.close()
+    return row['category_id'], row['location_id'], row['desk_id']
+
+
+def names(client, query):
+    response = client.get(f'/api/items?{query}')
+    assert response.status_code == 200
+    return sorted(item['name'] for item in response.get_json()['items'])
+
+
+def test_ids_assigned_and_normalized(client, pool):
+    """'cards' and ' Cards ' share one category; 'SLC' and 'slc' one desk."""
+    wallet = lookup_ids(pool, 'Black Wallet')
+    watcard = lookup_ids(pool, 'WatCard')
+    assert None not in wallet
+    assert wallet[0] == watcard[0]
+    assert wallet[2] == watcard[2]
+    assert wallet[1] != watcard[1]
+
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT key, name FROM categories ORDER BY key')
+    assert [(row['key'], row['name']) for row in cursor.fetchall()] == [
+        ('bottles', 'bottles'), ('cards', 'cards'), ('other', 'other')
+    ]
+    conn.execute("UPDATE items SET category = 'Keys' WHERE name = 'Umbrella'")
+    conn.commit()
+    conn.close()
+    assert names(client, 'category=keys') == ['Umbrella']
+    assert names(client, 'category=other') == []
+
+
+def test_unchanged_keys_written_once(client, pool):
+    """Re-saving the same category and desk moves items.rows by one write only."""
+    wallet = lookup_ids(pool, 'Black Wallet')
+    conn = pool.connection()
+    cursor = conn.cursor()
+    before = read_generation(cursor, 'items.rows')
+    conn.execute("UPDATE items SET category = 'CARDS', found_by_desk = 'SLC' WHERE name = 'Black Wallet'")
+    conn.commit()
+    assert read_generation(cursor, 'items.rows') == before + 1
+    conn.close()
+    assert lookup_ids(pool, 'Black Wallet') == wallet
+
+
+def test_api_writes_assign_ids(client, pool):
+    """create_item and update_item rows are filterable immediately."""
+    response = client.post('/api/items', data=json.dumps({
+        'name': 'Calculator', 'description': 'TI-84', 'category': 'Electronics',
+        'location_found': 'E7 Atrium', 'pickup_at': 'SLC', 'date_found': '2025-11-21T10:00:00',
+        'found_by_desk': 'SLC'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    item_id = response.get_json()['item']['item_id']
+    assert names(client, 'category=electronics') == ['Calculator']
+
+    response = client.put(f'/api/items/{item_id}', data=json.dumps({'location_found': 'QNC Lobby'}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert names(client, 'location=qnc') == ['Calculator']
+    assert names(client, 'location=e7') == []
+
+
+def test_filters(client):
+    """Category and desk are exact; location matches any part of the name."""
+    assert names(client, 'category=CARDS') == ['Black Wallet', 'WatCard']
+    assert names(client, 'category=card') == []
+    assert names(client, 'location=library') == ['Black Wallet', 'WatCard']
+    assert names(client, 'location=Great') == ['Umbrella']
+    assert names(client, 'desk=pac') == ['Water Bottle']
+    assert names(client, 'category=cards&location=DP') == ['WatCard']
+
+
+def test_migration_fills_existing_items(pool):
+    """Items written before migration 8 get ids when it runs."""
+    conn = pool.connection()
+    migrations.upgrade(conn, target=7)
+    insert_items(pool)
+    assert [step.version for step in migrations.upgrade(conn, target=8)] == [8]
+    conn.close()
+    assert None not in lookup_ids(pool, 'WatCard')
+    assert lookup_ids(pool, 'WatCard')[0] == lookup_ids(pool, 'Black Wallet')[0]
+
+
+def test_sqlite_category_filter_uses_index(migrated_pool):
+    """The category filter is an index lookup on items.category_id."""
+    if migrated_pool.backend != 'sqlite':
+        pytest.skip('SQLite query plan')
+    insert_items(migrated_pool)
+    conn = migrated_pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(f"EXPLAIN QUERY PLAN SELECT item_id FROM items WHERE {CATEGORY_FILTER}", ('cards',))
+    plan = ' | '.join(row[3] for row in cursor.fetchall())
+    conn.close()
+    assert 'INDEX idx_items_category_id (category_id=?)' in plan
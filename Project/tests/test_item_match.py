@@ -0,0 +1,166 @@
+"""
+Test suite for POST /api/items/match (description similarity).
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Unclaimed items ranked by TF-IDF cosine similarity to a description
+- Claimed and deleted items never matched; filler and unknown words ignored
+- Creates, edits and deletes through the API applied without a rebuild,
+  and rebuilt for once at the next generation check
+- Direct SQL writes picked up after MATCH_REFRESH_SECONDS
+- Items claimed since the index was built filtered out
+- Compaction keeps similarities unchanged
+- Request validation
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import matching
+from matching import TfidfIndex
+
+
+ITEMS = [
+    # name, description, category, location_found, status
+    ('Black Wallet', 'Black leather wallet with a WatCard inside', 'cards', 'SLC Great Hall', 'unclaimed'),
+    ('Wallet', 'Brown fabric wallet', 'cards', 'DC Library', 'unclaimed'),
+    ('Water Bottle', 'Blue Hydro Flask with stickers', 'bottles', 'PAC Gym', 'unclaimed'),
+    ('Black Wallet', 'Black leather wallet, WatCard', 'cards', 'SLC Great Hall', 'claimed'),
+    ('Leather Wallet', 'Black leather wallet', 'cards', 'SLC Great Hall', 'deleted'),
+]
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with ITEMS."""
+    conn = migrated_pool.connection()
+    for name, description, category, location, status in ITEMS:
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found,
+                               found_by_desk, status)
+            VALUES (?, ?, ?, ?, 'SLC', '2025-11-20 10:00:00', 'SLC', ?)
+        ''', (name, description, category, location, status))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def match(client, description, **extra):
+    response = client.post('/api/items/match', data=json.dumps(dict(extra, description=description)),
+                           content_type='application/json')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == len(data['items'])
+    return data['items']
+
+
+def matched_ids(client, description):
+    return [item['item_id'] for item in match(client, description)]
+
+
+def execute(pool, sql, params=()):
+    conn = pool.connection()
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def test_ranked_by_similarity(client):
+    items = match(client, 'I lost my black leather wallet with my WatCard in the SLC')
+    assert [item['item_id'] for item in items] == [1, 2]
+    assert items[0]['name'] == 'Black Wallet' and items[0]['status'] == 'unclaimed'
+    assert 1 >= items[0]['score'] > items[1]['score'] > 0
+    assert 'pending_claims' in items[0]
+
+    assert matched_ids(client, 'blue bottle') == [3]
+    assert len(match(client, 'wallet', limit=1)) == 1
+
+
+def test_filler_and_unknown_words(client):
+    assert match(client, 'I think I lost it there') == []
+    assert match(client, 'stethoscope') == []
+
+
+def test_api_writes_applied_without_rebuild(client, monkeypatch):
+    matched_ids(client, 'wallet')
+    build = matching.match_indexes.build
+    monkeypatch.setattr(matching.match_indexes, 'build', None)
+
+    response = client.post('/api/items', data=json.dumps({
+        'name': 'Calculator', 'description': 'TI-84 graphing calculator', 'category': 'electronics',
+        'location_found': 'MC Lounge', 'pickup_at': 'SLC', 'date_found': '2025-11-21T10:00:00Z',
+        'found_by_desk': 'SLC'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    item_id = response.get_json()['item']['item_id']
+    assert matched_ids(client, 'graphing calculator') == [item_id]
+
+    response = client.put(f'/api/items/{item_id}', data=json.dumps({'description': 'Casio scientific'}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert matched_ids(client, 'graphing') == []
+    assert matched_ids(client, 'casio') == [item_id]
+
+    assert client.delete(f'/api/items/{item_id}').status_code == 200
+    assert matched_ids(client, 'casio') == []
+
+    # The writes moved the generation: the next check rebuilds once
+    builds = []
+    monkeypatch.setattr(matching.match_indexes, 'build', lambda cursor: builds.append(1) or build(cursor))
+    monkeypatch.setattr(matching.match_indexes, 'refresh_seconds', 0)
+    assert matched_ids(client, 'wallet') == matched_ids(client, 'wallet')
+    assert len(builds) == 1
+
+
+def test_direct_writes_after_refresh(client, pool, monkeypatch):
+    assert matched_ids(client, 'hydro flask') == [3]
+    execute(pool, "UPDATE items SET description = 'Red Nalgene' WHERE item_id = 3")
+    assert matched_ids(client, 'hydro flask') == [3]
+
+    monkeypatch.setattr(matching.match_indexes, 'refresh_seconds', 0)
+    assert matched_ids(client, 'hydro flask') == []
+    assert matched_ids(client, 'nalgene') == [3]
+
+
+def test_claimed_since_build_filtered(client, pool):
+    assert matched_ids(client, 'brown wallet')[0] == 2
+    execute(pool, "UPDATE items SET status = 'claimed' WHERE item_id = 2")
+    assert 2 not in matched_ids(client, 'brown wallet')
+
+
+def test_compaction_keeps_similarity():
+    index = TfidfIndex()
+    index.load([
+        (1, 'unclaimed', ['Black Wallet', 'Leather wallet', 'cards', 'SLC']),
+        (2, 'unclaimed', ['Umbrella', 'Green umbrella', 'other', 'DC Library']),
+    ])
+    index.note_item(3, 'unclaimed', 'Wallet', 'Red wallet', 'cards', 'MC')
+    index.note_item(1, 'claimed')
+    before = index.match('red wallet')
+    index._compact()
+    assert index.match('red wallet') == before
+    assert [item_id for item_id, _score in before] == [3]
+    assert len(index) == 2
+
+
+def test_validation(client):
+    def status(body):
+        return client.post('/api/items/match', data=json.dumps(body), content_type='application/json').status_code
+
+    assert status({}) == 400
+    assert status({'description': '   '}) == 400
+    assert status({'description': 'x' * 5001}) == 400
+    assert status({'description': 'wallet', 'limit': 0}) == 400
+    assert status({'description': 'wallet', 'limit': 51}) == 400
+    assert status({'description': 'wallet', 'limit': '5'}) == 400
@@ -0,0 +1,155 @@
+"""
+Test suite for full-text item search.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Word prefix, stemming and case-insensitive matching across item columns
+- Every search word must match
+- Index kept in sync on insert, update and delete
+- sort=relevance ranks name matches above description matches
+- Search input is never interpreted as query syntax
+- The SQLite search uses the FTS5 index instead of scanning items
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import db_config
+from search import ITEM_MATCH_JOIN, match_expression, search_terms
+
+
+ITEMS = [
+    # name, description, category, location_found
+    ('Black Wallet', 'Leather wallet with a WatCard', 'cards', 'SLC Great Hall'),
+    ('Water Bottle', 'Blue bottle, slightly dented', 'bottles', 'PAC Gym'),
+    ('Umbrella', 'Black umbrella left near the wallets display', 'other', 'DC Library'),
+    ('AirPods', 'White earbuds in a case', 'electronics', 'MC Comfy Lounge'),
+]
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with ITEMS."""
+    conn = migrated_pool.connection()
+    cursor = conn.cursor()
+    for name, description, category, location in ITEMS:
+        cursor.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, ?, ?, ?, 'SLC', '2025-11-20 10:00:00', 'SLC')
+        ''', (name, description, category, location))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def search(client, text, **params):
+    response = client.get('/api/items', query_string={'search': text, **params})
+    assert response.status_code == 200
+    return [item['name'] for item in response.get_json()['items']]
+
+
+def test_search_terms():
+    """Words are lower-cased and punctuation is dropped."""
+    assert search_terms('Black  WALLET!') == ['black', 'wallet']
+    assert search_terms('"; DROP TABLE items --') == ['drop', 'table', 'items']
+    assert match_expression(db_config.SQLITE, '...') is None
+    assert match_expression(db_config.POSTGRESQL, 'black wal') == 'black:* & wal:*'
+
+
+def test_prefix_stemming_and_case(client):
+    """Prefixes, plurals and any letter case find the same item."""
+    assert set(search(client, 'WATCARD')) == {'Black Wallet'}
+    assert set(search(client, 'earb')) == {'AirPods'}
+    assert set(search(client, 'bottles')) == {'Water Bottle'}
+    assert set(search(client, 'electronics')) == {'AirPods'}
+    assert set(search(client, 'comfy')) == {'AirPods'}
+
+
+def test_all_words_must_match(client):
+    """Multi-word searches narrow the results."""
+    assert set(search(client, 'black')) == {'Black Wallet', 'Umbrella'}
+    assert set(search(client, 'black leather')) == {'Black Wallet'}
+    assert search(client, 'black bottle') == []
+
+
+def test_pagination_counts_matches(client):
+    """total_count reflects the search, not the whole table."""
+    response = client.get('/api/items?search=black&page_size=1')
+    pagination = response.get_json()['pagination']
+    assert pagination['total_count'] == 2
+    assert pagination['total_pages'] == 2
+
+
+def test_index_follows_item_changes(client, pool):
+    """Inserts, edits and deletes are visible to search immediately."""
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES ('Calculator', 'TI-84 graphing calculator', 'electronics', 'E7', 'SLC', '2025-11-21 09:00:00', 'SLC')
+    ''')
+    conn.commit()
+    assert search(client, 'graphing') == ['Calculator']
+
+    cursor.execute("UPDATE items SET description = 'Scientific calculator' WHERE name = 'Calculator'")
+    conn.commit()
+    assert search(client, 'graphing') == []
+    assert search(client, 'scientific') == ['Calculator']
+
+    cursor.execute("DELETE FROM items WHERE name = 'Calculator'")
+    conn.commit()
+    conn.close()
+    assert search(client, 'scientific') == []
+
+
+def test_deleted_items_are_hidden(client, pool):
+    """Soft-deleted items stay indexed but are filtered out."""
+    conn = pool.connection()
+    conn.execute("UPDATE items SET status = 'deleted' WHERE name = 'Umbrella'")
+    conn.commit()
+    conn.close()
+    assert search(client, 'black') == ['Black Wallet']
+
+
+def test_sort_by_relevance(client):
+    """A match in the name outranks a match in the description."""
+    assert search(client, 'wallet', sort='relevance') == ['Black Wallet', 'Umbrella']
+    # Without a search, relevance falls back to the default order
+    response = client.get('/api/items?sort=relevance')
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == len(ITEMS)
+
+
+def test_query_syntax_is_literal(client):
+    """Operators, quotes and column filters in the input are plain words."""
+    assert search(client, 'black OR water') == []
+    assert set(search(client, '"black')) == {'Black Wallet', 'Umbrella'}
+    assert search(client, 'leather*)') == ['Black Wallet']
+    assert search(client, 'category:cards') == []
+    assert search(client, '*') == []
+
+
+def test_sqlite_search_uses_fts_index(pool):
+    """The match is served by the FTS5 index, not a scan of items."""
+    if pool.backend != 'sqlite':
+        pytest.skip('SQLite query plan')
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f"EXPLAIN QUERY PLAN SELECT COUNT(*) FROM items {ITEM_MATCH_JOIN['sqlite']} WHERE status != 'deleted'",
+        (match_expression(cursor.dialect, 'wallet'),)
+    )
+    plan = ' | '.join(row[3] for row in cursor.fetchall())
+    conn.close()
+    assert 'VIRTUAL TABLE INDEX' in plan
+    assert 'SEARCH items USING INTEGER PRIMARY KEY' in plan
@@ -0,0 +1,166 @@
+"""
+Test suite for /api/items/suggest (search-as-you-type).
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Completions of any word of a name, ranked by number of items
+- Category and location suggestions, trailing space completing the next word
+- Deleted items not suggested
+- Creates, edits and deletes through the API applied without a rebuild,
+  and rebuilt for once at the next generation check
+- Direct SQL writes picked up after SUGGEST_REFRESH_SECONDS
+- Warm lookups run no query
+- limit validation
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import count_cache
+import suggest
+from suggest import PrefixIndex
+
+
+ITEMS = [
+    # name, category, location_found, status
+    ('Black Wallet', 'cards', 'SLC Great Hall', 'unclaimed'),
+    ('Black Wallet', 'cards', 'Dana Porter Library', 'unclaimed'),
+    ('Wallet', 'cards', 'SLC Great Hall', 'claimed'),
+    ('Water Bottle', 'bottles', 'PAC Gym', 'unclaimed'),
+    ('Walkman', 'electronics', 'MC Lounge', 'deleted'),
+]
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with ITEMS."""
+    conn = migrated_pool.connection()
+    for name, category, location, status in ITEMS:
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found,
+                               found_by_desk, status)
+            VALUES (?, ?, ?, ?, 'SLC', '2025-11-20 10:00:00', 'SLC', ?)
+        ''', (name, name, category, location, status))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def suggestions(client, query, limit=None):
+    url = f'/api/items/suggest?q={query}' + (f'&limit={limit}' if limit else '')
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.get_json()['query'] == query.replace('+', ' ')
+    return [(s['text'], s['type'], s['count']) for s in response.get_json()['suggestions']]
+
+
+def test_word_prefixes_ranked(client):
+    """The prefix "wal" matches the second word of "Black Wallet", which has the most items."""
+    assert suggestions(client, 'wal') == [
+        ('Black Wallet', 'name', 2),
+        ('Wallet', 'name', 1),
+    ]
+    assert suggestions(client, 'WA') == [
+        ('Black Wallet', 'name', 2),
+        ('Wallet', 'name', 1),
+        ('Water Bottle', 'name', 1),
+    ]
+    assert suggestions(client, 'wa', limit=1) == [('Black Wallet', 'name', 2)]
+    assert suggestions(client, 'zzz') == []
+    assert suggestions(client, '') == []
+
+
+def test_categories_and_locations(client):
+    assert suggestions(client, 'car') == [('cards', 'category', 3)]
+    assert suggestions(client, 'hall') == [('SLC Great Hall', 'location', 2)]
+    assert suggestions(client, 'slc+') == [('SLC Great Hall', 'location', 2)]
+    assert suggestions(client, 'black+') == [('Black Wallet', 'name', 2)]
+
+
+def test_deleted_items_not_suggested(client):
+    assert suggestions(client, 'walk') == []
+    assert suggestions(client, 'mc') == []
+
+
+def test_api_writes_applied_without_rebuild(client, pool, monkeypatch):
+    suggestions(client, 'wal')
+    build = suggest.suggestion_indexes.build
+    monkeypatch.setattr(suggest.suggestion_indexes, 'build', None)
+
+    response = client.post('/api/items', data=json.dumps({
+        'name': 'Walking Stick', 'category': 'other', 'location_found': 'DC Library',
+        'pickup_at': 'SLC', 'date_found': '2025-11-21T10:00:00Z', 'found_by_desk': 'SLC'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    item_id = response.get_json()['item']['item_id']
+    assert ('Walking Stick', 'name', 1) in suggestions(client, 'walk')
+
+    response = client.put(f'/api/items/{item_id}', data=json.dumps({'name': 'Hiking Pole'}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert suggestions(client, 'walk') == []
+    assert suggestions(client, 'pole') == [('Hiking Pole', 'name', 1)]
+
+    assert client.delete(f'/api/items/{item_id}').status_code == 200
+    assert suggestions(client, 'pole') == []
+    assert suggestions(client, 'dc') == []
+
+    # The writes moved the generation: the next check rebuilds once
+    builds = []
+    monkeypatch.setattr(suggest.suggestion_indexes, 'build', lambda cursor: builds.append(1) or build(cursor))
+    monkeypatch.setattr(suggest.suggestion_indexes, 'refresh_seconds', 0)
+    assert suggestions(client, 'wal') == suggestions(client, 'wal')
+    assert len(builds) == 1
+
+
+def test_direct_writes_after_refresh(client, pool, monkeypatch):
+    suggestions(client, 'wal')
+    conn = pool.connection()
+    conn.execute("UPDATE items SET status = 'deleted' WHERE name = 'Wallet'")
+    conn.commit()
+    conn.close()
+    assert ('Wallet', 'name', 1) in suggestions(client, 'wal')
+
+    monkeypatch.setattr(suggest.suggestion_indexes, 'refresh_seconds', 0)
+    assert suggestions(client, 'wal') == [('Black Wallet', 'name', 2)]
+
+
+def test_warm_lookup_runs_no_query(client, monkeypatch):
+    suggestions(client, 'wal')
+
+    def no_query(*args, **kwargs):
+        raise AssertionError('suggestion lookup used the database')
+
+    monkeypatch.setattr(count_cache, 'read_generation', no_query)
+    monkeypatch.setattr(suggest.suggestion_indexes, 'build', no_query)
+    assert suggestions(client, 'wate') == [('Water Bottle', 'name', 1)]
+
+
+def test_limit_validation(client):
+    assert client.get('/api/items/suggest?q=wal&limit=0').status_code == 400
+    assert client.get('/api/items/suggest?q=wal&limit=21').status_code == 400
+    assert client.get('/api/items/suggest?q=wal&limit=abc').status_code == 400
+
+
+def test_prefix_index_counts():
+    """Replacing an item's values moves its count; shared values survive."""
+    index = PrefixIndex()
+    index.note_item(1, 'unclaimed', name='Umbrella', category='other')
+    index.note_item(2, 'unclaimed', name='Umbrella', category='other')
+    assert index.suggest('umb') == [{'text': 'Umbrella', 'type': 'name', 'count': 2}]
+    index.note_item(2, 'unclaimed', name='Blue Umbrella', category='other')
+    assert [s['text'] for s in index.suggest('umb')] == ['Blue Umbrella', 'Umbrella']
+    index.forget_item(1)
+    index.forget_item(2)
+    assert index.suggest('umb') == [] and len(index) == 0
@@ -0,0 +1,175 @@
+"""
+Test suite for keyset (cursor) pagination of the items listing.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Walking every page with next_cursor in both sort orders
+- Items sharing a date_found are neither skipped nor repeated
+- Inserts between requests do not shift later pages
+- Cursors combined with filters and search
+- Invalid cursors and cursors from another sort order rejected
+- Page-number mode unchanged, with a next_cursor to switch over
+- The SQLite page query seeks through idx_items_listing
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import app, encode_item_cursor, decode_item_cursor
+
+
+# 12 items over 4 days, three per day with the same date_found and created_at
+ITEM_COUNT = 12
+
+
+def insert_item(cursor, name, day, category='other'):
+    cursor.execute('''
+        INSERT INTO items (name, description, category, location_found, pickup_at, date_found,
+                           found_by_desk, created_at)
+        VALUES (?, ?, ?, 'SLC', 'SLC', ?, 'SLC', ?)
+    ''', (name, f'{name} description', category, f'2025-11-{day:02d} 10:00:00', f'2025-11-{day:02d} 12:00:00'))
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with 12 items."""
+    conn = migrated_pool.connection()
+    cursor = conn.cursor()
+    for number in range(ITEM_COUNT):
+        insert_item(cursor, f'Item {number:02d}', 10 + number // 3,
+                    category='electronics' if number % 2 else 'clothing')
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def walk(client, **params):
+    """Follow next_cursor from the first page; returns the names of each page."""
+    pages = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get('/api/items', query_string={'cursor': cursor, **params})
+        assert response.status_code == 200
+        data = response.get_json()
+        pages.append([item['name'] for item in data['items']])
+        assert data['pagination']['has_more'] == (data['pagination']['next_cursor'] is not None)
+        cursor = data['pagination']['next_cursor']
+        assert len(pages) <= ITEM_COUNT
+    return pages
+
+
+def test_cursor_round_trip():
+    """Tokens are opaque but decode to the sort order and row key."""
+    token = encode_item_cursor('recent', {
+        'date_found': '2025-11-10 10:00:00', 'created_at': '2025-11-10 12:00:00', 'item_id': 7
+    })
+    assert '=' not in token
+    assert decode_item_cursor(token) == ('recent', ['2025-11-10 10:00:00', '2025-11-10 12:00:00', 7])
+    for bad in ('not-a-cursor', 'W10', encode_item_cursor('sideways', {
+            'date_found': 'x', 'created_at': 'y', 'item_id': 1})):
+        with pytest.raises(ValueError):
+            decode_item_cursor(bad)
+
+
+def test_walk_all_pages_recent(client):
+    """Every item appears exactly once, newest first, ties broken by item_id."""
+    pages = walk(client, page_size=5)
+    assert [len(page) for page in pages] == [5, 5, 2]
+    names = [name for page in pages for name in page]
+    assert names == [f'Item {number:02d}' for number in reversed(range(ITEM_COUNT))]
+
+
+def test_walk_all_pages_oldest(client):
+    """sort=oldest walks the same items in the opposite order."""
+    pages = walk(client, page_size=4, sort='oldest')
+    assert [len(page) for page in pages] == [4, 4, 4]
+    names = [name for page in pages for name in page]
+    assert names == [f'Item {number:02d}' for number in range(ITEM_COUNT)]
+
+
+def test_inserts_do_not_shift_pages(client, pool):
+    """A newer item added between requests does not repeat the boundary item."""
+    first = client.get('/api/items?cursor=&page_size=3').get_json()
+    assert [item['name'] for item in first['items']] == ['Item 11', 'Item 10', 'Item 09']
+
+    conn = pool.connection()
+    insert_item(conn.cursor(), 'Newest', 20)
+    conn.commit()
+    conn.close()
+
+    second = client.get('/api/items', query_string={
+        'cursor': first['pagination']['next_cursor'], 'page_size': 3
+    }).get_json()
+    assert [item['name'] for item in second['items']] == ['Item 08', 'Item 07', 'Item 06']
+
+    # Page numbers, by contrast, shift by the inserted row
+    page_two = client.get('/api/items?page=2&page_size=3').get_json()
+    assert page_two['items'][0]['name'] == 'Item 09'
+
+
+def test_cursor_with_filters_and_search(client):
+    """Filters and full-text search apply to every cursor page."""
+    pages = walk(client, page_size=2, category='electronics')
+    names = [name for page in pages for name in page]
+    assert names == ['Item 11', 'Item 09', 'Item 07', 'Item 05', 'Item 03', 'Item 01']
+
+    pages = walk(client, page_size=4, search='description')
+    assert sum(len(page) for page in pages) == ITEM_COUNT
+
+
+def test_invalid_cursors_rejected(client):
+    """Garbage, other-order and relevance-ranked cursor requests are 400s."""
+    assert client.get('/api/items?cursor=garbage!').status_code == 400
+
+    recent = client.get('/api/items?cursor=&page_size=2').get_json()['pagination']['next_cursor']
+    response = client.get('/api/items', query_string={'cursor': recent, 'sort': 'oldest'})
+    assert response.status_code == 400
+
+    response = client.get('/api/items?cursor=&sort=relevance&search=item')
+    assert response.status_code == 400
+
+
+def test_page_mode_unchanged(client):
+    """Page numbers still work and offer a cursor for the following page."""
+    data = client.get('/api/items?page=2&page_size=5').get_json()
+    assert data['pagination']['page'] == 2
+    assert data['pagination']['total_pages'] == 3
+    assert data['pagination']['total_count'] == ITEM_COUNT
+    assert [item['name'] for item in data['items']][0] == 'Item 06'
+
+    following = client.get('/api/items', query_string={
+        'cursor': data['pagination']['next_cursor'], 'page_size': 5
+    }).get_json()
+    assert [item['name'] for item in following['items']] == ['Item 01', 'Item 00']
+    assert following['pagination']['next_cursor'] is None
+
+    last = client.get('/api/items?page=3&page_size=5').get_json()
+    assert last['pagination']['next_cursor'] is None
+
+
+def test_sqlite_cursor_page_uses_listing_index(pool):
+    """The page after a cursor is a range seek on idx_items_listing, not a sort."""
+    if pool.backend != 'sqlite':
+        pytest.skip('SQLite query plan')
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        EXPLAIN QUERY PLAN SELECT item_id FROM items
+        WHERE status != 'deleted' AND {app_module.ITEM_AFTER_CURSOR['recent']}
+        ORDER BY {app_module.ITEM_ORDER['recent']} LIMIT 21
+    ''', ('2025-11-12 10:00:00', '2025-11-12 12:00:00', 7))
+    plan = ' | '.join(row[3] for row in cursor.fetchall())
+    conn.close()
+    assert 'idx_items_listing' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,119 @@
+"""
+Test suite for the schema migration engine.
+
+Tests cover:
+- Fresh database upgraded to the latest version
+- Upgrades are idempotent and recorded in schema_version
+- Pre-migration databases are adopted in place (missing columns added)
+- Startup version check
+- Partial upgrades with --to
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+import sqlite3
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import migrations
+from db_config import column_names, table_exists
+from db_pool import SQLitePool
+
+TEST_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'test_migrations.db')
+
+
+@pytest.fixture
+def pool():
+    """Pool on an empty test database file."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    pool = SQLitePool(TEST_DB_PATH, profile='default')
+    yield pool
+    pool.close()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+def test_fresh_database_upgraded_to_latest(pool):
+    """All migrations apply to an empty database and are recorded."""
+    conn = pool.connection()
+    applied = migrations.upgrade(conn)
+    assert [step.version for step in applied] == [step.version for step in migrations.MIGRATIONS]
+    assert migrations.current_version(conn) == migrations.latest_version()
+
+    cursor = conn.cursor()
+    for table in ('users', 'items', 'claims', 'activity_log', 'notifications'):
+        assert table_exists(cursor, table)
+    conn.close()
+
+
+def test_upgrade_is_idempotent(pool):
+    """A second upgrade applies nothing."""
+    conn = pool.connection()
+    migrations.upgrade(conn)
+    assert migrations.upgrade(conn) == []
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) AS count FROM schema_version')
+    assert cursor.fetchone()['count'] == len(migrations.MIGRATIONS)
+    conn.close()
+
+
+def test_legacy_database_adopted(pool):
+    """A database created before migrations existed gets its missing columns."""
+    legacy = sqlite3.connect(TEST_DB_PATH)
+    legacy.execute('''
+        CREATE TABLE items (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT,
+            category TEXT NOT NULL,
+            location_found TEXT NOT NULL,
+            pickup_at TEXT NOT NULL,
+            date_found TIMESTAMP NOT NULL,
+            status TEXT NOT NULL DEFAULT 'unclaimed',
+            image_url TEXT,
+            found_by_desk TEXT NOT NULL,
+            created_by_user_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    legacy.execute('''
+        INSERT INTO items (description, category, location_found, pickup_at, date_found, found_by_desk)
+        VALUES ('Blue bottle', 'bottles', 'PAC', 'PAC', '2025-11-21 14:00:00', 'PAC')
+    ''')
+    legacy.commit()
+    legacy.close()
+
+    conn = pool.connection()
+    migrations.upgrade(conn)
+    cursor = conn.cursor()
+    assert {'name', 'updated_at', 'claimed_at'} <= column_names(cursor, 'items')
+    cursor.execute('SELECT name, updated_at FROM items')
+    row = cursor.fetchone()
+    assert row['name'] == 'Blue bottle'
+    assert row['updated_at'] is not None
+    conn.close()
+
+
+def test_check_schema_reports_outdated(pool, capsys):
+    """The startup check reports a database that has not been migrated."""
+    conn = pool.connection()
+    assert migrations.check_schema(conn) == (0, migrations.latest_version())
+    assert 'migrations.py upgrade' in capsys.readouterr().out
+
+    migrations.upgrade(conn)
+    assert migrations.check_schema(conn) == (migrations.latest_version(), migrations.latest_version())
+    conn.close()
+
+
+def test_upgrade_to_target(pool):
+    """--to stops at the requested version."""
+    conn = pool.connection()
+    applied = migrations.upgrade(conn, target=1)
+    assert [step.version for step in applied] == [1]
+    assert migrations.current_version(conn) == 1
+    conn.close()
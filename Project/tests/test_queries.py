@@ -0,0 +1,118 @@
+"""
+Test suite for the named query registry.
+
+Backend tests run once per backend like test_data_access.py (PostgreSQL only
+when TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Registration and caching of named queries and their variants
+- Per-name execution count, errors and latency
+- Server-side prepared statements on PostgreSQL (PREPARE once per connection)
+- Staff-only diagnostics endpoint
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+from db_config import OperationalError
+from queries import named_query, query_stats, reset_query_stats
+
+from conftest import login
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool for each backend."""
+    return migrated_pool
+
+
+def stats_for(name):
+    return next(row for row in query_stats() if row['name'] == name)
+
+
+def test_named_query_is_cached_per_text():
+    """The same name and text return one object; variants share statistics."""
+    first = named_query('test.cached', 'SELECT 1 AS one')
+    assert named_query('test.cached', 'SELECT 1 AS one') is first
+    other = named_query('test.cached', 'SELECT 2 AS one')
+    assert other is not first
+    assert other.stats is first.stats
+    assert stats_for('test.cached')['variants'] == 2
+
+
+def test_prepared_text_uses_numbered_parameters():
+    """Prepared queries get $n placeholders and a valid statement name."""
+    query = named_query('test.numbered', 'SELECT * FROM items WHERE item_id = ? AND status = ?', prepare=True)
+    assert query._numbered == 'SELECT * FROM items WHERE item_id = $1 AND status = $2'
+    assert query.param_count == 2
+    assert query.statement_name.startswith('q_test_numbered_')
+    assert len(query.statement_name) <= 63
+
+
+def test_executions_are_counted_and_timed(pool):
+    """Each execution is recorded under the query's name, failures included."""
+    reset_query_stats()
+    query = named_query('test.count_users', 'SELECT COUNT(*) AS count FROM users WHERE role = ?', prepare=True)
+    conn = pool.connection()
+    cursor = conn.cursor()
+    for _ in range(3):
+        cursor.execute(query, ('staff',))
+        assert cursor.fetchone()['count'] == 1  # the conftest staff user
+    conn.rollback()
+
+    broken = named_query('test.broken', 'SELECT * FROM no_such_table')
+    with pytest.raises(OperationalError):
+        cursor.execute(broken)
+    conn.close()
+
+    stats = stats_for('test.count_users')
+    assert stats['count'] == 3
+    assert stats['errors'] == 0
+    assert stats['total_ms'] > 0
+    assert stats['max_ms'] >= stats['avg_ms']
+    assert stats_for('test.broken')['errors'] == 1
+
+
+def test_prepared_once_per_connection(pool):
+    """PostgreSQL prepares the statement on first use and then only EXECUTEs it."""
+    query = named_query('test.item_by_id', 'SELECT item_id FROM items WHERE item_id = ?', prepare=True)
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(query, (1,))
+    cursor.execute(query, (2,))
+    assert cursor.fetchone() is None
+
+    if cursor.dialect.name == 'postgresql':
+        cursor.execute('SELECT name FROM pg_prepared_statements')
+        names = [row['name'] for row in cursor.fetchall()]
+        assert names.count(query.statement_name) == 1
+    conn.close()
+
+
+@pytest.fixture
+def client(pool, client_for):
+    """Logged-out test client whose routes use the backend under test."""
+    return client_for(pool, None)
+
+
+def test_diagnostics_lists_hot_queries(client):
+    """Item listing queries show up in the staff diagnostics endpoint."""
+    reset_query_stats()
+    login(client, 'student@uwaterloo.ca')
+    assert client.get('/api/items?category=cards&location=slc').status_code == 200
+    assert client.get('/api/diagnostics/queries').status_code == 403
+    client.post('/auth/logout')
+
+    login(client, 'staff@uwaterloo.ca')
+    response = client.get('/api/diagnostics/queries')
+    assert response.status_code == 200
+    names = {row['name']: row for row in response.get_json()['queries']}
+    assert names['items.page']['count'] == 1
+    assert names['items.count']['count'] == 1
@@ -0,0 +1,127 @@
+"""
+Test suite for read-replica routing on PostgreSQL.
+
+Needs TEST_DATABASE_URL (skipped otherwise). The "replica" is a second pool
+on the same database, so routing can be observed through pool statistics.
+WARNING: the app's tables in that database are dropped and recreated.
+
+Tests cover:
+- Read-only endpoints use the replica pool
+- Writes stay on the primary
+- Sticky primary reads for the writing session (read-your-writes)
+- Fallback to the primary when the replica is unreachable
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import app
+import db_config
+import db_pool
+import migrations
+
+from conftest import USERS, add_users, login
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL', '')
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+
+
+def with_option(url, option):
+    return url + ('&' if '?' in url else '?') + option
+
+
+REPLICA_URL = with_option(TEST_DATABASE_URL, 'application_name=replica')
+
+
+@pytest.fixture
+def client(monkeypatch, drop_app_tables):
+    """Client on PostgreSQL with a replica configured, one staff and one student."""
+    db_pool.close_all_pools()
+    monkeypatch.setattr(db_config, 'DB_TYPE', 'postgresql')
+    monkeypatch.setattr(db_config, 'DATABASE_URL', TEST_DATABASE_URL)
+    monkeypatch.setattr(db_config, 'REPLICA_DATABASE_URL', REPLICA_URL)
+    monkeypatch.setattr(db_pool, '_replica_down_until', 0.0)
+    app.config['TESTING'] = True
+
+    conn = db_pool.get_postgres_pool().connection()
+    drop_app_tables(conn)
+    migrations.upgrade(conn)
+    add_users(conn, USERS)
+    conn.commit()
+    conn.close()
+
+    with app.test_client() as client:
+        yield client
+    db_pool.close_all_pools()
+
+
+def checkouts(url):
+    return db_pool.get_postgres_pool(url, role='replica').stats()['checkouts']
+
+
+def create_item(client, name):
+    response = client.post('/api/items', data=json.dumps({
+        'name': name, 'description': name, 'category': 'cards', 'location_found': 'SLC',
+        'pickup_at': 'SLC', 'date_found': '2025-11-20 10:00:00', 'found_by_desk': 'SLC'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    return response.get_json()['item']['item_id']
+
+
+def test_reads_go_to_replica(client):
+    """GET endpoints check out from the replica pool; login stays on the primary."""
+    login(client, 'student@uwaterloo.ca')
+    before = checkouts(REPLICA_URL)
+    assert client.get('/api/items').status_code == 200
+    assert client.get('/api/claims').status_code == 200
+    assert checkouts(REPLICA_URL) == before + 2
+    assert db_pool.get_postgres_pool(REPLICA_URL).role == 'replica'
+
+
+def test_session_sticks_to_primary_after_write(client, monkeypatch):
+    """After its own write a session reads from the primary until the window passes."""
+    monkeypatch.setattr(app_module, 'REPLICA_STICKY_SECONDS', 0.5)
+    login(client, 'staff@uwaterloo.ca')
+    item_id = create_item(client, 'Sticky Wallet')
+
+    replica_before = checkouts(REPLICA_URL)
+    response = client.get(f'/api/items/{item_id}')
+    assert response.status_code == 200
+    assert checkouts(REPLICA_URL) == replica_before
+
+    time.sleep(0.6)
+    assert client.get(f'/api/items/{item_id}').status_code == 200
+    assert checkouts(REPLICA_URL) == replica_before + 1
+
+
+def test_other_sessions_keep_using_replica(client):
+    """Only the writing session is pinned to the primary."""
+    # Plain clients: a `with` client keeps its last request's g alive for the next one
+    staff, student = app.test_client(), app.test_client()
+    login(staff, 'staff@uwaterloo.ca')
+    create_item(staff, 'Blue Bottle')
+
+    login(student, 'student@uwaterloo.ca')
+    before = checkouts(REPLICA_URL)
+    assert student.get('/api/items').status_code == 200
+    assert checkouts(REPLICA_URL) == before + 1
+
+
+def test_unreachable_replica_falls_back_to_primary(client, monkeypatch):
+    """A broken replica DSN does not break reads; the replica is skipped for a while."""
+    monkeypatch.setattr(db_config, 'REPLICA_DATABASE_URL', with_option(TEST_DATABASE_URL, 'port=1'))
+    login(client, 'student@uwaterloo.ca')
+    response = client.get('/api/items')
+    assert response.status_code == 200
+    assert not db_pool.replica_available()
@@ -0,0 +1,164 @@
+"""
+Test suite for the cached /api/items responses.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- ResponseCache LRU eviction, TTL expiry, generation checks and stats
+- Request keys normalized (parameter order, letter case) and split by role
+- Repeated listings served without running the listing queries
+- Item and claim writes through the API invalidate cached listings
+- Diagnostics endpoint (staff only)
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+from werkzeug.datastructures import MultiDict
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import response_cache
+from queries import query_stats
+from response_cache import ResponseCache, request_key
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with two items."""
+    conn = migrated_pool.connection()
+    for name, category in (('Black Wallet', 'cards'), ('Water Bottle', 'bottles')):
+        conn.execute('''
+            INSERT INTO items (name, description, category, location_found, pickup_at, date_found, found_by_desk)
+            VALUES (?, ?, ?, 'SLC Great Hall', 'SLC', '2025-11-20 10:00:00', 'SLC')
+        ''', (name, name, category))
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+
+def page_calls():
+    return next((row['count'] for row in query_stats() if row['name'] == 'items.page'), 0)
+
+
+def listing(client, query='page=1&sort=recent'):
+    response = client.get(f'/api/items?{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def item(data, name):
+    return next(entry for entry in data['items'] if entry['name'] == name)
+
+
+def test_response_cache_lru_ttl_and_generation(monkeypatch):
+    """Entries miss once their generations move or the TTL passes; the oldest is evicted."""
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now[0])
+    cache = ResponseCache(size=2, ttl=30)
+    cache.put('a', (1, 1), b'A')
+    cache.put('b', (1, 1), b'B')
+    assert cache.get('a', (1, 1)) == b'A'
+    assert cache.get('a', (1, 2)) is None
+    cache.put('c', (1, 1), b'C')
+    cache.put('d', (1, 1), b'D')
+    assert cache.get('b', (1, 1)) is None
+    now[0] += 31
+    assert cache.get('d', (1, 1)) is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+    assert stats['invalidated'] == 1
+    assert stats['evictions'] == 1
+    assert stats['expired'] == 1
+    assert stats['entries'] == 1
+
+
+def test_request_key_normalized():
+    """Order and case of caseless values do not matter; status, cursor and role do."""
+    key = request_key('items', 'student', MultiDict([('page', '1'), ('category', 'Cards')]))
+    assert key == request_key('items', 'student', MultiDict([('category', ' cards'), ('page', '1')]))
+    assert key != request_key('items', 'staff', MultiDict([('category', 'cards'), ('page', '1')]))
+    assert request_key('items', 'student', MultiDict([('status', 'Claimed')])) != \
+        request_key('items', 'student', MultiDict([('status', 'claimed')]))
+    assert request_key('items', 'student', MultiDict([('cursor', 'AbC')])) != \
+        request_key('items', 'student', MultiDict([('cursor', 'abc')]))
+
+
+def test_repeated_listing_served_from_cache(client):
+    """The second identical request runs no listing query and returns the same body."""
+    first = client.get('/api/items?page=1&sort=recent')
+    calls = page_calls()
+    second = client.get('/api/items?sort=Recent&page=1')
+    assert page_calls() == calls
+    assert second.status_code == 200
+    assert second.get_data() == first.get_data()
+
+    listing(client, 'page=1&sort=oldest')
+    assert page_calls() == calls + 1
+
+
+def test_item_writes_invalidate(client):
+    """create_item, update_item and delete_item all show up on the next request."""
+    assert len(listing(client)['items']) == 2
+
+    response = client.post('/api/items', data=json.dumps({
+        'name': 'Calculator', 'description': 'TI-84', 'category': 'electronics',
+        'location_found': 'E7 Atrium', 'pickup_at': 'SLC', 'date_found': '2025-11-21T10:00:00',
+        'found_by_desk': 'SLC'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    item_id = response.get_json()['item']['item_id']
+    assert len(listing(client)['items']) == 3
+
+    response = client.put(f'/api/items/{item_id}', data=json.dumps({'category': 'keys'}),
+                          content_type='application/json')
+    assert response.status_code == 200
+    assert item(listing(client), 'Calculator')['category'] == 'keys'
+
+    assert client.delete(f'/api/items/{item_id}').status_code == 200
+    assert len(listing(client)['items']) == 2
+
+
+def test_claim_writes_invalidate(client, pool, client_for):
+    """create_claim and update_claim change the cached claim details."""
+    assert item(listing(client), 'Black Wallet')['pending_claims'] == 0
+
+    student = client_for(pool, 'student@uwaterloo.ca')
+    response = student.post('/api/claims', data=json.dumps({
+        'item_id': 1, 'verification_text': 'Black leather, my WatCard inside'
+    }), content_type='application/json')
+    assert response.status_code == 201
+    claim_id = response.get_json()['claim']['claim_id']
+    # The student's listing is cached separately from staff's
+    assert item(listing(student), 'Black Wallet')['pending_claims'] == 1
+
+    assert item(listing(client), 'Black Wallet')['pending_claims'] == 1
+
+    response = client.patch(f'/api/claims/{claim_id}', data=json.dumps({'status': 'approved'}),
+                            content_type='application/json')
+    assert response.status_code == 200
+    wallet = item(listing(client), 'Black Wallet')
+    assert wallet['pending_claims'] == 0
+    assert wallet['latest_claim_status'] == 'approved'
+
+
+def test_diagnostics_endpoint(client, pool, client_for):
+    listing(client)
+    listing(client)
+    response = client.get('/api/diagnostics/response-cache')
+    assert response.status_code == 200
+    caches = [entry for entry in response.get_json()['caches'] if entry['backend'] == pool.backend]
+    assert any(entry['hits'] >= 1 and entry['entries'] >= 1 for entry in caches)
+
+    student = client_for(pool, 'student@uwaterloo.ca')
+    assert student.get('/api/diagnostics/response-cache').status_code == 403
@@ -0,0 +1,188 @@
+"""
+Test suite for saved searches and their notifications.
+
+Runs once per backend like test_data_access.py (PostgreSQL only when
+TEST_DATABASE_URL is set; its app tables are dropped and recreated).
+
+Tests cover:
+- Creating, listing and deleting saved searches (own only)
+- Validation and the per-user limit
+- A new item notifies owners of matching searches: word prefixes, category,
+  desk and partial location filters, one notification per user
+- No notification for non-matching items, the item's creator or deleted searches
+- Saved searches written by another worker picked up through their generation
+- Percolation only checks the searches the item's words reach
+
+Author: Team 15
+"""
+
+import pytest
+import json
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import app
+import saved_searches
+from saved_searches import Percolator, SavedSearch
+from write_queue import get_write_queue
+
+from conftest import USERS, add_users
+
+
+# Added to conftest.USERS (staff is user 1, student 2)
+OTHER_STUDENT = ('other@uwaterloo.ca', 'student')
+
+
+@pytest.fixture
+def pool(pool, migrated_pool):
+    """The migrated pool with a second student."""
+    conn = migrated_pool.connection()
+    add_users(conn, [OTHER_STUDENT])
+    conn.commit()
+    conn.close()
+
+    yield migrated_pool
+
+    get_write_queue().flush(timeout=10)
+
+
+@pytest.fixture
+def clients(pool, client_for):
+    """Logged-in staff, student and other-student clients on the backend under test."""
+    return [client_for(pool, email) for email, _role in USERS + [OTHER_STUDENT]]
+
+
+def save(client, **search):
+    response = client.post('/api/saved-searches', data=json.dumps(search), content_type='application/json')
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['saved_search']
+
+
+def log_item(staff, **values):
+    item = dict({
+        'name': 'Umbrella', 'description': 'Green umbrella', 'category': 'other',
+        'location_found': 'DC Library', 'pickup_at': 'SLC', 'date_found': '2025-11-21T10:00:00Z',
+        'found_by_desk': 'SLC'
+    }, **values)
+    response = staff.post('/api/items', data=json.dumps(item), content_type='application/json')
+    assert response.status_code == 201
+    get_write_queue().flush(timeout=10)
+    return response.get_json()['item']['item_id']
+
+
+def notifications(client):
+    response = client.get('/api/notifications?status=all')
+    assert response.status_code == 200
+    return [n for n in response.get_json()['notifications'] if n['title'] == 'Saved Search Match']
+
+
+def test_create_list_delete(clients):
+    staff, student, other = clients
+    first = save(student, search='black wallet')
+    assert first['name'] == 'black wallet' and first['search'] == 'black wallet'
+    second = save(student, name='Keys', category='Keys', location='SLC')
+    assert second['category'] == 'Keys' and second['search'] is None
+
+    listed = student.get('/api/saved-searches').get_json()
+    assert listed['count'] == 2
+    assert [s['saved_search_id'] for s in listed['saved_searches']] == \
+        [second['saved_search_id'], first['saved_search_id']]
+    assert other.get('/api/saved-searches').get_json()['count'] == 0
+
+    assert other.delete(f"/api/saved-searches/{first['saved_search_id']}").status_code == 404
+    assert student.delete(f"/api/saved-searches/{first['saved_search_id']}").status_code == 200
+    assert student.get('/api/saved-searches').get_json()['count'] == 1
+
+
+def test_validation(clients, monkeypatch):
+    student = clients[1]
+
+    def status(body):
+        return student.post('/api/saved-searches', data=json.dumps(body),
+                            content_type='application/json').status_code
+
+    assert status({}) == 400
+    assert status({'name': 'Nothing to match'}) == 400
+    assert status({'search': '!!!'}) == 400
+    assert status({'search': 'x' * 201}) == 400
+    assert status({'search': 5}) == 400
+
+    monkeypatch.setattr(app_module, 'SAVED_SEARCH_LIMIT', 2)
+    assert status({'search': 'wallet'}) == 201
+    assert status({'search': 'keys'}) == 201
+    assert status({'search': 'phone'}) == 400
+
+
+def test_new_item_notifies_matching_searches(clients):
+    staff, student, other = clients
+    wallet = save(student, name='My wallet', search='blac wal')
+    save(student, category='CARDS')
+    save(other, search='wallet', location='great hall')
+    save(other, search='wallet', desk='PAC')
+
+    item_id = log_item(staff, name='Black Wallet', description='Leather', category='cards',
+                       location_found='SLC Great Hall')
+    received = notifications(student)
+    assert len(received) == 1
+    assert received[0]['metadata']['item_id'] == item_id
+    assert len(received[0]['metadata']['saved_search_ids']) == 2
+    assert 'My wallet' in received[0]['message'] and 'Black Wallet' in received[0]['message']
+    assert wallet['saved_search_id'] in received[0]['metadata']['saved_search_ids']
+    # Location matched, desk did not
+    assert len(notifications(other)) == 1
+    assert len(notifications(other)[0]['metadata']['saved_search_ids']) == 1
+
+
+def test_no_notification_without_match(clients):
+    staff, student, _other = clients
+    save(student, search='black wallet')
+    log_item(staff, name='Blue Wallet')
+    log_item(staff, name='Black Umbrella')
+    assert notifications(student) == []
+
+
+def test_creator_and_deleted_searches_not_notified(clients):
+    staff, student, _other = clients
+    save(staff, search='umbrella')
+    search = save(student, search='umbrella')
+    assert student.delete(f"/api/saved-searches/{search['saved_search_id']}").status_code == 200
+    log_item(staff)
+    assert notifications(staff) == []
+    assert notifications(student) == []
+
+
+def test_searches_saved_elsewhere(clients, pool):
+    """A saved search inserted by another worker is seen through its generation."""
+    staff, student, _other = clients
+    log_item(staff)   # percolator built
+    conn = pool.connection()
+    conn.execute("INSERT INTO saved_searches (user_id, name, search_text) VALUES (2, 'Brolly', 'umbrella')")
+    conn.commit()
+    conn.close()
+    log_item(staff)
+    assert len(notifications(student)) == 1
+
+
+def test_percolation_checks_reached_searches_only(monkeypatch):
+    index = Percolator()
+    for search_id in range(5000):
+        index.add(SavedSearch(search_id, 1, 'other', (f'word{search_id}',), None, None, None))
+    index.add(SavedSearch(9999, 2, 'wallet', ('black', 'wal'), None, 'slc', None))
+
+    checked = []
+    real_filters_match = saved_searches._filters_match
+
+    def counting_filters_match(search, item):
+        checked.append(search.search_id)
+        return real_filters_match(search, item)
+
+    monkeypatch.setattr(saved_searches, '_filters_match', counting_filters_match)
+    matched = index.percolate({'name': 'Black Wallet', 'location_found': 'SLC Great Hall'})
+    assert [search.search_id for search in matched] == [9999]
+    assert checked == [9999]
+    assert index.percolate({'name': 'Black Wallet', 'location_found': 'PAC'}) == []
@@ -0,0 +1,178 @@
+"""
+Test suite for the write-behind queue.
+
+Tests cover:
+- Batching queued writes with executemany in one transaction
+- Bounded capacity (overflow is written synchronously, never dropped)
+- Failed rows counted without losing the rest of the batch
+- Flush on stop
+- Audit log, last login and notifications going through the queue
+- Notifications written only after the request's transaction commits
+
+Author: Team 15
+"""
+
+import pytest
+import os
+import sys
+import threading
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Import after path is set
+import app as app_module
+from app import app, insert_notification, log_activity
+import migrations
+from db_pool import SQLitePool
+from write_queue import WriteBehindQueue, get_write_queue
+
+from conftest import add_users
+
+TEST_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'test_write_queue.db')
+
+INSERT_LOG = 'INSERT INTO activity_log (action_type, details) VALUES (?, ?)'
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Migrated test database that the app's connection helpers use."""
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+    pool = SQLitePool(TEST_DB_PATH, profile='default')
+    conn = pool.connection()
+    migrations.upgrade(conn)
+    conn.close()
+    monkeypatch.setattr(app_module, 'get_pool', lambda *args, **kwargs: pool)
+    yield pool
+    get_write_queue().flush(timeout=10)
+    pool.close()
+    if os.path.exists(TEST_DB_PATH):
+        os.remove(TEST_DB_PATH)
+
+
+def count(pool, sql, params=()):
+    conn = pool.connection()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    value = cursor.fetchone()[0]
+    conn.close()
+    return value
+
+
+def test_writes_are_batched(pool):
+    """Queued rows are written by the writer thread in batches."""
+    queue = WriteBehindQueue(capacity=100, batch_size=50, enabled=True)
+    for i in range(20):
+        queue.submit(pool, INSERT_LOG, ('data_export', f'row {i}'))
+    assert queue.flush(timeout=10)
+    queue.stop()
+
+    assert count(pool, 'SELECT COUNT(*) FROM activity_log') == 20
+    stats = queue.stats()
+    assert stats['depth'] == 0
+    assert stats['enqueued'] == 20
+    assert stats['written'] == 20
+    assert stats['batches'] <= 20
+    assert stats['max_batch_size'] >= stats['avg_batch_size'] >= 1
+
+
+def paused_writer(queue, monkeypatch):
+    """Hold the writer thread before its first batch until the returned event is set."""
+    resume = threading.Event()
+    write_batch = queue._write_batch
+
+    def gated(batch):
+        if threading.current_thread().name == 'write-behind':
+            resume.wait(10)
+        write_batch(batch)
+
+    monkeypatch.setattr(queue, '_write_batch', gated)
+    return resume
+
+
+def test_full_queue_writes_synchronously(pool, monkeypatch):
+    """When the queue is full the caller writes the row itself."""
+    queue = WriteBehindQueue(capacity=2, batch_size=10, enabled=True)
+    resume = paused_writer(queue, monkeypatch)
+    queue.submit(pool, INSERT_LOG, ('data_export', 'taken by the writer'))
+    deadline = time.monotonic() + 5
+    while queue.stats()['depth'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for i in range(3):
+        queue.submit(pool, INSERT_LOG, ('data_export', f'row {i}'))
+    assert queue.stats()['overflows'] == 1
+    assert queue.stats()['depth'] == 2
+    assert count(pool, 'SELECT COUNT(*) FROM activity_log') == 1
+
+    resume.set()
+    assert queue.flush(timeout=10)
+    queue.stop()
+    assert count(pool, 'SELECT COUNT(*) FROM activity_log') == 4
+
+
+def test_failed_rows_do_not_lose_batch(pool, monkeypatch):
+    """A bad row is counted as failed; the rest of the batch is kept."""
+    queue = WriteBehindQueue(capacity=10, batch_size=10, enabled=True)
+    resume = paused_writer(queue, monkeypatch)
+    queue.submit(pool, INSERT_LOG, ('data_export', 'first'))
+    queue.submit(pool, INSERT_LOG, ('data_export', 'good'))
+    queue.submit(pool, 'INSERT INTO no_such_table (x) VALUES (?)', (1,))
+    queue.submit(pool, INSERT_LOG, ('data_export', 'also good'))
+    resume.set()
+    assert queue.flush(timeout=10)
+    queue.stop()
+
+    assert count(pool, 'SELECT COUNT(*) FROM activity_log') == 3
+    assert queue.stats()['failed'] == 1
+
+
+def test_stop_flushes_pending_writes(pool):
+    """Stopping the queue writes everything still queued."""
+    queue = WriteBehindQueue(capacity=100, batch_size=5, enabled=True)
+    for i in range(12):
+        queue.submit(pool, INSERT_LOG, ('data_export', f'row {i}'))
+    queue.stop(timeout=10)
+    assert count(pool, 'SELECT COUNT(*) FROM activity_log') == 12
+
+
+def test_notification_waits_for_commit(pool):
+    """Notifications queued in a request are written only if its transaction commits."""
+    with app.test_request_context('/'):
+        conn = app_module.get_db_connection()
+        insert_notification(conn.cursor(), 1, 'Rolled back', 'never written')
+        conn.close()  # rollback
+        conn = app_module.get_db_connection()
+        insert_notification(conn.cursor(), 1, 'Committed', 'written after commit')
+        conn.commit()
+        conn.close()
+    get_write_queue().flush(timeout=10)
+
+    assert count(pool, "SELECT COUNT(*) FROM notifications WHERE title = 'Rolled back'") == 0
+    assert count(pool, "SELECT COUNT(*) FROM notifications WHERE title = 'Committed'") == 1
+
+
+def test_login_and_audit_log_are_queued(pool, client_for, monkeypatch):
+    """The login path only enqueues its last_login update and audit writes."""
+    conn = pool.connection()
+    add_users(conn, [('staff@uwaterloo.ca', 'staff')])
+    conn.commit()
+    conn.close()
+
+    submitted = []
+    original_submit = get_write_queue().submit
+
+    def record_submit(target, query, params):
+        submitted.append(query.name)
+        original_submit(target, query, params)
+
+    monkeypatch.setattr(get_write_queue(), 'submit', record_submit)
+    client_for(pool)
+    with app.test_request_context('/'):
+        log_activity('user_login', details='queued', user_id=1)
+
+    get_write_queue().flush(timeout=10)
+    assert submitted == ['users.last_login', 'activity_log.insert']
+    assert count(pool, 'SELECT COUNT(*) FROM users WHERE last_login IS NOT NULL') == 1
+    assert count(pool, "SELECT COUNT(*) FROM activity_log WHERE action_type = 'user_login'") == 1